@@ -46,7 +46,8 @@ with app.app_context():
     cache = LLMCache()
     print(f"  Enabled: {cache.enabled}")
     print(f"  TTL: {cache.ttl_seconds}s ({cache.ttl_seconds/3600:.1f}h)")
-    print(f"  Backend: {'Redis' if cache.redis_client else 'In-Memory Dict'}")
+    print(f"  Backend: {'In-process LRU + Redis' if cache.redis_client else 'In-process LRU'}")
+    print(f"  L1 limits: {cache.memory_cache.max_entries} entries / {cache.memory_cache.max_bytes // (1024 * 1024)} MB")
     
     # Session cache
     print("\n🔐 SESSION CACHE:")
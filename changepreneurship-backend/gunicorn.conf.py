@@ -7,7 +7,10 @@ bind = "0.0.0.0:5000"
 
 # Worker processes
 workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
-worker_class = "sync"
+# Threaded workers: a long-running SSE stream (/api/ai/insights-report/stream)
+# occupies one thread instead of a whole worker process
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
@@ -0,0 +1,35 @@
+"""add user assessment stats
+
+Revision ID: add_user_assessment_stats
+Revises: add_resume_enrichment_fields
+Create Date: 2026-10-17 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_user_assessment_stats'
+down_revision = 'add_resume_enrichment_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_assessment_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_assessments', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_assessments', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_responses', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('average_progress', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('last_response_at', sa.DateTime(), nullable=True),
+        sa.Column('phase_stats', sa.Text(), nullable=True),
+        sa.Column('response_type_counts', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_assessment_stats')
@@ -0,0 +1,52 @@
+"""add composite indexes for hot assessment access paths
+
+Revision ID: add_assessment_access_indexes
+Revises: add_user_assessment_stats
+Create Date: 2026-10-17 10:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_assessment_access_indexes'
+down_revision = 'add_user_assessment_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Older submit paths could insert the same question twice; keep the newest row
+    op.execute(
+        "DELETE FROM assessment_response WHERE id NOT IN ("
+        "  SELECT max_id FROM ("
+        "    SELECT MAX(id) AS max_id FROM assessment_response"
+        "    GROUP BY assessment_id, question_id"
+        "  ) AS latest"
+        ")"
+    )
+
+    with op.batch_alter_table('assessment_response') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_assessment_response_question', ['assessment_id', 'question_id']
+        )
+
+    op.create_index(
+        'ix_assessment_response_assessment_updated',
+        'assessment_response',
+        ['assessment_id', 'updated_at'],
+    )
+    op.create_index('ix_assessment_user_phase', 'assessment', ['user_id', 'phase_id'])
+    op.create_index(
+        'ix_user_session_token_active',
+        'user_session',
+        ['session_token', 'is_active'],
+        postgresql_include=['user_id', 'expires_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_session_token_active', table_name='user_session')
+    op.drop_index('ix_assessment_user_phase', table_name='assessment')
+    op.drop_index('ix_assessment_response_assessment_updated', table_name='assessment_response')
+    with op.batch_alter_table('assessment_response') as batch_op:
+        batch_op.drop_constraint('uq_assessment_response_question', type_='unique')
@@ -0,0 +1,36 @@
+"""add precomputed phase summaries
+
+Revision ID: add_phase_summary
+Revises: add_assessment_access_indexes
+Create Date: 2026-10-17 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_phase_summary'
+down_revision = 'add_assessment_access_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'phase_summary',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('phase_id', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('revision', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('input_digest', sa.String(length=32), nullable=True),
+        sa.Column('requested_at', sa.DateTime(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'phase_id', name='uq_phase_summary_user_phase')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('phase_summary')
@@ -0,0 +1,25 @@
+"""add user_assessment_stats.state_version
+
+Revision ID: add_stats_state_version
+Revises: add_phase_summary
+Create Date: 2026-10-17 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_stats_state_version'
+down_revision = 'add_phase_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'user_assessment_stats',
+        sa.Column('state_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('user_assessment_stats', 'state_version')
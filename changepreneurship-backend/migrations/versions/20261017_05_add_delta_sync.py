@@ -0,0 +1,44 @@
+"""add assessment.updated_at and response tombstones for delta sync
+
+Revision ID: add_delta_sync
+Revises: add_stats_state_version
+Create Date: 2026-10-17 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'add_delta_sync'
+down_revision = 'add_stats_state_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'assessment',
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+    )
+    op.create_table(
+        'assessment_response_tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('assessment_id', sa.Integer(), nullable=False),
+        sa.Column('phase_id', sa.String(length=50), nullable=False),
+        sa.Column('section_id', sa.String(length=100), nullable=False),
+        sa.Column('question_id', sa.String(length=100), nullable=False),
+        sa.Column('response_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_response_tombstone_user_deleted',
+        'assessment_response_tombstone',
+        ['user_id', 'deleted_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_response_tombstone_user_deleted', table_name='assessment_response_tombstone')
+    op.drop_table('assessment_response_tombstone')
+    op.drop_column('assessment', 'updated_at')
@@ -0,0 +1,43 @@
+"""Backfill / rebuild user_assessment_stats from raw assessment responses.
+
+Usage:
+    python rebuild_assessment_stats.py             # every user
+    python rebuild_assessment_stats.py --user 42   # a single user
+"""
+import argparse
+import sys
+import os
+
+# Add src to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.models.assessment import db, User
+from src.services.assessment_stats_service import AssessmentStatsService
+from src.main import app
+
+
+def rebuild_stats(user_id=None, batch_size=200):
+    """Rebuild stats for one user or for all users, committing in batches"""
+    with app.app_context():
+        if user_id is not None:
+            user_ids = [user_id]
+        else:
+            user_ids = [uid for (uid,) in db.session.query(User.id).order_by(User.id).all()]
+
+        for i, uid in enumerate(user_ids, start=1):
+            stats = AssessmentStatsService.rebuild(uid)
+            print(f"User {uid}: {stats.total_assessments} assessments, "
+                  f"{stats.total_responses} responses, "
+                  f"avg progress {stats.average_progress:.1f}%")
+            if i % batch_size == 0:
+                db.session.commit()
+
+        db.session.commit()
+        print(f"\n✅ Rebuilt assessment stats for {len(user_ids)} user(s)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user', type=int, default=None, help='Rebuild a single user id')
+    args = parser.parse_args()
+    rebuild_stats(args.user)
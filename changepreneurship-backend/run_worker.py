@@ -0,0 +1,37 @@
+"""Background job worker: executes queued report jobs (see src/services/job_queue.py)."""
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from main import app
+from src.services.job_queue import get_job_queue, work_forever, registered_job_types
+import src.services.report_jobs  # noqa: F401  (registers handlers)
+
+if __name__ == '__main__':
+    concurrency = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+    job_queue = get_job_queue()
+    stop = threading.Event()
+
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    if job_queue.in_process:
+        print("[Worker] REDIS_URL is not reachable; jobs are run inside the web process instead")
+        sys.exit(1)
+
+    requeued = job_queue.sweep_stale()
+    print(f"[Worker] Job types: {', '.join(registered_job_types())}")
+    print(f"[Worker] Concurrency: {concurrency}, re-queued stale jobs: {requeued}")
+
+    threads = [
+        threading.Thread(target=work_forever, args=(job_queue, app, stop), name=f'job-worker-{i}')
+        for i in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print("[Worker] Stopped")
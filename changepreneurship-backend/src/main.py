@@ -11,6 +11,10 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 from src.models.assessment import db
 from src.utils.limiter import limiter
+from src.utils.session_resolver import session_resolver
+from src.utils.single_flight import single_flight
+from src.utils.llm_cache import l1_cache
+from src.services.llm_router import router_stats
 from src.routes.user import user_bp
 from src.routes.auth import auth_bp
 from src.routes.assessment import assessment_bp
@@ -25,6 +29,8 @@ from src.routes.dashboard import dashboard_bp
 from src.routes.ai_recommendations import ai_recommendations_bp
 from src.routes.ai_routes import ai_bp
 from src.routes.data_import import data_import_bp
+from src.routes.jobs import jobs_bp
+from src.routes.metrics import metrics_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), "static"))
 # Trust exactly 1 proxy (Caddy) so get_remote_address returns the real client IP
@@ -118,6 +124,8 @@ app.register_blueprint(dashboard_bp)
 app.register_blueprint(ai_recommendations_bp)
 app.register_blueprint(ai_bp, url_prefix="/api/ai")
 app.register_blueprint(data_import_bp, url_prefix="/api/data/import")
+app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
+app.register_blueprint(metrics_bp)
 
 # Database configuration
 database_url = os.getenv("DATABASE_URL")
@@ -150,7 +158,7 @@ with app.app_context():
                 print("[Startup] SQLite: No tables found, creating...")
                 db.create_all()
             else:
-                required = {"user", "entrepreneur_profile", "user_session"}
+                required = {"user", "entrepreneur_profile", "user_session", "user_assessment_stats"}
                 missing = required.difference(tables)
                 if missing:
                     print(f"[Startup] SQLite: Missing {missing}, creating...")
@@ -189,4 +197,10 @@ def serve(path):
 
 @app.get('/api/health')
 def health():
-    return jsonify({"status": "ok"})
+    return jsonify({
+        "status": "ok",
+        "session_cache": session_resolver.stats(),
+        "single_flight": single_flight.stats(),
+        "llm_cache": l1_cache.stats(),
+        "llm_routes": router_stats(),
+    })
@@ -28,6 +28,11 @@ class User(db.Model):
         }
 
 class Assessment(db.Model):
+    __table_args__ = (
+        # Every per-phase lookup filters on (user_id, phase_id)
+        db.Index('ix_assessment_user_phase', 'user_id', 'phase_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     phase_id = db.Column(db.String(50), nullable=False)  # e.g., 'self_discovery', 'idea_discovery'
@@ -36,6 +41,8 @@ class Assessment(db.Model):
     completed_at = db.Column(db.DateTime)
     is_completed = db.Column(db.Boolean, default=False)
     progress_percentage = db.Column(db.Float, default=0.0)
+    # Phase-state changes for /sync-all?since= (progress, completion, metadata)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Store assessment data as JSON
     assessment_data = db.Column(db.Text)  # JSON string
@@ -68,6 +75,13 @@ class Assessment(db.Model):
         }
 
 class AssessmentResponse(db.Model):
+    __table_args__ = (
+        # One answer per question per assessment - lets saves become upserts
+        db.UniqueConstraint('assessment_id', 'question_id', name='uq_assessment_response_question'),
+        # Recent-activity / last-updated queries order by updated_at within an assessment
+        db.Index('ix_assessment_response_assessment_updated', 'assessment_id', 'updated_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     assessment_id = db.Column(db.Integer, db.ForeignKey('assessment.id'), nullable=False)
     section_id = db.Column(db.String(100), nullable=False)  # e.g., 'core_motivation', 'life_impact'
@@ -91,11 +105,14 @@ class AssessmentResponse(db.Model):
                 return self.response_value
         return None
     
-    def set_response_value(self, value):
+    @staticmethod
+    def encode_response_value(value):
         if isinstance(value, (dict, list)):
-            self.response_value = json.dumps(value)
-        else:
-            self.response_value = str(value)
+            return json.dumps(value)
+        return str(value)
+    
+    def set_response_value(self, value):
+        self.response_value = self.encode_response_value(value)
     
     def to_dict(self):
         return {
@@ -110,6 +127,29 @@ class AssessmentResponse(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class AssessmentResponseTombstone(db.Model):
+    """A deleted AssessmentResponse, kept so /sync-all?since= can report the deletion.
+
+    Written by a flush hook (services/assessment_sync.py); pruned after
+    SYNC_TOMBSTONE_RETENTION_DAYS, after which older cursors get a full sync.
+    """
+    __table_args__ = (
+        db.Index('ix_response_tombstone_user_deleted', 'user_id', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign keys: tombstones outlive their response and assessment rows
+    user_id = db.Column(db.Integer, nullable=False)
+    assessment_id = db.Column(db.Integer, nullable=False)
+    phase_id = db.Column(db.String(50), nullable=False)
+    section_id = db.Column(db.String(100), nullable=False)
+    question_id = db.Column(db.String(100), nullable=False)
+    response_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AssessmentResponseTombstone {self.question_id} for User {self.user_id}>'
+
 class EntrepreneurProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True)
@@ -202,7 +242,114 @@ class EntrepreneurProfile(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+class UserAssessmentStats(db.Model):
+    """Per-user assessment aggregates, maintained incrementally on every write.
+
+    Read endpoints use this row instead of scanning AssessmentResponse.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_assessments = db.Column(db.Integer, default=0, nullable=False)
+    completed_assessments = db.Column(db.Integer, default=0, nullable=False)
+    total_responses = db.Column(db.Integer, default=0, nullable=False)
+    average_progress = db.Column(db.Float, default=0.0, nullable=False)
+    last_response_at = db.Column(db.DateTime)
+
+    # JSON: {phase_id: {'progress', 'completed', 'responses', 'last_updated'}}
+    phase_stats = db.Column(db.Text)
+    # JSON: {response_type: count}
+    response_type_counts = db.Column(db.Text)
+
+    # Bumped by every write hook; derived-view cache keys embed it (utils/versioned_cache.py)
+    state_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserAssessmentStats for User {self.user_id}>'
+
+    def get_json_field(self, field_name):
+        field_value = getattr(self, field_name)
+        if field_value:
+            try:
+                return json.loads(field_value)
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    def set_json_field(self, field_name, value):
+        setattr(self, field_name, json.dumps(value or {}))
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'total_assessments': self.total_assessments,
+            'completed_assessments': self.completed_assessments,
+            'total_responses': self.total_responses,
+            'average_progress': self.average_progress,
+            'last_response_at': self.last_response_at.isoformat() if self.last_response_at else None,
+            'phase_stats': self.get_json_field('phase_stats'),
+            'response_type_counts': self.get_json_field('response_type_counts'),
+            'state_version': self.state_version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class PhaseSummary(db.Model):
+    """Precomputed AI summary of one completed phase, written by phase_summary jobs.
+
+    ``revision`` is bumped whenever the phase's responses change; a job only
+    stores its result if the revision it was started for is still current.
+    ``input_digest`` hashes the answers ``summary`` was generated from, so a
+    re-save of identical answers reuses it instead of calling the LLM again.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'phase_id', name='uq_phase_summary_user_phase'),
+    )
+
+    PENDING = 'pending'
+    READY = 'ready'
+    FAILED = 'failed'  # generation fell back; retried on the next request
+    STALE = 'stale'    # responses changed while the phase is not complete
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    phase_id = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    revision = db.Column(db.Integer, nullable=False, default=1)
+    summary = db.Column(db.Text)  # JSON string
+    input_digest = db.Column(db.String(32))
+    requested_at = db.Column(db.DateTime, default=datetime.utcnow)
+    generated_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<PhaseSummary {self.phase_id} for User {self.user_id} ({self.status})>'
+
+    def get_summary(self):
+        if self.summary:
+            return json.loads(self.summary)
+        return None
+
+    def set_summary(self, data):
+        self.summary = json.dumps(data) if data is not None else None
+
+    def to_dict(self):
+        return {
+            'phase_id': self.phase_id,
+            'status': self.status,
+            'revision': self.revision,
+            'summary': self.get_summary(),
+            'requested_at': self.requested_at.isoformat() if self.requested_at else None,
+            'generated_at': self.generated_at.isoformat() if self.generated_at else None
+        }
+
 class UserSession(db.Model):
+    __table_args__ = (
+        # Hit on every authenticated request; INCLUDE makes it index-only on Postgres
+        db.Index(
+            'ix_user_session_token_active', 'session_token', 'is_active',
+            postgresql_include=['user_id', 'expires_at'],
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     session_token = db.Column(db.String(255), unique=True, nullable=False)
@@ -3,7 +3,9 @@ AI Recommendations API Routes
 Provides endpoints for personalized AI-driven recommendations.
 
 Primary path: powered by InsightsReportService (Groq llama-3.3-70b-versatile).
-Fallback:     rule-based AIRecommendationsEngine if LLM call fails.
+Fallback:     rule-based AIRecommendationsEngine if LLM call fails, or when the
+              user's LLM token budget is spent (utils/llm_budget.py) and no
+              report is stored for their current answers.
 
 Security: all routes require authentication via verify_session_token().
           Users may only access their own recommendations.
@@ -17,6 +19,7 @@ from ..services.insights_report_service import InsightsReportService
 from ..models.assessment import Assessment, AssessmentResponse
 from ..utils.auth import verify_session_token
 from ..utils.assessment_collector import collect_assessment_data
+from ..utils.llm_budget import degraded_response, llm_budget
 
 logger = logging.getLogger(__name__)
 ai_recommendations_bp = Blueprint('ai_recommendations', __name__)
@@ -102,6 +105,19 @@ def _map_report_to_recommendations(report: dict, user_id: int) -> dict:
     }
 
 
+def _stored_report(user_id: int):
+    """The report already stored for the user's current answers, or None; never calls the LLM."""
+    try:
+        return InsightsReportService().cached_report(user_id, collect_assessment_data(user_id))
+    except Exception as e:
+        logger.warning(f"[Recommendations] Cached report lookup failed (user={user_id}): {e}")
+        return None
+
+
+def _generated_report(user_id: int) -> dict:
+    return InsightsReportService().generate_report(user_id, collect_assessment_data(user_id))
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -119,23 +135,27 @@ def get_recommendations(user_id):
     if user.id != user_id:
         return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-    try:
-        assessment_data = collect_assessment_data(user.id)
-        service = InsightsReportService()
-        report = service.generate_report(user.id, assessment_data)
-        data = _map_report_to_recommendations(report, user_id)
-        return jsonify({'success': True, 'data': data}), 200
-    except Exception as e:
-        logger.warning(
-            f"[Recommendations] LLM failed (user={user_id}): {e} — falling back to rule-based"
-        )
+    with llm_budget.spend(user.id, 'insights_report') as charge:
+        # Past the budget, a report already stored for these answers still costs nothing
+        report = None if charge.allowed else _stored_report(user.id)
+        if not charge.allowed and report is None:
+            data = AIRecommendationsEngine().generate_recommendations(user_id)
+            return degraded_response({'success': True, 'data': data}, charge)
         try:
-            engine = AIRecommendationsEngine()
-            data = engine.generate_recommendations(user_id)
+            report = report or _generated_report(user.id)
+            data = _map_report_to_recommendations(report, user_id)
             return jsonify({'success': True, 'data': data}), 200
-        except Exception as e2:
-            logger.error(f"[Recommendations] Fallback also failed: {e2}")
-            return jsonify({'success': False, 'error': str(e2)}), 500
+        except Exception as e:
+            logger.warning(
+                f"[Recommendations] LLM failed (user={user_id}): {e} — falling back to rule-based"
+            )
+            try:
+                engine = AIRecommendationsEngine()
+                data = engine.generate_recommendations(user_id)
+                return jsonify({'success': True, 'data': data}), 200
+            except Exception as e2:
+                logger.error(f"[Recommendations] Fallback also failed: {e2}")
+                return jsonify({'success': False, 'error': str(e2)}), 500
 
 
 @ai_recommendations_bp.route('/api/ai/recommendations/strengths/<int:user_id>', methods=['GET'])
@@ -150,29 +170,40 @@ def get_user_strengths(user_id):
     if user.id != user_id:
         return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-    try:
-        assessment_data = collect_assessment_data(user.id)
-        service = InsightsReportService()
-        report = service.generate_report(user.id, assessment_data)
-        ent = report.get('entrepreneur', {})
-        return jsonify({
-            'success': True,
-            'data': {
-                'strengths': [
-                    {'title': s['name'], 'score': s.get('score', 0)}
-                    for s in ent.get('strengths', [])
-                ],
-                'founder_profile': {
-                    'archetype': ent.get('archetype', 'Founder'),
-                    'tagline': ent.get('tagline', ''),
-                    'score': ent.get('score', 0),
+    with llm_budget.spend(user.id, 'insights_report') as charge:
+        # Past the budget, a report already stored for these answers still costs nothing
+        report = None if charge.allowed else _stored_report(user.id)
+        if not charge.allowed and report is None:
+            data = AIRecommendationsEngine().generate_recommendations(user_id)
+            return degraded_response({
+                'success': True,
+                'data': {
+                    'strengths': data['strengths'],
+                    'founder_profile': data['founder_profile'],
+                    'ai_confidence': data['ai_confidence'],
                 },
-                'ai_confidence': report.get('consensus', {}).get('confidence', 0.9),
-            },
-        }), 200
-    except Exception as e:
-        logger.error(f"[Strengths] Error for user {user_id}: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+            }, charge)
+        try:
+            report = report or _generated_report(user.id)
+            ent = report.get('entrepreneur', {})
+            return jsonify({
+                'success': True,
+                'data': {
+                    'strengths': [
+                        {'title': s['name'], 'score': s.get('score', 0)}
+                        for s in ent.get('strengths', [])
+                    ],
+                    'founder_profile': {
+                        'archetype': ent.get('archetype', 'Founder'),
+                        'tagline': ent.get('tagline', ''),
+                        'score': ent.get('score', 0),
+                    },
+                    'ai_confidence': report.get('consensus', {}).get('confidence', 0.9),
+                },
+            }), 200
+        except Exception as e:
+            logger.error(f"[Strengths] Error for user {user_id}: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @ai_recommendations_bp.route('/api/ai/recommendations/action-plan/<int:user_id>', methods=['GET'])
@@ -187,22 +218,29 @@ def get_action_plan(user_id):
     if user.id != user_id:
         return jsonify({'success': False, 'error': 'Access denied'}), 403
 
-    try:
-        assessment_data = collect_assessment_data(user.id)
-        service = InsightsReportService()
-        report = service.generate_report(user.id, assessment_data)
-        data = _map_report_to_recommendations(report, user_id)
-        return jsonify({
-            'success': True,
-            'data': {
-                'gaps': data['gaps'],
-                'next_steps': data['next_steps'],
-                'recommendations': data['recommendations'],
-                'success_probability': data['success_probability'],
-            },
-        }), 200
-    except Exception as e:
-        logger.error(f"[ActionPlan] Error for user {user_id}: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+    with llm_budget.spend(user.id, 'insights_report') as charge:
+        # Past the budget, a report already stored for these answers still costs nothing
+        report = None if charge.allowed else _stored_report(user.id)
+        if not charge.allowed and report is None:
+            data = AIRecommendationsEngine().generate_recommendations(user_id)
+            return degraded_response({
+                'success': True,
+                'data': {key: data[key] for key in ('gaps', 'next_steps', 'recommendations', 'success_probability')},
+            }, charge)
+        try:
+            report = report or _generated_report(user.id)
+            data = _map_report_to_recommendations(report, user_id)
+            return jsonify({
+                'success': True,
+                'data': {
+                    'gaps': data['gaps'],
+                    'next_steps': data['next_steps'],
+                    'recommendations': data['recommendations'],
+                    'success_probability': data['success_probability'],
+                },
+            }), 200
+        except Exception as e:
+            logger.error(f"[ActionPlan] Error for user {user_id}: {e}")
+            return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -1,21 +1,61 @@
 """
 AI Consensus API Routes
 Multi-LLM business insights endpoints
+
+Every endpoint that may call an LLM is charged against the user's token
+budget (utils/llm_budget.py); once it is spent they answer from cached or
+rule-based data (AIRecommendationsEngine) instead.
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from src.services.ai_consensus import AIConsensusService
 from src.services.insights_report_service import InsightsReportService
 from src.services.phase_summary_service import PhaseSummaryService
-from src.models.assessment import Assessment, AssessmentResponse
+from src.models.assessment import db, Assessment, AssessmentResponse, PhaseSummary
 from src.utils.auth import verify_session_token
-from src.utils.assessment_collector import collect_assessment_data
+from src.utils.assessment_collector import collect_assessment_data, build_phase_meta
+from src.services.report_jobs import enqueue_report_job, enqueue_phase_summary
+from src.services.phase_summary_store import PhaseSummaryStore
+from src.services.ai_recommendations_service import AIRecommendationsEngine
+from src.routes.jobs import job_accepted
+from src.utils.llm_budget import degraded_fields, degraded_response, llm_budget
+from src.utils.llm_metrics import spend_tracker
+import json
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
 ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
 
 
+def _rule_based_consensus(user_id: int) -> dict:
+    """Consensus-shaped answer from AIRecommendationsEngine (no LLM)."""
+    data = AIRecommendationsEngine().generate_recommendations(user_id)
+    insights = [
+        f"{item['title']}: {item['description']}"
+        for item in data['recommendations'] + data['gaps']
+        if item.get('title')
+    ]
+    return {
+        'success': True,
+        'consensus': {'key_insights': insights, 'models_consulted': 0, 'confidence': 'rule_based'},
+        'llm_responses': [],
+        'business_summary': '',
+    }
+
+
+def _rule_based_report(service: InsightsReportService, user_id: int) -> dict:
+    """The newest stored report, else the fallback report plus rule-based recommendations."""
+    report = service.latest_report(user_id)
+    if report is not None:
+        return {'success': True, 'report': report}
+    return {
+        'success': True,
+        'report': service._fallback_report(),
+        'recommendations': AIRecommendationsEngine().generate_recommendations(user_id),
+    }
+
+
 @ai_bp.route('/consensus', methods=['GET'])
 def get_consensus():
     """
@@ -29,33 +69,32 @@ def get_consensus():
     if error:
         return jsonify(error), status_code
 
-    try:
-        assessment_data = collect_assessment_data(user.id)
+    with llm_budget.spend(user.id, 'ai_consensus') as charge:
+        if not charge.allowed:
+            return degraded_response(_rule_based_consensus(user.id), charge)
+        try:
+            assessment_data = collect_assessment_data(user.id)
 
-        if not assessment_data['phases']:
-            return jsonify({
-                'success': False,
-                'error': 'No assessments found',
-                'message': 'Complete at least one assessment phase to get insights'
-            }), 404
-
-        phase_meta = {
-            'total_phases': len(assessment_data['phases']),
-            'completed_phases': sum(1 for p in assessment_data['phases'] if p.get('completed')),
-            'phases': assessment_data['phases'],
-        }
+            if not assessment_data['phases']:
+                return jsonify({
+                    'success': False,
+                    'error': 'No assessments found',
+                    'message': 'Complete at least one assessment phase to get insights'
+                }), 404
 
-        consensus_service = AIConsensusService()
-        result = consensus_service.generate_consensus(assessment_data['responses'], phase_meta)
+            phase_meta = build_phase_meta(assessment_data)
 
-        return jsonify(result), 200
+            consensus_service = AIConsensusService()
+            result = consensus_service.generate_consensus(assessment_data['responses'], phase_meta)
 
-    except Exception as e:
-        logger.error(f"Consensus generation error: {e}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+            return jsonify(result), 200
+
+        except Exception as e:
+            logger.error(f"Consensus generation error: {e}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
 
 
 @ai_bp.route('/executive-summary', methods=['GET'])
@@ -109,6 +148,11 @@ def get_insights_report():
 
     Query params:
         refresh=1  — bypass Redis cache and regenerate
+        async=1    — enqueue a background job and return 202 with its id
+                     (poll /api/jobs/<id> and /api/jobs/<id>/result)
+        previous=1 — after the answers changed, return the report for the
+                     earlier answers at once (``_stale_reason:
+                     "answers_changed"``) while a new one is generated
 
     Returns:
         {
@@ -120,28 +164,98 @@ def get_insights_report():
     if error:
         return jsonify(error), status_code
 
-    try:
-        force_refresh = request.args.get('refresh', '0') == '1'
-        service = InsightsReportService()
+    service = InsightsReportService()
+    with llm_budget.spend(user.id, 'insights_report') as charge:
+        if not charge.allowed:
+            return degraded_response(_rule_based_report(service, user.id), charge)
+        try:
+            force_refresh = request.args.get('refresh', '0') == '1'
+
+            # Bust cache if requested
+            if force_refresh:
+                service.invalidate_cache(user.id)
+
+            if request.args.get('async', '0') == '1':
+                charge.keep_estimate = True
+                # A forced refresh must not be deduplicated onto the finished job for these answers
+                key_suffix = f"refresh:{uuid.uuid4().hex}" if force_refresh else None
+                job = enqueue_report_job('insights_report', user.id, key_suffix=key_suffix)
+                return jsonify(job_accepted(job)), 202
+
+            assessment_data = collect_assessment_data(user.id)
+            report = service.generate_report(
+                user.id, assessment_data, allow_previous=request.args.get('previous', '0') == '1'
+            )
 
-        # Bust cache if requested
-        if force_refresh:
-            service.invalidate_cache(user.id)
+            return jsonify({
+                'success': True,
+                'report': report,
+            }), 200
 
-        assessment_data = collect_assessment_data(user.id)
-        report = service.generate_report(user.id, assessment_data)
+        except Exception as e:
+            logger.error(f"[InsightsReport] Error for user {user.id}: {e}", exc_info=True)
+            return jsonify({
+                'success': False,
+                'error': str(e),
+            }), 500
 
-        return jsonify({
-            'success': True,
-            'report': report,
-        }), 200
 
-    except Exception as e:
-        logger.error(f"[InsightsReport] Error for user {user.id}: {e}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'error': str(e),
-        }), 500
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@ai_bp.route('/insights-report/stream', methods=['GET'])
+def stream_insights_report():
+    """
+    Server-sent-events variant of /insights-report.
+
+    Emits `progress` events immediately and while the model is generating,
+    a `section` event for each report section (entrepreneur, venture,
+    venture.heatmap, alignment, readiness) as soon as it is complete and
+    schema-checked, and finally a `report` event with the full report.
+
+    Query params:
+        refresh=1  — bypass Redis cache and regenerate
+    """
+    user, session, error, status_code = verify_session_token()
+    if error:
+        return jsonify(error), status_code
+
+    service = InsightsReportService()
+    user_id = user.id
+    charge = llm_budget.reserve(user_id, 'insights_report')
+    if not charge.allowed:
+        report = _rule_based_report(service, user_id)['report']
+
+        def degraded_events():
+            yield _sse('report', {**report, **degraded_fields(charge)})
+
+        return Response(degraded_events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'Retry-After': str(charge.retry_after)})
+
+    force_refresh = request.args.get('refresh', '0') == '1'
+    if force_refresh:
+        service.invalidate_cache(user_id)
+
+    assessment_data = collect_assessment_data(user_id)
+
+    def events():
+        # The generation runs while the response streams, so settle the budget here
+        with spend_tracker() as spent:
+            try:
+                for event, data in service.stream_report(user_id, assessment_data):
+                    yield _sse(event, data)
+            except Exception as e:
+                logger.error(f"[InsightsReport] Stream error for user {user_id}: {e}", exc_info=True)
+                yield _sse('error', {'success': False, 'error': str(e)})
+            finally:
+                llm_budget.settle(charge, spent.tokens)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -151,17 +265,23 @@ def get_insights_report():
 @ai_bp.route('/phase-summary', methods=['POST'])
 def get_phase_summary():
     """
-    Generate a brief AI-powered summary for a single completed assessment phase.
-    Called immediately after the user finishes a phase.
+    AI-powered summary for a single completed assessment phase.
+
+    Summaries are precomputed by a background job when the phase is
+    completed (and again when its answers change), so this usually returns
+    the stored result at once.
 
     Request body:
         { "phase_id": "self_discovery" }
 
     Returns:
-        {
-          success: true,
-          summary: { phase_id, score, headline, summary, key_findings, next_focus }
-        }
+        200 { success: true, status: "ready",
+              summary: { phase_id, score, headline, summary, key_findings, next_focus } }
+        202 { success: true, status: "pending", job, status_url, result_url }
+            while the job runs — poll this endpoint (or status_url) again
+
+    Phases without a precomputed summary (not completed, or completed
+    before summaries were precomputed) are summarised synchronously.
     """
     user, session, error, status_code = verify_session_token()
     if error:
@@ -181,11 +301,30 @@ def get_phase_summary():
             'error': f'No assessment found for phase: {phase_id}',
         }), 404
 
+    stored = PhaseSummaryStore.get(user.id, phase_id)
+    if stored is not None and assessment.is_completed:
+        if stored.status == PhaseSummary.READY:
+            return jsonify({'success': True, 'status': stored.status, 'summary': stored.get_summary()}), 200
+        if stored.status == PhaseSummary.FAILED:
+            # Serve the fallback, and try the LLM again in the background
+            summary = stored.get_summary()
+            PhaseSummaryStore.mark_pending(stored)
+            db.session.commit()
+            PhaseSummaryStore.dispatch_pending()
+            return jsonify({'success': True, 'status': PhaseSummary.FAILED, 'summary': summary}), 200
+        # Pending: re-enqueueing is idempotent per revision and revives a lost job
+        job = enqueue_phase_summary(user.id, phase_id, stored.revision)
+        return jsonify({'status': PhaseSummary.PENDING, **job_accepted(job)}), 202
+
     responses = AssessmentResponse.query.filter_by(
         assessment_id=assessment.id
     ).all()
 
     service = PhaseSummaryService()
-    summary = service.generate_summary(phase_id, assessment.phase_name, responses)
+    with llm_budget.spend(user.id, 'phase_summary') as charge:
+        if not charge.allowed:
+            summary = service._fallback_summary(phase_id, assessment.phase_name, len(responses))
+            return degraded_response({'success': True, 'status': PhaseSummary.READY, 'summary': summary}, charge)
+        summary = service.generate_summary(phase_id, assessment.phase_name, responses)
 
-    return jsonify({'success': True, 'summary': summary}), 200
+    return jsonify({'success': True, 'status': PhaseSummary.READY, 'summary': summary}), 200
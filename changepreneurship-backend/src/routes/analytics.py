@@ -6,13 +6,111 @@ Uses token-based authentication and aligns with current model fields
 from flask import Blueprint, request, jsonify, current_app
 from src.models.assessment import db, Assessment, AssessmentResponse, EntrepreneurProfile
 from src.utils.auth import verify_session_token
-from sqlalchemy import func, desc
+from src.utils.conditional_get import state_etag, utc_day
+from src.services.assessment_stats_service import AssessmentStatsService
+from src.utils.versioned_cache import VersionedCache
+from sqlalchemy import desc
 from datetime import datetime, timedelta
 import json
+import os
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# Views are keyed by the user's assessment state version, so a write is visible on the next poll;
+# the "last N days" views are also keyed by the UTC date, like their ETags
+analytics_cache = VersionedCache(
+    'analytics:dashboard',
+    ttl_seconds=int(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', '300')),
+    beta=float(os.getenv('DASHBOARD_CACHE_BETA', '1.0')),
+)
+
+def _build_overview(user_id):
+    """Overview payload for /dashboard/overview"""
+    # Load aggregates first: a lazy rebuild commits, which would expire the assessments
+    stats = AssessmentStatsService.get_stats(user_id)
+    phase_stats = stats.get_json_field('phase_stats')
+    
+    # Get user's assessments
+    assessments = Assessment.query.filter_by(user_id=user_id).all()
+    
+    # Calculate overall progress using correct field name
+    total_phases = 7  # 7-part framework
+    completed_phases = len([a for a in assessments if a.is_completed])
+    overall_progress = (completed_phases / total_phases) * 100 if total_phases > 0 else 0
+    
+    # Calculate total time spent (estimate based on progress)
+    total_time = sum([a.progress_percentage * 0.6 for a in assessments])  # Rough estimate
+    
+    # Get current phase
+    current_phase = None
+    phase_order = ['self_discovery', 'idea_discovery', 'market_research', 'business_pillars', 
+                  'product_concept_testing', 'business_development', 'business_prototype_testing']
+    
+    for phase_id in phase_order:
+        assessment = next((a for a in assessments if a.phase_id == phase_id), None)
+        if not assessment or not assessment.is_completed:
+            current_phase = phase_id
+            break
+    
+    # Get recent activity (using updated_at from AssessmentResponse)
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    recent_responses = db.session.query(AssessmentResponse)\
+        .join(Assessment)\
+        .filter(Assessment.user_id == user_id)\
+        .filter(AssessmentResponse.updated_at >= thirty_days_ago)\
+        .order_by(desc(AssessmentResponse.updated_at))\
+        .limit(10).all()
+    
+    # Generate insights
+    insights = generate_user_insights(assessments, overall_progress, stats)
+    
+    # Calculate achievements
+    achievements = calculate_achievements(assessments)
+    
+    # Get assessment progress with updated_at from responses
+    phase_progress = []
+    for phase_id in phase_order:
+        assessment = next((a for a in assessments if a.phase_id == phase_id), None)
+        if assessment:
+            # Latest response timestamp is maintained in the stats row
+            last_updated = (phase_stats.get(phase_id) or {}).get('last_updated')
+            if not last_updated and assessment.started_at:
+                last_updated = assessment.started_at.isoformat()
+        else:
+            last_updated = None
+        
+        phase_progress.append({
+            'phase_id': phase_id,
+            'progress': assessment.progress_percentage if assessment else 0,
+            'is_completed': assessment.is_completed if assessment else False,
+            'last_updated': last_updated
+        })
+    
+    dashboard_data = {
+        'overall_progress': round(overall_progress, 1),
+        'completed_phases': completed_phases,
+        'total_phases': total_phases,
+        'current_phase': current_phase,
+        'time_spent': round(total_time),
+        'insights': insights,
+        'achievements': achievements,
+        'recent_activity': [
+            {
+                'section_id': r.section_id,
+                'question_id': r.question_id,
+                'response_type': r.response_type,
+                'updated_at': r.updated_at.isoformat(),
+                'assessment_phase': next((a.phase_id for a in assessments if a.id == r.assessment_id), 'unknown')
+            } for r in recent_responses
+        ],
+        'phase_progress': phase_progress
+    }
+    
+    return dashboard_data
+
+
 @analytics_bp.route('/dashboard/overview', methods=['GET'])
+@state_etag
 def get_dashboard_overview():
     """Get comprehensive dashboard overview for authenticated user"""
     user, session, error, status_code = verify_session_token()
@@ -21,81 +119,10 @@ def get_dashboard_overview():
     user_id = user.id
     
     try:
-        # Get user's assessments
-        assessments = Assessment.query.filter_by(user_id=user_id).all()
-        
-        # Calculate overall progress using correct field name
-        total_phases = 7  # 7-part framework
-        completed_phases = len([a for a in assessments if a.is_completed])
-        overall_progress = (completed_phases / total_phases) * 100 if total_phases > 0 else 0
-        
-        # Calculate total time spent (estimate based on progress)
-        total_time = sum([a.progress_percentage * 0.6 for a in assessments])  # Rough estimate
-        
-        # Get current phase
-        current_phase = None
-        phase_order = ['self_discovery', 'idea_discovery', 'market_research', 'business_pillars', 
-                      'product_concept_testing', 'business_development', 'business_prototype_testing']
-        
-        for phase_id in phase_order:
-            assessment = next((a for a in assessments if a.phase_id == phase_id), None)
-            if not assessment or not assessment.is_completed:
-                current_phase = phase_id
-                break
-        
-        # Get recent activity (using updated_at from AssessmentResponse)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_responses = db.session.query(AssessmentResponse)\
-            .join(Assessment)\
-            .filter(Assessment.user_id == user_id)\
-            .filter(AssessmentResponse.updated_at >= thirty_days_ago)\
-            .order_by(desc(AssessmentResponse.updated_at))\
-            .limit(10).all()
-        
-        # Generate insights
-        insights = generate_user_insights(assessments, overall_progress)
-        
-        # Calculate achievements
-        achievements = calculate_achievements(assessments)
-        
-        # Get assessment progress with updated_at from responses
-        phase_progress = []
-        for phase_id in phase_order:
-            assessment = next((a for a in assessments if a.phase_id == phase_id), None)
-            if assessment:
-                # Get latest response for this assessment
-                latest_response = AssessmentResponse.query.filter_by(assessment_id=assessment.id)\
-                    .order_by(desc(AssessmentResponse.updated_at)).first()
-                last_updated = latest_response.updated_at if latest_response else assessment.started_at
-            else:
-                last_updated = None
-            
-            phase_progress.append({
-                'phase_id': phase_id,
-                'progress': assessment.progress_percentage if assessment else 0,
-                'is_completed': assessment.is_completed if assessment else False,
-                'last_updated': last_updated.isoformat() if last_updated else None
-            })
-        
-        dashboard_data = {
-            'overall_progress': round(overall_progress, 1),
-            'completed_phases': completed_phases,
-            'total_phases': total_phases,
-            'current_phase': current_phase,
-            'time_spent': round(total_time),
-            'insights': insights,
-            'achievements': achievements,
-            'recent_activity': [
-                {
-                    'section_id': r.section_id,
-                    'question_id': r.question_id,
-                    'response_type': r.response_type,
-                    'updated_at': r.updated_at.isoformat(),
-                    'assessment_phase': next((a.phase_id for a in assessments if a.id == r.assessment_id), 'unknown')
-                } for r in recent_responses
-            ],
-            'phase_progress': phase_progress
-        }
+        version = AssessmentStatsService.state_version(user_id)
+        dashboard_data, _ = analytics_cache.fetch(
+            user_id, version, lambda: _build_overview(user_id), variant=f'overview:{utc_day()}'
+        )
         
         return jsonify({
             'success': True,
@@ -106,7 +133,54 @@ def get_dashboard_overview():
         current_app.logger.error(f"Dashboard overview error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _build_progress_history(user_id, days):
+    """Daily progress for the last *days* days"""
+    # Get assessment responses updated in the last N days
+    start_date = datetime.utcnow() - timedelta(days=days)
+    responses = db.session.query(AssessmentResponse)\
+        .join(Assessment)\
+        .filter(Assessment.user_id == user_id)\
+        .filter(AssessmentResponse.updated_at >= start_date)\
+        .order_by(AssessmentResponse.updated_at).all()
+    
+    # Group by date and calculate daily progress
+    daily_progress = {}
+    assessments = Assessment.query.filter_by(user_id=user_id).all()
+    assessment_dict = {a.id: a for a in assessments}
+    
+    for response in responses:
+        date_key = response.updated_at.date().isoformat()
+        if date_key not in daily_progress:
+            daily_progress[date_key] = {
+                'date': date_key,
+                'responses_count': 0,
+                'assessments_updated': set(),
+                'phases_completed': 0
+            }
+        
+        daily_progress[date_key]['responses_count'] += 1
+        if response.assessment_id in assessment_dict:
+            daily_progress[date_key]['assessments_updated'].add(response.assessment_id)
+            assessment = assessment_dict[response.assessment_id]
+            if assessment.is_completed:
+                daily_progress[date_key]['phases_completed'] += 1
+    
+    # Convert to list and calculate metrics
+    history_data = []
+    for date_data in daily_progress.values():
+        history_data.append({
+            'date': date_data['date'],
+            'responses_count': date_data['responses_count'],
+            'assessments_updated': len(date_data['assessments_updated']),
+            'phases_completed': date_data['phases_completed']
+        })
+    history_data.sort(key=lambda x: x['date'])
+    
+    return history_data
+
+
 @analytics_bp.route('/dashboard/progress-history', methods=['GET'])
+@state_etag
 def get_progress_history():
     """Get historical progress data for charts"""
     user, session, error, status_code = verify_session_token()
@@ -117,56 +191,55 @@ def get_progress_history():
     days = request.args.get('days', 30, type=int)
     
     try:
-        # Get assessment responses updated in the last N days
-        start_date = datetime.utcnow() - timedelta(days=days)
-        responses = db.session.query(AssessmentResponse)\
-            .join(Assessment)\
-            .filter(Assessment.user_id == user_id)\
-            .filter(AssessmentResponse.updated_at >= start_date)\
-            .order_by(AssessmentResponse.updated_at).all()
-        
-        # Group by date and calculate daily progress
-        daily_progress = {}
-        assessments = Assessment.query.filter_by(user_id=user_id).all()
-        assessment_dict = {a.id: a for a in assessments}
-        
-        for response in responses:
-            date_key = response.updated_at.date().isoformat()
-            if date_key not in daily_progress:
-                daily_progress[date_key] = {
-                    'date': date_key,
-                    'responses_count': 0,
-                    'assessments_updated': set(),
-                    'phases_completed': 0
-                }
-            
-            daily_progress[date_key]['responses_count'] += 1
-            if response.assessment_id in assessment_dict:
-                daily_progress[date_key]['assessments_updated'].add(response.assessment_id)
-                assessment = assessment_dict[response.assessment_id]
-                if assessment.is_completed:
-                    daily_progress[date_key]['phases_completed'] += 1
-        
-        # Convert to list and calculate metrics
-        history_data = []
-        for date_data in daily_progress.values():
-            history_data.append({
-                'date': date_data['date'],
-                'responses_count': date_data['responses_count'],
-                'assessments_updated': len(date_data['assessments_updated']),
-                'phases_completed': date_data['phases_completed']
-            })
+        version = AssessmentStatsService.state_version(user_id)
+        history_data, _ = analytics_cache.fetch(
+            user_id, version, lambda: _build_progress_history(user_id, days), variant=f'progress-history:{days}:{utc_day()}'
+        )
         
         return jsonify({
             'success': True,
-            'data': sorted(history_data, key=lambda x: x['date'])
+            'data': history_data
         })
         
     except Exception as e:
         current_app.logger.error(f"Progress history error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _build_entrepreneur_profile(user_id):
+    """Profile and archetype analysis for /dashboard/entrepreneur-profile"""
+    # Get entrepreneur profile
+    profile = EntrepreneurProfile.query.filter_by(user_id=user_id).first()
+    
+    # Get self-discovery assessment
+    self_discovery = Assessment.query.filter_by(
+        user_id=user_id, 
+        phase_id='self_discovery'
+    ).first()
+    
+    profile_data = {
+        'entrepreneur_archetype': profile.entrepreneur_archetype if profile else None,
+        'core_motivation': profile.core_motivation if profile else None,
+        'risk_tolerance': profile.risk_tolerance if profile else None,
+        'confidence_level': profile.confidence_level if profile else None,
+        'primary_opportunity': profile.get_json_field('primary_opportunity') if profile else {},
+        'opportunity_score': profile.opportunity_score if profile else None,
+        'skills_assessment': profile.get_json_field('skills_assessment') if profile else {},
+        'success_probability': profile.success_probability if profile else None,
+        'ai_recommendations': profile.get_json_field('ai_recommendations') if profile else {},
+        'assessment_completed': self_discovery.is_completed if self_discovery else False,
+        'last_updated': profile.updated_at.isoformat() if profile and profile.updated_at else None
+    }
+    
+    # Add archetype details
+    if profile_data['entrepreneur_archetype']:
+        archetype_details = get_archetype_details(profile_data['entrepreneur_archetype'])
+        profile_data['archetype_details'] = archetype_details
+    
+    return profile_data
+
+
 @analytics_bp.route('/dashboard/entrepreneur-profile', methods=['GET'])
+@state_etag
 def get_entrepreneur_profile():
     """Get detailed entrepreneur profile and archetype analysis"""
     user, session, error, status_code = verify_session_token()
@@ -175,33 +248,10 @@ def get_entrepreneur_profile():
     user_id = user.id
     
     try:
-        # Get entrepreneur profile
-        profile = EntrepreneurProfile.query.filter_by(user_id=user_id).first()
-        
-        # Get self-discovery assessment
-        self_discovery = Assessment.query.filter_by(
-            user_id=user_id, 
-            phase_id='self_discovery'
-        ).first()
-        
-        profile_data = {
-            'entrepreneur_archetype': profile.entrepreneur_archetype if profile else None,
-            'core_motivation': profile.core_motivation if profile else None,
-            'risk_tolerance': profile.risk_tolerance if profile else None,
-            'confidence_level': profile.confidence_level if profile else None,
-            'primary_opportunity': profile.get_json_field('primary_opportunity') if profile else {},
-            'opportunity_score': profile.opportunity_score if profile else None,
-            'skills_assessment': profile.get_json_field('skills_assessment') if profile else {},
-            'success_probability': profile.success_probability if profile else None,
-            'ai_recommendations': profile.get_json_field('ai_recommendations') if profile else {},
-            'assessment_completed': self_discovery.is_completed if self_discovery else False,
-            'last_updated': profile.updated_at.isoformat() if profile and profile.updated_at else None
-        }
-        
-        # Add archetype details
-        if profile_data['entrepreneur_archetype']:
-            archetype_details = get_archetype_details(profile_data['entrepreneur_archetype'])
-            profile_data['archetype_details'] = archetype_details
+        version = AssessmentStatsService.state_version(user_id)
+        profile_data, _ = analytics_cache.fetch(
+            user_id, version, lambda: _build_entrepreneur_profile(user_id), variant='entrepreneur-profile'
+        )
         
         return jsonify({
             'success': True,
@@ -212,7 +262,20 @@ def get_entrepreneur_profile():
         current_app.logger.error(f"Entrepreneur profile error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _build_recommendations(user_id):
+    """Recommendations for /dashboard/recommendations"""
+    # Get user's assessment data
+    assessments = Assessment.query.filter_by(user_id=user_id).all()
+    profile = EntrepreneurProfile.query.filter_by(user_id=user_id).first()
+    
+    # Generate recommendations based on progress and profile
+    recommendations = generate_recommendations(assessments, profile)
+    
+    return recommendations
+
+
 @analytics_bp.route('/dashboard/recommendations', methods=['GET'])
+@state_etag
 def get_personalized_recommendations():
     """Get AI-powered personalized recommendations"""
     user, session, error, status_code = verify_session_token()
@@ -221,12 +284,10 @@ def get_personalized_recommendations():
     user_id = user.id
     
     try:
-        # Get user's assessment data
-        assessments = Assessment.query.filter_by(user_id=user_id).all()
-        profile = EntrepreneurProfile.query.filter_by(user_id=user_id).first()
-        
-        # Generate recommendations based on progress and profile
-        recommendations = generate_recommendations(assessments, profile)
+        version = AssessmentStatsService.state_version(user_id)
+        recommendations, _ = analytics_cache.fetch(
+            user_id, version, lambda: _build_recommendations(user_id), variant='recommendations'
+        )
         
         return jsonify({
             'success': True,
@@ -237,7 +298,49 @@ def get_personalized_recommendations():
         current_app.logger.error(f"Recommendations error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def _build_assessment_statistics(user_id):
+    """Statistics for /dashboard/assessment-stats"""
+    # Get all user assessments; response aggregates come from the stats row
+    user_stats = AssessmentStatsService.get_stats(user_id)
+    assessments = Assessment.query.filter_by(user_id=user_id).all()
+    
+    # Calculate statistics
+    stats = {
+        'total_assessments': len(assessments),
+        'completed_assessments': len([a for a in assessments if a.is_completed]),
+        'total_responses': user_stats.total_responses,
+        'average_progress': user_stats.average_progress,
+        'assessment_breakdown': {},
+        'response_types': user_stats.get_json_field('response_type_counts'),
+        'completion_timeline': []
+    }
+    
+    # Assessment breakdown by phase
+    for assessment in assessments:
+        phase_name = assessment.phase_name or assessment.phase_id
+        stats['assessment_breakdown'][phase_name] = {
+            'progress': assessment.progress_percentage,
+            'is_completed': assessment.is_completed,
+            'started_at': assessment.started_at.isoformat() if assessment.started_at else None,
+            'completed_at': assessment.completed_at.isoformat() if assessment.completed_at else None
+        }
+    
+    # Completion timeline
+    completed_assessments = [a for a in assessments if a.is_completed and a.completed_at]
+    stats['completion_timeline'] = [
+        {
+            'phase_name': a.phase_name,
+            'completed_at': a.completed_at.isoformat(),
+            'duration_days': (a.completed_at - a.started_at).days if a.started_at else 0
+        }
+        for a in sorted(completed_assessments, key=lambda x: x.completed_at)
+    ]
+    
+    return stats
+
+
 @analytics_bp.route('/dashboard/assessment-stats', methods=['GET'])
+@state_etag
 def get_assessment_statistics():
     """Get detailed assessment statistics"""
     user, session, error, status_code = verify_session_token()
@@ -246,55 +349,10 @@ def get_assessment_statistics():
     user_id = user.id
     
     try:
-        # Get all user assessments and responses
-        assessments = Assessment.query.filter_by(user_id=user_id).all()
-        total_responses = db.session.query(AssessmentResponse)\
-            .join(Assessment)\
-            .filter(Assessment.user_id == user_id)\
-            .count()
-        
-        # Calculate statistics
-        stats = {
-            'total_assessments': len(assessments),
-            'completed_assessments': len([a for a in assessments if a.is_completed]),
-            'total_responses': total_responses,
-            'average_progress': sum([a.progress_percentage for a in assessments]) / len(assessments) if assessments else 0,
-            'assessment_breakdown': {},
-            'response_types': {},
-            'completion_timeline': []
-        }
-        
-        # Assessment breakdown by phase
-        for assessment in assessments:
-            phase_name = assessment.phase_name or assessment.phase_id
-            stats['assessment_breakdown'][phase_name] = {
-                'progress': assessment.progress_percentage,
-                'is_completed': assessment.is_completed,
-                'started_at': assessment.started_at.isoformat() if assessment.started_at else None,
-                'completed_at': assessment.completed_at.isoformat() if assessment.completed_at else None
-            }
-        
-        # Response types breakdown
-        response_types = db.session.query(
-            AssessmentResponse.response_type,
-            func.count(AssessmentResponse.id).label('count')
-        ).join(Assessment)\
-         .filter(Assessment.user_id == user_id)\
-         .group_by(AssessmentResponse.response_type).all()
-        
-        for response_type, count in response_types:
-            stats['response_types'][response_type] = count
-        
-        # Completion timeline
-        completed_assessments = [a for a in assessments if a.is_completed and a.completed_at]
-        stats['completion_timeline'] = [
-            {
-                'phase_name': a.phase_name,
-                'completed_at': a.completed_at.isoformat(),
-                'duration_days': (a.completed_at - a.started_at).days if a.started_at else 0
-            }
-            for a in sorted(completed_assessments, key=lambda x: x.completed_at)
-        ]
+        version = AssessmentStatsService.state_version(user_id)
+        stats, _ = analytics_cache.fetch(
+            user_id, version, lambda: _build_assessment_statistics(user_id), variant='assessment-stats'
+        )
         
         return jsonify({
             'success': True,
@@ -305,7 +363,7 @@ def get_assessment_statistics():
         current_app.logger.error(f"Assessment statistics error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-def generate_user_insights(assessments, overall_progress):
+def generate_user_insights(assessments, overall_progress, stats=None):
     """Generate personalized insights based on user progress"""
     insights = []
     
@@ -358,7 +416,9 @@ def generate_user_insights(assessments, overall_progress):
     seven_days_ago = datetime.utcnow() - timedelta(days=7)
     recent_activity = 0
     
-    if assessments:
+    if stats is not None:
+        recent_activity = int(bool(stats.last_response_at and stats.last_response_at >= seven_days_ago))
+    elif assessments:
         recent_activity = db.session.query(AssessmentResponse)\
             .join(Assessment)\
             .filter(Assessment.user_id == assessments[0].user_id)\
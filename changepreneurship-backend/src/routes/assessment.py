@@ -3,6 +3,12 @@ from datetime import datetime
 
 from src.models.assessment import db, Assessment, AssessmentResponse, EntrepreneurProfile
 from src.utils.auth import verify_session_token
+from src.utils.conditional_get import state_etag
+from src.utils.assessment_snapshot import load_assessment_snapshot
+from src.services.assessment_stats_service import AssessmentStatsService
+from src.services.assessment_sync import decode_cursor, full_sync_cursor, load_delta
+from src.services.phase_summary_store import PhaseSummaryStore
+from src.utils.response_upsert import upsert_responses
 
 assessment_bp = Blueprint('assessment', __name__)
 
@@ -17,8 +23,11 @@ PHASE_QUESTION_TOTALS = {
 }
 
 
-def recompute_assessment_status(assessment, force_complete=False):
-    response_count = AssessmentResponse.query.filter_by(assessment_id=assessment.id).count()
+def recompute_assessment_status(assessment, force_complete=False, response_count=None, responses_changed=False,
+                                changes=()):
+    was_completed = bool(assessment.is_completed)
+    if response_count is None:
+        response_count = AssessmentResponse.query.filter_by(assessment_id=assessment.id).count()
     total_questions = PHASE_QUESTION_TOTALS.get(assessment.phase_id) or 1
     if force_complete:
         progress = 100.0
@@ -39,9 +48,44 @@ def recompute_assessment_status(assessment, force_complete=False):
     elif not should_complete:
         assessment.completed_at = None
 
+    AssessmentStatsService.on_assessment_status_changed(assessment, response_count=response_count, changes=changes)
+    # Completing a phase (or changing a completed phase's answers) queues its AI summary
+    PhaseSummaryStore.on_assessment_status_changed(assessment, was_completed, responses_changed)
     return assessment
 
+def save_assessment_responses(assessment, items, force_complete=False):
+    """Upsert answers, update the stats row and recompute status
+    (caller commits, then calls PhaseSummaryStore.dispatch_pending).
+    Callers load *assessment* FOR UPDATE."""
+    # Read under the stats row lock: concurrent saves of new questions would
+    # otherwise both start from the same count and each store count + 1
+    known_count = AssessmentStatsService.phase_response_count(assessment.user_id, assessment.phase_id)
+    result = upsert_responses(assessment.id, items, known_count=known_count)
+
+    changes = [(response_type, None, True) for _, response_type in result.inserted]
+    changes += [(response_type, previous_type, False) for _, previous_type, response_type in result.updated]
+    recompute_assessment_status(
+        assessment,
+        force_complete=force_complete,
+        response_count=result.response_count,
+        responses_changed=bool(changes),
+        changes=changes,
+    )
+    return result
+
+MAX_BATCH_RESPONSES = 200
+RESPONSE_FIELDS = ('section_id', 'question_id', 'question_text', 'response_type')
+
+def validate_response_item(data):
+    """Return an error message for an invalid response payload, or None"""
+    if not isinstance(data, dict):
+        return 'Response must be an object'
+    if not all(data.get(field) for field in RESPONSE_FIELDS):
+        return 'Missing required fields'
+    return None
+
 @assessment_bp.route('/phases', methods=['GET'])
+@state_etag
 def get_assessment_phases():
     """Get all assessment phases with user progress"""
     try:
@@ -172,6 +216,7 @@ def start_assessment(phase_id):
                 started_at=datetime.utcnow()
             )
             db.session.add(assessment)
+            AssessmentStatsService.on_assessment_status_changed(assessment, response_count=0)
             db.session.commit()
         
         return jsonify({
@@ -195,52 +240,22 @@ def save_response(assessment_id):
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        # Verify assessment belongs to user
+        # Verify assessment belongs to user (locked until commit: saves of one phase run in turn)
         assessment = Assessment.query.filter_by(
             id=assessment_id,
             user_id=user.id
-        ).first()
+        ).with_for_update().first()
         
         if not assessment:
             return jsonify({'error': 'Assessment not found'}), 404
         
-        section_id = data.get('section_id')
-        question_id = data.get('question_id')
-        question_text = data.get('question_text')
-        response_type = data.get('response_type')
-        response_value = data.get('response_value')
-        
-        if not all([section_id, question_id, question_text, response_type]):
-            return jsonify({'error': 'Missing required fields'}), 400
-        
-        # Check if response already exists
-        existing_response = AssessmentResponse.query.filter_by(
-            assessment_id=assessment_id,
-            question_id=question_id
-        ).first()
-        
-        if existing_response:
-            # Update existing response
-            existing_response.set_response_value(response_value)
-            if response_type:
-                existing_response.response_type = response_type
-            if question_text:
-                existing_response.question_text = question_text
-            existing_response.updated_at = datetime.utcnow()
-        else:
-            # Create new response
-            response = AssessmentResponse(
-                assessment_id=assessment_id,
-                section_id=section_id,
-                question_id=question_id,
-                question_text=question_text,
-                response_type=response_type
-            )
-            response.set_response_value(response_value)
-            db.session.add(response)
+        validation_error = validate_response_item(data)
+        if validation_error:
+            return jsonify({'error': validation_error}), 400
         
-        recompute_assessment_status(assessment)
+        save_assessment_responses(assessment, [data])
         db.session.commit()
+        PhaseSummaryStore.dispatch_pending()
         
         return jsonify({
             'message': 'Response saved successfully',
@@ -251,6 +266,60 @@ def save_response(assessment_id):
         current_app.logger.error(f"Save response error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@assessment_bp.route('/<int:assessment_id>/responses:batch', methods=['POST'])
+def save_responses_batch(assessment_id):
+    """Save many assessment responses in one transaction with per-item results"""
+    try:
+        user, session, error, status_code = verify_session_token()
+        if error:
+            return jsonify(error), status_code
+        
+        data = request.get_json(silent=True)
+        items = data.get('responses') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No responses provided'}), 400
+        if len(items) > MAX_BATCH_RESPONSES:
+            return jsonify({'error': f'At most {MAX_BATCH_RESPONSES} responses per batch'}), 400
+        
+        # Verify assessment belongs to user (locked until commit: saves of one phase run in turn)
+        assessment = Assessment.query.filter_by(
+            id=assessment_id,
+            user_id=user.id
+        ).with_for_update().first()
+        
+        if not assessment:
+            return jsonify({'error': 'Assessment not found'}), 404
+        
+        results = []
+        valid_items = []
+        for index, item in enumerate(items):
+            validation_error = validate_response_item(item)
+            question_id = item.get('question_id') if isinstance(item, dict) else None
+            if validation_error:
+                results.append({'index': index, 'question_id': question_id, 'success': False, 'error': validation_error})
+            else:
+                results.append({'index': index, 'question_id': question_id, 'success': True})
+                valid_items.append(item)
+        
+        if valid_items:
+            save_assessment_responses(assessment, valid_items)
+            db.session.commit()
+            PhaseSummaryStore.dispatch_pending()
+        
+        saved = len(valid_items)
+        return jsonify({
+            'message': f'Saved {saved} of {len(items)} responses',
+            'saved': saved,
+            'failed': len(items) - saved,
+            'results': results,
+            'assessment': assessment.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Batch save responses error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @assessment_bp.route('/<int:assessment_id>/progress', methods=['PUT'])
 def update_progress(assessment_id):
     """Update assessment progress"""
@@ -283,6 +352,7 @@ def update_progress(assessment_id):
         recompute_assessment_status(assessment, force_complete=bool(is_completed))
         
         db.session.commit()
+        PhaseSummaryStore.dispatch_pending()
         
         return jsonify({
             'message': 'Progress updated successfully',
@@ -361,6 +431,7 @@ def update_profile():
                 profile.set_json_field(field, data[field])
         
         profile.updated_at = datetime.utcnow()
+        AssessmentStatsService.on_profile_changed(user.id)
         db.session.commit()
         
         return jsonify({
@@ -459,7 +530,7 @@ def submit_phase_assessment(phase_id):
         assessment = Assessment.query.filter_by(
             user_id=user.id,
             phase_id=phase_id
-        ).first()
+        ).with_for_update().first()
         
         if not assessment:
             # Map phase_id to phase_name
@@ -482,27 +553,21 @@ def submit_phase_assessment(phase_id):
             db.session.add(assessment)
             db.session.flush()
         
-        # Save responses
+        # Save responses (one answer per question - re-submits update in place)
         responses_data = data.get('responses', {})
-        for question_key, answer in responses_data.items():
-            response = AssessmentResponse(
-                assessment_id=assessment.id,
-                section_id='general',  # Default section
-                question_id=str(question_key),
-                question_text=str(question_key),
-                response_type='text',
-                response_value=str(answer),
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            db.session.add(response)
-        
-        # Update progress
-        assessment.progress_percentage = 100
-        assessment.is_completed = True
-        assessment.updated_at = datetime.utcnow()
+        save_assessment_responses(assessment, [
+            {
+                'section_id': 'general',  # Default section
+                'question_id': str(question_key),
+                'question_text': str(question_key),
+                'response_type': 'text',
+                'response_value': answer,
+            }
+            for question_key, answer in responses_data.items()
+        ], force_complete=True)
         
         db.session.commit()
+        PhaseSummaryStore.dispatch_pending()
         
         return jsonify({
             'success': True,
@@ -581,48 +646,61 @@ def get_phase_questions(phase_id):
         'questions': questions
     }), 200
 
+def _sync_phase_entry(assessment, responses, response_count):
+    """One phase in /sync-all's format; *responses* are grouped by section."""
+    sections = {}
+    for response, value in responses:
+        sections.setdefault(response.section_id or 'general', []).append({
+            'question_id': response.question_id,
+            'question_text': response.question_text,
+            'response_type': response.response_type,
+            'response_value': value
+        })
+    return {
+        'assessmentId': assessment.id,
+        'phaseId': assessment.phase_id,
+        'completed': bool(assessment.is_completed),
+        'progress': int(assessment.progress_percentage or 0),
+        'startedAt': assessment.started_at.isoformat() if assessment.started_at else None,
+        'completedAt': assessment.completed_at.isoformat() if assessment.completed_at else None,
+        'responses': sections,
+        'responseCount': response_count
+    }
+
+
 @assessment_bp.route('/sync-all', methods=['GET'])
+@state_etag
 def sync_all_assessments():
-    """Sync all assessment data - returns phases with full response data in format frontend expects"""
+    """Sync all assessment data - returns phases with full response data in format frontend expects.
+
+    With ``?since=<cursor>`` (the ``cursor`` of an earlier answer) only what
+    changed since then is returned - see services/assessment_sync.py.
+    """
     try:
         user, session, error, status_code = verify_session_token()
         if error:
             return jsonify(error), status_code
-        
-        # Get all assessments for user
-        assessments = Assessment.query.filter_by(user_id=user.id).all()
+
+        since = request.args.get('since')
+        mark = decode_cursor(since) if since else None
+        if mark is not None:
+            return _sync_delta(user, mark, since)
+
+        # Take the cursor before reading so nothing written meanwhile is skipped
+        cursor = full_sync_cursor()
+        # Load assessments + responses in a single round trip
+        snapshot = load_assessment_snapshot(user.id)
+        assessments = snapshot.assessments if snapshot else ()
         
         # Build assessment data in exact format frontend expects
-        assessment_payload = {}
-        
-        for assessment in assessments:
-            # Get all responses for this assessment
-            responses = AssessmentResponse.query.filter_by(assessment_id=assessment.id).all()
-            
-            # Group responses by section
-            sections = {}
-            for response in responses:
-                section_id = response.section_id or 'general'
-                if section_id not in sections:
-                    sections[section_id] = []
-                sections[section_id].append({
-                    'question_id': response.question_id,
-                    'question_text': response.question_text,
-                    'response_type': response.response_type,
-                    'response_value': response.response_value
-                })
-            
-            # Build phase data in frontend format
-            assessment_payload[assessment.phase_id] = {
-                'assessmentId': assessment.id,
-                'phaseId': assessment.phase_id,
-                'completed': assessment.is_completed,
-                'progress': int(assessment.progress_percentage),
-                'startedAt': assessment.started_at.isoformat() if assessment.started_at else None,
-                'completedAt': assessment.completed_at.isoformat() if assessment.completed_at else None,
-                'responses': sections,
-                'responseCount': len(responses)
-            }
+        assessment_payload = {
+            assessment.phase_id: _sync_phase_entry(
+                assessment,
+                [(response, response.raw_value) for response in assessment.responses],
+                assessment.response_count,
+            )
+            for assessment in assessments
+        }
         
         return jsonify({
             'success': True,
@@ -630,9 +708,51 @@ def sync_all_assessments():
             'username': user.username,
             'assessmentData': assessment_payload,
             'totalAssessments': len(assessments),
-            'completedAssessments': sum(1 for a in assessments if a.is_completed)
+            'completedAssessments': sum(1 for a in assessments if a.is_completed),
+            'cursor': cursor,
+            # A stale or unreadable cursor lands here too: the client replaces its state
+            'full': True
         }), 200
         
     except Exception as e:
         current_app.logger.error(f"Sync all error: {str(e)}")
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
+
+
+def _sync_delta(user, mark, since):
+    delta = load_delta(user.id, mark)
+    assessments = delta['assessments']
+
+    assessment_payload = {}
+    for assessment in assessments:
+        if assessment.id not in delta['changed']:
+            continue
+        metadata = assessment.get_assessment_data() or {}
+        response_count = metadata.get('response_count')
+        if response_count is None:
+            response_count = AssessmentResponse.query.filter_by(assessment_id=assessment.id).count()
+        assessment_payload[assessment.phase_id] = _sync_phase_entry(
+            assessment,
+            [(response, response.response_value) for response in delta['changed'][assessment.id]],
+            response_count,
+        )
+
+    return jsonify({
+        'success': True,
+        'user_id': user.id,
+        'username': user.username,
+        'assessmentData': assessment_payload,
+        'deleted': [
+            {
+                'phaseId': tombstone.phase_id,
+                'sectionId': tombstone.section_id,
+                'questionId': tombstone.question_id
+            }
+            for tombstone in delta['tombstones']
+        ],
+        'totalAssessments': len(assessments),
+        'completedAssessments': sum(1 for a in assessments if a.is_completed),
+        # Nothing new: the caller's own cursor, so its next poll revalidates to 304
+        'cursor': delta['cursor'] if assessment_payload or delta['tombstones'] else since,
+        'full': False
+    }), 200
@@ -4,7 +4,6 @@ from flask import Blueprint, request, jsonify, current_app, make_response
 
 from src.models.assessment import User, EntrepreneurProfile
 from src.services.auth_service import AuthService
-from src.utils.redis_client import get_session_user
 from src.utils.auth import verify_session_token
 from src.utils.limiter import limiter
 
@@ -108,21 +107,6 @@ def logout():
 @auth_bp.route('/verify', methods=['GET'])
 def verify_session():
     """Verify session token validity"""
-    # Try cache first
-    auth_header = request.headers.get('Authorization', '')
-    if auth_header.startswith('Bearer '):
-        token = auth_header.split(' ', 1)[1].strip()
-        cached_user_id = get_session_user(token)
-        if cached_user_id:
-            user = User.query.get(cached_user_id)
-            if user:
-                return jsonify({
-                    'valid': True,
-                    'user': user.to_dict(),
-                    'session': {'from_cache': True}
-                })
-
-    # Fallback to DB
     user, session, error, status = verify_session_token()
     if error:
         return jsonify(error), status
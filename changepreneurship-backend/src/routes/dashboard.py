@@ -2,6 +2,7 @@
 import json
 from flask import Blueprint, request, jsonify, session, current_app
 from flask_cors import cross_origin
+import os
 from datetime import datetime
 from sqlalchemy import text
 
@@ -9,8 +10,11 @@ from ..models.assessment import db
 from ..services.dashboard_service import DashboardDataGenerator
 from ..services.test_data_generator import TestDataGenerator
 from ..services.complete_user_generator import CompleteUserGenerator
+from ..services.assessment_stats_service import AssessmentStatsService
 from ..utils.auth import verify_session_token
-from ..utils.redis_client import get_redis_client
+from ..utils.conditional_get import state_etag
+from ..utils.llm_budget import degraded_fields, llm_budget
+from ..utils.versioned_cache import VersionedCache
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -19,16 +23,31 @@ dashboard_service = DashboardDataGenerator()
 test_data_generator = TestDataGenerator()
 complete_user_generator = CompleteUserGenerator()
 
-_DASHBOARD_CACHE_TTL = 300  # 5 minutes
+# Keyed by the user's assessment state version: answering a question moves every reader to a new key
+dashboard_cache = VersionedCache(
+    'dashboard:executive_summary',
+    ttl_seconds=int(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '300')),
+    beta=float(os.getenv('DASHBOARD_CACHE_BETA', '1.0')),
+)
 
 
-def _dashboard_cache_key(user_id):
-    return f"dashboard:executive_summary:{user_id}"
+def _build_executive_summary(user_id):
+    """Response fields for the summary; a budget-degraded one is flagged and not cached."""
+    if os.getenv("USE_LLM", "false").lower() != "true":
+        return {'data': dashboard_service.generate_executive_summary(user_id)}
+
+    # The LLM narrative is charged to the user's budget; past it, serve the rule-based summary
+    with llm_budget.spend(user_id, 'executive_summary') as charge:
+        dashboard_data = dashboard_service.generate_executive_summary(user_id, use_llm=charge.allowed)
+    if not charge.allowed:
+        return {'data': dashboard_data, **degraded_fields(charge)}
+    return {'data': dashboard_data}
 
 
 @dashboard_bp.route('/executive-summary', methods=['GET'])
 @dashboard_bp.route('/api/dashboard/executive-summary', methods=['GET'])
 @cross_origin()
+@state_etag
 def get_executive_summary():
     """Get comprehensive executive summary for authenticated user"""
     user, user_session, error, status_code = verify_session_token()
@@ -37,37 +56,23 @@ def get_executive_summary():
 
     current_app.logger.info(f"[Dashboard] Executive summary for user: {user.username} (ID: {user.id})")
 
-    # Try Redis cache first
-    redis = get_redis_client()
-    cache_key = _dashboard_cache_key(user.id)
-    if redis:
-        try:
-            cached = redis.get(cache_key)
-            if cached:
-                current_app.logger.info(f"[Dashboard] Cache HIT for user {user.id}")
-                return jsonify({
-                    'success': True,
-                    'data': json.loads(cached),
-                    'generated_at': datetime.utcnow().isoformat(),
-                    'from_cache': True
-                })
-        except Exception as e:
-            current_app.logger.warning(f"[Dashboard] Redis read error: {e}")
-
-    dashboard_data = dashboard_service.generate_executive_summary(user.id)
-
-    # Store in cache
-    if redis:
-        try:
-            redis.set(cache_key, json.dumps(dashboard_data), ex=_DASHBOARD_CACHE_TTL)
-        except Exception as e:
-            current_app.logger.warning(f"[Dashboard] Redis write error: {e}")
+    version = AssessmentStatsService.state_version(user.id)
+    body, from_cache = dashboard_cache.fetch(
+        user.id, version, lambda: _build_executive_summary(user.id),
+        cache_if=lambda built: not built.get('degraded'),
+    )
+    if from_cache:
+        current_app.logger.info(f"[Dashboard] Cache HIT for user {user.id} (state v{version})")
 
-    return jsonify({
+    response = jsonify({
         'success': True,
-        'data': dashboard_data,
-        'generated_at': datetime.utcnow().isoformat()
+        **body,
+        'generated_at': datetime.utcnow().isoformat(),
+        **({'from_cache': True} if from_cache else {}),
     })
+    if body.get('degraded'):
+        response.headers['Retry-After'] = str(body['retry_after'])
+    return response
 
 
 @dashboard_bp.route('/api/dashboard/executive-summary/refresh', methods=['POST'])
@@ -78,16 +83,14 @@ def refresh_executive_summary():
     if error:
         return jsonify(error), status_code
 
-    # Invalidate cache so fresh data is served on next GET
-    redis = get_redis_client()
-    if redis:
-        try:
-            redis.delete(_dashboard_cache_key(user.id))
-        except Exception as e:
-            current_app.logger.warning(f"[Dashboard] Cache invalidation error: {e}")
-
     current_app.logger.info(f"[Dashboard] Refreshing dashboard for user: {user.username} (ID: {user.id})")
+
+    # A new state version: clients holding the old ETag revalidate to the refreshed summary
+    AssessmentStatsService.touch(user.id)
+    db.session.commit()
+    version = AssessmentStatsService.state_version(user.id)
     dashboard_data = dashboard_service.refresh_dashboard_data(user.id)
+    dashboard_cache.put(user.id, version, {'data': dashboard_data})
 
     return jsonify({
         'success': True,
@@ -4,6 +4,7 @@ from flask import Blueprint, jsonify, request, current_app
 from werkzeug.utils import secure_filename
 
 from src.models.assessment import db, EntrepreneurProfile
+from src.services.assessment_stats_service import AssessmentStatsService
 from src.services.resume_analysis_service import ResumeAnalysisService
 from src.utils.auth import verify_session_token
 from src.utils.limiter import limiter
@@ -50,6 +51,7 @@ def upload_resume():
         profile.set_json_field('resume_data', result['parsed_data'])
         profile.set_json_field('resume_analysis', result['analysis'])
         profile.resume_uploaded_at = datetime.utcnow()
+        AssessmentStatsService.on_profile_changed(user.id)
         db.session.commit()
 
         return jsonify({
@@ -0,0 +1,106 @@
+"""
+Background job API
+Enqueue slow LLM work and poll for its status / result
+"""
+from flask import Blueprint, jsonify, request
+
+from src.services.job_queue import FAILED, SUCCEEDED, get_job_queue, registered_job_types
+from src.services.report_jobs import enqueue_report_job
+from src.utils.auth import verify_session_token
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# Fields safe to return to the job's owner (payload / key are internal)
+PUBLIC_JOB_FIELDS = (
+    'id', 'type', 'status', 'attempts', 'max_attempts', 'error',
+    'created_at', 'updated_at', 'started_at', 'finished_at', 'next_run_at', 'duration_ms',
+)
+
+
+def public_job(job):
+    data = {k: job.get(k) for k in PUBLIC_JOB_FIELDS if k in job}
+    data['deduplicated'] = bool(job.get('deduplicated'))
+    return data
+
+
+def job_accepted(job):
+    """202 body for an enqueued job."""
+    return {
+        'success': True,
+        'job': public_job(job),
+        'status_url': f"/api/jobs/{job['id']}",
+        'result_url': f"/api/jobs/{job['id']}/result",
+    }
+
+
+def _owned_job(job_id, user):
+    job = get_job_queue().get(job_id)
+    if not job or job.get('user_id') != user.id:
+        return None
+    return job
+
+
+@jobs_bp.route('', methods=['POST'])
+def create_job():
+    """
+    Enqueue a report job for the current user
+
+    Body:
+        { "type": "insights_report" | "phase_summary" | "ai_consensus" | "executive_summary",
+          "params": { "phase_id": "..." } }     # params only for phase_summary
+
+    Returns 202 with the job and its status / result URLs. Enqueueing the same
+    type for unchanged assessment answers returns the existing job.
+    """
+    user, session, error, status_code = verify_session_token()
+    if error:
+        return jsonify(error), status_code
+
+    data = request.get_json(silent=True) or {}
+    job_type = data.get('type')
+    if job_type not in registered_job_types():
+        return jsonify({
+            'success': False,
+            'error': f"type must be one of: {', '.join(registered_job_types())}",
+        }), 400
+
+    try:
+        job = enqueue_report_job(job_type, user.id, data.get('params') or {})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify(job_accepted(job)), 202
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status (queued / running / succeeded / failed)"""
+    user, session, error, status_code = verify_session_token()
+    if error:
+        return jsonify(error), status_code
+
+    job = _owned_job(job_id, user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': public_job(job)}), 200
+
+
+@jobs_bp.route('/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """
+    Job result: 200 with the result once succeeded, 202 while pending,
+    500 with the last error once retries are exhausted.
+    """
+    user, session, error, status_code = verify_session_token()
+    if error:
+        return jsonify(error), status_code
+
+    job = _owned_job(job_id, user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    if job['status'] == SUCCEEDED:
+        return jsonify({'success': True, 'job': public_job(job), 'result': job['result']}), 200
+    if job['status'] == FAILED:
+        return jsonify({'success': False, 'job': public_job(job), 'error': job.get('error')}), 500
+    return jsonify({'success': True, 'job': public_job(job), 'result': None}), 202
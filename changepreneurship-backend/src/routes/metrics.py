@@ -0,0 +1,69 @@
+"""
+Metrics API
+LLM token / latency / cost / cache metrics for this worker process
+"""
+import hmac
+import ipaddress
+import os
+
+from flask import Blueprint, Response, jsonify, request
+
+from src.utils.llm_cache import l1_cache
+from src.utils.llm_metrics import metrics
+from src.utils.single_flight import single_flight
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _is_loopback(address):
+    try:
+        return ipaddress.ip_address(address or '').is_loopback
+    except ValueError:
+        return False
+
+
+def _authorized():
+    """With METRICS_TOKEN set, require it as a bearer token; without it, only loopback callers."""
+    expected = os.getenv('METRICS_TOKEN')
+    if not expected:
+        # remote_addr is the client behind Caddy (ProxyFix), so public scrapes are refused
+        return _is_loopback(request.remote_addr)
+    supplied = request.headers.get('Authorization', '')
+    if supplied.startswith('Bearer '):
+        supplied = supplied[7:].strip()
+    return hmac.compare_digest(supplied, expected)
+
+
+@metrics_bp.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    LLM metrics for this worker (each gunicorn worker reports its own).
+
+    Query params:
+        format=json  — JSON snapshot with cache stats (and per-user spend when
+                       METRICS_TOKEN is configured); default is Prometheus text
+
+    Counters:   llm_requests_total, llm_tokens_total, llm_cost_usd_total,
+                llm_cache_lookups_total
+    Histograms: llm_latency_ms, llm_ttft_ms, llm_prompt_tokens
+    """
+    if not _authorized():
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    if request.args.get('format') == 'json':
+        data = metrics.snapshot(include_users=bool(os.getenv('METRICS_TOKEN')))
+        data['llm_cache'] = l1_cache.stats()
+        data['single_flight'] = single_flight.stats()
+        return jsonify(data), 200
+
+    text = metrics.prometheus_text()
+    cache = l1_cache.stats()
+    text += (
+        "# TYPE llm_cache_l1_entries gauge\n"
+        f"llm_cache_l1_entries {cache['entries']}\n"
+        "# TYPE llm_cache_l1_bytes gauge\n"
+        f"llm_cache_l1_bytes {cache['bytes']}\n"
+        "# TYPE llm_cache_l1_evictions_total counter\n"
+        f"llm_cache_l1_evictions_total {cache['evictions']}\n"
+    )
+    return Response(text, mimetype='text/plain; version=0.0.4')
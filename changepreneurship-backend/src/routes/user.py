@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from src.models.assessment import User, db
+from src.services.assessment_stats_service import AssessmentStatsService
+from src.services.auth_service import AuthService
 from src.utils.auth import verify_session_token
 
 user_bp = Blueprint('user', __name__)
@@ -76,6 +78,8 @@ def update_user(user_id):
     data = request.json
     user.username = data.get('username', user.username)
     user.email = data.get('email', user.email)
+    # /sync-all returns the username under the state ETag
+    AssessmentStatsService.on_profile_changed(user.id)
     db.session.commit()
     return jsonify(user.to_dict())
 
@@ -87,6 +91,8 @@ def delete_user(user_id):
     if current_user.id != user_id:
         return jsonify({'error': 'Forbidden'}), 403
     user = User.query.get_or_404(user_id)
+    # verify_session_token trusts a resolved session without loading the user row
+    AuthService.invalidate_user_sessions(user.id)
     db.session.delete(user)
     db.session.commit()
     return '', 204
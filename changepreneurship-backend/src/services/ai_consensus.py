@@ -7,6 +7,9 @@ import requests
 import json
 from typing import Dict, List, Optional
 
+from src.utils.llm_metrics import track_llm_call
+from src.utils.prompt_packer import PromptPacker, token_budget
+
 class AIConsensusService:
     """Service for generating consensus business insights from multiple LLMs"""
     
@@ -72,19 +75,22 @@ class AIConsensusService:
     
     def _prepare_business_summary(self, responses: Dict, phases: Dict) -> str:
         """Prepare structured business summary from user responses"""
+        # Sized for the smallest model queried (Groq llama3-8b-8192)
+        packer = PromptPacker(token_budget('ai_consensus', 'llama3-8b-8192'))
+        packed = packer.pack(
+            responses,
+            reserved="\n".join(f"\n## {phase_id.replace('_', ' ').title()}" for phase_id in responses),
+            prefix="- ",
+        )
+
         summary_parts = []
-        
-        # Extract key information from responses
-        for phase_id, phase_responses in responses.items():
+        for phase_id in responses:
+            if not packed.lines.get(phase_id):
+                continue
             phase_name = phase_id.replace('_', ' ').title()
             summary_parts.append(f"\n## {phase_name}")
-            
-            for response in phase_responses[:5]:  # Top 5 responses per phase
-                question_id = response.get('question_id', 'unknown')
-                value = response.get('response_value', '')
-                if value and len(str(value)) > 10:
-                    summary_parts.append(f"- {question_id}: {value[:200]}")
-        
+            summary_parts.extend(packed.lines[phase_id])
+
         return "\n".join(summary_parts)
     
     def _query_gemini(self, business_summary: str) -> Optional[str]:
@@ -92,23 +98,26 @@ class AIConsensusService:
         try:
             url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent"
             
+            prompt = f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}"
             payload = {
                 "contents": [{
                     "parts": [{
-                        "text": f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}"
+                        "text": prompt
                     }]
                 }]
             }
             
-            response = requests.post(
-                f"{url}?key={self.gemini_key}",
-                json=payload,
-                timeout=15
-            )
-            
-            if response.status_code == 200:
+            with track_llm_call("gemini", "gemini-pro", prompt, max_tokens=500) as call:
+                response = requests.post(
+                    f"{url}?key={self.gemini_key}",
+                    json=payload,
+                    timeout=15
+                )
+                response.raise_for_status()
                 data = response.json()
-                return data['candidates'][0]['content']['parts'][0]['text']
+                text = data['candidates'][0]['content']['parts'][0]['text']
+                call.set_response(text)
+            return text
         except Exception as e:
             print(f"Gemini API error: {e}")
         
@@ -119,12 +128,13 @@ class AIConsensusService:
         try:
             url = "https://api.groq.com/openai/v1/chat/completions"
             
+            prompt = f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}"
             payload = {
                 "model": "llama3-8b-8192",
                 "messages": [
                     {
                         "role": "user",
-                        "content": f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}"
+                        "content": prompt
                     }
                 ],
                 "max_tokens": 500
@@ -135,11 +145,14 @@ class AIConsensusService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
+            with track_llm_call("groq", "llama3-8b-8192", prompt, max_tokens=500) as call:
+                response = requests.post(url, json=payload, headers=headers, timeout=15)
+                response.raise_for_status()
                 data = response.json()
-                return data['choices'][0]['message']['content']
+                text = data['choices'][0]['message']['content']
+                call.set_usage(data.get('usage'))
+                call.set_response(text)
+            return text
         except Exception as e:
             print(f"Groq API error: {e}")
         
@@ -150,8 +163,9 @@ class AIConsensusService:
         try:
             url = "https://api-inference.huggingface.co/models/mistralai/Mistral-7B-Instruct-v0.1"
             
+            prompt = f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}"
             payload = {
-                "inputs": f"Analyze this business plan and provide 3 key insights:\n\n{business_summary}",
+                "inputs": prompt,
                 "parameters": {
                     "max_new_tokens": 500,
                     "temperature": 0.7
@@ -163,11 +177,13 @@ class AIConsensusService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
+            with track_llm_call("huggingface", "Mistral-7B-Instruct-v0.1", prompt, max_tokens=500) as call:
+                response = requests.post(url, json=payload, headers=headers, timeout=15)
+                response.raise_for_status()
                 data = response.json()
-                return data[0]['generated_text'] if isinstance(data, list) else data.get('generated_text', '')
+                text = data[0]['generated_text'] if isinstance(data, list) else data.get('generated_text', '')
+                call.set_response(text)
+            return text
         except Exception as e:
             print(f"HuggingFace API error: {e}")
         
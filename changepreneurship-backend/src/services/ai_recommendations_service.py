@@ -4,7 +4,8 @@ Generates personalized business recommendations based on user assessment respons
 """
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from ..models.assessment import db, User, Assessment, AssessmentResponse
+from ..models.assessment import db
+from ..utils.assessment_snapshot import load_assessment_snapshot
 
 class AIRecommendationsEngine:
     """
@@ -69,39 +70,30 @@ class AIRecommendationsEngine:
         Retrieve user's assessment data
         """
         try:
-            user = self.session.query(User).filter_by(id=user_id).first()
-            if not user:
+            snapshot = load_assessment_snapshot(user_id, session=self.session)
+            if not snapshot:
                 return None
             
-            assessments = self.session.query(Assessment).filter_by(user_id=user_id).all()
-            
-            user_data = {
+            return {
                 'user_id': user_id,
-                'username': user.username,
-                'assessments': []
+                'username': snapshot.username,
+                'assessments': [
+                    {
+                        'phase_name': a.phase_name,
+                        'progress': a.progress_percentage,
+                        'responses': [
+                            {
+                                'question_id': r.question_id,
+                                'value': r.raw_value,
+                                'type': r.response_type
+                            }
+                            for r in a.responses
+                        ]
+                    }
+                    for a in snapshot.assessments
+                ]
             }
             
-            for assessment in assessments:
-                responses = self.session.query(AssessmentResponse).filter_by(
-                    assessment_id=assessment.id
-                ).all()
-                
-                assessment_data = {
-                    'phase_name': assessment.phase_name,
-                    'progress': assessment.progress_percentage,
-                    'responses': [
-                        {
-                            'question_id': r.question_id,
-                            'value': r.response_value,
-                            'type': r.response_type
-                        }
-                        for r in responses
-                    ]
-                }
-                user_data['assessments'].append(assessment_data)
-            
-            return user_data
-            
         except Exception as e:
             print(f"Error retrieving user data: {str(e)}")
             return None
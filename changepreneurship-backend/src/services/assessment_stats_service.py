@@ -0,0 +1,281 @@
+"""Assessment stats service - keeps UserAssessmentStats in step with response writes"""
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+import logging
+
+from sqlalchemy import event, func
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.models.assessment import db, Assessment, AssessmentResponse, UserAssessmentStats
+
+logger = logging.getLogger(__name__)
+
+_LOCKED_KEY = 'assessment_stats_locked'
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _forget_locks(session):
+    session.info.pop(_LOCKED_KEY, None)
+
+
+class AssessmentStatsService:
+    """Incrementally maintained per-user assessment aggregates.
+
+    Write hooks mutate the stats row inside the caller's transaction, so the
+    aggregates commit (or roll back) together with the response rows. Users
+    without a stats row are skipped by the hooks and rebuilt lazily on first
+    read, or in bulk by ``rebuild_assessment_stats.py``.
+
+    The row is read ``FOR UPDATE`` once per transaction; later hooks in the
+    same transaction reuse it from the session, and ``state_version`` moves
+    once per transaction however many hooks run.
+    """
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_stats(user_id: int) -> UserAssessmentStats:
+        """Return the user's stats row, rebuilding it from raw rows if it is missing."""
+        stats = db.session.get(UserAssessmentStats, user_id)
+        if stats is not None:
+            return stats
+
+        stats = AssessmentStatsService.rebuild(user_id)
+        try:
+            db.session.commit()
+        except SQLAlchemyError as e:
+            # Another worker created the row first - the rebuilt values are still correct
+            db.session.rollback()
+            logger.warning(f"[AssessmentStats] Lazy rebuild commit failed for user {user_id}: {e}")
+        return stats
+
+    @staticmethod
+    def state_version(user_id: int) -> int:
+        """The user's assessment state version; any write hook moves it on."""
+        return AssessmentStatsService.get_stats(user_id).state_version or 0
+
+    # ------------------------------------------------------------------
+    # Write hooks
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def on_response_saved(
+        user_id: int,
+        phase_id: str,
+        response_type: str,
+        previous_type: Optional[str] = None,
+        is_new: bool = True,
+        saved_at: Optional[datetime] = None,
+    ) -> None:
+        """Record one inserted or updated response."""
+        AssessmentStatsService.on_responses_saved(
+            user_id, phase_id, [(response_type, previous_type, is_new)], saved_at=saved_at
+        )
+
+    @staticmethod
+    def on_responses_saved(
+        user_id: int,
+        phase_id: str,
+        changes: Iterable[Tuple[str, Optional[str], bool]],
+        saved_at: Optional[datetime] = None,
+    ) -> None:
+        """Record a batch of saved responses as (response_type, previous_type, is_new) tuples."""
+        changes = list(changes)
+        if not changes:
+            return
+        stats = AssessmentStatsService._load_for_update(user_id)
+        if stats is None:
+            return
+
+        type_counts = stats.get_json_field('response_type_counts')
+        phases = stats.get_json_field('phase_stats')
+        entry = phases.setdefault(phase_id, AssessmentStatsService._empty_phase())
+        AssessmentStatsService._count_changes(type_counts, entry, changes, saved_at or datetime.utcnow())
+
+        stats.set_json_field('response_type_counts', type_counts)
+        AssessmentStatsService._apply_phases(stats, phases)
+
+    @staticmethod
+    def on_assessment_status_changed(
+        assessment: Assessment,
+        response_count: Optional[int] = None,
+        changes: Iterable[Tuple[str, Optional[str], bool]] = (),
+        saved_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Record an assessment's progress / completion (and its exact response
+        count if known), plus the responses saved with it as in
+        on_responses_saved - one update of the stats row for the whole save.
+        """
+        stats = AssessmentStatsService._load_for_update(assessment.user_id)
+        if stats is None:
+            return
+
+        phases = stats.get_json_field('phase_stats')
+        entry = phases.setdefault(assessment.phase_id, AssessmentStatsService._empty_phase())
+        changes = list(changes)
+        if changes:
+            type_counts = stats.get_json_field('response_type_counts')
+            AssessmentStatsService._count_changes(type_counts, entry, changes, saved_at or datetime.utcnow())
+            stats.set_json_field('response_type_counts', type_counts)
+        entry['progress'] = assessment.progress_percentage or 0.0
+        entry['completed'] = bool(assessment.is_completed)
+        if response_count is not None:
+            entry['responses'] = response_count
+
+        AssessmentStatsService._apply_phases(stats, phases)
+
+    @staticmethod
+    def phase_response_count(user_id: int, phase_id: str) -> Optional[int]:
+        """
+        The phase's stored response count, read under the stats row lock (so
+        concurrent saves of one user are counted in turn). None without a
+        stats row or an entry for the phase.
+        """
+        stats = AssessmentStatsService._load_for_update(user_id)
+        if stats is None:
+            return None
+        entry = stats.get_json_field('phase_stats').get(phase_id)
+        return entry.get('responses') if entry else None
+
+    @staticmethod
+    def on_profile_changed(user_id: int) -> None:
+        """Record a profile or account write (no aggregates change, only the state version)."""
+        AssessmentStatsService.touch(user_id)
+
+    @staticmethod
+    def touch(user_id: int) -> None:
+        """Move the state version on without changing aggregates (caller commits)."""
+        stats = AssessmentStatsService._load_for_update(user_id)
+        if stats is not None:
+            AssessmentStatsService._bump_version(stats)
+
+    # ------------------------------------------------------------------
+    # Rebuild / backfill
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def rebuild(user_id: int) -> UserAssessmentStats:
+        """Recompute a user's stats from raw rows (adds the row to the session if new)."""
+        assessments = Assessment.query.filter_by(user_id=user_id).all()
+
+        per_assessment = {
+            assessment_id: (count, last_updated)
+            for assessment_id, count, last_updated in db.session.query(
+                AssessmentResponse.assessment_id,
+                func.count(AssessmentResponse.id),
+                func.max(AssessmentResponse.updated_at),
+            )
+            .join(Assessment)
+            .filter(Assessment.user_id == user_id)
+            .group_by(AssessmentResponse.assessment_id)
+            .all()
+        }
+
+        type_counts = {
+            response_type: count
+            for response_type, count in db.session.query(
+                AssessmentResponse.response_type,
+                func.count(AssessmentResponse.id),
+            )
+            .join(Assessment)
+            .filter(Assessment.user_id == user_id)
+            .group_by(AssessmentResponse.response_type)
+            .all()
+        }
+
+        phases = {}
+        for a in assessments:
+            count, last_updated = per_assessment.get(a.id, (0, None))
+            phases[a.phase_id] = {
+                'progress': a.progress_percentage or 0.0,
+                'completed': bool(a.is_completed),
+                'responses': count,
+                'last_updated': last_updated.isoformat() if last_updated else None,
+            }
+
+        stats = db.session.get(UserAssessmentStats, user_id)
+        if stats is None:
+            stats = UserAssessmentStats(user_id=user_id)
+            db.session.add(stats)
+
+        stats.set_json_field('response_type_counts', type_counts)
+        AssessmentStatsService._apply_phases(stats, phases)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_for_update(user_id: int) -> Optional[UserAssessmentStats]:
+        # user_id -> [row or None, version bumped yet]; holding the row keeps it in the identity map
+        locked = db.session.info.setdefault(_LOCKED_KEY, {})
+        if user_id in locked:
+            return locked[user_id][0]
+        # populate_existing: a copy loaded before the lock may predate a concurrent save
+        stats = (
+            UserAssessmentStats.query
+            .filter_by(user_id=user_id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+        locked[user_id] = [stats, False]
+        return stats
+
+    @staticmethod
+    def _bump_version(stats: UserAssessmentStats) -> None:
+        """Move state_version on, once per transaction."""
+        lock = (db.session.info.get(_LOCKED_KEY) or {}).get(stats.user_id)
+        if lock is not None and lock[0] is stats:
+            if lock[1]:
+                return
+            lock[1] = True
+        stats.state_version = (stats.state_version or 0) + 1
+
+    @staticmethod
+    def _count_changes(type_counts: dict, entry: dict, changes, saved_at: datetime) -> None:
+        """Apply (response_type, previous_type, is_new) changes to the histogram and phase entry."""
+        for response_type, previous_type, is_new in changes:
+            if is_new:
+                type_counts[response_type] = type_counts.get(response_type, 0) + 1
+                entry['responses'] = entry.get('responses', 0) + 1
+            elif previous_type and previous_type != response_type:
+                AssessmentStatsService._decrement(type_counts, previous_type)
+                type_counts[response_type] = type_counts.get(response_type, 0) + 1
+
+        last = entry.get('last_updated')
+        if not last or last < saved_at.isoformat():
+            entry['last_updated'] = saved_at.isoformat()
+
+    @staticmethod
+    def _empty_phase() -> dict:
+        return {'progress': 0.0, 'completed': False, 'responses': 0, 'last_updated': None}
+
+    @staticmethod
+    def _decrement(counts: dict, key: str) -> None:
+        remaining = counts.get(key, 0) - 1
+        if remaining > 0:
+            counts[key] = remaining
+        else:
+            counts.pop(key, None)
+
+    @staticmethod
+    def _apply_phases(stats: UserAssessmentStats, phases: dict) -> None:
+        """Store per-phase stats and re-derive the denormalised totals (at most 7 phases)."""
+        stats.set_json_field('phase_stats', phases)
+        stats.total_assessments = len(phases)
+        stats.completed_assessments = sum(1 for p in phases.values() if p.get('completed'))
+        stats.total_responses = sum(p.get('responses', 0) for p in phases.values())
+        stats.average_progress = (
+            sum(p.get('progress', 0) for p in phases.values()) / len(phases) if phases else 0.0
+        )
+        timestamps = [p['last_updated'] for p in phases.values() if p.get('last_updated')]
+        stats.last_response_at = datetime.fromisoformat(max(timestamps)) if timestamps else None
+        AssessmentStatsService._bump_version(stats)
+        stats.updated_at = datetime.utcnow()
@@ -0,0 +1,172 @@
+"""
+Assessment Delta Sync
+---------------------
+Incremental mode of /api/assessment/sync-all (``?since=<cursor>``).
+
+The cursor is an opaque high-water mark over ``(AssessmentResponse.updated_at,
+id)``. A delta returns, since that mark:
+
+  - the responses written (inserted or updated) after it
+  - the phases whose state changed (``Assessment.updated_at``) or that own
+    one of those responses
+  - tombstones for responses deleted after it (AssessmentResponseTombstone,
+    written by the flush hook below)
+
+plus the next cursor - three indexed queries, so a reconnect costs what
+changed, not the size of the profile. When nothing changed the cursor is
+handed back unchanged: the next poll repeats the same URL and the state ETag
+(utils/conditional_get.py) answers it with 304.
+
+Commit order is not timestamp order: a save stamps ``updated_at`` before it
+waits on the user's stats-row lock, so a row can become visible after a newer
+one was already sent. The cursor therefore never moves past the settle
+horizon (``now - SYNC_SETTLE_SECONDS``); younger rows are sent anyway and sent
+again on the next call. Clients apply rows by question id, so that is
+harmless.
+
+Cursors that cannot be read, or are older than SYNC_TOMBSTONE_RETENTION_DAYS
+(tombstones are pruned after that), get a full sync flagged ``full: true``.
+
+Used by:
+  - routes/assessment.py  (/sync-all)
+"""
+import base64
+import binascii
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+
+from src.models.assessment import Assessment, AssessmentResponse, AssessmentResponseTombstone, User
+
+SYNC_SETTLE_SECONDS = float(os.getenv('SYNC_SETTLE_SECONDS', '5'))
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '30'))
+
+Mark = Tuple[datetime, int]
+
+
+@event.listens_for(Session, 'before_flush')
+def _record_tombstones(session, flush_context, instances):
+    """Leave a tombstone for every AssessmentResponse deleted in this flush."""
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    users = set()
+    for response in [obj for obj in session.deleted if isinstance(obj, AssessmentResponse)]:
+        assessment = response.assessment
+        # Nobody syncs a deleted account
+        if assessment is None or assessment.user_id in deleted_users:
+            continue
+        session.add(AssessmentResponseTombstone(
+            user_id=assessment.user_id,
+            assessment_id=assessment.id,
+            phase_id=assessment.phase_id,
+            section_id=response.section_id,
+            question_id=response.question_id,
+            response_id=response.id,
+        ))
+        users.add(assessment.user_id)
+
+    if users:
+        # Deletes are rare, so pruning alongside them keeps the table small enough
+        session.query(AssessmentResponseTombstone).filter(
+            AssessmentResponseTombstone.user_id.in_(users),
+            AssessmentResponseTombstone.deleted_at < _retention_horizon(),
+        ).delete(synchronize_session=False)
+
+
+def encode_cursor(mark: Mark) -> str:
+    updated_at, response_id = mark
+    raw = f"{updated_at.isoformat()}|{response_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Mark]:
+    """The mark in *cursor*, or None if it is unreadable or too old to delta from."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, response_id = raw.split('|')
+        mark = (datetime.fromisoformat(timestamp), int(response_id))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    if mark[0] < _retention_horizon():
+        return None
+    return mark
+
+
+def full_sync_cursor() -> str:
+    """Cursor to hand out with a full sync: everything settled has been sent."""
+    return encode_cursor((_settle_horizon(), 0))
+
+
+def load_delta(user_id: int, since: Mark) -> Dict:
+    """
+    Changes for *user_id* after *since*::
+
+        {'assessments': [Assessment, ...],            # every phase row, for totals
+         'changed': {assessment_id: [AssessmentResponse, ...]},
+         'tombstones': [AssessmentResponseTombstone, ...],
+         'cursor': str}
+
+    Phases in ``changed`` have a new state or new responses (possibly none).
+    With no changes and no tombstones the cursor is *since* itself.
+    """
+    since_at, since_id = since
+    horizon = _settle_horizon()
+
+    # A handful of rows per user (one per phase)
+    assessments = Assessment.query.filter_by(user_id=user_id).all()
+
+    responses = (
+        AssessmentResponse.query
+        .join(Assessment, AssessmentResponse.assessment_id == Assessment.id)
+        .filter(
+            Assessment.user_id == user_id,
+            or_(
+                AssessmentResponse.updated_at > since_at,
+                and_(AssessmentResponse.updated_at == since_at, AssessmentResponse.id > since_id),
+            ),
+        )
+        .order_by(AssessmentResponse.updated_at, AssessmentResponse.id)
+        .all()
+    )
+
+    tombstones = (
+        AssessmentResponseTombstone.query
+        .filter(
+            AssessmentResponseTombstone.user_id == user_id,
+            AssessmentResponseTombstone.deleted_at >= since_at,
+        )
+        .order_by(AssessmentResponseTombstone.deleted_at, AssessmentResponseTombstone.id)
+        .all()
+    )
+
+    changed: Dict[int, List[AssessmentResponse]] = {
+        a.id: [] for a in assessments if a.updated_at is not None and a.updated_at >= since_at
+    }
+    for response in responses:
+        changed.setdefault(response.assessment_id, []).append(response)
+
+    if not changed and not tombstones:
+        mark = since
+    else:
+        # Everything up to the horizon was in this answer; past it, only rows that settled
+        mark = max(since, (horizon, 0))
+        settled = [(r.updated_at, r.id) for r in responses if r.updated_at <= horizon]
+        if settled:
+            mark = max(mark, settled[-1])
+
+    return {
+        'assessments': assessments,
+        'changed': changed,
+        'tombstones': tombstones,
+        'cursor': encode_cursor(mark),
+    }
+
+
+def _settle_horizon() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+
+
+def _retention_horizon() -> datetime:
+    return datetime.utcnow() - timedelta(days=SYNC_TOMBSTONE_RETENTION_DAYS)
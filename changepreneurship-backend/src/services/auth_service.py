@@ -6,8 +6,9 @@ import secrets
 import re
 
 from werkzeug.security import generate_password_hash, check_password_hash
-from src.models.assessment import db, User, UserSession, EntrepreneurProfile
+from src.models.assessment import db, User, UserSession, EntrepreneurProfile, UserAssessmentStats
 from src.utils.redis_client import cache_session
+from src.utils.session_resolver import session_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +77,7 @@ class AuthService:
             
             profile = EntrepreneurProfile(user_id=user.id)
             db.session.add(profile)
+            db.session.add(UserAssessmentStats(user_id=user.id))
             db.session.commit()
             
             return user, None
@@ -117,12 +119,27 @@ class AuthService:
         db.session.commit()
         
         # Cache in Redis (best-effort)
-        cache_session(token, user_id, ttl_seconds=AuthService.SESSION_EXPIRY_DAYS * 86400)
+        cache_session(
+            token, user_id, ttl_seconds=AuthService.SESSION_EXPIRY_DAYS * 86400,
+            session_id=session.id, expires_at=expires_at,
+        )
         
         return session
 
     @staticmethod
-    def invalidate_session(session: UserSession) -> None:
-        """Invalidate user session"""
-        session.is_active = False
+    def invalidate_session(session) -> None:
+        """Invalidate user session (a UserSession or a ResolvedSession) in the DB and every cache tier"""
+        UserSession.query.filter_by(session_token=session.session_token).update({'is_active': False})
         db.session.commit()
+        session_resolver.invalidate(session.session_token)
+
+    @staticmethod
+    def invalidate_user_sessions(user_id: int) -> None:
+        """Deactivate every session of a user and drop them from the cache tiers (caller commits)"""
+        tokens = [
+            token for (token,) in
+            db.session.query(UserSession.session_token).filter_by(user_id=user_id, is_active=True)
+        ]
+        UserSession.query.filter_by(user_id=user_id).update({'is_active': False})
+        for token in tokens:
+            session_resolver.invalidate(token)
@@ -6,7 +6,9 @@ representing a Tech Startup Founder with strong business acumen
 import json
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash
-from ..models.assessment import db, User, Assessment, AssessmentResponse
+from ..models.assessment import db, User, Assessment
+from ..utils.assessment_snapshot import load_assessment_snapshot
+from ..utils.response_upsert import upsert_responses
 
 class CompleteUserGenerator:
     """
@@ -617,25 +619,13 @@ class CompleteUserGenerator:
         """
         Create or update assessment responses
         """
-        for resp_data in responses:
-            existing = self.session.query(AssessmentResponse).filter_by(
-                assessment_id=assessment_id,
-                question_id=resp_data['question_id']
-            ).first()
-            
-            if existing:
-                existing.response_value = resp_data['response_value']
-                existing.updated_at = datetime.utcnow()
-            else:
-                response = AssessmentResponse(
-                    assessment_id=assessment_id,
-                    section_id=resp_data['section_id'],
-                    question_id=resp_data['question_id'],
-                    question_text=resp_data['question_text'],
-                    response_type=resp_data['response_type'],
-                    response_value=resp_data['response_value']
-                )
-                self.session.add(response)
+        result = upsert_responses(assessment_id, responses, session=self.session)
+        
+        # Keep the cached count in step so the next route save can skip its COUNT
+        assessment = self.session.get(Assessment, assessment_id)
+        metadata = assessment.get_assessment_data() or {}
+        metadata['response_count'] = result.response_count
+        assessment.set_assessment_data(metadata)
         
         self.session.commit()
     
@@ -644,43 +634,36 @@ class CompleteUserGenerator:
         Export user data to JSON file
         """
         try:
-            user = self.session.query(User).filter_by(id=user_id).first()
-            if not user:
+            snapshot = load_assessment_snapshot(user_id, session=self.session)
+            if not snapshot:
                 print(f"[ERROR] User {user_id} not found")
                 return None
             
             export_data = {
                 'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email
+                    'id': snapshot.user_id,
+                    'username': snapshot.username,
+                    'email': snapshot.email
                 },
-                'assessments': []
+                'assessments': [
+                    {
+                        'phase_name': a.phase_name,
+                        'progress_percentage': a.progress_percentage,
+                        'responses': [
+                            {
+                                'section_id': r.section_id,
+                                'question_id': r.question_id,
+                                'question_text': r.question_text,
+                                'response_type': r.response_type,
+                                'response_value': r.raw_value
+                            }
+                            for r in a.responses
+                        ]
+                    }
+                    for a in snapshot.assessments
+                ]
             }
             
-            assessments = self.session.query(Assessment).filter_by(user_id=user_id).all()
-            
-            for assessment in assessments:
-                responses = self.session.query(AssessmentResponse).filter_by(
-                    assessment_id=assessment.id
-                ).all()
-                
-                assessment_data = {
-                    'phase_name': assessment.phase_name,
-                    'progress_percentage': assessment.progress_percentage,
-                    'responses': [
-                        {
-                            'section_id': r.section_id,
-                            'question_id': r.question_id,
-                            'question_text': r.question_text,
-                            'response_type': r.response_type,
-                            'response_value': r.response_value
-                        }
-                        for r in responses
-                    ]
-                }
-                export_data['assessments'].append(assessment_data)
-            
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(export_data, f, indent=2, ensure_ascii=False)
             
@@ -2,17 +2,29 @@
 AI-Driven Dashboard Data Generator
 Analyzes user assessment responses and generates intelligent business insights
 """
+import copy
 import json
 import math
 from datetime import datetime, timedelta
+from functools import cached_property
 from typing import Dict, List, Optional, Any
 import os
 import logging
+from flask import g, has_app_context
 from sqlalchemy.orm import Session
-from ..models.assessment import User, Assessment, AssessmentResponse, db
+from ..models.assessment import db, UserAssessmentStats
+from .assessment_stats_service import AssessmentStatsService
+from ..utils.assessment_snapshot import load_assessment_snapshot
+from ..utils.versioned_cache import VersionedCache
 
 logger = logging.getLogger(__name__)
 
+# DashboardComputation nodes by state version: shared across requests and, with Redis, workers
+computation_cache = VersionedCache(
+    'dashboard:computation',
+    ttl_seconds=int(os.getenv('DASHBOARD_CACHE_TTL_SECONDS', '300')),
+)
+
 class DashboardDataGenerator:
     """
     Generates comprehensive dashboard data with AI-driven insights
@@ -78,221 +90,231 @@ class DashboardDataGenerator:
             }
         ]
 
-    def generate_executive_summary(self, user_id: str) -> Dict[str, Any]:
+    def generate_executive_summary(self, user_id: str, use_llm: Optional[bool] = None) -> Dict[str, Any]:
         """
         Generate comprehensive executive summary dashboard data
+
+        use_llm=False skips the LLM narrative / consensus even with USE_LLM set
+        (a user whose LLM budget is spent gets the rule-based summary).
         """
         try:
-            # Get user's assessment data
-            user_data = self._get_user_assessment_data(user_id)
-            
-            if not user_data:
-                return self._generate_fallback_data(user_id)
-            
-            # Calculate overall metrics
-            overall_score = self._calculate_overall_score(user_data)
-            data_completeness = self._calculate_data_completeness(user_data)
-            assessment_count = len(user_data.get('assessments', []))
-            
-            # Generate sub-elements with AI insights
-            sub_elements = []
-            for element in self.business_sub_elements:
-                sub_element_data = self._generate_sub_element_data(
-                    element, user_data, overall_score
-                )
-                sub_elements.append(sub_element_data)
-            
-            payload = {
+            computation = self._computation(user_id)
+            if computation is None:
+                return self._generate_fallback_data(user_id, use_llm)
+
+            return copy.deepcopy({
                 'component_title': 'Executive Summary Dashboard',
-                'overall_score': overall_score,
-                'data_completeness': data_completeness,
-                'assessment_count': assessment_count,
+                'overall_score': computation.overall_score,
+                'data_completeness': computation.data_completeness,
+                'assessment_count': computation.assessment_count,
                 'last_updated': datetime.utcnow().isoformat(),
-                'sub_elements': sub_elements,
-                'ai_insights': self._generate_ai_insights(user_data, overall_score)
-            }
+                'sub_elements': computation.sub_elements(),
+                'ai_insights': computation.narrative(use_llm),
+            })
 
-            # Optional LLM-generated narrative summary (feature-flagged)
-            use_llm_flag = os.getenv("USE_LLM", "false").lower()
-            logger.info(f"[DEBUG] USE_LLM env value: '{use_llm_flag}' (equals 'true': {use_llm_flag == 'true'})")
-            if use_llm_flag == "true":
-                logger.info("[LLM] Starting LLM narrative generation...")
-                try:
-                    from .llm_client import LLMClient
-                    prompt = (
-                        "You are an analyst creating an executive summary for a startup founder.\n"
-                        f"Overall score: {overall_score}/100. Data completeness: {int(data_completeness*100)}%. Assessments: {assessment_count}.\n"
-                        "Summarize strengths, risks, and a short outlook in 6-8 bullets."
-                    )
-                    client = LLMClient()
-                    logger.info(f"[LLM] Client initialized, generating narrative...")
-                    narrative = client.generate(prompt=prompt, system="Executive summary generator")
-                    payload['ai_insights']['narrative'] = narrative
-                    logger.info(f"[LLM] Generated narrative: {len(narrative)} chars")
-                except Exception as e:
-                    # Fail silently to preserve rule-based output
-                    logger.error(f"[LLM] Error generating narrative: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    payload['ai_insights']['narrative'] = ""
+        except Exception as e:
+            logger.error(f"Error generating dashboard data: {e}", exc_info=True)
+            return self._generate_fallback_data(user_id, use_llm)
 
-                # Optional consensus step
-                consensus_flag = os.getenv("LLM_CONSENSUS", "false").lower()
-                logger.info(f"LLM_CONSENSUS={consensus_flag}")
-                if consensus_flag == "true":
-                    logger.info("Starting LLM consensus generation...")
-                    try:
-                        from .llm_consensus import LLMConsensus
-                        configs = [
-                            {"provider": os.getenv("LLM_PROVIDER", "openai"), "model": os.getenv("LLM_MODEL", "gpt-4o-mini")},
-                            {"provider": os.getenv("LLM_PROVIDER_ALT", os.getenv("LLM_PROVIDER", "openai")), "model": os.getenv("LLM_MODEL_ALT", os.getenv("LLM_MODEL", "gpt-4o-mini"))},
-                        ]
-                        
-                        logger.info(f"Running LLM consensus with {len(configs)} models")
-                        
-                        # Enhanced prompt for structured insights
-                        consensus_prompt = (
-                            "You are a business consultant analyzing a startup founder's assessment.\n"
-                            f"Overall score: {overall_score}/100. Data completeness: {int(data_completeness*100)}%. "
-                            f"Assessments completed: {assessment_count}.\n\n"
-                            "Provide 4-6 key insights in the following format:\n"
-                            "- [STRENGTH] Description of a strength\n"
-                            "- [WARNING] Description of a risk or concern\n"
-                            "- [RECOMMENDATION] Actionable advice\n\n"
-                            "Be specific, actionable, and focus on business readiness."
-                        )
-                        
-                        consensus = LLMConsensus(configs=configs).run(
-                            prompt=consensus_prompt, 
-                            system="Business insights consensus generator"
-                        )
-                        bullets = consensus.get("majority", [])
-                        minority = consensus.get("minority_reviews", [])
-                        logger.debug(f"Consensus: {len(bullets)} majority, {len(minority)} minority reviews")
-                        
-                        # Transform bullets into key_insights structure
-                        llm_insights = []
-                        for bullet in bullets:
-                            # Parse type from bullet (e.g., "[STRENGTH] text")
-                            bullet_text = bullet.strip()
-                            insight_type = 'recommendation'  # default
-                            title = 'Business Insight'
-                            description = bullet_text
-                            
-                            if bullet_text.startswith('[STRENGTH]'):
-                                insight_type = 'strength'
-                                title = 'Strength Identified'
-                                description = bullet_text.replace('[STRENGTH]', '').strip()
-                            elif bullet_text.startswith('[WARNING]'):
-                                insight_type = 'warning'
-                                title = 'Area of Concern'
-                                description = bullet_text.replace('[WARNING]', '').strip()
-                            elif bullet_text.startswith('[RECOMMENDATION]'):
-                                insight_type = 'recommendation'
-                                title = 'Recommended Action'
-                                description = bullet_text.replace('[RECOMMENDATION]', '').strip()
-                            
-                            llm_insights.append({
-                                'type': insight_type,
-                                'title': title,
-                                'description': description,
-                                'source': 'llm_consensus'
-                            })
-                        
-                        # Add minority insights as niche recommendations
-                        for m in minority:
-                            label = m.get("label", "")
-                            claim = m.get("claim", "")
-                            if label == "niche_insight":
-                                llm_insights.append({
-                                    'type': 'recommendation',
-                                    'title': 'Niche Insight',
-                                    'description': claim,
-                                    'source': 'llm_minority'
-                                })
-                        
-                        # Merge LLM insights with rule-based insights
-                        # LLM insights take priority, add up to 6 total
-                        combined_insights = llm_insights[:4] + payload['ai_insights']['key_insights'][:2]
-                        payload['ai_insights']['key_insights'] = combined_insights[:6]
-                        
-                        # Update narrative with formatted text
-                        narrative_lines = [f"- {bullet}" for bullet in bullets]
-                        if minority:
-                            narrative_lines.append("")
-                            narrative_lines.append("Minority perspectives:")
-                            for m in minority:
-                                tag = "Niche Insight" if m.get("label") == "niche_insight" else "Alternative View"
-                                narrative_lines.append(f"- {tag}: {m.get('claim')}")
-                        
-                        payload['ai_insights']['narrative'] = "\n".join(narrative_lines)
-                        payload['ai_insights']['consensus'] = {
-                            "models": [{"provider": c.get("provider"), "model": c.get("model")} for c in configs],
-                            "confidence": len(bullets) / max(1, len(bullets) + len(minority)),
-                            "total_insights": len(llm_insights)
-                        }
-                        logger.info(f"Consensus confidence: {payload['ai_insights']['consensus']['confidence']:.2%}, insights: {len(llm_insights)}")
-                    except Exception as e:
-                        logger.error(f"LLM consensus error: {e}", exc_info=True)
+    def _computation(self, user_id: str) -> Optional['DashboardComputation']:
+        """
+        The user's DashboardComputation for the current state version, or None
+        if the user does not exist.
 
-            return payload
-            
+        Nodes already built at this version come from ``computation_cache``; the
+        snapshot is only loaded when a missing node has to be computed. The
+        computation is also kept for the rest of the request (flask.g).
+        """
+        if isinstance(user_id, str) and user_id.isdigit():
+            user_id = int(user_id)
+        stats = AssessmentStatsService.get_stats(user_id)
+        version = stats.state_version or 0
+
+        store = g.setdefault('dashboard_computations', {}) if has_app_context() else {}
+        computation = store.get((user_id, version))
+        if computation is None:
+            nodes = computation_cache.get(user_id, version)
+            computation = DashboardComputation(self, user_id, version, nodes, stats)
+            if nodes is None and computation.user_data is None:
+                return None
+            store[(user_id, version)] = computation
+        return computation
+
+    def _element_spec(self, element_key: str) -> Optional[Dict]:
+        """Sub-element definition by key, or by its title slug (``company_vision``)."""
+        for element in self.business_sub_elements:
+            if element['key'] == element_key or element['title'].lower().replace(' ', '_') == element_key:
+                return element
+        return None
+
+    def _add_llm_insights(self, ai_insights: Dict, overall_score: int, data_completeness: float,
+                          assessment_count: int) -> None:
+        """
+        Add the optional LLM narrative (USE_LLM) and two-model consensus
+        (LLM_CONSENSUS) to the rule-based *ai_insights*, in place.
+        """
+        logger.info("[LLM] Starting LLM narrative generation...")
+        try:
+            from .llm_client import LLMClient
+            prompt = (
+                "You are an analyst creating an executive summary for a startup founder.\n"
+                f"Overall score: {overall_score}/100. Data completeness: {int(data_completeness*100)}%. Assessments: {assessment_count}.\n"
+                "Summarize strengths, risks, and a short outlook in 6-8 bullets."
+            )
+            client = LLMClient()
+            logger.info(f"[LLM] Client initialized, generating narrative...")
+            narrative = client.generate(prompt=prompt, system="Executive summary generator")
+            ai_insights['narrative'] = narrative
+            logger.info(f"[LLM] Generated narrative: {len(narrative)} chars")
         except Exception as e:
-            logger.error(f"Error generating dashboard data: {e}", exc_info=True)
-            return self._generate_fallback_data(user_id)
+            # Fail silently to preserve rule-based output
+            logger.error(f"[LLM] Error generating narrative: {e}")
+            import traceback
+            traceback.print_exc()
+            ai_insights['narrative'] = ""
 
-    def _get_user_assessment_data(self, user_id: str) -> Optional[Dict]:
+        # Optional consensus step
+        consensus_flag = os.getenv("LLM_CONSENSUS", "false").lower()
+        logger.info(f"LLM_CONSENSUS={consensus_flag}")
+        if consensus_flag == "true":
+            logger.info("Starting LLM consensus generation...")
+            try:
+                from .llm_consensus import LLMConsensus
+                configs = [
+                    {"provider": os.getenv("LLM_PROVIDER", "openai"), "model": os.getenv("LLM_MODEL", "gpt-4o-mini")},
+                    {"provider": os.getenv("LLM_PROVIDER_ALT", os.getenv("LLM_PROVIDER", "openai")), "model": os.getenv("LLM_MODEL_ALT", os.getenv("LLM_MODEL", "gpt-4o-mini"))},
+                ]
+                
+                logger.info(f"Running LLM consensus with {len(configs)} models")
+                
+                # Enhanced prompt for structured insights
+                consensus_prompt = (
+                    "You are a business consultant analyzing a startup founder's assessment.\n"
+                    f"Overall score: {overall_score}/100. Data completeness: {int(data_completeness*100)}%. "
+                    f"Assessments completed: {assessment_count}.\n\n"
+                    "Provide 4-6 key insights in the following format:\n"
+                    "- [STRENGTH] Description of a strength\n"
+                    "- [WARNING] Description of a risk or concern\n"
+                    "- [RECOMMENDATION] Actionable advice\n\n"
+                    "Be specific, actionable, and focus on business readiness."
+                )
+                
+                consensus = LLMConsensus(configs=configs).run(
+                    prompt=consensus_prompt, 
+                    system="Business insights consensus generator"
+                )
+                bullets = consensus.get("majority", [])
+                minority = consensus.get("minority_reviews", [])
+                logger.debug(f"Consensus: {len(bullets)} majority, {len(minority)} minority reviews")
+                
+                # Transform bullets into key_insights structure
+                llm_insights = []
+                for bullet in bullets:
+                    # Parse type from bullet (e.g., "[STRENGTH] text")
+                    bullet_text = bullet.strip()
+                    insight_type = 'recommendation'  # default
+                    title = 'Business Insight'
+                    description = bullet_text
+                    
+                    if bullet_text.startswith('[STRENGTH]'):
+                        insight_type = 'strength'
+                        title = 'Strength Identified'
+                        description = bullet_text.replace('[STRENGTH]', '').strip()
+                    elif bullet_text.startswith('[WARNING]'):
+                        insight_type = 'warning'
+                        title = 'Area of Concern'
+                        description = bullet_text.replace('[WARNING]', '').strip()
+                    elif bullet_text.startswith('[RECOMMENDATION]'):
+                        insight_type = 'recommendation'
+                        title = 'Recommended Action'
+                        description = bullet_text.replace('[RECOMMENDATION]', '').strip()
+                    
+                    llm_insights.append({
+                        'type': insight_type,
+                        'title': title,
+                        'description': description,
+                        'source': 'llm_consensus'
+                    })
+                
+                # Add minority insights as niche recommendations
+                for m in minority:
+                    label = m.get("label", "")
+                    claim = m.get("claim", "")
+                    if label == "niche_insight":
+                        llm_insights.append({
+                            'type': 'recommendation',
+                            'title': 'Niche Insight',
+                            'description': claim,
+                            'source': 'llm_minority'
+                        })
+                
+                # Merge LLM insights with rule-based insights
+                # LLM insights take priority, add up to 6 total
+                combined_insights = llm_insights[:4] + ai_insights['key_insights'][:2]
+                ai_insights['key_insights'] = combined_insights[:6]
+                
+                # Update narrative with formatted text
+                narrative_lines = [f"- {bullet}" for bullet in bullets]
+                if minority:
+                    narrative_lines.append("")
+                    narrative_lines.append("Minority perspectives:")
+                    for m in minority:
+                        tag = "Niche Insight" if m.get("label") == "niche_insight" else "Alternative View"
+                        narrative_lines.append(f"- {tag}: {m.get('claim')}")
+                
+                ai_insights['narrative'] = "\n".join(narrative_lines)
+                ai_insights['consensus'] = {
+                    "models": [{"provider": c.get("provider"), "model": c.get("model")} for c in configs],
+                    "confidence": len(bullets) / max(1, len(bullets) + len(minority)),
+                    "total_insights": len(llm_insights)
+                }
+                logger.info(f"Consensus confidence: {ai_insights['consensus']['confidence']:.2%}, insights: {len(llm_insights)}")
+            except Exception as e:
+                logger.error(f"LLM consensus error: {e}", exc_info=True)
+
+    def _get_user_assessment_data(self, user_id: str,
+                                  stats: Optional[UserAssessmentStats] = None) -> Optional[Dict]:
         """
         Retrieve and analyze user's assessment responses
+
+        *stats* is the user's stats row when the caller already holds it; its
+        aggregates ride along in the returned dict.
         """
         try:
-            logger.info(f"[_get_user_assessment_data] Fetching data for user_id: {user_id} (type: {type(user_id)})")
-            
-            # Convert user_id to int if it's numeric
-            if isinstance(user_id, str) and user_id.isdigit():
-                user_id = int(user_id)
-                logger.info(f"[_get_user_assessment_data] Converted to int: {user_id}")
-            
-            user = self.session.query(User).filter_by(id=user_id).first()
-            if not user:
+            snapshot = load_assessment_snapshot(user_id, session=self.session)
+            if not snapshot:
                 logger.warning(f"[_get_user_assessment_data] User not found: {user_id}")
                 return None
-            
-            logger.info(f"[_get_user_assessment_data] Found user: {user.username}")
-            assessments = self.session.query(Assessment).filter_by(user_id=user_id).all()
-            logger.info(f"[_get_user_assessment_data] Found {len(assessments)} assessments")
-            
-            user_data = {
-                'user_id': user_id,
-                'username': user.username,
-                'email': user.email,
-                'assessments': []
+
+            logger.info(
+                f"[_get_user_assessment_data] Loaded {len(snapshot.assessments)} assessments, "
+                f"{snapshot.total_responses} responses for user {snapshot.username}"
+            )
+
+            return {
+                'user_id': snapshot.user_id,
+                'average_progress': stats.average_progress if stats is not None and stats.total_assessments else None,
+                'username': snapshot.username,
+                'email': snapshot.email,
+                'assessments': [
+                    {
+                        'id': a.id,
+                        'phase_name': a.phase_name,
+                        'completion_percentage': a.progress_percentage,
+                        'responses': [
+                            {
+                                'question_id': r.question_id,
+                                'response_value': r.raw_value,
+                                'response_type': r.response_type,
+                                'created_at': r.created_at
+                            }
+                            for r in a.responses
+                        ]
+                    }
+                    for a in snapshot.assessments
+                ]
             }
             
-            for assessment in assessments:
-                responses = self.session.query(AssessmentResponse).filter_by(
-                    assessment_id=assessment.id
-                ).all()
-                logger.info(f"[_get_user_assessment_data] Assessment {assessment.phase_name}: {len(responses)} responses")
-                
-                assessment_data = {
-                    'id': assessment.id,
-                    'phase_name': assessment.phase_name,
-                    'completion_percentage': assessment.progress_percentage,
-                    'responses': [
-                        {
-                            'question_id': r.question_id,
-                            'response_value': r.response_value,
-                            'response_type': r.response_type,
-                            'created_at': r.created_at
-                        }
-                        for r in responses
-                    ]
-                }
-                user_data['assessments'].append(assessment_data)
-            
-            return user_data
-            
         except Exception as e:
             logger.error(f"Error retrieving user data: {e}", exc_info=True)
             return None
@@ -365,8 +387,11 @@ class DashboardDataGenerator:
         if not assessments:
             return 0.0
         
-        total_completion = sum(a.get('completion_percentage', 0) for a in assessments)
-        average_completion = total_completion / len(assessments)
+        # Prefer the incrementally maintained aggregate; fall back to the loaded rows
+        average_completion = user_data.get('average_progress')
+        if average_completion is None:
+            total_completion = sum(a.get('completion_percentage', 0) for a in assessments)
+            average_completion = total_completion / len(assessments)
         
         return round(average_completion / 100, 2)
 
@@ -1145,7 +1170,7 @@ class DashboardDataGenerator:
             ]
         }
 
-    def _generate_fallback_data(self, user_id: str) -> Dict[str, Any]:
+    def _generate_fallback_data(self, user_id: str, use_llm: Optional[bool] = None) -> Dict[str, Any]:
         """
         Generate fallback data when no assessment data is available
         """
@@ -1216,7 +1241,7 @@ class DashboardDataGenerator:
         # TEST: Run LLM even with no data to verify infrastructure works
         use_llm_flag = os.getenv("USE_LLM", "false").lower()
         logger.info(f"[FALLBACK] USE_LLM={use_llm_flag}")
-        if use_llm_flag == "true":
+        if use_llm_flag == "true" and use_llm is not False:
             logger.info("[LLM FALLBACK] Testing LLM with empty data profile...")
             try:
                 from .llm_client import LLMClient
@@ -1257,25 +1282,44 @@ class DashboardDataGenerator:
     def get_sub_element_details(self, user_id: str, element_key: str) -> Optional[Dict]:
         """
         Get detailed data for a specific sub-element
+
+        Only the snapshot, the overall score and this one element are computed.
         """
-        dashboard_data = self.generate_executive_summary(user_id)
-        
-        for element in dashboard_data.get('sub_elements', []):
-            if element['title'].lower().replace(' ', '_') == element_key:
-                return element
-        
-        return None
+        element = self._element_spec(element_key)
+        if element is None:
+            return None
+
+        try:
+            computation = self._computation(user_id)
+            if computation is not None:
+                return copy.deepcopy(computation.element(element['key']))
+        except Exception as e:
+            logger.error(f"Error generating sub-element {element_key}: {e}", exc_info=True)
+
+        fallback = self._generate_fallback_data(user_id, use_llm=False)
+        return next(e for e in fallback['sub_elements'] if e['title'] == element['title'])
 
     def get_dashboard_metrics(self, user_id: str = None) -> Dict[str, Any]:
         """
         Get aggregated dashboard metrics
         """
         if user_id:
-            user_data = self.generate_executive_summary(user_id)
+            try:
+                computation = self._computation(user_id)
+            except Exception as e:
+                logger.error(f"Error generating dashboard metrics: {e}", exc_info=True)
+                computation = None
+            if computation is None:
+                user_data = self._generate_fallback_data(user_id, use_llm=False)
+                return {
+                    'user_score': user_data['overall_score'],
+                    'completeness': user_data['data_completeness'],
+                    'assessment_count': user_data['assessment_count']
+                }
             return {
-                'user_score': user_data.get('overall_score', 0),
-                'completeness': user_data.get('data_completeness', 0),
-                'assessment_count': user_data.get('assessment_count', 0)
+                'user_score': computation.overall_score,
+                'completeness': computation.data_completeness,
+                'assessment_count': computation.assessment_count
             }
         
         # Return aggregate metrics for all users (if needed)
@@ -1283,4 +1327,78 @@ class DashboardDataGenerator:
             'total_users': 1,
             'average_score': 65,
             'completion_rate': 0.7
-        }
\ No newline at end of file
+        }
+
+
+class DashboardComputation:
+    """
+    One user's dashboard at one assessment state (``state_version``), built on demand.
+
+    snapshot -> overall score / completeness -> element(key) -> insights -> narrative:
+    each node is computed the first time something asks for it, so
+    /sub-element/<key> builds a single element and /metrics none at all, and the
+    LLM narrative only runs for the full executive summary.  Built nodes are
+    written back to ``computation_cache`` under the state version, and the
+    snapshot is only loaded once a node is missing there.  Nodes are shared
+    objects; public DashboardDataGenerator methods hand out copies.
+    """
+
+    def __init__(self, generator: DashboardDataGenerator, user_id: int, version: int,
+                 nodes: Optional[Dict] = None, stats: Optional[UserAssessmentStats] = None):
+        self.generator = generator
+        self.user_id = user_id
+        self.version = version
+        self.nodes: Dict[str, Any] = nodes or {}
+        self.stats = stats
+
+    @cached_property
+    def user_data(self) -> Optional[Dict]:
+        return self.generator._get_user_assessment_data(self.user_id, self.stats)
+
+    def _node(self, name: str, build):
+        if name not in self.nodes:
+            self.nodes[name] = build()
+            computation_cache.put(self.user_id, self.version, self.nodes)
+        return self.nodes[name]
+
+    @property
+    def overall_score(self) -> int:
+        return self._node('overall_score', lambda: self.generator._calculate_overall_score(self.user_data))
+
+    @property
+    def data_completeness(self) -> float:
+        return self._node('data_completeness', lambda: self.generator._calculate_data_completeness(self.user_data))
+
+    @property
+    def assessment_count(self) -> int:
+        return self._node('assessment_count', lambda: len(self.user_data.get('assessments', [])))
+
+    def element(self, element_key: str) -> Optional[Dict]:
+        element = self.generator._element_spec(element_key)
+        if element is None:
+            return None
+        return self._node(
+            f"element:{element['key']}",
+            lambda: self.generator._generate_sub_element_data(element, self.user_data, self.overall_score),
+        )
+
+    def sub_elements(self) -> List[Dict]:
+        return [self.element(element['key']) for element in self.generator.business_sub_elements]
+
+    @property
+    def insights(self) -> Dict:
+        return self._node('insights', lambda: self.generator._generate_ai_insights(self.user_data, self.overall_score))
+
+    def narrative(self, use_llm: Optional[bool] = None) -> Dict:
+        """ai_insights, with the LLM narrative / consensus when USE_LLM is on and *use_llm* is not False."""
+        with_llm = os.getenv("USE_LLM", "false").lower() == "true" and use_llm is not False
+
+        def build():
+            ai_insights = copy.deepcopy(self.insights)
+            if with_llm:
+                self.generator._add_llm_insights(
+                    ai_insights, self.overall_score, self.data_completeness, self.assessment_count
+                )
+            return ai_insights
+
+        return self._node(f"narrative:{'llm' if with_llm else 'rules'}", build)
@@ -3,10 +3,20 @@ AI Insights Report Service
 --------------------------
 Generates the full Entrepreneur + Venture AI report by:
   1. Collecting all assessment responses for the user (all 7 phases)
-  2. Building a rich structured prompt
-  3. Calling Groq (llama-3.3-70b-versatile) in JSON mode — AI consensus
+  2. Building a structured prompt that fits the model's token budget
+     (prompt_packer.PromptPacker)
+  3. Calling Groq (llama-3.3-70b-versatile) in JSON mode — AI consensus.
+     By default (INSIGHTS_SHARDED) this is one cached call per phase plus a
+     merge call (insights_shards.py), so only changed phases are regenerated
   4. Returning the full report dict
-  5. Caching the result in Redis (TTL 3600s)
+  5. Caching the result by assessment-state hash (report_cache.ReportCache):
+     fresh for INSIGHTS_CACHE_FRESH_SECONDS, then served stale while a
+     background job regenerates it (a report for earlier answers only when
+     the caller opts in); kept for INSIGHTS_CACHE_RETENTION_SECONDS
+     with at most INSIGHTS_CACHE_MAX_VERSIONS versions per user.
+
+The insights report, recommendations, strengths and action-plan endpoints all
+render this one report, so they share a single LLM call per answer state.
 """
 import os
 import json
@@ -15,7 +25,12 @@ import logging
 import time
 from typing import Optional
 
-from groq import Groq
+from .llm_pool import get_provider_client
+from .report_cache import ReportCache
+from ..utils.single_flight import single_flight
+from ..utils.llm_metrics import record_cache_lookup, track_llm_call
+from ..utils.incremental_json import IncrementalJSONParser
+from ..utils.prompt_packer import PromptPacker, token_budget
 
 logger = logging.getLogger(__name__)
 
@@ -167,7 +182,9 @@ Return ONLY a valid JSON object (no markdown fences) that strictly follows this
 }
 """
 
-SYSTEM_PROMPT = """You are the Changepreneurship AI Analyst — an expert business psychologist and venture analyst.
+# Prompt building blocks, shared with the per-phase shard and merge prompts
+# (insights_shards.py)
+ANALYST_INTRO = """You are the Changepreneurship AI Analyst — an expert business psychologist and venture analyst.
 Your job is to analyze a user's full entrepreneurship assessment and generate a comprehensive AI insights report.
 
 The Changepreneurship platform assesses founders across 7 phases:
@@ -179,7 +196,9 @@ The Changepreneurship platform assesses founders across 7 phases:
   Phase 6 — AI & Future-Proofing (technology readiness, AI adoption)
   Phase 7 — Execution & Growth (planning, operations, scaling)
 
-SCORING GUIDANCE:
+"""
+
+SCORING_GUIDANCE = """SCORING GUIDANCE:
   - Scores reflect quality of responses, depth of thinking, and readiness level
   - 85-100: Exceptional / investor-ready
   - 70-84: Strong / minor gaps
@@ -187,12 +206,16 @@ SCORING GUIDANCE:
   - 40-54: Early stage / significant work needed
   - <40: Not yet addressed
 
-ALIGNMENT GUIDANCE:
+"""
+
+ALIGNMENT_GUIDANCE = """ALIGNMENT GUIDANCE:
   - Sweet Spots: Find at LEAST 3 and up to 5. Where a founder STRENGTH directly reinforces a venture STRENGTH or compensates for a gap. Use verbs: Reinforces / Anchors / Differentiates / Informs / Enables.
   - Risk Zones: Find at LEAST 3 and up to 4. Where a founder WEAKNESS compounds a venture WEAKNESS (these are critical). Use labels: Critical Gap / Compounding / Bottleneck / Limiting. Each risk_zone MUST include a concrete 'action' field.
   - Untapped Potential: Find at LEAST 3. Where an unused founder strength could dramatically improve a venture gap. Always end insight with an estimated score impact using the purple highlight span.
 
-INSIGHT TEXT RULES:
+"""
+
+INSIGHT_TEXT_RULES = """INSIGHT TEXT RULES:
   - Be specific with numbers, percentages, and named dimensions
   - Insights must be 2-3 full sentences — substantive, not generic
   - Use HTML: <b>bold key phrases</b> for emphasis
@@ -201,9 +224,13 @@ INSIGHT TEXT RULES:
   - Use <span class='highlight purple'>purple text</span> for strategic insights and impact estimates
   - Example: "<b>Your 12-month runway is shorter than the 18 months needed.</b> This creates a <span class='highlight red'>6-month funding gap</span> that must be resolved before launch."
 
-Be specific, honest, and actionable. Scores must be internally consistent.
+"""
+
+CLOSING_RULES = """Be specific, honest, and actionable. Scores must be internally consistent.
+
+"""
 
-PHASE CARD GUIDANCE — You MUST generate ALL of these cards for each completed or in-progress phase:
+CARD_GUIDANCE = """PHASE CARD GUIDANCE — You MUST generate ALL of these cards for each completed or in-progress phase:
 
 ENTREPRENEUR PHASES:
   Phase 1 (Self-Discovery & Purpose) — Generate ALL 6 cards:
@@ -248,25 +275,103 @@ CRITICAL RULES FOR CARDS:
   - Sub scores must be consistent with the parent card score (±15 range)
   - Card descriptions must be 1-2 specific sentences — NOT generic filler
   - For unlocked/not-started phases: set cards=[] and score=null and completed=false
-""" + REPORT_SCHEMA
+"""
+
+SYSTEM_PROMPT = (
+  ANALYST_INTRO + SCORING_GUIDANCE + ALIGNMENT_GUIDANCE + INSIGHT_TEXT_RULES
+  + CLOSING_RULES + CARD_GUIDANCE + REPORT_SCHEMA
+)
+
+# ---------------------------------------------------------------------------
+# Structural checks mirroring REPORT_SCHEMA, applied per section while the
+# streamed report is still being generated
+# ---------------------------------------------------------------------------
+_NUMBER = (int, float)
+
+REPORT_SECTIONS = {
+  "entrepreneur": {
+    "score": _NUMBER, "archetype": str, "tagline": str, "summary": str,
+    "radar": dict, "dimensions": list, "phases": list,
+    "strengths": list, "growth_areas": list, "recent_activity": list,
+  },
+  "venture": {
+    "score": _NUMBER, "idea_name": str, "tagline": str, "summary": str,
+    "radar": dict, "dimensions": list, "phases": list,
+    "validation_pct": _NUMBER, "heatmap": dict,
+  },
+  "alignment": {
+    "score": _NUMBER, "combined_score": _NUMBER,
+    "sweet_spots": list, "risk_zones": list, "untapped_potential": list,
+  },
+  "readiness": {"unlocked": bool, "unlock_message": str},
+}
+HEATMAP_ROWS = ("Strategic", "Behavioral", "Predictive")
+HEATMAP_COLUMNS = 6
+
+# Paths announced as soon as they are complete in the stream
+STREAM_SECTION_PATHS = {(name,) for name in REPORT_SECTIONS} | {("venture", "heatmap")}
+
+
+def _is_number(value) -> bool:
+  return isinstance(value, _NUMBER) and not isinstance(value, bool)
+
+
+def validate_report_section(path: tuple, value) -> list:
+  """Return a list of schema problems for one streamed report section (empty if valid)."""
+  if path == ("venture", "heatmap"):
+    if not isinstance(value, dict):
+      return ["heatmap must be an object"]
+    errors = []
+    for row in HEATMAP_ROWS:
+      cells = value.get(row)
+      if not isinstance(cells, list) or len(cells) != HEATMAP_COLUMNS:
+        errors.append(f"heatmap.{row} must be a list of {HEATMAP_COLUMNS} scores")
+      elif not all(_is_number(c) and 0 <= c <= 100 for c in cells):
+        errors.append(f"heatmap.{row} scores must be 0-100")
+    return errors
+
+  fields = REPORT_SECTIONS.get(path[0]) if len(path) == 1 else None
+  if fields is None:
+    return []
+  if not isinstance(value, dict):
+    return [f"{path[0]} must be an object"]
+  errors = []
+  for field, expected in fields.items():
+    if field not in value:
+      errors.append(f"{path[0]}.{field} is missing")
+    elif expected is _NUMBER and not _is_number(value[field]):
+      errors.append(f"{path[0]}.{field} must be a number")
+    elif expected is not _NUMBER and not isinstance(value[field], expected):
+      errors.append(f"{path[0]}.{field} must be {expected.__name__}")
+  return errors
+
+
+report_cache = ReportCache(
+  "insights:report",
+  fresh_seconds=float(os.getenv("INSIGHTS_CACHE_FRESH_SECONDS", "3600")),
+  retention_seconds=int(os.getenv("INSIGHTS_CACHE_RETENTION_SECONDS", str(30 * 24 * 3600))),
+  max_versions=int(os.getenv("INSIGHTS_CACHE_MAX_VERSIONS", "3")),
+)
 
 
 class InsightsReportService:
   """Generate AI-powered full insights report for a user."""
 
-  CACHE_TTL = 3600  # 1 hour
-  ENABLE_CACHE = False
+  ENABLE_CACHE = os.getenv("INSIGHTS_CACHE_ENABLED", "true").lower() == "true"
+  # Per-phase shards + merge (insights_shards.py) instead of one monolithic call
+  SHARDED = os.getenv("INSIGHTS_SHARDED", "true").lower() == "true"
 
   def __init__(self):
     self.groq_key = os.getenv("GROQ_API_KEY")
     self.groq_model = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
-    self._redis = None
 
   # ------------------------------------------------------------------
   # Public API
   # ------------------------------------------------------------------
 
-  def generate_report(self, user_id: int, assessment_data: dict) -> dict:
+  def generate_report(
+    self, user_id: int, assessment_data: dict, allow_stale: bool = True, allow_previous: bool = False
+  ) -> dict:
     """
     Build or retrieve the full AI insights report.
 
@@ -275,48 +380,187 @@ class InsightsReportService:
       assessment_data: dict with keys:
         'phases'     — list of {id, name, progress, completed}
         'responses'  — dict phase_id → list of response dicts
+      allow_stale: serve an expired entry for these answers and regenerate it
+        in the background. The background job itself passes False.
+      allow_previous: when nothing is stored for these answers, serve the
+        user's newest report for *earlier* answers (with allow_stale) instead
+        of generating synchronously. Callers opt in, since that report does
+        not reflect the current answers.
     Returns:
-      Full report dict (see REPORT_SCHEMA above).
+      Full report dict (see REPORT_SCHEMA above). A stale one carries
+      ``_stale``, ``_stale_reason`` ("expired" or "answers_changed") and
+      ``_refresh_job``.
     """
-    cache_key = None
-
-    if self.ENABLE_CACHE:
-      cache_key = self._cache_key(user_id, assessment_data)
-      cached = self._get_cache(cache_key)
-      if cached:
-        logger.info(f"[InsightsReport] Cache HIT for user {user_id}")
-        cached["_from_cache"] = True
-        return cached
+    if not self.ENABLE_CACHE:
+      logger.info(f"[InsightsReport] Cache disabled — generating fresh report for user {user_id}")
+      return self._generate(assessment_data, user_id)
+
+    digest = self._state_digest(assessment_data)
+    cached = report_cache.get(user_id, digest)
+    if cached and cached.is_fresh:
+      logger.info(f"[InsightsReport] Cache HIT for user {user_id}")
+      record_cache_lookup("insights_report", "hit")
+      return self._from_cache(cached)
+
+    if allow_stale:
+      stale = cached or (report_cache.latest(user_id) if allow_previous else None)
+      if stale:
+        same_answers = stale.digest == digest
+        # An exact-state entry is refreshed once per stored version
+        suffix = f"refresh-{int(stale.stored_at)}" if same_answers else None
+        job_id = self._schedule_refresh(user_id, assessment_data, suffix)
+        logger.info(
+          f"[InsightsReport] Serving stale report for user {user_id} "
+          f"(age {int(stale.age_seconds)}s, same answers={same_answers}), refresh job {job_id}"
+        )
+        record_cache_lookup("insights_report", "stale")
+        report = self._from_cache(stale)
+        report["_stale"] = True
+        report["_stale_reason"] = "expired" if same_answers else "answers_changed"
+        report["_refresh_job"] = job_id
+        return report
+
+    logger.info(f"[InsightsReport] Cache MISS for user {user_id} — calling AI")
+    record_cache_lookup("insights_report", "miss")
+    # Parallel requests for the same answers (any worker) wait for one generation
+    return single_flight.do(
+      report_cache.key(user_id, digest),
+      lambda: self._generate_and_store(user_id, digest, assessment_data),
+      fallback=lambda: self._cached_or_fallback(user_id, digest),
+    )
 
-      logger.info(f"[InsightsReport] Cache MISS for user {user_id} — calling AI")
+  def _generate(self, assessment_data: dict, user_id: Optional[int] = None) -> dict:
+    if self.SHARDED and self.groq_key:
+      from .insights_shards import ShardedReportBuilder
+      builder = ShardedReportBuilder(self.groq_key, self.groq_model, use_cache=self.ENABLE_CACHE)
+      report = builder.build(user_id, assessment_data)
     else:
-      logger.info(f"[InsightsReport] Cache disabled — generating fresh report for user {user_id}")
+      report = self._call_groq(self._build_user_prompt(assessment_data))
+    self._stamp_metadata(report, assessment_data)
+    return report
 
-    user_prompt = self._build_user_prompt(assessment_data)
-    report = self._call_groq(user_prompt)
+  def _generate_and_store(self, user_id: int, digest: str, assessment_data: dict) -> dict:
+    report = self._generate(assessment_data, user_id)
+    # Partial sharded reports are not cached; their good shards are
+    if not any(report.get(k) for k in ("_fallback", "_failed_shards", "_fallback_sections")):
+      report_cache.put(user_id, digest, report)
+    return report
 
-    # Always stamp metadata
-    report["generated_at"] = _now_iso()
-    report["consensus"] = {
-      "models": [{"model": self.groq_model, "provider": "groq"}],
-      "confidence": self._calc_confidence(assessment_data),
-      "phases_analyzed": len(assessment_data.get("phases", [])),
-      "responses_analyzed": sum(
-        len(v) for v in assessment_data.get("responses", {}).values()
-      ),
-    }
+  def cached_report(self, user_id: int, assessment_data: dict) -> Optional[dict]:
+    """The stored report for exactly these answers, fresh or expired; never calls the LLM."""
+    if not self.ENABLE_CACHE:
+      return None
+    cached = report_cache.get(user_id, self._state_digest(assessment_data))
+    return self._from_cache(cached) if cached else None
 
-    if self.ENABLE_CACHE:
-      self._set_cache(cache_key, report)
-    return report
+  def latest_report(self, user_id: int) -> Optional[dict]:
+    """The user's newest stored report, whatever answers it was built from; never calls the LLM."""
+    cached = report_cache.latest(user_id)
+    return self._from_cache(cached) if cached else None
+
+  def _cached_or_fallback(self, user_id: int, digest: str) -> dict:
+    """Used when waiting on another worker's generation times out."""
+    cached = report_cache.get(user_id, digest)
+    return self._from_cache(cached) if cached else self._fallback_report()
+
+  def stream_report(self, user_id: int, assessment_data: dict):
+    """
+    Streaming variant of generate_report().
+
+    Yields (event, data) tuples:
+      ("progress", {...})  — stage changes and bytes received so far
+      ("section",  {...})  — a top-level section (or venture.heatmap) as soon
+                             as it is complete, with its schema check result
+      ("report",   {...})  — the final report, missing / invalid sections
+                             replaced from the fallback report
+    """
+    t0 = time.time()
+    yield "progress", {"stage": "started"}
+
+    digest = self._state_digest(assessment_data) if self.ENABLE_CACHE else None
+    cached = report_cache.get(user_id, digest) if digest else None
+    if cached:
+      report = self._from_cache(cached)
+      if not cached.is_fresh:
+        report["_stale"] = True
+        report["_stale_reason"] = "expired"
+        report["_refresh_job"] = self._schedule_refresh(
+          user_id, assessment_data, f"refresh-{int(cached.stored_at)}"
+        )
+      for name in REPORT_SECTIONS:
+        yield "section", {"path": name, "valid": True, "errors": [], "data": report.get(name)}
+      yield "report", report
+      return
+
+    sections = {}
+    if not self.groq_key:
+      logger.warning("[InsightsReport] No GROQ_API_KEY — streaming fallback")
+    else:
+      user_prompt = self._build_user_prompt(assessment_data)
+      yield "progress", {"stage": "generating", "prompt_chars": len(user_prompt)}
+
+      parser = IncrementalJSONParser(max_depth=2)
+      received = 0
+      reported = 0
+      try:
+        with track_llm_call(
+          "groq", self.groq_model, user_prompt, SYSTEM_PROMPT, {"stream": True}, max_tokens=8192
+        ) as call:
+          stream = get_provider_client("groq", api_key=self.groq_key).chat.completions.create(
+            model=self.groq_model,
+            messages=[
+              {"role": "system", "content": SYSTEM_PROMPT},
+              {"role": "user", "content": user_prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            max_tokens=8192,
+            timeout=90,
+            stream=True,
+          )
+          for event in stream:
+            # Groq reports usage on the final chunk
+            call.set_usage(event)
+            delta = (event.choices[0].delta.content or "") if event.choices else ""
+            if not delta:
+              continue
+            call.first_token()
+            received += len(delta)
+            for path, value in parser.feed(delta):
+              if path not in STREAM_SECTION_PATHS:
+                continue
+              errors = validate_report_section(path, value)
+              if len(path) == 1 and not errors:
+                sections[path[0]] = value
+              yield "section", {"path": ".".join(path), "valid": not errors, "errors": errors, "data": value}
+            if received - reported >= 2048:
+              reported = received
+              yield "progress", {
+                "stage": "generating",
+                "chars": received,
+                "sections": sorted(sections),
+                "elapsed_ms": int((time.time() - t0) * 1000),
+              }
+          call.set_response(parser.buffer)
+        logger.info(
+          f"[InsightsReport] Groq stream done in {time.time() - t0:.2f}s, "
+          f"{received} chars, model={self.groq_model}"
+        )
+      except Exception as e:
+        logger.error(f"[InsightsReport] Groq stream error: {e}")
+        yield "progress", {"stage": "error", "error": str(e)}
+
+    report = self._merge_sections(sections)
+    self._stamp_metadata(report, assessment_data)
+    if digest and not report.get("_fallback"):
+      report_cache.put(user_id, digest, report)
+    yield "report", report
 
   def invalidate_cache(self, user_id: int):
-    """Bust all cached reports for this user."""
-    redis = self._get_redis()
-    if redis:
-      pattern = f"insights:report:{user_id}:*"
-      for key in redis.scan_iter(pattern):
-        redis.delete(key)
+    """Bust all cached reports (and report shards) for this user."""
+    from .insights_shards import shard_cache
+    report_cache.evict_user(user_id)
+    shard_cache.evict_user(user_id)
 
   # ------------------------------------------------------------------
   # Prompt building
@@ -326,42 +570,51 @@ class InsightsReportService:
     phases = assessment_data.get("phases", [])
     responses = assessment_data.get("responses", {})
 
-    lines = [
+    header = [
       "=== ASSESSMENT OVERVIEW ===",
       f"Total phases tracked: {len(phases)}",
       f"Completed phases: {sum(1 for p in phases if p.get('completed'))}",
       "",
     ]
+    footer = "Based on all the above, generate the complete AI insights report JSON."
 
+    phase_lines = {}
     for phase in phases:
       pid = phase.get("id", "unknown")
       pname = phase.get("name", pid)
       progress = phase.get("progress", 0)
       completed = phase.get("completed", False)
-      lines.append(
+      phase_lines[pid] = (
         f"Phase '{pid}' — {pname} | Progress: {progress:.0f}% | "
         f"{'Completed' if completed else 'In Progress'}"
       )
-      phase_responses = responses.get(pid, [])
-      if phase_responses:
-        lines.append(f"  Responses ({len(phase_responses)} answers):")
-        for resp in phase_responses[:30]:  # cap per phase
-          section = resp.get("section_id", "")
-          q_text = resp.get("question_text", resp.get("question_id", ""))
-          value = resp.get("response_value", "")
-          if value is None:
-            continue
-          val_str = str(value)
-          if len(val_str) > 300:
-            val_str = val_str[:300] + "…"
-          lines.append(f"    [{section}] Q: {q_text[:120]} → A: {val_str}")
+
+    packer = PromptPacker(token_budget("insights_report", self.groq_model))
+    packed = packer.pack(
+      {pid: responses.get(pid, []) for pid in phase_lines},
+      # Phase lines plus the worst-case "Responses (...)" line per phase
+      reserved="\n".join(
+        header + [f"{line}\n  Responses (999 answers, 999 most informative shown):\n" for line in phase_lines.values()]
+        + [footer]
+      ),
+      prefix="    ",
+    )
+
+    lines = list(header)
+    for pid, phase_line in phase_lines.items():
+      lines.append(phase_line)
+      total = packed.totals.get(pid, 0)
+      if total:
+        shown = packed.shown(pid)
+        note = f"{total} answers" if shown == total else f"{total} answers, {shown} most informative shown"
+        lines.append(f"  Responses ({note}):")
+        lines.extend(packed.lines[pid])
       else:
         lines.append("  No responses yet for this phase.")
       lines.append("")
 
-    lines.append(
-      "Based on all the above, generate the complete AI insights report JSON."
-    )
+    lines.append(footer)
+    logger.debug(f"[InsightsReport] Prompt packing: {packed.stats()}")
     return "\n".join(lines)
 
   # ------------------------------------------------------------------
@@ -374,21 +627,24 @@ class InsightsReportService:
       return self._fallback_report()
 
     try:
-      client = Groq(api_key=self.groq_key)
+      client = get_provider_client("groq", api_key=self.groq_key)
       t0 = time.time()
-      completion = client.chat.completions.create(
-        model=self.groq_model,
-        messages=[
-          {"role": "system", "content": SYSTEM_PROMPT},
-          {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},
-        temperature=0.3,
-        max_tokens=8192,
-        timeout=90,
-      )
+      with track_llm_call("groq", self.groq_model, user_prompt, SYSTEM_PROMPT, max_tokens=8192) as call:
+        completion = client.chat.completions.create(
+          model=self.groq_model,
+          messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+          ],
+          response_format={"type": "json_object"},
+          temperature=0.3,
+          max_tokens=8192,
+          timeout=90,
+        )
+        raw = completion.choices[0].message.content
+        call.set_usage(getattr(completion, "usage", None))
+        call.set_response(raw)
       elapsed = time.time() - t0
-      raw = completion.choices[0].message.content
       logger.info(
         f"[InsightsReport] Groq response in {elapsed:.2f}s, "
         f"{len(raw)} chars, model={self.groq_model}"
@@ -406,21 +662,12 @@ class InsightsReportService:
   # Cache helpers
   # ------------------------------------------------------------------
 
-  def _get_redis(self):
-    if self._redis is not None:
-      return self._redis
-    try:
-      import redis as redis_lib
-      url = os.getenv("REDIS_URL", "")
-      if url:
-        self._redis = redis_lib.from_url(url, decode_responses=True)
-        self._redis.ping()
-        return self._redis
-    except Exception as e:
-      logger.warning(f"[InsightsReport] Redis unavailable: {e}")
-    return None
-
   def _cache_key(self, user_id: int, assessment_data: dict) -> str:
+    return report_cache.key(user_id, self._state_digest(assessment_data))
+
+  @staticmethod
+  def _state_digest(assessment_data: dict) -> str:
+    """Content hash of the answers a report is generated from."""
     phases_state = [
       {
         "id": p.get("id"),
@@ -457,34 +704,53 @@ class InsightsReportService:
       sort_keys=True,
       default=str,
     )
-    h = hashlib.md5(state.encode()).hexdigest()[:12]
-    return f"insights:report:{user_id}:{h}"
+    return hashlib.md5(state.encode()).hexdigest()[:12]
 
-  def _get_cache(self, key: str) -> Optional[dict]:
-    redis = self._get_redis()
-    if not redis:
-      return None
-    try:
-      raw = redis.get(key)
-      if raw:
-        return json.loads(raw)
-    except Exception as e:
-      logger.warning(f"[InsightsReport] Cache get error: {e}")
-    return None
+  @staticmethod
+  def _from_cache(cached) -> dict:
+    report = cached.report
+    report["_from_cache"] = True
+    report["_cache_age_seconds"] = int(cached.age_seconds)
+    return report
 
-  def _set_cache(self, key: str, data: dict):
-    redis = self._get_redis()
-    if not redis:
-      return
+  def _schedule_refresh(self, user_id: int, assessment_data: dict, suffix: Optional[str]) -> Optional[str]:
+    """Enqueue a background regeneration (deduplicated per answer state)."""
+    from .report_jobs import enqueue_report_job
     try:
-      redis.setex(key, self.CACHE_TTL, json.dumps(data))
+      return enqueue_report_job(
+        "insights_report", user_id, assessment_data=assessment_data, key_suffix=suffix
+      )["id"]
     except Exception as e:
-      logger.warning(f"[InsightsReport] Cache set error: {e}")
+      logger.warning(f"[InsightsReport] Could not schedule refresh for user {user_id}: {e}")
+      return None
 
   # ------------------------------------------------------------------
   # Helpers
   # ------------------------------------------------------------------
 
+  def _stamp_metadata(self, report: dict, assessment_data: dict) -> None:
+    report["generated_at"] = _now_iso()
+    report["consensus"] = {
+      "models": [{"model": self.groq_model, "provider": "groq"}],
+      "confidence": self._calc_confidence(assessment_data),
+      "phases_analyzed": len(assessment_data.get("phases", [])),
+      "responses_analyzed": sum(
+        len(v) for v in assessment_data.get("responses", {}).values()
+      ),
+    }
+
+  def _merge_sections(self, sections: dict) -> dict:
+    """Combine validated streamed sections with the fallback for anything missing."""
+    report = self._fallback_report()
+    if not sections:
+      return report
+    missing = [name for name in REPORT_SECTIONS if name not in sections]
+    report.update(sections)
+    report.pop("_fallback", None)
+    if missing:
+      report["_fallback_sections"] = missing
+    return report
+
   @staticmethod
   def _calc_confidence(assessment_data: dict) -> float:
     phases = assessment_data.get("phases", [])
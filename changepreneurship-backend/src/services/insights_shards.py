@@ -0,0 +1,364 @@
+"""
+Sharded Insights Report Generation
+----------------------------------
+Builds the insights report (REPORT_SCHEMA) from one small LLM call per phase
+plus a merge call, instead of one 8192-token completion over all phases:
+
+  1. Shard — each phase with responses is analysed on its own (cards, the
+     radar axes it informs, strengths / gaps, hard facts, a short digest).
+     Shards run in parallel (INSIGHTS_SHARD_CONCURRENCY) and are cached by
+     the phase's own content hash, so answering one more question in phase 3
+     regenerates only the phase 3 shard.
+  2. Merge — one call over the compact shard digests (no cards) writes the
+     cross-phase fields: headline scores, archetype, dimensions, heatmap,
+     alignment and readiness.
+  3. Assemble — phases come from the shards in assessment order, radar axes
+     are the average of the shards that scored them, and everything else
+     from the merge; missing pieces fall back to the fallback report so the
+     result always has every REPORT_SCHEMA field.
+
+Phases without responses get a "not started" stub and cost no LLM call.
+
+Used by:
+  - insights_report_service.InsightsReportService  (when INSIGHTS_SHARDED)
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .llm_pool import get_provider_client
+from .report_cache import ReportCache
+from .insights_report_service import (
+    ANALYST_INTRO,
+    SCORING_GUIDANCE,
+    ALIGNMENT_GUIDANCE,
+    INSIGHT_TEXT_RULES,
+    CLOSING_RULES,
+    CARD_GUIDANCE,
+    REPORT_SCHEMA,
+    REPORT_SECTIONS,
+    InsightsReportService,
+    validate_report_section,
+)
+from ..utils.llm_metrics import metrics_context, current_tags, track_llm_call
+from ..utils.llm_rate_limiter import llm_wait_deadline
+from ..utils.prompt_packer import PromptPacker, token_budget
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shard prompt or schema changes so old shards are not reused
+SHARD_VERSION = 1
+
+SHARD_SCHEMA = """
+Return ONLY a valid JSON object (no markdown fences) with this structure:
+
+{
+  "entrepreneur_phase": <null if this phase says nothing about the founder, otherwise one
+                         entrepreneur.phases entry of the full report: {"id", "title", "icon",
+                         "score", "completed", "cards"}>,
+  "venture_phase": <null if this phase says nothing about the venture, otherwise one
+                    venture.phases entry of the full report>,
+  "entrepreneur_radar": { <only the entrepreneur radar axes this phase informs>: <int 0-100> },
+  "venture_radar": { <only the venture radar axes this phase informs>: <int 0-100> },
+  "strengths": [ {"name": <string>, "score": <int>} ],
+  "growth_areas": [ {"name": <string>, "score": <int>} ],
+  "facts": {
+    "idea_name": <string or null>,
+    "runway_months": <int or null>,
+    "months_to_profit": <int or null>,
+    "interviews_done": <int or null>,
+    "competitors_validated": <int or null>
+  },
+  "digest": <string, 2-4 sentences on what this phase reveals, with specific numbers>
+}
+
+Radar axis names, card names and field formats are exactly those of the full report schema:
+""" + REPORT_SCHEMA
+
+SHARD_SYSTEM_PROMPT = (
+    ANALYST_INTRO + SCORING_GUIDANCE + INSIGHT_TEXT_RULES + CLOSING_RULES + CARD_GUIDANCE
+    + "\nYou are analysing ONE phase of the assessment. Only score what this phase's answers show.\n"
+    + SHARD_SCHEMA
+)
+
+MERGE_SCHEMA = """
+Return ONLY a valid JSON object (no markdown fences) with the "entrepreneur", "venture",
+"alignment" and "readiness" sections of the full report schema below, EXCEPT:
+  - omit "phases" and "radar" in entrepreneur and venture (they are filled in from the phase analyses)
+  - base every score on the phase analyses given; stay consistent with their scores
+""" + REPORT_SCHEMA
+
+MERGE_SYSTEM_PROMPT = (
+    ANALYST_INTRO + SCORING_GUIDANCE + ALIGNMENT_GUIDANCE + INSIGHT_TEXT_RULES + CLOSING_RULES
+    + "\nYou receive per-phase analyses of the assessment, not the raw answers. "
+    "Combine them into the report-level fields.\n"
+    + MERGE_SCHEMA
+)
+
+FACT_FIELDS = ("runway_months", "months_to_profit", "interviews_done", "competitors_validated")
+
+shard_cache = ReportCache(
+    "insights:shard",
+    fresh_seconds=float("inf"),  # content-addressed: a shard never goes stale
+    retention_seconds=int(os.getenv("INSIGHTS_CACHE_RETENTION_SECONDS", str(30 * 24 * 3600))),
+    # Shards share one per-user index; every generation re-stores the shards it used
+    max_versions=int(os.getenv("INSIGHTS_SHARD_MAX_VERSIONS", "32")),
+)
+
+
+def phase_digest(model: str, phase: dict, responses: list) -> str:
+    """Content hash of one phase's answers (the shard cache key)."""
+    state = json.dumps(
+        {
+            "v": SHARD_VERSION,
+            "model": model,
+            "phase": {k: phase.get(k) for k in ("id", "name", "progress", "completed")},
+            "responses": sorted(
+                (
+                    {
+                        "question_id": r.get("question_id"),
+                        "section_id": r.get("section_id"),
+                        "response_type": r.get("response_type"),
+                        "response_value": r.get("response_value"),
+                    }
+                    for r in responses
+                ),
+                key=lambda r: (str(r["question_id"] or ""), str(r["section_id"] or "")),
+            ),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return f"{phase.get('id')}.{hashlib.md5(state.encode()).hexdigest()[:12]}"
+
+
+def _not_started(phase: dict) -> dict:
+    return {
+        "id": phase.get("id"),
+        "title": phase.get("name") or phase.get("id"),
+        "icon": "🔒",
+        "score": None,
+        "completed": False,
+        "cards": [],
+    }
+
+
+class ShardedReportBuilder:
+    """Generate a full insights report from per-phase shards plus a merge step."""
+
+    def __init__(self, api_key: str, model: str, concurrency: Optional[int] = None, use_cache: bool = True):
+        self.api_key = api_key
+        self.model = model
+        self.use_cache = use_cache
+        self.concurrency = concurrency or int(os.getenv("INSIGHTS_SHARD_CONCURRENCY", "4"))
+        # One rate-limit deadline for the whole fan-out + merge, not one per call
+        self.wait_seconds = float(os.getenv("INSIGHTS_SHARD_WAIT_SECONDS", "120"))
+        self.last_stats: Dict[str, int] = {}
+
+    def build(self, user_id: int, assessment_data: dict) -> dict:
+        # Shards queue for rate-limit capacity as a batch rather than timing out one by one
+        with llm_wait_deadline(self.wait_seconds):
+            return self._build(user_id, assessment_data)
+
+    def _build(self, user_id: int, assessment_data: dict) -> dict:
+        t0 = time.time()
+        phases = assessment_data.get("phases", [])
+        responses = assessment_data.get("responses", {}) or {}
+
+        use_cache = self.use_cache and user_id is not None
+        shards: Dict[str, dict] = {}
+        digests: Dict[str, str] = {}
+        todo = []
+        for phase in phases:
+            phase_responses = responses.get(phase.get("id"), [])
+            if not phase_responses:
+                continue
+            digests[phase["id"]] = digest = phase_digest(self.model, phase, phase_responses)
+            cached = shard_cache.get(user_id, digest) if use_cache else None
+            if cached:
+                shards[phase["id"]] = cached.report
+            else:
+                todo.append((phase, phase_responses))
+
+        failed = []
+        if todo:
+            tags = current_tags()
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(todo))) as pool:
+                futures = [
+                    (phase, pool.submit(contextvars.copy_context().run, self._tagged_shard, tags, phase, items))
+                    for phase, items in todo
+                ]
+                for phase, future in futures:
+                    try:
+                        shards[phase["id"]] = future.result()
+                    except Exception as e:
+                        logger.error(f"[InsightsShards] Shard {phase['id']} failed: {e}")
+                        failed.append(phase["id"])
+
+        if use_cache:
+            # Re-store reused shards too so eviction only ever drops unused ones
+            for pid, shard in shards.items():
+                shard_cache.put(user_id, digests[pid], shard)
+
+        self.last_stats = {
+            "shards": len(shards),
+            "regenerated": len(todo) - len(failed),
+            "reused": len(shards) - (len(todo) - len(failed)),
+            "failed": len(failed),
+        }
+        if not shards:
+            return InsightsReportService._fallback_report()
+
+        try:
+            merged = self._merge(assessment_data, shards)
+        except Exception as e:
+            logger.error(f"[InsightsShards] Merge failed: {e}")
+            merged = None
+
+        report = self._assemble(phases, shards, merged)
+        if failed:
+            report["_failed_shards"] = failed
+        logger.info(
+            f"[InsightsShards] Report for user {user_id} in {time.time() - t0:.2f}s: {self.last_stats}"
+        )
+        return report
+
+    # ------------------------------------------------------------------
+    # LLM calls
+    # ------------------------------------------------------------------
+
+    def _tagged_shard(self, tags: tuple, phase: dict, responses: list) -> dict:
+        with metrics_context(endpoint=tags[0], user_id=tags[1]):
+            return self._shard(phase, responses)
+
+    def _shard(self, phase: dict, responses: list) -> dict:
+        pid = phase.get("id")
+        header = [
+            f"=== PHASE '{pid}' — {phase.get('name', pid)} ===",
+            f"Progress: {phase.get('progress', 0):.0f}% | "
+            f"{'Completed' if phase.get('completed') else 'In Progress'}",
+            f"Responses ({len(responses)} answers):",
+        ]
+        footer = "Analyze this phase and return the phase analysis JSON."
+        packed = PromptPacker(token_budget("insights_shard", self.model)).pack(
+            {pid: responses}, reserved="\n".join(header + [footer]), prefix="  "
+        )
+        prompt = "\n".join(header + packed.lines[pid] + ["", footer])
+        return self._complete_json(SHARD_SYSTEM_PROMPT, prompt, max_tokens=2048, options={"shard": pid})
+
+    def _merge(self, assessment_data: dict, shards: Dict[str, dict]) -> dict:
+        phases = assessment_data.get("phases", [])
+        analyses = []
+        for phase in phases:
+            shard = shards.get(phase.get("id"))
+            if shard is None:
+                analyses.append({"phase": phase.get("id"), "name": phase.get("name"), "status": "not started"})
+                continue
+            analyses.append({
+                "phase": phase.get("id"),
+                "name": phase.get("name"),
+                "progress": phase.get("progress"),
+                "completed": phase.get("completed"),
+                "entrepreneur_score": (shard.get("entrepreneur_phase") or {}).get("score"),
+                "venture_score": (shard.get("venture_phase") or {}).get("score"),
+                "entrepreneur_radar": shard.get("entrepreneur_radar"),
+                "venture_radar": shard.get("venture_radar"),
+                "strengths": shard.get("strengths"),
+                "growth_areas": shard.get("growth_areas"),
+                "facts": shard.get("facts"),
+                "digest": shard.get("digest"),
+            })
+        prompt = "\n".join([
+            "=== PHASE ANALYSES ===",
+            f"Completed phases: {sum(1 for p in phases if p.get('completed'))} of {len(phases)}",
+            json.dumps(analyses, ensure_ascii=False, separators=(",", ":")),
+            "",
+            "Based on these phase analyses, generate the report-level JSON.",
+        ])
+        return self._complete_json(MERGE_SYSTEM_PROMPT, prompt, max_tokens=3072, options={"shard": "merge"})
+
+    def _complete_json(self, system: str, prompt: str, max_tokens: int, options: dict) -> dict:
+        client = get_provider_client("groq", api_key=self.api_key)
+        with track_llm_call("groq", self.model, prompt, system, options, max_tokens=max_tokens) as call:
+            completion = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.3,
+                max_tokens=max_tokens,
+                timeout=60,
+            )
+            raw = completion.choices[0].message.content
+            call.set_usage(getattr(completion, "usage", None))
+            call.set_response(raw)
+        return json.loads(raw)
+
+    # ------------------------------------------------------------------
+    # Assembly
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _assemble(phases: List[dict], shards: Dict[str, dict], merged: Optional[dict]) -> dict:
+        report = InsightsReportService._fallback_report()
+        report.pop("_fallback", None)
+        fallback_sections = []
+
+        for name in REPORT_SECTIONS:
+            section = (merged or {}).get(name)
+            if isinstance(section, dict):
+                section.pop("phases", None)
+                section.pop("radar", None)
+                report[name].update(section)
+            if merged is None or validate_report_section((name,), report[name]):
+                fallback_sections.append(name)
+
+        for track in ("entrepreneur", "venture"):
+            entries = []
+            for phase in phases:
+                shard = shards.get(phase.get("id"))
+                if shard is None:
+                    entries.append(_not_started(phase))
+                elif isinstance(shard.get(f"{track}_phase"), dict):
+                    entries.append(shard[f"{track}_phase"])
+            report[track]["phases"] = entries
+
+            radar = report[track]["radar"]
+            for axis in radar:
+                scores = [
+                    s[f"{track}_radar"][axis] for s in shards.values()
+                    if isinstance(s.get(f"{track}_radar"), dict)
+                    and isinstance(s[f"{track}_radar"].get(axis), (int, float))
+                ]
+                radar[axis] = round(sum(scores) / len(scores)) if scores else 0
+
+        # Facts the merge left out come straight from the shards
+        venture = report["venture"]
+        for shard in shards.values():
+            facts = shard.get("facts") or {}
+            for field in FACT_FIELDS:
+                if not venture.get(field) and isinstance(facts.get(field), (int, float)):
+                    venture[field] = facts[field]
+            if venture.get("idea_name") in (None, "", "Not yet defined") and facts.get("idea_name"):
+                venture["idea_name"] = facts["idea_name"]
+
+        if merged is None:
+            # No merge: derive headline scores and lists from the shards alone
+            for track in ("entrepreneur", "venture"):
+                scored = [v for v in report[track]["radar"].values() if v]
+                report[track]["score"] = round(sum(scored) / len(scored)) if scored else 0
+            for key in ("strengths", "growth_areas"):
+                items = [i for s in shards.values() for i in (s.get(key) or []) if isinstance(i, dict)]
+                items.sort(key=lambda i: i.get("score") or 0, reverse=(key == "strengths"))
+                report["entrepreneur"][key] = items[:5]
+
+        if fallback_sections:
+            report["_fallback_sections"] = fallback_sections
+        return report
@@ -0,0 +1,438 @@
+"""
+Background job queue
+--------------------
+Moves slow LLM work (insights report, phase summary, AI consensus, dashboard
+narrative) out of the request thread. Web workers enqueue and return 202;
+``run_worker.py`` processes execute the jobs.
+
+Backends:
+  - Redis (REDIS_URL set): job records in ``job:<id>``, FIFO list
+    ``jobs:queue``, in-flight list ``jobs:processing`` (BLMOVE) and retry
+    schedule ``jobs:delayed`` (ZSET). Every worker sweeps the in-flight list
+    each JOB_SWEEP_SECONDS and re-queues jobs whose lease ran out, so a
+    crashed worker's jobs do not wait for the next deploy. While a handler
+    runs, a heartbeat thread renews its lease each JOB_HEARTBEAT_SECONDS, so
+    long jobs (sharded reports) are never taken for crashed ones.
+  - In-process (dev, no Redis): the same records in memory, executed by
+    daemon threads inside the web process.
+
+Idempotency: jobs carry a key derived from the assessment-state hash
+(InsightsReportService._cache_key); enqueueing a key that already has a
+queued, running or finished job returns that job instead of a new one.
+
+Failed attempts are retried with exponential backoff up to max_attempts.
+"""
+import heapq
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.llm_metrics import metrics_context
+from src.utils.llm_rate_limiter import BACKGROUND, llm_priority
+from src.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(24 * 3600)))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_SWEEP_SECONDS = float(os.getenv("JOB_SWEEP_SECONDS", "60"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", str(JOB_LEASE_SECONDS / 3)))
+
+_handlers: Dict[str, Callable[[dict], Any]] = {}
+_priorities: Dict[str, str] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad payload, missing data)."""
+
+
+def job_handler(job_type: str, priority: str = BACKGROUND):
+    """Register a function(payload) -> JSON-serialisable result for *job_type*.
+
+    *priority* is the outbound LLM rate-limit priority of the handler's calls.
+    """
+    def decorator(fn):
+        _handlers[job_type] = fn
+        _priorities[job_type] = priority
+        return fn
+    return decorator
+
+
+def registered_job_types():
+    return sorted(_handlers)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base, 2*base, 4*base, ... (+0-25%)."""
+    delay = JOB_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1))
+    return delay * (1 + random.random() * 0.25)
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class RedisJobBackend:
+    QUEUE = "jobs:queue"
+    PROCESSING = "jobs:processing"
+    DELAYED = "jobs:delayed"
+
+    def __init__(self, client):
+        self.r = client
+
+    def save(self, job: dict) -> None:
+        self.r.set(f"job:{job['id']}", json.dumps(job, default=str), ex=JOB_TTL_SECONDS)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        raw = self.r.get(f"job:{job_id}")
+        return json.loads(raw) if raw else None
+
+    def claim_key(self, key: str, job_id: str) -> Optional[str]:
+        """Bind *key* to *job_id*; return the job id already holding it, if any."""
+        if self.r.set(f"jobkey:{key}", job_id, nx=True, ex=JOB_TTL_SECONDS):
+            return None
+        return self.r.get(f"jobkey:{key}")
+
+    def bind_key(self, key: str, job_id: str) -> None:
+        self.r.set(f"jobkey:{key}", job_id, ex=JOB_TTL_SECONDS)
+
+    def release_key(self, key: str, job_id: str) -> None:
+        if self.r.get(f"jobkey:{key}") == job_id:
+            self.r.delete(f"jobkey:{key}")
+
+    def push(self, job_id: str) -> None:
+        self.r.lpush(self.QUEUE, job_id)
+
+    def schedule(self, job_id: str, run_at: float) -> None:
+        self.r.zadd(self.DELAYED, {job_id: run_at})
+
+    def pop(self, timeout: float) -> Optional[str]:
+        self._promote_due()
+        return self.r.blmove(self.QUEUE, self.PROCESSING, max(1, int(timeout)), "RIGHT", "LEFT")
+
+    def ack(self, job_id: str) -> None:
+        self.r.lrem(self.PROCESSING, 1, job_id)
+
+    def extend_lease(self, job_id: str, lease_until: float) -> bool:
+        job = self.load(job_id)
+        if job is None or job["status"] != RUNNING:
+            return False
+        job["lease_until"] = lease_until
+        self.save(job)
+        return True
+
+    def requeue_stale(self) -> int:
+        """Return running jobs whose lease expired (their worker died) to the queue.
+
+        A job that is in flight but not RUNNING yet may just have been moved
+        by a live worker, so it is left alone.
+        """
+        requeued = 0
+        now = time.time()
+        for job_id in self.r.lrange(self.PROCESSING, 0, -1):
+            job = self.load(job_id)
+            if job is None or job["status"] in (SUCCEEDED, FAILED):
+                # Finished (or expired) but never acked
+                self.r.lrem(self.PROCESSING, 1, job_id)
+                continue
+            if job["status"] != RUNNING or job.get("lease_until", 0) >= now:
+                continue
+            # lrem wins for exactly one sweeping worker
+            if self.r.lrem(self.PROCESSING, 1, job_id):
+                job["status"] = QUEUED
+                job.pop("lease_until", None)
+                self.save(job)
+                self.push(job_id)
+                requeued += 1
+        return requeued
+
+    def depth(self) -> dict:
+        return {
+            "queued": self.r.llen(self.QUEUE),
+            "processing": self.r.llen(self.PROCESSING),
+            "delayed": self.r.zcard(self.DELAYED),
+        }
+
+    def _promote_due(self) -> None:
+        for job_id in self.r.zrangebyscore(self.DELAYED, 0, time.time(), start=0, num=100):
+            # zrem wins for exactly one worker
+            if self.r.zrem(self.DELAYED, job_id):
+                self.push(job_id)
+
+
+class MemoryJobBackend:
+    """Single-process backend for development and tests."""
+
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+        self._keys: Dict[str, str] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._delayed: list = []
+        self._lock = threading.Lock()
+
+    def save(self, job: dict) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = json.loads(json.dumps(job, default=str))
+
+    def load(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def claim_key(self, key: str, job_id: str) -> Optional[str]:
+        with self._lock:
+            existing = self._keys.get(key)
+            if existing is None:
+                self._keys[key] = job_id
+            return existing
+
+    def bind_key(self, key: str, job_id: str) -> None:
+        with self._lock:
+            self._keys[key] = job_id
+
+    def release_key(self, key: str, job_id: str) -> None:
+        with self._lock:
+            if self._keys.get(key) == job_id:
+                del self._keys[key]
+
+    def push(self, job_id: str) -> None:
+        self._queue.put(job_id)
+
+    def schedule(self, job_id: str, run_at: float) -> None:
+        with self._lock:
+            heapq.heappush(self._delayed, (run_at, job_id))
+
+    def pop(self, timeout: float) -> Optional[str]:
+        self._promote_due()
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ack(self, job_id: str) -> None:
+        pass
+
+    def extend_lease(self, job_id: str, lease_until: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != RUNNING:
+                return False
+            job["lease_until"] = lease_until
+            return True
+
+    def requeue_stale(self) -> int:
+        return 0
+
+    def depth(self) -> dict:
+        with self._lock:
+            return {"queued": self._queue.qsize(), "processing": 0, "delayed": len(self._delayed)}
+
+    def _promote_due(self) -> None:
+        now = time.time()
+        with self._lock:
+            due = []
+            while self._delayed and self._delayed[0][0] <= now:
+                due.append(heapq.heappop(self._delayed)[1])
+        for job_id in due:
+            self.push(job_id)
+
+
+# ---------------------------------------------------------------------------
+# Queue
+# ---------------------------------------------------------------------------
+
+class JobQueue:
+    def __init__(self, backend):
+        self.backend = backend
+        self.in_process = isinstance(backend, MemoryJobBackend)
+        self._threads_pid = None
+        self._start_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        user_id: Optional[int] = None,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> dict:
+        if job_type not in _handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        now = datetime.utcnow().isoformat()
+        job = {
+            "id": uuid.uuid4().hex,
+            "type": job_type,
+            "status": QUEUED,
+            "user_id": user_id,
+            "payload": payload,
+            "idempotency_key": idempotency_key,
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        if idempotency_key:
+            existing_id = self.backend.claim_key(idempotency_key, job["id"])
+            if existing_id:
+                existing = self.backend.load(existing_id)
+                if existing and existing["status"] != FAILED:
+                    existing["deduplicated"] = True
+                    return existing
+                self.backend.bind_key(idempotency_key, job["id"])
+
+        self.backend.save(job)
+        self.backend.push(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.backend.load(job_id)
+
+    def run_one(self, timeout: float = 1.0) -> bool:
+        """Execute the next available job, if any. Returns True when a job was processed."""
+        job_id = self.backend.pop(timeout)
+        if not job_id:
+            return False
+        job = self.backend.load(job_id)
+        if job is None or job["status"] in (SUCCEEDED, FAILED):
+            self.backend.ack(job_id)
+            return True
+
+        job["status"] = RUNNING
+        job["attempts"] += 1
+        job["lease_until"] = time.time() + JOB_LEASE_SECONDS
+        job["started_at"] = datetime.utcnow().isoformat()
+        job["updated_at"] = job["started_at"]
+        self.backend.save(job)
+
+        t0 = time.time()
+        try:
+            with metrics_context(endpoint=f"job:{job['type']}", user_id=job.get("user_id")), \
+                    llm_priority(_priorities.get(job["type"], BACKGROUND)), \
+                    self._heartbeat(job_id):
+                result = _handlers[job["type"]](job["payload"])
+            job["status"] = SUCCEEDED
+            job["result"] = result
+            job["error"] = None
+        except Exception as e:
+            job["error"] = str(e)
+            retryable = not isinstance(e, PermanentJobError)
+            if retryable and job["attempts"] < job["max_attempts"]:
+                delay = retry_delay(job["attempts"])
+                job["status"] = QUEUED
+                job["next_run_at"] = datetime.utcfromtimestamp(time.time() + delay).isoformat()
+                logger.warning(
+                    f"[Jobs] {job['type']} {job_id} attempt {job['attempts']} failed: {e} — retrying in {delay:.1f}s"
+                )
+                self.backend.save(job)
+                self.backend.schedule(job_id, time.time() + delay)
+                self.backend.ack(job_id)
+                return True
+            job["status"] = FAILED
+            logger.error(f"[Jobs] {job['type']} {job_id} failed after {job['attempts']} attempts: {e}")
+            if job.get("idempotency_key"):
+                self.backend.release_key(job["idempotency_key"], job_id)
+
+        job["duration_ms"] = int((time.time() - t0) * 1000)
+        job["finished_at"] = datetime.utcnow().isoformat()
+        job["updated_at"] = job["finished_at"]
+        job.pop("lease_until", None)
+        self.backend.save(job)
+        self.backend.ack(job_id)
+        return True
+
+    @contextmanager
+    def _heartbeat(self, job_id: str):
+        """Renew the job's lease until the block exits; a dead worker stops renewing."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(JOB_HEARTBEAT_SECONDS):
+                try:
+                    if not self.backend.extend_lease(job_id, time.time() + JOB_LEASE_SECONDS):
+                        return
+                except Exception as e:
+                    logger.warning(f"[Jobs] Lease renewal for {job_id} failed: {e}")
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            # Joined before run_one saves the outcome, so a late renewal cannot overwrite it
+            stop.set()
+            thread.join()
+
+    def sweep_stale(self) -> int:
+        """Re-queue expired leases, at most once per JOB_SWEEP_SECONDS in this process."""
+        with self._sweep_lock:
+            if time.monotonic() < self._next_sweep:
+                return 0
+            self._next_sweep = time.monotonic() + JOB_SWEEP_SECONDS
+        requeued = self.backend.requeue_stale()
+        if requeued:
+            logger.warning(f"[Jobs] Re-queued {requeued} job(s) with an expired lease")
+        return requeued
+
+    def ensure_in_process_workers(self, app, count: Optional[int] = None) -> None:
+        """Start daemon worker threads in this process (in-process backend only)."""
+        if not self.in_process or self._threads_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._threads_pid == os.getpid():
+                return
+            self._threads_pid = os.getpid()
+            count = count or int(os.getenv("JOB_INPROCESS_WORKERS", "2"))
+            for i in range(count):
+                threading.Thread(
+                    target=work_forever, args=(self, app), name=f"job-worker-{i}", daemon=True
+                ).start()
+
+
+def work_forever(job_queue: JobQueue, app, stop: Optional[threading.Event] = None) -> None:
+    """Worker loop: run jobs inside an app context until *stop* is set."""
+    while stop is None or not stop.is_set():
+        try:
+            job_queue.sweep_stale()
+            with app.app_context():
+                job_queue.run_one(timeout=1.0)
+        except Exception as e:
+            logger.error(f"[Jobs] Worker loop error: {e}")
+            time.sleep(1)
+
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue: Redis-backed when REDIS_URL is reachable, otherwise in-process."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                client = get_redis_client()
+                backend = RedisJobBackend(client) if client else MemoryJobBackend()
+                _job_queue = JobQueue(backend)
+                logger.info(f"[Jobs] Using {type(backend).__name__}")
+    return _job_queue
@@ -1,14 +1,28 @@
+import asyncio
+import copy
 import os
-import time
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Iterator, List
 from src.utils.llm_audit_logger import LLMAuditLogger
 from src.utils.llm_cache import LLMCache
+from src.utils.single_flight import single_flight
+from src.utils.llm_metrics import LLMCall, record_cached_call, track_llm_call, usage_from
+from src.utils.llm_rate_limiter import RateLimitTimeout
+from .llm_pool import get_provider_client
+from .llm_router import ProviderRouter, ProvidersUnavailable, Route, parse_routes
+
+
+# Provider usage of the current thread's last non-streaming call
+_last_usage = threading.local()
 
 
 class LLMClient:
     """
-    Thin abstraction over multiple LLM providers. Keeps one public method: generate(prompt, system, options).
+    Thin abstraction over multiple LLM providers: generate(prompt, system, options), plus
+    agenerate() and stream() variants. Provider SDK clients are shared per process (llm_pool).
     Providers supported via env: LLM_PROVIDER=openai|azure-openai|anthropic|ollama|groq|mock
+    LLM_PROVIDERS lists fallback routes in order ("groq:<model>,openai:<model>"); calls are
+    hedged and failed over between them (llm_router).
     """
 
     def __init__(self):
@@ -25,7 +39,16 @@ class LLMClient:
         # Use mock client if key is 'mock-' prefixed or provider is 'mock'
         if self.provider == "mock" or (self.api_key and self.api_key.startswith("mock-")):
             self.provider = "mock"
-        
+
+        # Ordered routes; the first one names the client (cache keys, stream default).
+        # A mock- key keeps every call on the mock provider.
+        spec = "" if self.api_key.startswith("mock-") else os.getenv("LLM_PROVIDERS", "")
+        self._default_provider, self._llm_api_key = self.provider, self.api_key
+        self.routes = parse_routes(spec, Route(self.provider, self.model))
+        self.provider, self.model = self.routes[0].provider, self.routes[0].model
+        self.api_key = self._api_key_for(self.provider)
+        self.router = ProviderRouter(self.routes, self.timeout)
+
         # Initialize audit logger and cache
         self.audit_logger = LLMAuditLogger()
         self.cache = LLMCache()
@@ -39,22 +62,60 @@ class LLMClient:
         # Check cache first
         cached_response = self.cache.get(self.provider, self.model, prompt, system)
         if cached_response:
+            record_cached_call(self.provider, self.model)
             return cached_response
-        
-        # Log request
-        request_id = self.audit_logger.log_request(
+
+        # Concurrent identical prompts (any worker) share one provider call
+        key = self.cache._generate_key(self.provider, self.model, prompt, system)
+        return single_flight.do(key, lambda: self._generate_uncached(prompt, system, options))
+
+    def _generate_uncached(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        response = self.router.call(lambda route: self._for_route(route)._generate_once(prompt, system, options))
+
+        # Cache the successful response
+        self.cache.set(
             provider=self.provider,
             model=self.model,
             prompt=prompt,
-            system_message=system,
-            options=options or {}
+            system=system,
+            response=response,
         )
-        
-        start_time = time.time()
-        error = None
-        response = ""
-        
-        try:
+        return response
+
+    def _for_route(self, route: Route) -> "LLMClient":
+        """This client bound to *route*'s provider, model and key (same cache and audit log)."""
+        if (route.provider, route.model) == (self.provider, self.model):
+            return self
+        bound = copy.copy(self)
+        bound.provider, bound.model = route.provider, route.model
+        bound.api_key = self._api_key_for(route.provider)
+        return bound
+
+    def _api_key_for(self, provider: str) -> str:
+        """LLM_API_KEY belongs to LLM_PROVIDER; any other provider reads <PROVIDER>_API_KEY."""
+        own = os.getenv(f"{provider.upper().replace('-', '_')}_API_KEY", "")
+        if provider == self._default_provider:
+            return self._llm_api_key or own
+        return own
+
+    def _generate_once(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """One provider call on this client's provider; runs on a router thread when hedged."""
+        # Audit log + token / latency / cost metrics
+        with track_llm_call(
+            self.provider, self.model, prompt, system, options, audit_logger=self.audit_logger,
+            max_tokens=(options or {}).get("max_tokens", self.max_tokens),
+        ) as call:
+            _last_usage.value = None
             provider = self.provider
             if provider == "mock":
                 response = self._generate_mock(prompt, system, options)
@@ -70,120 +131,166 @@ class LLMClient:
                 response = self._generate_ollama(prompt, system, options)
             else:
                 raise ValueError(f"Unsupported LLM provider: {provider}")
-            
-            # Cache the successful response
-            self.cache.set(
-                provider=self.provider,
-                model=self.model,
-                prompt=prompt,
-                system=system,
-                response=response,
-                metadata={"request_id": request_id}
-            )
-            
-            return response
-            
-        except Exception as e:
-            error = str(e)
-            raise
-        finally:
-            # Always log response (success or failure)
-            latency_ms = int((time.time() - start_time) * 1000)
-            self.audit_logger.log_response(
-                request_id=request_id,
-                response_text=response,
-                latency_ms=latency_ms,
-                error=error
+            call.set_usage(getattr(_last_usage, "value", None))
+            call.set_response(response)
+        return response
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Awaitable generate(); runs on a worker thread so the pooled sync client is reused."""
+        return await asyncio.to_thread(self.generate, prompt, system, options)
+
+    def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Yield response text as the provider produces it (cached / non-streaming providers yield once)."""
+        cached_response = self.cache.get(self.provider, self.model, prompt, system)
+        if cached_response:
+            record_cached_call(self.provider, self.model)
+            yield cached_response
+            return
+
+        response, last_error = None, None
+        for route in self.router.candidates():
+            # Fail over only until the first chunk; after that the stream is committed
+            client, chunks, settled = self._for_route(route), [], False
+            try:
+                with track_llm_call(
+                    route.provider, route.model, prompt, system, {**(options or {}), "stream": True},
+                    audit_logger=self.audit_logger, max_tokens=(options or {}).get("max_tokens", self.max_tokens),
+                ) as call:
+                    for chunk in client._stream_provider(prompt, system, options, call):
+                        if chunk:
+                            call.first_token()
+                            chunks.append(chunk)
+                            yield chunk
+                    response = "".join(chunks).strip()
+                    call.set_response(response)
+                self.router.record(route, ok=True)
+                settled = True
+                break
+            except RateLimitTimeout as e:
+                # Our own limiter, not the provider: the finally below frees the probe
+                if chunks:
+                    raise
+                last_error = e
+            except Exception as e:
+                self.router.record(route, ok=False)
+                settled = True
+                if chunks:
+                    raise
+                last_error = e
+            finally:
+                if not settled:
+                    # Rate limited, client disconnected (GeneratorExit) or iteration abandoned:
+                    # a half-open route would otherwise keep its probe claimed for good
+                    if chunks:
+                        self.router.record(route, ok=True)
+                    else:
+                        self.router.release(route)
+        if response is None:
+            raise last_error or ProvidersUnavailable(
+                "All LLM providers are circuit-open: " + ", ".join(r.key for r in self.routes)
             )
-    
+
+        self.cache.set(
+            provider=self.provider,
+            model=self.model,
+            prompt=prompt,
+            system=system,
+            response=response,
+        )
+
+    def _stream_provider(
+        self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]], call: Optional[LLMCall] = None
+    ) -> Iterator[str]:
+        if self.provider in ("groq", "openai", "azure-openai"):
+            for event in self._chat_completion(prompt, system, options, stream=True):
+                if call is not None:
+                    # Usage arrives on the final chunk (Groq: x_groq.usage)
+                    call.set_usage(event)
+                if event.choices:
+                    yield event.choices[0].delta.content or ""
+        elif self.provider == "anthropic":
+            with self._provider_client().messages.stream(
+                model=self.model,
+                max_tokens=(options or {}).get("max_tokens", self.max_tokens),
+                temperature=(options or {}).get("temperature", self.temperature),
+                system=system or "",
+                messages=[{"role": "user", "content": prompt}],
+                timeout=self.timeout,
+            ) as events:
+                for text in events.text_stream:
+                    yield text
+                if call is not None:
+                    call.set_usage(events.get_final_message())
+        elif self.provider == "mock":
+            text = self._generate_mock(prompt, system, options)
+            for i, word in enumerate(text.split(" ")):
+                yield word if i == 0 else " " + word
+        elif self.provider == "ollama":
+            yield self._generate_ollama(prompt, system, options)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.provider}")
+
     def _generate_mock(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
         """Use mock client for testing without real API calls."""
         from .mock_llm_client import MockLLMClient
         mock = MockLLMClient()
         return mock.generate(prompt, system, options)
 
-    def _generate_groq(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
-        """Use Groq's ultra-fast inference API with Llama 3.1 70B."""
-        try:
-            from groq import Groq
-        except Exception:
-            raise RuntimeError("Groq client not installed. Add 'groq' to requirements.txt.")
-        
-        if not self.groq_api_key:
-            raise RuntimeError("Missing GROQ_API_KEY environment variable")
-        
-        client = Groq(api_key=self.groq_api_key)
+    def _messages(self, prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
         messages = []
         if system:
             messages.append({"role": "system", "content": system})
         messages.append({"role": "user", "content": prompt})
-        
-        temperature = (options or {}).get("temperature", self.temperature)
-        max_tokens = (options or {}).get("max_tokens", self.max_tokens)
-        
-        start = time.time()
-        resp = client.chat.completions.create(
+        return messages
+
+    def _provider_client(self):
+        """Shared per-process SDK client (see llm_pool)."""
+        if self.provider == "groq":
+            return get_provider_client("groq", api_key=self.groq_api_key)
+        if self.provider == "azure-openai":
+            return get_provider_client("azure-openai", api_key=self.azure_api_key, endpoint=self.azure_endpoint)
+        return get_provider_client(self.provider, api_key=self.api_key)
+
+    def _chat_completion(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]], stream: bool = False):
+        """OpenAI-compatible chat completion (Groq, OpenAI, Azure OpenAI) with a request-level timeout."""
+        resp = self._provider_client().chat.completions.create(
             model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+            messages=self._messages(prompt, system),
+            temperature=(options or {}).get("temperature", self.temperature),
+            max_tokens=(options or {}).get("max_tokens", self.max_tokens),
+            timeout=self.timeout,
+            stream=stream,
         )
-        if time.time() - start > self.timeout:
-            raise TimeoutError("LLM request exceeded timeout")
+        if not stream:
+            _last_usage.value = usage_from(resp)
+        return resp
+
+    def _generate_groq(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
+        """Use Groq's ultra-fast inference API with Llama 3.1 70B."""
+        resp = self._chat_completion(prompt, system, options)
         return (resp.choices[0].message.content or "").strip()
 
     # Provider implementations are minimal and import lazily to avoid hard deps
     def _generate_openai(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
-        try:
-            from openai import OpenAI
-        except Exception:
-            raise RuntimeError("OpenAI client not installed. Add 'openai' to requirements.txt.")
-        client = OpenAI(api_key=self.api_key or None)
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
-        temperature = (options or {}).get("temperature", self.temperature)
-        max_tokens = (options or {}).get("max_tokens", self.max_tokens)
-        start = time.time()
-        resp = client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-        if time.time() - start > self.timeout:
-            raise TimeoutError("LLM request exceeded timeout")
+        resp = self._chat_completion(prompt, system, options)
         return (resp.choices[0].message.content or "").strip()
 
     def _generate_azure_openai(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
-        try:
-            from openai import AzureOpenAI
-        except Exception:
-            raise RuntimeError("Azure OpenAI client not installed. Add 'openai' to requirements.txt.")
-        if not self.azure_endpoint or not self.azure_api_key:
-            raise RuntimeError("Missing Azure OpenAI env: AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY")
-        client = AzureOpenAI(api_key=self.azure_api_key, azure_endpoint=self.azure_endpoint)
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
-        temperature = (options or {}).get("temperature", self.temperature)
-        max_tokens = (options or {}).get("max_tokens", self.max_tokens)
-        resp = client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        resp = self._chat_completion(prompt, system, options)
         return (resp.choices[0].message.content or "").strip()
 
     def _generate_anthropic(self, prompt: str, system: Optional[str], options: Optional[Dict[str, Any]]) -> str:
-        try:
-            import anthropic
-        except Exception:
-            raise RuntimeError("Anthropic client not installed. Add 'anthropic' to requirements.txt.")
-        client = anthropic.Anthropic(api_key=self.api_key or None)
+        client = self._provider_client()
         temperature = (options or {}).get("temperature", self.temperature)
         max_tokens = (options or {}).get("max_tokens", self.max_tokens)
         sys_msg = system or ""
@@ -193,7 +300,9 @@ class LLMClient:
             temperature=temperature,
             system=sys_msg,
             messages=[{"role": "user", "content": prompt}],
+            timeout=self.timeout,
         )
+        _last_usage.value = usage_from(resp)
         # Anthropic returns content as a list of blocks
         parts = resp.content or []
         text = "\n".join([p.text for p in parts if hasattr(p, "text")])
@@ -219,4 +328,5 @@ class LLMClient:
         )
         with urllib.request.urlopen(req, timeout=self.timeout) as resp:
             data = json.loads(resp.read().decode("utf-8"))
+            _last_usage.value = usage_from(data)
             return (data.get("response") or "").strip()
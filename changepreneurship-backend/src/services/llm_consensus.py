@@ -1,5 +1,8 @@
+import contextvars
 import os
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Callable, Optional
 
 from .llm_client import LLMClient
 
@@ -14,9 +17,20 @@ class LLMConsensus:
     3) Peer-review: Ask non-claiming models to re-check specifically the minority claim.
     4) If re-check confirms, mark as Niche Insight; if rejected, mark as Hallucination.
     5) Return structured result with confidence scores.
+
+    Steps 1 and 3 fan out over a bounded thread pool. Every call has its own
+    timeout and the whole run shares one deadline; calls that have not
+    finished by then are reported as timed out and the result is built from
+    whatever did finish (``partial`` is set).
     """
 
-    def __init__(self, configs: List[Dict[str, Any]]):
+    def __init__(
+        self,
+        configs: List[Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        call_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ):
         # configs: [{provider, model, weight(optional)}]
         self.clients: List[Dict[str, Any]] = []
         for cfg in configs:
@@ -26,43 +40,76 @@ class LLMConsensus:
             client = LLMClient()
             self.clients.append({"client": client, "weight": float(cfg.get("weight", 1.0)), "provider": os.getenv("LLM_PROVIDER"), "model": os.getenv("LLM_MODEL")})
 
+        self.max_workers = max_workers or int(os.getenv("LLM_CONSENSUS_MAX_WORKERS", "8"))
+        self.call_timeout = call_timeout or float(os.getenv("LLM_CONSENSUS_CALL_TIMEOUT_SECONDS", "30"))
+        self.deadline = deadline or float(os.getenv("LLM_CONSENSUS_DEADLINE_SECONDS", "60"))
+
     def run(self, prompt: str, system: str = "") -> Dict[str, Any]:
-        initial: List[Dict[str, Any]] = []
-        for c in self.clients:
-            text = c["client"].generate(prompt=prompt, system=system)
-            initial.append({"provider": c["provider"], "model": c["model"], "text": text})
-
-        # Simple extraction: split into bullet-like lines
-        findings_by_model: List[List[str]] = []
-        for r in initial:
-            lines = [ln.strip("- • ").strip() for ln in r["text"].splitlines() if ln.strip()]
-            findings_by_model.append(lines)
-
-        # Tally findings frequency
-        freq: Dict[str, int] = {}
-        for lines in findings_by_model:
-            for f in set(lines):
-                freq[f] = freq.get(f, 0) + 1
-
-        majority_threshold = max(2, len(self.clients) // 2 + 1)
-        majority = {f for f, n in freq.items() if n >= majority_threshold}
-        minority = {f for f, n in freq.items() if n < majority_threshold}
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        calls: List[Dict[str, Any]] = []
+
+        # Not a context manager: its exit would join threads abandoned at the deadline
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="llm-consensus")
+        try:
+            # 1) Initial generations, all models at once
+            initial_tasks = []
+            for idx, c in enumerate(self.clients):
+                call = {"kind": "generate", "provider": c["provider"], "model": c["model"]}
+                initial_tasks.append((idx, call, self._caller(c["client"], prompt, system)))
+            initial_results = self._fan_out(pool, initial_tasks, deadline_at, calls)
+
+            initial: List[Dict[str, Any]] = []
+            findings_by_model: Dict[int, set] = {}
+            for idx, c in enumerate(self.clients):
+                if idx not in initial_results:
+                    continue
+                text = initial_results[idx]
+                initial.append({"provider": c["provider"], "model": c["model"], "text": text})
+                # Simple extraction: split into bullet-like lines
+                findings_by_model[idx] = {ln.strip("- • ").strip() for ln in text.splitlines() if ln.strip()}
+
+            # Tally findings frequency
+            freq: Dict[str, int] = {}
+            for lines in findings_by_model.values():
+                for f in lines:
+                    freq[f] = freq.get(f, 0) + 1
+
+            # Majority is relative to the models that actually answered
+            majority_threshold = max(2, len(findings_by_model) // 2 + 1)
+            majority = {f for f, n in freq.items() if n >= majority_threshold}
+            minority = sorted(f for f, n in freq.items() if n < majority_threshold)
+
+            # 3) Peer reviews: every (claim, non-claiming model) pair at once
+            review_tasks = []
+            for claim_idx, claim in enumerate(minority):
+                recheck_prompt = (
+                    f"Minority claim detected: '{claim}'. Re-check specifically for evidence supporting or refuting this claim.\n"
+                    "Return one of: CONFIRM niche insight with reasoning, or REJECT as hallucination with reasoning."
+                )
+                for idx, model_findings in findings_by_model.items():
+                    if claim in model_findings:
+                        continue
+                    c = self.clients[idx]
+                    call = {"kind": "review", "provider": c["provider"], "model": c["model"], "claim": claim}
+                    review_tasks.append((
+                        (claim_idx, idx), call,
+                        self._caller(c["client"], recheck_prompt, "Peer review for claim validation"),
+                    ))
+            review_results = self._fan_out(pool, review_tasks, deadline_at, calls)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
         peer_reviews: List[Dict[str, Any]] = []
-        for claim in minority:
-            # Ask all models that did not report the claim to re-check explicitly
-            recheck_prompt = (
-                f"Minority claim detected: '{claim}'. Re-check specifically for evidence supporting or refuting this claim.\n"
-                "Return one of: CONFIRM niche insight with reasoning, or REJECT as hallucination with reasoning."
-            )
+        for claim_idx, claim in enumerate(minority):
             confirmations = 0
             rejections = 0
             details: List[Dict[str, Any]] = []
-            for idx, c in enumerate(self.clients):
-                model_findings = set(findings_by_model[idx])
-                if claim in model_findings:
+            for idx in findings_by_model:
+                txt = review_results.get((claim_idx, idx))
+                if txt is None:
                     continue
-                txt = c["client"].generate(prompt=recheck_prompt, system="Peer review for claim validation")
+                c = self.clients[idx]
                 verdict = "REJECT"
                 content_low = txt.lower()
                 if "confirm" in content_low and "hallucination" not in content_low:
@@ -80,5 +127,71 @@ class LLMConsensus:
             "majority": sorted(list(majority)),
             "minority_reviews": peer_reviews,
             "raw": initial,
+            "calls": calls,
+            "partial": any(call["status"] != "ok" for call in calls),
+            "elapsed_ms": int((time.monotonic() - started) * 1000),
         }
         return result
+
+    @staticmethod
+    def _caller(client: LLMClient, prompt: str, system: str) -> Callable[[], str]:
+        return lambda: client.generate(prompt=prompt, system=system)
+
+    def _fan_out(self, pool: ThreadPoolExecutor, tasks: List[tuple], deadline_at: float, calls: List[Dict[str, Any]]) -> Dict[Any, str]:
+        """
+        Run (key, call_info, fn) tasks on the pool until they finish, time out or the deadline passes.
+        Appends one timing record per task to ``calls`` and returns {key: text} for successful calls.
+        """
+        results: Dict[Any, str] = {}
+        if not tasks:
+            return results
+
+        started_at: Dict[Any, float] = {}
+
+        def timed(key, fn):
+            started_at[key] = time.monotonic()
+            return fn()
+
+        # One context copy per call so metrics tags and spend tracking follow it into the pool
+        pending = {
+            pool.submit(contextvars.copy_context().run, timed, key, fn): (key, call)
+            for key, call, fn in tasks
+        }
+
+        def record(future, key, call, status, error=None):
+            began = started_at.get(key)
+            call["status"] = status
+            call["duration_ms"] = int((time.monotonic() - began) * 1000) if began is not None else 0
+            if error:
+                call["error"] = error
+            calls.append(call)
+            future.cancel()
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            # Wake up for the earliest per-call timeout or the global deadline
+            next_timeout = min(
+                [started_at[key] + self.call_timeout for key, _ in pending.values() if key in started_at] + [deadline_at]
+            )
+            done, _ = wait(list(pending), timeout=max(0.0, next_timeout - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                key, call = pending.pop(future)
+                try:
+                    results[key] = future.result()
+                    record(future, key, call, "ok")
+                except Exception as e:
+                    record(future, key, call, "error", str(e))
+
+            now = time.monotonic()
+            for future, (key, call) in list(pending.items()):
+                if key in started_at and now - started_at[key] >= self.call_timeout:
+                    pending.pop(future)
+                    record(future, key, call, "timeout")
+
+        for future, (key, call) in pending.items():
+            record(future, key, call, "timeout" if key in started_at else "cancelled")
+
+        return results
@@ -0,0 +1,100 @@
+"""
+LLM provider client pool
+------------------------
+Keeps one SDK client (and therefore one HTTP connection pool) per provider
+and credentials per worker process, instead of constructing a new
+``Groq(...)`` / ``OpenAI(...)`` - and paying TLS + HTTP setup - on every call.
+
+The SDK clients are thread-safe, so LLMConsensus fan-out threads share them.
+Clients are keyed by PID as well: gunicorn forks after ``preload_app`` and a
+forked child must not reuse sockets opened by its parent.
+
+Used by:
+  - llm_client.LLMClient
+  - insights_report_service.InsightsReportService._call_groq
+  - phase_summary_service.PhaseSummaryService._call_groq
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple, Any] = {}
+_lock = threading.Lock()
+
+# SDK retries would multiply the caller's timeout; callers decide on retries
+DEFAULT_MAX_RETRIES = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "0"))
+
+
+def _build(provider: str, api_key: Optional[str], endpoint: Optional[str]):
+    if provider == "groq":
+        try:
+            from groq import Groq
+        except Exception:
+            raise RuntimeError("Groq client not installed. Add 'groq' to requirements.txt.")
+        if not api_key:
+            raise RuntimeError("Missing GROQ_API_KEY environment variable")
+        return Groq(api_key=api_key, max_retries=DEFAULT_MAX_RETRIES)
+
+    if provider == "openai":
+        try:
+            from openai import OpenAI
+        except Exception:
+            raise RuntimeError("OpenAI client not installed. Add 'openai' to requirements.txt.")
+        return OpenAI(api_key=api_key or None, max_retries=DEFAULT_MAX_RETRIES)
+
+    if provider == "azure-openai":
+        try:
+            from openai import AzureOpenAI
+        except Exception:
+            raise RuntimeError("Azure OpenAI client not installed. Add 'openai' to requirements.txt.")
+        if not endpoint or not api_key:
+            raise RuntimeError("Missing Azure OpenAI env: AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY")
+        return AzureOpenAI(api_key=api_key, azure_endpoint=endpoint, max_retries=DEFAULT_MAX_RETRIES)
+
+    if provider == "anthropic":
+        try:
+            import anthropic
+        except Exception:
+            raise RuntimeError("Anthropic client not installed. Add 'anthropic' to requirements.txt.")
+        return anthropic.Anthropic(api_key=api_key or None, max_retries=DEFAULT_MAX_RETRIES)
+
+    raise ValueError(f"No pooled client for LLM provider: {provider}")
+
+
+def get_provider_client(provider: str, api_key: Optional[str] = None, endpoint: Optional[str] = None):
+    """Return this process's shared SDK client for *provider* and credentials."""
+    key = (os.getpid(), provider, api_key or "", endpoint or "")
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Drop clients inherited across a fork
+            for stale in [k for k in _clients if k[0] != key[0]]:
+                _clients.pop(stale, None)
+            client = _build(provider, api_key, endpoint)
+            _clients[key] = client
+            logger.info(f"[LLMPool] Created {provider} client for pid {key[0]}")
+    return client
+
+
+def pool_size() -> int:
+    return len(_clients)
+
+
+def reset_pool() -> None:
+    """Close and forget every pooled client (tests / credential rotation)."""
+    with _lock:
+        for client in _clients.values():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+        _clients.clear()
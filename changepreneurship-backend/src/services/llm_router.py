@@ -0,0 +1,339 @@
+"""
+LLM provider routing: hedged requests, failover and circuit breakers.
+
+LLMClient hands every non-streaming call to a ProviderRouter built from an
+ordered route list (``LLM_PROVIDERS=groq:llama-3.3-70b-versatile,openai:gpt-4o-mini``):
+
+  1. The first route whose circuit breaker is closed gets the request.
+  2. If it has not answered after the hedge delay (the route's observed p95
+     latency, clamped to LLM_HEDGE_MIN_MS..LLM_HEDGE_MAX_MS), the same request
+     goes to the next route as well; whichever answers first wins. Losers run
+     to completion in the background so their latency still feeds the p95.
+  3. A route that errors, or has no outbound rate-limit capacity in time
+     (utils/llm_rate_limiter.py), is failed over to the next one straight away.
+  4. LLM_BREAKER_FAILURES consecutive failures open a route's breaker: it is
+     skipped for LLM_BREAKER_RESET_SECONDS, then one probe request decides
+     whether it closes again.
+
+Breakers and latency windows are per process and shared by all LLMClient
+instances. With a single route there is nothing to hedge or fail over to, but
+the call still runs on the router pool so LLM_TIMEOUT_SECONDS applies.
+
+Used by:
+  - services/llm_client.py  (generate / stream)
+  - main.py                 (/api/health)
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.utils.llm_metrics import metrics
+from src.utils.llm_rate_limiter import RateLimitTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class ProvidersUnavailable(RuntimeError):
+    """Every configured route is circuit-open."""
+
+
+@dataclass(frozen=True)
+class Route:
+    provider: str
+    model: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+def parse_routes(spec: str, default: Route) -> List[Route]:
+    """
+    ``"groq:llama-3.3-70b-versatile, openai:gpt-4o-mini"`` -> routes.
+
+    A route may leave out its model only when it is *default*'s provider (it
+    then uses *default*'s model); any other provider must name one.
+    """
+    routes = []
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        # Split on the first colon only: Ollama models look like "llama3:8b"
+        provider, _, model = item.partition(":")
+        provider, model = provider.strip(), model.strip()
+        if not model:
+            if provider != default.provider:
+                raise ValueError(f"LLM route {provider!r} needs a model (\"{provider}:<model>\")")
+            model = default.model
+        route = Route(provider, model)
+        if route not in routes:
+            routes.append(route)
+    return routes or [default]
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """May a request go to this route now? Claims the probe slot when half-open."""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state, self._probing = self.HALF_OPEN, False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self.failures, self._probing = self.CLOSED, 0, False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this one opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state, self.opened_at = self.OPEN, time.monotonic()
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a claimed probe without an outcome (the attempt never reached the provider,
+        or was abandoned); the next request probes instead."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
+
+
+class LatencyWindow:
+    """The last *size* successful call latencies of one route."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyWindow] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def breaker_for(route: Route) -> CircuitBreaker:
+    with _lock:
+        breaker = _breakers.get(route.key)
+        if breaker is None:
+            breaker = _breakers[route.key] = CircuitBreaker(
+                int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+            )
+        return breaker
+
+
+def latency_for(route: Route) -> LatencyWindow:
+    with _lock:
+        window = _latencies.get(route.key)
+        if window is None:
+            window = _latencies[route.key] = LatencyWindow(int(os.getenv("LLM_HEDGE_WINDOW", "200")))
+        return window
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("LLM_ROUTER_MAX_WORKERS", "32")), thread_name_prefix="llm-route"
+            )
+        return _executor
+
+
+def router_stats() -> Dict[str, Any]:
+    with _lock:
+        keys = sorted(set(_breakers) | set(_latencies))
+        breakers, latencies = dict(_breakers), dict(_latencies)
+    stats = {}
+    for key in keys:
+        window = latencies.get(key)
+        p95 = window.percentile(95) if window else None
+        stats[key] = {
+            **(breakers[key].stats() if key in breakers else {"state": CircuitBreaker.CLOSED, "failures": 0}),
+            "samples": len(window) if window else 0,
+            "p95_ms": int(p95 * 1000) if p95 is not None else None,
+        }
+    return stats
+
+
+def reset_router() -> None:
+    """Forget breaker state and latency history (tests)."""
+    with _lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def _count(event: str, route: Route) -> None:
+    metrics.inc("llm_route_events_total", {"event": event, "provider": route.provider, "model": route.model})
+
+
+class ProviderRouter:
+    def __init__(self, routes: List[Route], timeout: float):
+        self.routes = list(routes)
+        self.timeout = timeout
+        self.hedging = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+        self.hedge_min = int(os.getenv("LLM_HEDGE_MIN_MS", "500")) / 1000
+        self.hedge_max = int(os.getenv("LLM_HEDGE_MAX_MS", "15000")) / 1000
+        self.hedge_default = int(os.getenv("LLM_HEDGE_DEFAULT_MS", "5000")) / 1000
+        self.min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+    def hedge_delay(self, route: Route) -> float:
+        """Seconds to wait on *route* before asking the next one too."""
+        p95 = latency_for(route).percentile(95, self.min_samples)
+        delay = self.hedge_default if p95 is None else p95
+        return min(self.hedge_max, max(self.hedge_min, delay))
+
+    def record(self, route: Route, ok: bool) -> None:
+        """Feed an outcome to *route*'s breaker."""
+        if ok:
+            breaker_for(route).record_success()
+        elif breaker_for(route).record_failure():
+            logger.warning(f"[LLMRouter] Circuit opened for {route.key}")
+            _count("breaker_open", route)
+
+    def release(self, route: Route) -> None:
+        """Free *route*'s probe slot without recording an outcome."""
+        breaker_for(route).release()
+
+    def run(self, route: Route, attempt: Callable[[Route], Any]) -> Any:
+        """One attempt on *route*, feeding its breaker and latency window."""
+        started = time.monotonic()
+        try:
+            result = attempt(route)
+        except RateLimitTimeout:
+            # Our own limiter, not the provider: fail over without tripping the breaker
+            self.release(route)
+            raise
+        except Exception:
+            self.record(route, ok=False)
+            raise
+        latency_for(route).observe(time.monotonic() - started)
+        self.record(route, ok=True)
+        return result
+
+    def call(self, attempt: Callable[[Route], Any]) -> Any:
+        """Run ``attempt(route)`` against the routes; first successful result wins."""
+        queue = list(self.routes)
+
+        def next_route() -> Optional[Route]:
+            while queue:
+                route = queue.pop(0)
+                if breaker_for(route).allow():
+                    return route
+                _count("skipped", route)
+            return None
+
+        primary = next_route()
+        if primary is None:
+            raise ProvidersUnavailable(
+                "All LLM providers are circuit-open: " + ", ".join(r.key for r in self.routes)
+            )
+
+        pending = {}
+
+        def launch(route: Route) -> None:
+            # Copy the context so metrics tags (metrics_context) follow the call
+            future = _pool().submit(contextvars.copy_context().run, self.run, route, attempt)
+            pending[future] = route
+
+        launch(primary)
+        deadline = time.monotonic() + self.timeout
+        hedge_at = time.monotonic() + self.hedge_delay(primary) if self.hedging else None
+        last_error: Optional[BaseException] = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wake = min(deadline, hedge_at) if hedge_at is not None and queue else deadline
+            done, _ = wait(pending, timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                route = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.info(f"[LLMRouter] {route.key} failed: {e}")
+                    continue
+                if route != primary:
+                    _count("hedge_won", route)
+                return result
+
+            if done and not pending:
+                # Everything in flight failed: fail over without waiting
+                route = next_route()
+                if route is None:
+                    break
+                _count("failover", route)
+                launch(route)
+                primary = route
+                hedge_at = time.monotonic() + self.hedge_delay(route) if self.hedging else None
+            elif hedge_at is not None and time.monotonic() >= hedge_at:
+                # One hedge per primary; a further route is only tried on failure
+                hedge_at = None
+                route = next_route()
+                if route is not None:
+                    _count("hedge", route)
+                    launch(route)
+
+        if pending:
+            raise TimeoutError(
+                f"LLM request timed out after {self.timeout}s ({', '.join(r.key for r in pending.values())})"
+            )
+        if last_error is not None:
+            raise last_error
+        raise ProvidersUnavailable(
+            "All LLM providers are circuit-open: " + ", ".join(r.key for r in self.routes)
+        )
+
+    def candidates(self) -> Iterator[Route]:
+        """Routes in order, circuit-open ones skipped; lazy so only a tried route claims a probe."""
+        for route in self.routes:
+            if breaker_for(route).allow():
+                yield route
+            else:
+                _count("skipped", route)
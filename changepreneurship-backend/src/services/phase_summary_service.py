@@ -6,10 +6,14 @@ Called immediately after the user completes a phase to show what was discovered.
 """
 import os
 import json
+import hashlib
 import logging
 import time
 
-from groq import Groq
+from .llm_pool import get_provider_client
+from ..utils.single_flight import single_flight
+from ..utils.llm_metrics import track_llm_call
+from ..utils.prompt_packer import PromptPacker, token_budget
 
 logger = logging.getLogger(__name__)
 
@@ -92,31 +96,32 @@ class PhaseSummaryService:
             return self._fallback_summary(phase_id, phase_name, len(responses))
 
         prompt = self._build_prompt(phase_name, responses)
-        return self._call_groq(phase_id, phase_name, prompt, len(responses))
+        # Double submits / parallel tabs for the same answers share one Groq call
+        key = "phase_summary:" + hashlib.sha256(
+            f"{self.groq_model}:{phase_id}:{prompt}".encode("utf-8")
+        ).hexdigest()[:16]
+        return single_flight.do(
+            key,
+            lambda: self._call_groq(phase_id, phase_name, prompt, len(responses)),
+            fallback=lambda: self._fallback_summary(phase_id, phase_name, len(responses)),
+        )
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _build_prompt(self, phase_name: str, responses: list) -> str:
-        lines = [
+        header = [
             f"=== {phase_name.upper()} PHASE RESPONSES ===",
             f"Total answers: {len(responses)}",
             "",
         ]
-        for r in responses[:25]:  # cap to keep prompt focused
-            q = (getattr(r, "question_text", None) or getattr(r, "question_id", "?"))[:100]
-            try:
-                v = r.get_response_value()
-            except Exception:
-                v = str(getattr(r, "response_value", "") or "")
-            val_str = str(v)[:250] if v is not None else ""
-            section = getattr(r, "section_id", "") or ""
-            lines.append(f"[{section}] Q: {q} → A: {val_str}")
+        footer = f"Analyze these {phase_name} responses and generate the phase summary JSON."
+        packer = PromptPacker(token_budget("phase_summary", self.groq_model))
+        packed = packer.pack({"phase": responses}, reserved="\n".join(header + [footer]))
+        lines = header + packed.lines["phase"]
         lines.append("")
-        lines.append(
-            f"Analyze these {phase_name} responses and generate the phase summary JSON."
-        )
+        lines.append(footer)
         return "\n".join(lines)
 
     def _call_groq(
@@ -133,21 +138,26 @@ class PhaseSummaryService:
             + PHASE_SUMMARY_SCHEMA
         )
         try:
-            client = Groq(api_key=self.groq_key)
+            client = get_provider_client("groq", api_key=self.groq_key)
             t0 = time.time()
-            completion = client.chat.completions.create(
-                model=self.groq_model,
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": prompt},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3,
-                max_tokens=1024,
-                timeout=45,
-            )
+            with track_llm_call(
+                "groq", self.groq_model, prompt, system, {"phase_id": phase_id}, max_tokens=1024
+            ) as call:
+                completion = client.chat.completions.create(
+                    model=self.groq_model,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3,
+                    max_tokens=1024,
+                    timeout=45,
+                )
+                raw = completion.choices[0].message.content
+                call.set_usage(getattr(completion, "usage", None))
+                call.set_response(raw)
             elapsed = time.time() - t0
-            raw = completion.choices[0].message.content
             logger.info(
                 f"[PhaseSummary] Groq {elapsed:.2f}s for phase={phase_id}, "
                 f"model={self.groq_model}"
@@ -167,6 +177,7 @@ class PhaseSummaryService:
     ) -> dict:
         score = min(65, 30 + response_count * 3)
         return {
+            "_fallback": True,
             "phase_id": phase_id,
             "score": score,
             "headline": f"{phase_name} Completed",
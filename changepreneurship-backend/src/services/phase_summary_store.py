@@ -0,0 +1,168 @@
+"""
+Phase Summary Store
+-------------------
+Keeps one precomputed PhaseSummary row per (user, phase) in step with the
+phase's responses, so /api/ai/phase-summary can answer without waiting on
+Groq:
+
+  - a phase becoming complete creates (or re-arms) a ``pending`` row and a
+    ``phase_summary`` job is enqueued once the transaction commits
+  - responses changing in a completed phase bump the row's revision and
+    enqueue a fresh job; in an incomplete phase the row goes ``stale``
+  - the job stores its result only if its revision is still current, and
+    reuses the previous summary when the answers hash the same (re-saves)
+
+Write hooks run inside the caller's transaction (like AssessmentStatsService);
+the routes call ``dispatch_pending()`` after ``db.session.commit()`` so the
+worker never reads answers that are not committed yet.
+
+Used by:
+  - routes/assessment.py  (recompute_assessment_status, save routes)
+  - routes/ai_routes.py   (/api/ai/phase-summary)
+  - report_jobs.py        (phase_summary job handler)
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from src.models.assessment import db, PhaseSummary
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'phase_summary_jobs'
+
+_INSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class PhaseSummaryStore:
+    """Persistence and invalidation for precomputed phase summaries."""
+
+    @staticmethod
+    def get(user_id: int, phase_id: str) -> Optional[PhaseSummary]:
+        return PhaseSummary.query.filter_by(user_id=user_id, phase_id=phase_id).first()
+
+    # ------------------------------------------------------------------
+    # Write hooks (caller commits)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def on_assessment_status_changed(assessment, was_completed: bool, responses_changed: bool) -> None:
+        """Re-arm, invalidate or leave the phase's summary after a status recompute."""
+        if not responses_changed and was_completed == bool(assessment.is_completed):
+            return
+
+        row = PhaseSummaryStore.get(assessment.user_id, assessment.phase_id)
+        if not assessment.is_completed:
+            if row is not None and responses_changed and row.status != PhaseSummary.STALE:
+                PhaseSummaryStore._reset(row, PhaseSummary.STALE)
+            return
+
+        if row is None:
+            row = PhaseSummaryStore._create_locked(assessment.user_id, assessment.phase_id)
+        if row.status == PhaseSummary.READY and not responses_changed:
+            return  # re-completed with the same answers
+        PhaseSummaryStore._reset(row, PhaseSummary.PENDING)
+        PhaseSummaryStore.schedule(row)
+
+    @staticmethod
+    def _create_locked(user_id: int, phase_id: str) -> PhaseSummary:
+        """The (user, phase) row, inserted unless a concurrent save got there first, locked."""
+        insert = _INSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+        if insert is None:
+            row = PhaseSummary(user_id=user_id, phase_id=phase_id, revision=0)
+            db.session.add(row)
+            return row
+        # A plain INSERT would hit uq_phase_summary_user_phase when two saves complete the phase at once
+        db.session.execute(
+            insert(PhaseSummary.__table__)
+            .values(user_id=user_id, phase_id=phase_id, revision=0, status=PhaseSummary.PENDING)
+            .on_conflict_do_nothing(index_elements=['user_id', 'phase_id'])
+        )
+        return (
+            PhaseSummary.query.filter_by(user_id=user_id, phase_id=phase_id)
+            .with_for_update()
+            .populate_existing()
+            .one()
+        )
+
+    @staticmethod
+    def schedule(row: PhaseSummary) -> None:
+        """Enqueue a job for *row*'s current revision once the session commits."""
+        db.session.info.setdefault(_PENDING_KEY, {})[(row.user_id, row.phase_id)] = row.revision
+
+    @staticmethod
+    def mark_pending(row: PhaseSummary) -> None:
+        """Start a new revision for *row* (e.g. a retry after a fallback)."""
+        PhaseSummaryStore._reset(row, PhaseSummary.PENDING)
+        PhaseSummaryStore.schedule(row)
+
+    @staticmethod
+    def _reset(row: PhaseSummary, status: str) -> None:
+        # The old summary and its input_digest stay for reuse, but are not served
+        row.revision = (row.revision or 0) + 1
+        row.status = status
+        row.requested_at = datetime.utcnow()
+
+    # ------------------------------------------------------------------
+    # After commit
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def dispatch_pending() -> None:
+        """Enqueue the jobs scheduled in the transaction that just committed."""
+        from .report_jobs import enqueue_phase_summary
+
+        pending = db.session.info.pop(_PENDING_KEY, None) or {}
+        for (user_id, phase_id), revision in pending.items():
+            try:
+                enqueue_phase_summary(user_id, phase_id, revision)
+            except Exception as e:
+                # The row stays pending; the summary endpoint re-enqueues it
+                logger.warning(f"[PhaseSummaryStore] Could not enqueue {phase_id} for user {user_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Job side
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def responses_digest(responses) -> str:
+        """Hash of a phase's answers (AssessmentResponse rows)."""
+        state = sorted((r.question_id, r.response_value or '') for r in responses)
+        return hashlib.md5(json.dumps(state).encode()).hexdigest()
+
+    @staticmethod
+    def reusable_summary(row: PhaseSummary, digest: str) -> Optional[dict]:
+        """The row's previous summary if it was generated from the same answers."""
+        summary = row.get_summary() if row.input_digest == digest else None
+        if summary and not summary.get('_fallback'):
+            return summary
+        return None
+
+    @staticmethod
+    def store_result(user_id: int, phase_id: str, revision: int, summary: dict, digest: str) -> bool:
+        """Persist a generated summary; False if the revision was superseded meanwhile."""
+        # Conditional on the revision, so a result for superseded answers is dropped
+        updated = PhaseSummary.query.filter_by(
+            user_id=user_id, phase_id=phase_id, revision=revision
+        ).update({
+            'status': PhaseSummary.FAILED if summary.get('_fallback') else PhaseSummary.READY,
+            'summary': json.dumps(summary),
+            'input_digest': digest,
+            'generated_at': datetime.utcnow(),
+        }, synchronize_session=False)
+        db.session.commit()
+        return bool(updated)
@@ -0,0 +1,195 @@
+"""
+Report cache
+------------
+Content-addressed store for generated LLM reports.
+
+Entries are keyed by ``<namespace>:<user_id>:<digest>`` where *digest* hashes
+the assessment state the report was generated from, so an entry never goes
+wrong - it only goes *stale* (older than ``fresh_seconds``) or is superseded
+by a report for newer answers. Entries are kept for ``retention_seconds``
+(days, not the old 1 h TTL) and each user keeps at most ``max_versions``
+digests; older versions are deleted explicitly when a new one is stored.
+
+Backends:
+  - Redis: entry keys plus a per-user ZSET ``<namespace>:versions:<user_id>``
+    (digest -> stored_at) used for "latest" lookups and eviction.
+  - In-process (no Redis): the same layout in a dict.
+
+Used by:
+  - insights_report_service.InsightsReportService
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from src.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedReport:
+    digest: str
+    report: dict
+    stored_at: float
+    fresh_seconds: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.age_seconds < self.fresh_seconds
+
+
+class RedisReportBackend:
+    def __init__(self, client):
+        self.r = client
+
+    def get(self, key: str) -> Optional[dict]:
+        raw = self.r.get(key)
+        return json.loads(raw) if raw else None
+
+    def put(self, key: str, index: str, digest: str, envelope: dict, retention: int) -> None:
+        pipe = self.r.pipeline()
+        pipe.set(key, json.dumps(envelope, default=str), ex=retention)
+        pipe.zadd(index, {digest: envelope["stored_at"]})
+        pipe.expire(index, retention)
+        pipe.execute()
+
+    def versions(self, index: str) -> List[str]:
+        """Digests newest first."""
+        return list(self.r.zrevrange(index, 0, -1))
+
+    def delete(self, keys: List[str], index: str, digests: List[str]) -> None:
+        if keys:
+            self.r.delete(*keys)
+        if digests:
+            self.r.zrem(index, *digests)
+
+    def clear(self, index: str, keys: List[str]) -> None:
+        self.r.delete(index, *keys)
+
+
+class MemoryReportBackend:
+    def __init__(self):
+        self._entries: Dict[str, tuple] = {}
+        self._indexes: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            raw, expires, _, _ = entry
+            if time.time() >= expires:
+                del self._entries[key]
+                return None
+        return json.loads(raw)
+
+    def put(self, key: str, index: str, digest: str, envelope: dict, retention: int) -> None:
+        with self._lock:
+            now = time.time()
+            # Users who never come back are never read again; drop their expired entries as we go
+            for stale in [k for k, (_, exp, _, _) in self._entries.items() if exp <= now]:
+                _, _, stale_index, stale_digest = self._entries.pop(stale)
+                members = self._indexes.get(stale_index, {})
+                members.pop(stale_digest, None)
+                if not members:
+                    self._indexes.pop(stale_index, None)
+            self._entries[key] = (json.dumps(envelope, default=str), now + retention, index, digest)
+            self._indexes.setdefault(index, {})[digest] = envelope["stored_at"]
+
+    def versions(self, index: str) -> List[str]:
+        with self._lock:
+            members = self._indexes.get(index, {})
+            return sorted(members, key=members.get, reverse=True)
+
+    def delete(self, keys: List[str], index: str, digests: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            members = self._indexes.get(index, {})
+            for digest in digests:
+                members.pop(digest, None)
+
+    def clear(self, index: str, keys: List[str]) -> None:
+        with self._lock:
+            self._indexes.pop(index, None)
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class ReportCache:
+    def __init__(self, namespace: str, fresh_seconds: float, retention_seconds: int, max_versions: int, backend=None):
+        self.namespace = namespace
+        self.fresh_seconds = fresh_seconds
+        self.retention_seconds = retention_seconds
+        self.max_versions = max(1, max_versions)
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            client = get_redis_client()
+            self._backend = RedisReportBackend(client) if client else MemoryReportBackend()
+        return self._backend
+
+    def reset_backend(self, backend=None) -> None:
+        """Swap the storage backend (tests; re-resolved lazily when None)."""
+        self._backend = backend
+
+    def key(self, user_id: int, digest: str) -> str:
+        return f"{self.namespace}:{user_id}:{digest}"
+
+    def _index(self, user_id: int) -> str:
+        return f"{self.namespace}:versions:{user_id}"
+
+    def get(self, user_id: int, digest: str) -> Optional[CachedReport]:
+        try:
+            envelope = self.backend.get(self.key(user_id, digest))
+        except Exception as e:
+            logger.warning(f"[ReportCache] get failed: {e}")
+            return None
+        if not envelope:
+            return None
+        return CachedReport(digest, envelope["report"], envelope["stored_at"], self.fresh_seconds)
+
+    def latest(self, user_id: int) -> Optional[CachedReport]:
+        """Newest stored version for the user, whatever answers it was built from."""
+        try:
+            versions = self.backend.versions(self._index(user_id))
+        except Exception as e:
+            logger.warning(f"[ReportCache] versions failed: {e}")
+            return None
+        for digest in versions:
+            cached = self.get(user_id, digest)
+            if cached is not None:
+                return cached
+        return None
+
+    def put(self, user_id: int, digest: str, report: dict) -> None:
+        """Store *report* for *digest* and evict the user's versions beyond max_versions."""
+        index = self._index(user_id)
+        envelope = {"stored_at": time.time(), "report": report}
+        try:
+            self.backend.put(self.key(user_id, digest), index, digest, envelope, self.retention_seconds)
+            evicted = self.backend.versions(index)[self.max_versions:]
+            if evicted:
+                self.backend.delete([self.key(user_id, d) for d in evicted], index, evicted)
+                logger.info(f"[ReportCache] Evicted {len(evicted)} old {self.namespace} version(s) for user {user_id}")
+        except Exception as e:
+            logger.warning(f"[ReportCache] put failed: {e}")
+
+    def evict_user(self, user_id: int) -> None:
+        index = self._index(user_id)
+        try:
+            digests = self.backend.versions(index)
+            self.backend.clear(index, [self.key(user_id, d) for d in digests])
+        except Exception as e:
+            logger.warning(f"[ReportCache] evict failed: {e}")
@@ -0,0 +1,125 @@
+"""
+Report job handlers
+-------------------
+Background versions of the request-thread LLM work, registered with the
+job queue (services/job_queue.py):
+
+  insights_report    InsightsReportService.generate_report
+  phase_summary      PhaseSummaryService.generate_summary   (params: phase_id;
+                     with revision: persisted through PhaseSummaryStore)
+  ai_consensus       AIConsensusService.generate_consensus
+  executive_summary  DashboardDataGenerator.generate_executive_summary
+
+Idempotency keys reuse the assessment-state hash from
+InsightsReportService._cache_key, so repeated requests for unchanged answers
+collapse onto one job. Precomputed phase summaries are keyed by their
+PhaseSummary revision instead.
+"""
+from typing import Optional
+
+from flask import current_app
+
+from src.models.assessment import Assessment, AssessmentResponse
+from src.utils.assessment_collector import collect_assessment_data, build_phase_meta
+from src.utils.llm_rate_limiter import INTERACTIVE
+from .job_queue import PermanentJobError, get_job_queue, job_handler
+from .insights_report_service import InsightsReportService
+from .phase_summary_service import PhaseSummaryService
+from .phase_summary_store import PhaseSummaryStore
+
+
+def report_job_key(job_type: str, user_id: int, assessment_data: dict, suffix: Optional[str] = None) -> str:
+    key = f"{job_type}:{InsightsReportService()._cache_key(user_id, assessment_data)}"
+    return f"{key}:{suffix}" if suffix else key
+
+
+def enqueue_report_job(
+    job_type: str,
+    user_id: int,
+    params: Optional[dict] = None,
+    assessment_data: Optional[dict] = None,
+    key_suffix: Optional[str] = None,
+) -> dict:
+    """
+    Enqueue *job_type* for *user_id* (deduplicated on assessment state).
+
+    *key_suffix* separates otherwise identical jobs, e.g. the stale-cache
+    refresh of a report that was already generated for the same answers.
+    """
+    params = params or {}
+    if job_type == "phase_summary" and not params.get("phase_id"):
+        raise ValueError("phase_id is required")
+
+    if assessment_data is None:
+        assessment_data = collect_assessment_data(user_id)
+    suffix = ":".join(str(part) for part in (params.get("phase_id"), key_suffix) if part) or None
+    job_queue = get_job_queue()
+    job = job_queue.enqueue(
+        job_type,
+        {"user_id": user_id, **params},
+        user_id=user_id,
+        idempotency_key=report_job_key(job_type, user_id, assessment_data, suffix),
+    )
+    job_queue.ensure_in_process_workers(current_app._get_current_object())
+    return job
+
+
+def enqueue_phase_summary(user_id: int, phase_id: str, revision: int) -> dict:
+    """Enqueue the precomputation of one PhaseSummary revision (idempotent per revision)."""
+    job_queue = get_job_queue()
+    job = job_queue.enqueue(
+        "phase_summary",
+        {"user_id": user_id, "phase_id": phase_id, "revision": revision},
+        user_id=user_id,
+        idempotency_key=f"phase_summary:{user_id}:{phase_id}:r{revision}",
+    )
+    job_queue.ensure_in_process_workers(current_app._get_current_object())
+    return job
+
+
+@job_handler("insights_report")
+def run_insights_report(payload: dict) -> dict:
+    user_id = payload["user_id"]
+    return InsightsReportService().generate_report(user_id, collect_assessment_data(user_id), allow_stale=False)
+
+
+# The user is usually polling for it, so it queues with request-thread calls
+@job_handler("phase_summary", priority=INTERACTIVE)
+def run_phase_summary(payload: dict) -> dict:
+    assessment = Assessment.query.filter_by(
+        user_id=payload["user_id"], phase_id=payload["phase_id"]
+    ).first()
+    if not assessment:
+        raise PermanentJobError(f"No assessment found for phase: {payload['phase_id']}")
+    responses = AssessmentResponse.query.filter_by(assessment_id=assessment.id).all()
+    revision = payload.get("revision")
+    if revision is None:
+        return PhaseSummaryService().generate_summary(assessment.phase_id, assessment.phase_name, responses)
+
+    row = PhaseSummaryStore.get(payload["user_id"], payload["phase_id"])
+    if row is None or row.revision != revision:
+        return {"superseded": True}
+    digest = PhaseSummaryStore.responses_digest(responses)
+    summary = PhaseSummaryStore.reusable_summary(row, digest)
+    if summary is None:
+        summary = PhaseSummaryService().generate_summary(assessment.phase_id, assessment.phase_name, responses)
+    if not PhaseSummaryStore.store_result(payload["user_id"], payload["phase_id"], revision, summary, digest):
+        return {"superseded": True}
+    return summary
+
+
+@job_handler("ai_consensus")
+def run_ai_consensus(payload: dict) -> dict:
+    from .ai_consensus import AIConsensusService
+
+    assessment_data = collect_assessment_data(payload["user_id"])
+    if not assessment_data["phases"]:
+        raise PermanentJobError("No assessments found")
+    return AIConsensusService().generate_consensus(assessment_data["responses"], build_phase_meta(assessment_data))
+
+
+@job_handler("executive_summary")
+def run_executive_summary(payload: dict) -> dict:
+    from .dashboard_service import DashboardDataGenerator
+
+    return DashboardDataGenerator().generate_executive_summary(payload["user_id"])
@@ -7,8 +7,9 @@ Single source of truth for loading a user's full assessment state
 Used by:
   - ai_routes.py  (insights-report endpoint)
   - ai_recommendations.py  (recommendations endpoints)
+  - report_jobs.py  (background report jobs)
 """
-from ..models.assessment import Assessment, AssessmentResponse
+from .assessment_snapshot import load_assessment_snapshot
 
 
 def collect_assessment_data(user_id: int) -> dict:
@@ -23,36 +24,16 @@ def collect_assessment_data(user_id: int) -> dict:
                                        'response_type'}, ...] }
         }
     """
-    assessments = Assessment.query.filter_by(user_id=user_id).all()
-
-    phases = [
-        {
-            'id': a.phase_id,
-            'name': a.phase_name,
-            'progress': a.progress_percentage,
-            'completed': a.is_completed,
-        }
-        for a in assessments
-    ]
-
-    responses_by_phase: dict = {}
-    if assessments:
-        assessment_ids = [a.id for a in assessments]
-        all_responses = AssessmentResponse.query.filter(
-            AssessmentResponse.assessment_id.in_(assessment_ids)
-        ).all()
-
-        aid_to_phase = {a.id: a.phase_id for a in assessments}
-
-        for r in all_responses:
-            pid = aid_to_phase.get(r.assessment_id)
-            if pid:
-                responses_by_phase.setdefault(pid, []).append({
-                    'question_id': r.question_id,
-                    'section_id': r.section_id,
-                    'question_text': r.question_text or r.question_id,
-                    'response_value': r.get_response_value(),
-                    'response_type': r.response_type,
-                })
-
-    return {'phases': phases, 'responses': responses_by_phase}
+    snapshot = load_assessment_snapshot(user_id)
+    if snapshot is None:
+        return {'phases': [], 'responses': {}}
+    return snapshot.as_assessment_data()
+
+
+def build_phase_meta(assessment_data: dict) -> dict:
+    """Phase totals passed to AIConsensusService.generate_consensus."""
+    return {
+        'total_phases': len(assessment_data['phases']),
+        'completed_phases': sum(1 for p in assessment_data['phases'] if p.get('completed')),
+        'phases': assessment_data['phases'],
+    }
@@ -0,0 +1,167 @@
+"""
+Assessment Snapshot Loader
+--------------------------
+Loads a user's full assessment state (user + assessments + responses) in a
+single joined round trip and freezes it into an immutable snapshot.
+
+Services used to walk ``Assessment`` rows and issue one ``AssessmentResponse``
+query per phase (N+1).  Everything that needs "all of a user's answers" should
+go through ``load_assessment_snapshot`` instead.
+
+Used by:
+  - assessment_collector.py  (AI report / recommendations input)
+  - dashboard_service.py     (executive summary)
+  - ai_recommendations_service.py
+  - complete_user_generator.py (JSON export)
+  - routes/assessment.py     (/sync-all)
+"""
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import joinedload
+
+from ..models.assessment import db, User, Assessment
+
+
+def decode_response_value(raw: Optional[str]) -> Any:
+    """Decode a stored response_value exactly like AssessmentResponse.get_response_value."""
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return raw
+
+
+@dataclass(frozen=True)
+class ResponseSnapshot:
+    id: int
+    section_id: str
+    question_id: str
+    question_text: str
+    response_type: str
+    raw_value: Optional[str]  # response_value column as stored
+    value: Any                # pre-decoded response_value
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class AssessmentSnapshot:
+    id: int
+    phase_id: str
+    phase_name: str
+    progress_percentage: float
+    is_completed: bool
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    responses: Tuple[ResponseSnapshot, ...]
+
+    @property
+    def response_count(self) -> int:
+        return len(self.responses)
+
+
+@dataclass(frozen=True)
+class UserAssessmentSnapshot:
+    user_id: int
+    username: str
+    email: str
+    assessments: Tuple[AssessmentSnapshot, ...]
+
+    @property
+    def total_responses(self) -> int:
+        return sum(a.response_count for a in self.assessments)
+
+    def phase(self, phase_id: str) -> Optional[AssessmentSnapshot]:
+        """Return the snapshot for *phase_id*, or None if the phase was never started."""
+        return next((a for a in self.assessments if a.phase_id == phase_id), None)
+
+    def as_assessment_data(self) -> Dict[str, Any]:
+        """
+        Shape consumed by the AI services:
+            {'phases': [...], 'responses': {phase_id: [...]}}
+        """
+        phases = [
+            {
+                'id': a.phase_id,
+                'name': a.phase_name,
+                'progress': a.progress_percentage,
+                'completed': a.is_completed,
+            }
+            for a in self.assessments
+        ]
+        responses_by_phase: Dict[str, list] = {}
+        for a in self.assessments:
+            if not a.responses:
+                continue
+            responses_by_phase.setdefault(a.phase_id, []).extend(
+                {
+                    'question_id': r.question_id,
+                    'section_id': r.section_id,
+                    'question_text': r.question_text or r.question_id,
+                    'response_value': r.value,
+                    'response_type': r.response_type,
+                }
+                for r in a.responses
+            )
+        return {'phases': phases, 'responses': responses_by_phase}
+
+
+def _freeze_assessment(assessment: Assessment) -> AssessmentSnapshot:
+    responses = tuple(
+        ResponseSnapshot(
+            id=r.id,
+            section_id=r.section_id,
+            question_id=r.question_id,
+            question_text=r.question_text,
+            response_type=r.response_type,
+            raw_value=r.response_value,
+            value=decode_response_value(r.response_value),
+            created_at=r.created_at,
+            updated_at=r.updated_at,
+        )
+        for r in sorted(assessment.responses, key=lambda r: r.id)
+    )
+    return AssessmentSnapshot(
+        id=assessment.id,
+        phase_id=assessment.phase_id,
+        phase_name=assessment.phase_name,
+        progress_percentage=assessment.progress_percentage or 0.0,
+        is_completed=bool(assessment.is_completed),
+        started_at=assessment.started_at,
+        completed_at=assessment.completed_at,
+        responses=responses,
+    )
+
+
+def load_assessment_snapshot(user_id, session=None) -> Optional[UserAssessmentSnapshot]:
+    """
+    Load *user_id*'s assessments and responses in one SELECT
+    (user LEFT JOIN assessment LEFT JOIN assessment_response).
+
+    Returns None if the user does not exist.
+    """
+    session = session or db.session
+    if isinstance(user_id, str) and user_id.isdigit():
+        user_id = int(user_id)
+
+    user = (
+        session.query(User)
+        .options(joinedload(User.assessments).joinedload(Assessment.responses))
+        .filter(User.id == user_id)
+        .first()
+    )
+    if not user:
+        return None
+
+    return UserAssessmentSnapshot(
+        user_id=user.id,
+        username=user.username,
+        email=user.email,
+        assessments=tuple(
+            _freeze_assessment(a) for a in sorted(user.assessments, key=lambda a: a.id)
+        ),
+    )
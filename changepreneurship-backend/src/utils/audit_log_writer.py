@@ -0,0 +1,444 @@
+"""
+Background writer for the LLM audit log.
+
+LLMAuditLogger hands entries to ``enqueue`` (a bounded queue put - never file
+I/O on the request path). One daemon thread per log directory and process:
+
+  - drains the queue in batches of up to LLM_AUDIT_BATCH_SIZE entries and
+    appends each batch to ``llm-audit-<date>.jsonl`` in one write
+  - fsyncs at most every LLM_AUDIT_FSYNC_SECONDS
+  - rotates to ``llm-audit-<date>.<n>.jsonl`` past LLM_AUDIT_MAX_FILE_BYTES
+    and gzips files of earlier days; files older than
+    LLM_AUDIT_RETENTION_DAYS are deleted only when that is set
+
+Every gunicorn process appends to the same daily file, so the processes
+coordinate through ``flock`` on ``llm-audit.lock`` in the log directory:
+writes hold it shared, rotation and compression exclusive, and a writer
+reopens its file whenever the path no longer points at the inode it holds
+(another process rotated or compressed it). Without fcntl (Windows) one
+process per log directory is assumed.
+
+Each process also keeps a ``DailyRollup`` per day, updated in O(1) per entry
+and snapshotted to ``llm-audit-<date>.rollup.<pid>.json``; daily stats merge
+those snapshots instead of re-reading the log.
+"""
+import atexit
+import bisect
+import glob
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Latency histogram upper bounds (ms): 1ms .. ~5min, 25% apart
+LATENCY_BUCKETS_MS: List[float] = []
+_bound = 1.0
+while _bound < 300_000:
+    LATENCY_BUCKETS_MS.append(round(_bound, 2))
+    _bound *= 1.25
+PERCENTILES = (50, 90, 95, 99)
+
+_LOG_NAME = re.compile(r"^llm-audit-(\d{4}-\d{2}-\d{2})(?:\.(\d+))?\.jsonl(\.gz)?$")
+
+
+def _new_counts() -> Dict[str, Any]:
+    return {"requests": 0, "responses": 0, "errors": 0, "total_tokens": 0, "latency_sum_ms": 0.0, "latency_count": 0}
+
+
+class DailyRollup:
+    """Mergeable per-day counters: totals, per-provider counts and a latency histogram."""
+
+    def __init__(self, date_str: str):
+        self.date = date_str
+        self.totals = _new_counts()
+        self.providers: Dict[str, Dict[str, Any]] = {}
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, entry: Dict[str, Any], provider: Optional[str]) -> None:
+        provider = provider or "unknown"
+        per_provider = self.providers.setdefault(provider, _new_counts())
+        if entry.get("event") == "request":
+            for counts in (self.totals, per_provider):
+                counts["requests"] += 1
+            return
+
+        latency = entry.get("latency_ms")
+        for counts in (self.totals, per_provider):
+            counts["responses"] += 1
+            if entry.get("error"):
+                counts["errors"] += 1
+            if entry.get("tokens_used"):
+                counts["total_tokens"] += entry["tokens_used"]
+            if latency:
+                counts["latency_sum_ms"] += latency
+                counts["latency_count"] += 1
+        if latency:
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)] += 1
+
+    def merge(self, other: "DailyRollup") -> None:
+        for key, value in other.totals.items():
+            self.totals[key] += value
+        for provider, counts in other.providers.items():
+            mine = self.providers.setdefault(provider, _new_counts())
+            for key, value in counts.items():
+                mine[key] += value
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+
+    def percentile(self, pct: float) -> Optional[float]:
+        total = sum(self.histogram)
+        if not total:
+            return None
+        target = total * pct / 100
+        running = 0
+        for i, count in enumerate(self.histogram):
+            running += count
+            if running >= target:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else LATENCY_BUCKETS_MS[-1]
+        return LATENCY_BUCKETS_MS[-1]
+
+    def to_stats(self) -> Dict[str, Any]:
+        t = self.totals
+        return {
+            "date": self.date,
+            "requests": t["requests"],
+            "responses": t["responses"],
+            "errors": t["errors"],
+            "error_rate": round(t["errors"] / t["responses"], 4) if t["responses"] else 0.0,
+            "total_tokens": t["total_tokens"],
+            "avg_latency_ms": t["latency_sum_ms"] / t["latency_count"] if t["latency_count"] else 0,
+            "latency_ms": {f"p{p}": self.percentile(p) for p in PERCENTILES},
+            "providers": {name: c["requests"] for name, c in self.providers.items() if c["requests"]},
+            "provider_stats": {
+                name: {
+                    "requests": c["requests"],
+                    "responses": c["responses"],
+                    "errors": c["errors"],
+                    "error_rate": round(c["errors"] / c["responses"], 4) if c["responses"] else 0.0,
+                    "avg_latency_ms": c["latency_sum_ms"] / c["latency_count"] if c["latency_count"] else 0,
+                }
+                for name, c in self.providers.items()
+            },
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"date": self.date, "totals": self.totals, "providers": self.providers, "histogram": self.histogram}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DailyRollup":
+        rollup = cls(data["date"])
+        rollup.totals.update(data.get("totals", {}))
+        for provider, counts in data.get("providers", {}).items():
+            rollup.providers[provider] = {**_new_counts(), **counts}
+        histogram = data.get("histogram") or []
+        if len(histogram) == len(rollup.histogram):
+            rollup.histogram = histogram
+        return rollup
+
+
+class AuditLogWriter:
+    """Queue-fed batching writer and rollup keeper for one log directory."""
+
+    def __init__(
+        self,
+        log_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        fsync_interval: float = 1.0,
+        max_file_bytes: int = 50 * 1024 * 1024,
+        retention_days: Optional[int] = None,
+        queue_size: int = 10_000,
+    ):
+        self.log_dir = log_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_file_bytes = max_file_bytes
+        self.retention_days = retention_days
+        self.pid = os.getpid()
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._rollups: Dict[str, DailyRollup] = {}
+        self._dirty_dates: set = set()
+        # request_id -> provider, so response entries are attributed to a provider
+        self._providers: "OrderedDict[str, str]" = OrderedDict()
+        self._dropped = 0
+
+        self._file = None
+        self._file_date: Optional[str] = None
+        self._file_path: Optional[str] = None
+        self._last_fsync = 0.0
+        self._last_housekeeping_date: Optional[str] = None
+        self._lock_path = os.path.join(log_dir, "llm-audit.lock")
+        self._lock_file = None
+
+        os.makedirs(log_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="llm-audit-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side (request threads)
+    # ------------------------------------------------------------------
+
+    def enqueue(self, entry: Dict[str, Any]) -> None:
+        date_str = entry["timestamp"][:10]
+        with self._lock:
+            request_id = entry.get("request_id")
+            if entry.get("event") == "request":
+                provider = entry.get("provider")
+                self._providers[request_id] = provider
+                if len(self._providers) > 10_000:
+                    self._providers.popitem(last=False)
+            else:
+                provider = self._providers.pop(request_id, None)
+            self._rollup(date_str).add(entry, provider)
+            self._dirty_dates.add(date_str)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def daily_stats(self, date_str: str) -> Optional[Dict[str, Any]]:
+        """Merged rollup of this process (live) and other processes (snapshots)."""
+        merged = DailyRollup(date_str)
+        found = False
+        with self._lock:
+            own = self._rollups.get(date_str)
+            if own is not None:
+                merged.merge(own)
+                found = True
+        for path in glob.glob(os.path.join(self.log_dir, f"llm-audit-{date_str}.rollup.*.json")):
+            if path.endswith(f".rollup.{self.pid}.json") and own is not None:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    merged.merge(DailyRollup.from_dict(json.load(f)))
+                found = True
+            except (OSError, ValueError, KeyError):
+                continue
+        return merged.to_stats() if found else None
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything enqueued so far is written (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"queued": self._queue.qsize(), "dropped": self._dropped, "file": self._file_path}
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                if batch:
+                    self._write_batch(batch)
+                self._persist_rollups()
+                self._housekeeping()
+            except Exception as e:
+                # Don't let a disk problem kill the writer
+                print(f"[LLM Audit] Writer error: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        by_date: Dict[str, List[str]] = {}
+        for entry in batch:
+            by_date.setdefault(entry["timestamp"][:10], []).append(json.dumps(entry, ensure_ascii=False) + "\n")
+        with self._dir_lock(exclusive=False):
+            for date_str, lines in sorted(by_date.items()):
+                f = self._open_for(date_str)
+                f.write("".join(lines))
+                f.flush()
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+            full = self._file.tell() >= self.max_file_bytes
+        if full:
+            self._rotate()
+
+    @contextmanager
+    def _dir_lock(self, exclusive: bool):
+        """Cross-process lock on the log directory (see module docstring)."""
+        if fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            self._lock_file = open(self._lock_path, "a")
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _file_is_current(self) -> bool:
+        """The open file is still the one at its path (not rotated or compressed away)."""
+        try:
+            return os.stat(self._file_path).st_ino == os.fstat(self._file.fileno()).st_ino
+        except OSError:
+            return False
+
+    def _open_for(self, date_str: str):
+        if self._file is not None and self._file_date == date_str and self._file_is_current():
+            return self._file
+        if self._file_date and self._file_date < date_str:
+            # Day changed: compress the file we just left
+            self._last_housekeeping_date = None
+        self._close_file()
+        self._file_date = date_str
+        self._file_path = os.path.join(self.log_dir, f"llm-audit-{date_str}.jsonl")
+        self._file = open(self._file_path, "a", encoding="utf-8")
+        return self._file
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def _rotate(self) -> None:
+        """Move the full daily file aside as ``<date>.<n>.jsonl`` and start a new one."""
+        path, date_str = self._file_path, self._file_date
+        with self._dir_lock(exclusive=True):
+            # Another process may have rotated it while we waited for the lock
+            current = self._file_is_current()
+            self._close_file()
+            self._file_date = None
+            if not current:
+                return
+            n = 1
+            while glob.glob(os.path.join(self.log_dir, f"llm-audit-{date_str}.{n}.jsonl*")):
+                n += 1
+            try:
+                os.replace(path, os.path.join(self.log_dir, f"llm-audit-{date_str}.{n}.jsonl"))
+            except OSError:
+                pass
+
+    def _persist_rollups(self) -> None:
+        with self._lock:
+            snapshots = {d: self._rollups[d].to_dict() for d in self._dirty_dates if d in self._rollups}
+            self._dirty_dates.clear()
+        for date_str, data in snapshots.items():
+            path = os.path.join(self.log_dir, f"llm-audit-{date_str}.rollup.{self.pid}.json")
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+
+    def _housekeeping(self) -> None:
+        """Once per day: gzip earlier days' logs (and drop expired files if retention is set)."""
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        if self._last_housekeeping_date == today:
+            return
+        self._last_housekeeping_date = today
+        self.compress_and_expire(today)
+        with self._lock:
+            for date_str in [d for d in self._rollups if d < today]:
+                del self._rollups[date_str]
+
+    def compress_and_expire(self, today: str) -> None:
+        cutoff = ""  # audit logs are only deleted when a retention is configured
+        if self.retention_days:
+            cutoff = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        # Exclusive: no process is appending to a file while it is gzipped and removed
+        with self._dir_lock(exclusive=True):
+            for name in os.listdir(self.log_dir):
+                path = os.path.join(self.log_dir, name)
+                match = _LOG_NAME.match(name)
+                if match:
+                    date_str, _, gz = match.groups()
+                    if date_str < cutoff:
+                        _remove(path)
+                    elif date_str < today and not gz and path != self._file_path:
+                        _gzip(path)
+                elif name.startswith("llm-audit-") and ".rollup." in name and name[10:20] < cutoff:
+                    _remove(path)
+
+    def _rollup(self, date_str: str) -> DailyRollup:
+        rollup = self._rollups.get(date_str)
+        if rollup is None:
+            rollup = DailyRollup(date_str)
+            # Same pid after a restart: continue from its snapshot
+            path = os.path.join(self.log_dir, f"llm-audit-{date_str}.rollup.{self.pid}.json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    rollup = DailyRollup.from_dict(json.load(f))
+            except (OSError, ValueError, KeyError):
+                pass
+            self._rollups[date_str] = rollup
+        return rollup
+
+
+def _gzip(path: str) -> None:
+    try:
+        with open(path, "rb") as src, gzip.open(f"{path}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+    except OSError as e:
+        print(f"[LLM Audit] Failed to compress {path}: {e}")
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_writers: Dict[tuple, AuditLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_audit_writer(log_dir: str) -> AuditLogWriter:
+    """One writer (and thread) per log directory per process."""
+    key = (os.getpid(), os.path.abspath(log_dir))
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = AuditLogWriter(
+                    log_dir,
+                    batch_size=int(os.getenv("LLM_AUDIT_BATCH_SIZE", "200")),
+                    fsync_interval=float(os.getenv("LLM_AUDIT_FSYNC_SECONDS", "1")),
+                    max_file_bytes=int(os.getenv("LLM_AUDIT_MAX_FILE_BYTES", str(50 * 1024 * 1024))),
+                    retention_days=int(os.getenv("LLM_AUDIT_RETENTION_DAYS") or 0) or None,
+                )
+                _writers[key] = writer
+    return writer
+
+
+@atexit.register
+def _flush_all() -> None:
+    for (pid, _), writer in list(_writers.items()):
+        if pid == os.getpid():
+            writer.flush(timeout=2.0)
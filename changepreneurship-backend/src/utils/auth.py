@@ -1,5 +1,33 @@
-from flask import request, current_app
-from src.models.assessment import UserSession, User
+from flask import request, current_app, g
+from werkzeug.exceptions import NotFound
+from src.models.assessment import db, User
+from src.utils.session_resolver import session_resolver
+
+
+class SessionUser:
+    """The authenticated user of a request.
+
+    ``id`` comes from the resolved session; any other attribute loads the
+    ``User`` row on first use, so routes that only scope queries by ``user.id``
+    never touch the user table.
+    """
+
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self._row = None
+
+    def load(self) -> User:
+        if self._row is None:
+            self._row = db.session.get(User, self.id)
+            if self._row is None:
+                raise NotFound('User not found')
+        return self._row
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+    def __repr__(self):
+        return f'<SessionUser {self.id}>'
 
 
 def verify_session_token():
@@ -16,18 +44,15 @@ def verify_session_token():
         if not session_token:
             return None, None, {'error': 'No session token provided'}, 401
 
-        session = UserSession.query.filter_by(
-            session_token=session_token,
-            is_active=True
-        ).first()
-
+        session = session_resolver.resolve(session_token)
         if not session or session.is_expired():
             return None, None, {'error': 'Invalid or expired session'}, 401
 
-        user = User.query.get(session.user_id)
-        if not user:
-            return None, None, {'error': 'User not found'}, 404
+        # Deleting a user invalidates their sessions, so the row is only loaded when a route reads it
+        user = SessionUser(session.user_id)
 
+        # Tags LLM calls made while serving this request (llm_metrics)
+        g.current_user_id = user.id
         return user, session, None, None
     except Exception as e:
         current_app.logger.error(f"Session verification error: {str(e)}")
@@ -0,0 +1,91 @@
+"""
+Conditional GET for per-user read endpoints.
+
+``@state_etag`` derives a weak ETag from the caller's assessment state
+version (``UserAssessmentStats.state_version``, moved on by every write hook
+in AssessmentStatsService) plus the endpoint, query string and UTC date (the
+analytics views count "the last N days"), and answers a
+matching ``If-None-Match`` with 304 before the view runs: no snapshot load,
+no rebuild, no serialization. Only the session check and a primary-key read
+of the stats row happen first.
+
+    @assessment_bp.route('/sync-all', methods=['GET'])
+    @state_etag
+    def sync_all_assessments(): ...
+
+The tag is taken before the view runs, so a write racing the request can
+only make the tag older than the body - the next poll then misses and gets
+the new state. Only plain 200 responses are tagged: errors and
+budget-degraded answers (Retry-After) are never revalidated into a 304. A
+user without a stats row yet gets no tag until the row exists.
+
+Used by:
+  - routes/assessment.py  (/phases, /sync-all)
+  - routes/analytics.py   (/dashboard/*)
+  - routes/dashboard.py   (/executive-summary)
+"""
+import hashlib
+import logging
+from datetime import datetime
+from functools import wraps
+from typing import Optional
+
+from flask import current_app, make_response, request
+
+from src.models.assessment import db, UserAssessmentStats
+from src.utils.auth import verify_session_token
+from src.utils.llm_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every client's tags when response shapes change
+ETAG_GENERATION = 1
+
+
+def utc_day() -> str:
+    """Today's UTC date; time-relative views roll over at midnight without a write."""
+    return datetime.utcnow().date().isoformat()
+
+
+def state_etag_for(user_id: int) -> Optional[str]:
+    """Weak ETag value for the current request and *user_id*'s state, or None."""
+    stats = db.session.get(UserAssessmentStats, user_id)
+    if stats is None:
+        return None
+    # The query string matters: /progress-history?days=7 and ?days=30 are different bodies
+    source = (
+        f"{ETAG_GENERATION}:{request.endpoint}:{user_id}:{stats.state_version or 0}:"
+        f"{request.query_string.decode()}:{utc_day()}"
+    )
+    return hashlib.sha1(source.encode()).hexdigest()[:20]
+
+
+def state_etag(view):
+    """Tag *view*'s 200 responses with the user's state ETag and answer If-None-Match with 304."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        tag = None
+        try:
+            user, _, error, _ = verify_session_token()
+            if not error:
+                tag = state_etag_for(user.id)
+        except Exception as e:
+            logger.warning(f"[ConditionalGET] Could not compute ETag: {e}")
+
+        if tag is not None and request.if_none_match.contains_weak(tag):
+            metrics.inc("http_conditional_get_total", {"endpoint": request.endpoint, "result": "not_modified"})
+            response = current_app.response_class(status=304)
+            response.set_etag(tag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if tag is not None and response.status_code == 200 and 'Retry-After' not in response.headers:
+            metrics.inc("http_conditional_get_total", {"endpoint": request.endpoint, "result": "full"})
+            response.set_etag(tag, weak=True)
+            # Browsers revalidate on every poll instead of reusing the body blindly
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
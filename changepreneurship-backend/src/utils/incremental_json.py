@@ -0,0 +1,106 @@
+"""
+Incremental JSON parser for streamed LLM output.
+
+Feed text chunks as they arrive; every object / array whose path is at most
+``max_depth`` levels deep is decoded and returned the moment its closing
+bracket is seen, so callers can act on ``report["entrepreneur"]`` long before
+the rest of the document exists.
+
+    parser = IncrementalJSONParser(max_depth=2)
+    for chunk in stream:
+        for path, value in parser.feed(chunk):
+            ...   # e.g. (("venture", "heatmap"), {...}) then (("venture",), {...})
+
+The scanner is linear in the input (each character is looked at once) and
+only tracks string / escape state and a stack of open containers.
+"""
+import json
+from typing import Any, List, Optional, Tuple, Union
+
+PathKey = Union[str, int]
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "path", "expect_key", "key", "index")
+
+    def __init__(self, kind: str, start: int, path: Tuple[PathKey, ...]):
+        self.kind = kind              # '{' or '['
+        self.start = start
+        self.path = path
+        self.expect_key = kind == "{"
+        self.key: Optional[str] = None
+        self.index = 0
+
+
+class IncrementalJSONParser:
+    def __init__(self, max_depth: int = 1):
+        self.max_depth = max_depth
+        self.buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[Tuple[PathKey, ...], Any]]:
+        """Consume *chunk*; return (path, value) for every container completed by it."""
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        i = self._pos
+        end = len(buf)
+
+        while i < end:
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    top = self._stack[-1] if self._stack else None
+                    if top is not None and top.kind == "{" and top.expect_key:
+                        top.key = json.loads(buf[self._string_start:i + 1])
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if self._stack:
+                    parent = self._stack[-1]
+                    path = parent.path + ((parent.key if parent.kind == "{" else parent.index),)
+                else:
+                    path = ()
+                self._stack.append(_Frame(ch, i, path))
+            elif ch in "}]":
+                if not self._stack:
+                    raise ValueError(f"Unbalanced '{ch}' at offset {i}")
+                frame = self._stack.pop()
+                if 0 < len(frame.path) <= self.max_depth:
+                    completed.append((frame.path, json.loads(buf[frame.start:i + 1])))
+                if not self._stack:
+                    self.done = True
+            elif ch == ":":
+                if self._stack and self._stack[-1].kind == "{":
+                    self._stack[-1].expect_key = False
+            elif ch == ",":
+                if self._stack:
+                    top = self._stack[-1]
+                    if top.kind == "{":
+                        top.expect_key = True
+                        top.key = None
+                    else:
+                        top.index += 1
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def result(self) -> Any:
+        """Decode the complete document (raises ValueError if it is not finished / valid)."""
+        return json.loads(self.buffer)
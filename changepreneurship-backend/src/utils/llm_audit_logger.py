@@ -1,22 +1,30 @@
 """
 LLM Audit Logger - tracks all LLM API calls for debugging and cost monitoring.
 Stores prompts, responses, tokens, latency, and errors.
+
+Entries are written by a background batching writer (audit_log_writer), which
+also maintains the daily rollups returned by get_daily_stats.
 """
 import os
+import gzip
+import glob
 import json
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+from src.utils.audit_log_writer import get_audit_writer
+
 
 class LLMAuditLogger:
     """Logs all LLM interactions to file for audit and debugging."""
     
     def __init__(self, log_dir: Optional[str] = None):
-        self.log_dir = log_dir or os.path.join(
+        self.log_dir = log_dir or os.getenv("LLM_AUDIT_LOG_DIR") or os.path.join(
             os.path.dirname(__file__), '..', '..', 'logs', 'llm'
         )
         os.makedirs(self.log_dir, exist_ok=True)
         self.enabled = os.getenv("LLM_AUDIT_LOGGING", "true").lower() == "true"
+        self.writer = get_audit_writer(self.log_dir) if self.enabled else None
     
     def log_request(
         self,
@@ -54,7 +62,10 @@ class LLMAuditLogger:
         response_text: Optional[str] = None,
         tokens_used: Optional[int] = None,
         latency_ms: Optional[float] = None,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        ttft_ms: Optional[float] = None,
+        cost_usd: Optional[float] = None
     ):
         """Log an LLM response matching the request_id."""
         if not self.enabled:
@@ -71,28 +82,38 @@ class LLMAuditLogger:
             "error": error,
             "success": error is None
         }
+        if usage is not None:
+            log_entry["usage"] = usage
+        if ttft_ms is not None:
+            log_entry["ttft_ms"] = ttft_ms
+        if cost_usd is not None:
+            log_entry["cost_usd"] = cost_usd
         self._write_log(log_entry)
     
     def _write_log(self, entry: Dict[str, Any]):
-        """Write log entry to daily log file."""
+        """Queue log entry for the background writer (daily log file + rollup)."""
         try:
-            date_str = datetime.utcnow().strftime("%Y-%m-%d")
-            log_file = os.path.join(self.log_dir, f"llm-audit-{date_str}.jsonl")
-            
-            with open(log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.writer.enqueue(entry)
         except Exception as e:
             # Don't fail requests due to logging issues
-            print(f"[LLM Audit] Failed to write log: {e}")
-    
+            print(f"[LLM Audit] Failed to queue log: {e}")
+
     def get_daily_stats(self, date_str: Optional[str] = None) -> Dict[str, Any]:
-        """Get aggregated stats for a specific day."""
+        """Get aggregated stats for a specific day (from the incremental rollups)."""
         date_str = date_str or datetime.utcnow().strftime("%Y-%m-%d")
-        log_file = os.path.join(self.log_dir, f"llm-audit-{date_str}.jsonl")
-        
-        if not os.path.exists(log_file):
+
+        if self.writer is not None:
+            stats = self.writer.daily_stats(date_str)
+            if stats is not None:
+                return stats
+
+        log_files = sorted(glob.glob(os.path.join(self.log_dir, f"llm-audit-{date_str}*.jsonl*")))
+        if not log_files:
             return {"date": date_str, "requests": 0, "errors": 0}
-        
+        return self._scan_daily_stats(date_str, log_files)
+
+    def _scan_daily_stats(self, date_str: str, log_files: list) -> Dict[str, Any]:
+        """Full read of a day's files; only for days logged before rollups existed."""
         stats = {
             "date": date_str,
             "requests": 0,
@@ -106,23 +127,25 @@ class LLMAuditLogger:
         latencies = []
         
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    entry = json.loads(line)
-                    
-                    if entry.get("event") == "request":
-                        stats["requests"] += 1
-                        provider = entry.get("provider", "unknown")
-                        stats["providers"][provider] = stats["providers"].get(provider, 0) + 1
-                    
-                    elif entry.get("event") == "response":
-                        stats["responses"] += 1
-                        if entry.get("error"):
-                            stats["errors"] += 1
-                        if entry.get("tokens_used"):
-                            stats["total_tokens"] += entry["tokens_used"]
-                        if entry.get("latency_ms"):
-                            latencies.append(entry["latency_ms"])
+            for log_file in log_files:
+                opener = gzip.open if log_file.endswith(".gz") else open
+                with opener(log_file, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        entry = json.loads(line)
+
+                        if entry.get("event") == "request":
+                            stats["requests"] += 1
+                            provider = entry.get("provider", "unknown")
+                            stats["providers"][provider] = stats["providers"].get(provider, 0) + 1
+
+                        elif entry.get("event") == "response":
+                            stats["responses"] += 1
+                            if entry.get("error"):
+                                stats["errors"] += 1
+                            if entry.get("tokens_used"):
+                                stats["total_tokens"] += entry["tokens_used"]
+                            if entry.get("latency_ms"):
+                                latencies.append(entry["latency_ms"])
             
             if latencies:
                 stats["avg_latency_ms"] = sum(latencies) / len(latencies)
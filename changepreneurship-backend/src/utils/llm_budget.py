@@ -0,0 +1,213 @@
+"""
+Per-user LLM token budget for the LLM-heavy endpoints.
+
+Requests to /api/ai/*, /api/ai/recommendations/* and the LLM-backed
+executive summary are charged against a sliding window of tokens per
+authenticated user (LLM_USER_TOKEN_BUDGET per LLM_USER_BUDGET_WINDOW_SECONDS),
+not counted per IP like the flask-limiter defaults:
+
+  1. ``reserve(user_id, purpose)`` charges the purpose's estimated token weight
+     (ESTIMATED_TOKENS - an insights report weighs far more than a phase
+     summary) if it still fits in the window.
+  2. ``settle(charge, tokens)`` replaces the estimate with what the request
+     really spent - zero for a cache hit. ``spend()`` wraps both and measures
+     the spend through ``llm_metrics.spend_tracker``.
+
+With REDIS_URL the window is a ZSET ``llm:budget:<user_id>`` (one member per
+request, ``<id>:<tokens>``) updated in Lua, so every worker sees the same
+budget; without Redis it is kept per process.
+
+A refused charge is not an error: callers serve a rule-based answer
+(AIRecommendationsEngine, cached report) marked with ``degraded_fields()``.
+
+Used by:
+  - routes/ai_routes.py, routes/ai_recommendations.py, routes/dashboard.py
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from flask import jsonify
+
+from src.utils.llm_metrics import metrics, spend_tracker
+from src.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Prompt budget (utils/prompt_packer.py) plus a typical completion, per request
+ESTIMATED_TOKENS = {
+    "insights_report": 9000,
+    "phase_summary": 2500,
+    "ai_consensus": 6000,  # up to three providers
+    "executive_summary": 3500,  # narrative + optional consensus
+}
+
+# KEYS[1] window; ARGV window seconds, budget, cost, member id.
+# Returns {allowed, used tokens, retry-after seconds}
+_CHARGE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window, budget, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local entries = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local used = 0
+for i = 1, #entries, 2 do
+  used = used + tonumber(string.match(entries[i], ':(%d+)$'))
+end
+if used + cost > budget then
+  -- Retry once enough of the oldest spend has slid out of the window
+  local freed, retry = 0, window
+  for i = 1, #entries, 2 do
+    freed = freed + tonumber(string.match(entries[i], ':(%d+)$'))
+    if used - freed + cost <= budget then
+      retry = tonumber(entries[i + 1]) + window - now
+      break
+    end
+  end
+  return {0, used, tostring(retry)}
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. cost)
+redis.call('EXPIRE', KEYS[1], math.ceil(window))
+return {1, used + cost, '0'}
+"""
+
+# KEYS[1] window; ARGV old member, new member ('' to drop the entry)
+_SETTLE_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if score then
+  redis.call('ZREM', KEYS[1], ARGV[1])
+  if ARGV[2] ~= '' then redis.call('ZADD', KEYS[1], score, ARGV[2]) end
+end
+return 1
+"""
+
+
+@dataclass
+class Charge:
+    user_id: int
+    purpose: str
+    allowed: bool
+    tokens: int = 0
+    member: Optional[str] = None
+    retry_after: int = 0
+    remaining: Optional[int] = None
+    # The LLM work was handed to a job: keep the estimate instead of settling
+    keep_estimate: bool = False
+
+
+def degraded_fields(charge: Charge) -> dict:
+    """Response fields marking a rule-based answer served for an exhausted budget."""
+    return {'degraded': True, 'degraded_reason': 'llm_budget', 'retry_after': charge.retry_after}
+
+
+def degraded_response(payload: dict, charge: Charge):
+    """200 with the rule-based *payload*, flagged degraded, plus Retry-After."""
+    response = jsonify({**payload, **degraded_fields(charge)})
+    response.headers['Retry-After'] = str(charge.retry_after)
+    return response, 200
+
+
+class UserLLMBudget:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local: Dict[int, List[list]] = {}  # user -> [[ts, member, tokens], ...]
+        self._charge_script = self._settle_script = None
+
+    def reset(self) -> None:
+        """Drop per-process windows (tests)."""
+        with self._lock:
+            self._local.clear()
+
+    @staticmethod
+    def limits():
+        """(budget tokens, window seconds); a budget of 0 disables the limiter."""
+        return (int(os.getenv("LLM_USER_TOKEN_BUDGET", "60000")),
+                float(os.getenv("LLM_USER_BUDGET_WINDOW_SECONDS", "3600")))
+
+    def reserve(self, user_id: int, purpose: str) -> Charge:
+        budget, window = self.limits()
+        if budget <= 0 or os.getenv("LLM_USER_BUDGET_ENABLED", "true").lower() != "true":
+            return Charge(user_id, purpose, allowed=True)
+        cost = min(budget, ESTIMATED_TOKENS.get(purpose, 2000))
+        member = uuid.uuid4().hex
+        allowed, used, retry = self._charge(user_id, window, budget, cost, member)
+        metrics.inc("llm_user_budget_total", {"purpose": purpose, "result": "charged" if allowed else "degraded"})
+        if not allowed:
+            logger.info(f"[LLMBudget] User {user_id} over budget for {purpose} ({used}/{budget} tokens)")
+            return Charge(user_id, purpose, allowed=False, retry_after=max(1, int(retry + 0.999)),
+                          remaining=max(0, budget - used))
+        return Charge(user_id, purpose, allowed=True, tokens=cost, member=member, remaining=budget - used)
+
+    def settle(self, charge: Charge, tokens: int) -> None:
+        """Replace the estimate with the tokens actually spent (0 drops the entry)."""
+        if charge.member is None or int(tokens) == charge.tokens:
+            return
+        old = f"{charge.member}:{charge.tokens}"
+        new = f"{charge.member}:{int(tokens)}" if tokens > 0 else ""
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._settle_script is None:
+                    self._settle_script = client.register_script(_SETTLE_SCRIPT)
+                self._settle_script(keys=[f"llm:budget:{charge.user_id}"], args=[old, new])
+                return
+            except Exception as e:
+                logger.warning(f"[LLMBudget] Redis settle failed: {e}")
+        with self._lock:
+            entries = self._local.get(charge.user_id, [])
+            for entry in entries:
+                if entry[1] == charge.member:
+                    entry[2] = int(tokens)
+            self._local[charge.user_id] = [e for e in entries if e[2] > 0]
+
+    @contextmanager
+    def spend(self, user_id: int, purpose: str):
+        """Reserve, run the block, then settle with the tokens its LLM calls used."""
+        charge = self.reserve(user_id, purpose)
+        if not charge.allowed:
+            yield charge
+            return
+        with spend_tracker() as spent:
+            try:
+                yield charge
+            finally:
+                if not charge.keep_estimate:
+                    self.settle(charge, spent.tokens)
+
+    def _charge(self, user_id: int, window: float, budget: int, cost: int, member: str):
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._charge_script is None:
+                    self._charge_script = client.register_script(_CHARGE_SCRIPT)
+                allowed, used, retry = self._charge_script(
+                    keys=[f"llm:budget:{user_id}"], args=[window, budget, cost, member]
+                )
+                return bool(int(allowed)), int(used), float(retry)
+            except Exception as e:
+                logger.warning(f"[LLMBudget] Redis unavailable, using per-process window: {e}")
+
+        now = time.time()
+        with self._lock:
+            entries = [e for e in self._local.get(user_id, []) if e[0] > now - window]
+            used = sum(e[2] for e in entries)
+            if used + cost > budget:
+                self._local[user_id] = entries
+                freed, retry = 0, window
+                for ts, _, tokens in entries:
+                    freed += tokens
+                    if used - freed + cost <= budget:
+                        retry = ts + window - now
+                        break
+                return False, used, retry
+            entries.append([now, member, cost])
+            self._local[user_id] = entries
+            return True, used + cost, 0.0
+
+
+llm_budget = UserLLMBudget()
@@ -1,62 +1,202 @@
 """
 LLM Response Cache - reduces API costs by caching responses keyed by prompt hash.
-Uses Redis if available, falls back to in-memory dict.
+
+Two tiers:
+  L1  process-wide in-memory LRU shared by every LLMCache / LLMClient in the
+      worker, bounded by entry count (LLM_CACHE_L1_MAX_ENTRIES) and bytes
+      (LLM_CACHE_L1_MAX_BYTES), each entry expiring with LLM_CACHE_TTL_SECONDS
+  L2  Redis (if available), shared across workers and restarts
+
+invalidate() / clear_all() publish the key (``*`` for everything) on
+``llm:cache:invalidate``; every worker's L1 subscribes to it, so no worker
+keeps serving an entry another one evicted.
 """
 import os
 import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 
 
+class BoundedTTLCache:
+    """Thread-safe LRU with per-entry TTL, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024, default_ttl: float = 86400):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def _sizeof(value: Dict[str, Any]) -> int:
+        return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key, size)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self._sizeof(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._counters["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._remove(key, entry[2])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+            )
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+
+# Shared by every LLMCache in this process
+l1_cache = BoundedTTLCache(
+    max_entries=int(os.getenv("LLM_CACHE_L1_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("LLM_CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024))),
+    default_ttl=int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+)
+
+INVALIDATION_CHANNEL = "llm:cache:invalidate"
+CLEAR_ALL = "*"
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_invalidation_listener(client) -> None:
+    """Subscribe this process's L1 to invalidations once per process (gunicorn forks after preload)."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _listener_lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+    # Entries inherited from the master process were never subscribed
+    l1_cache.clear()
+    threading.Thread(target=_listen, args=(client,), name="llm-cache-invalidation", daemon=True).start()
+
+
+def _listen(client) -> None:
+    try:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(INVALIDATION_CHANNEL)
+        for message in pubsub.listen():
+            key = message.get("data")
+            if isinstance(key, bytes):
+                key = key.decode()
+            if key == CLEAR_ALL:
+                l1_cache.clear()
+            elif key:
+                l1_cache.delete(key)
+    except Exception as e:
+        # Entries other workers drop now live out their L1 TTL; the next fork / restart resubscribes
+        print(f"[LLM Cache] Invalidation listener stopped: {e}")
+
+
 class LLMCache:
     """Cache LLM responses to reduce API calls and costs."""
-    
+
     def __init__(self):
         self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
         self.ttl_seconds = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))  # 24h default
         self.redis_client = None
-        self.memory_cache: Dict[str, Any] = {}
-        
-        # Try Redis first
+        self.memory_cache = l1_cache
+
+        # Redis behind the in-process tier
         if self.enabled:
             try:
                 from src.utils.redis_client import get_redis_client
                 self.redis_client = get_redis_client()
-                print("[LLM Cache] Using Redis backend")
+                if self.redis_client:
+                    _ensure_invalidation_listener(self.redis_client)
             except Exception as e:
-                print(f"[LLM Cache] Redis unavailable, using in-memory cache: {e}")
-    
+                print(f"[LLM Cache] Redis unavailable, using in-memory cache only: {e}")
+
     def _generate_key(self, provider: str, model: str, prompt: str, system: Optional[str]) -> str:
         """Generate cache key from request parameters."""
         content = f"{provider}:{model}:{system or ''}:{prompt}"
         hash_obj = hashlib.sha256(content.encode('utf-8'))
         return f"llm:cache:{hash_obj.hexdigest()[:16]}"
-    
+
     def get(self, provider: str, model: str, prompt: str, system: Optional[str] = None) -> Optional[str]:
         """Retrieve cached response if available."""
         if not self.enabled:
             return None
-        
+
         key = self._generate_key(provider, model, prompt, system)
-        
+
+        cached = self.memory_cache.get(key)
+        if cached:
+            return cached.get("response")
+
         try:
             if self.redis_client:
-                cached = self.redis_client.get(key)
-                if cached:
-                    data = json.loads(cached)
-                    print(f"[LLM Cache] HIT for key {key[:24]}...")
+                pipe = self.redis_client.pipeline()
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = pipe.execute()
+                if raw:
+                    data = json.loads(raw)
+                    # Promote to L1 for no longer than Redis will keep it
+                    ttl = pttl / 1000 if pttl and pttl > 0 else self.ttl_seconds
+                    self.memory_cache.set(key, data, ttl=min(ttl, self.ttl_seconds))
+                    print(f"[LLM Cache] HIT (Redis) for key {key[:24]}...")
                     return data.get("response")
-            else:
-                cached = self.memory_cache.get(key)
-                if cached:
-                    print(f"[LLM Cache] HIT (memory) for key {key[:24]}...")
-                    return cached.get("response")
         except Exception as e:
             print(f"[LLM Cache] Error retrieving: {e}")
-        
+
         print(f"[LLM Cache] MISS for key {key[:24]}...")
         return None
-    
+
     def set(
         self,
         provider: str,
@@ -69,9 +209,9 @@ class LLMCache:
         """Store response in cache."""
         if not self.enabled or not response:
             return
-        
+
         key = self._generate_key(provider, model, prompt, system)
-        
+
         try:
             data = {
                 "response": response,
@@ -79,7 +219,8 @@ class LLMCache:
                 "model": model,
                 "metadata": metadata or {}
             }
-            
+
+            self.memory_cache.set(key, data, ttl=self.ttl_seconds)
             if self.redis_client:
                 self.redis_client.setex(
                     key,
@@ -87,34 +228,32 @@ class LLMCache:
                     json.dumps(data, ensure_ascii=False)
                 )
                 print(f"[LLM Cache] SET (Redis) key {key[:24]}... TTL={self.ttl_seconds}s")
-            else:
-                self.memory_cache[key] = data
-                print(f"[LLM Cache] SET (memory) key {key[:24]}...")
         except Exception as e:
             print(f"[LLM Cache] Error storing: {e}")
-    
+
     def invalidate(self, provider: str, model: str, prompt: str, system: Optional[str] = None):
         """Remove a specific cached response."""
         if not self.enabled:
             return
-        
+
         key = self._generate_key(provider, model, prompt, system)
-        
+
         try:
+            self.memory_cache.delete(key)
             if self.redis_client:
                 self.redis_client.delete(key)
-            else:
-                self.memory_cache.pop(key, None)
+                self.redis_client.publish(INVALIDATION_CHANNEL, key)
             print(f"[LLM Cache] Invalidated key {key[:24]}...")
         except Exception as e:
             print(f"[LLM Cache] Error invalidating: {e}")
-    
+
     def clear_all(self):
         """Clear all cached LLM responses."""
         if not self.enabled:
             return
-        
+
         try:
+            self.memory_cache.clear()
             if self.redis_client:
                 # Delete all keys matching llm:cache:*
                 pattern = "llm:cache:*"
@@ -125,9 +264,14 @@ class LLMCache:
                         self.redis_client.delete(*keys)
                     if cursor == 0:
                         break
+                self.redis_client.publish(INVALIDATION_CHANNEL, CLEAR_ALL)
                 print("[LLM Cache] Cleared all Redis cache entries")
-            else:
-                self.memory_cache.clear()
-                print("[LLM Cache] Cleared all memory cache entries")
+            print("[LLM Cache] Cleared all memory cache entries")
         except Exception as e:
             print(f"[LLM Cache] Error clearing cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """L1 hit / miss / eviction counters for this process."""
+        stats = self.memory_cache.stats()
+        stats["backend"] = "memory+redis" if self.redis_client else "memory"
+        return stats
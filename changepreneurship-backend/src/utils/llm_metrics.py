@@ -0,0 +1,423 @@
+"""
+LLM call instrumentation: tokens, latency, time to first token, cache and cost.
+
+Every provider call - LLMClient, InsightsReportService, PhaseSummaryService -
+goes through ``track_llm_call``, which writes the audit-log request/response
+pair and records metrics tagged with the Flask endpoint (or background job)
+and the user:
+
+    with track_llm_call("groq", model, prompt, system) as call:
+        completion = client.chat.completions.create(...)
+        call.set_usage(completion.usage)
+        call.set_response(completion.choices[0].message.content)
+
+For streams call ``call.first_token()`` when the first chunk arrives. Pass
+``max_tokens`` so the outbound rate limiter (utils/llm_rate_limiter.py), which
+every call acquires from first, can reserve the right token count.
+
+Metrics live in a per-process ``MetricsRegistry`` and are served by
+GET /api/metrics (Prometheus text, or JSON with ?format=json).
+
+Costs are estimates from PRICING_PER_MILLION (USD per 1M prompt / completion
+tokens), extendable with LLM_PRICING_JSON='{"model": [in, out]}'.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+PRICING_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+}
+try:
+    PRICING_PER_MILLION.update({k: tuple(v) for k, v in json.loads(os.getenv("LLM_PRICING_JSON", "{}")).items()})
+except (ValueError, TypeError):
+    pass
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000, 120000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("llm_metrics_context", default=None)
+_spend: ContextVar[Optional["Spend"]] = ContextVar("llm_metrics_spend", default=None)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (~4 characters per token) when a provider reports no usage."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    price = PRICING_PER_MILLION.get(model)
+    if price is None:
+        return None
+    return round((prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000, 8)
+
+
+def usage_from(obj: Any) -> Optional[Dict[str, int]]:
+    """Normalise provider usage (OpenAI/Groq ``usage``, Anthropic, Ollama dict, Groq stream ``x_groq``)."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        if "prompt_eval_count" in obj or "eval_count" in obj:
+            prompt, completion = obj.get("prompt_eval_count") or 0, obj.get("eval_count") or 0
+        else:
+            prompt = obj.get("prompt_tokens", obj.get("input_tokens")) or 0
+            completion = obj.get("completion_tokens", obj.get("output_tokens")) or 0
+    else:
+        usage = getattr(obj, "usage", None) or getattr(getattr(obj, "x_groq", None), "usage", None) or obj
+        prompt = getattr(usage, "prompt_tokens", None)
+        if prompt is None:
+            prompt = getattr(usage, "input_tokens", None)
+        completion = getattr(usage, "completion_tokens", None)
+        if completion is None:
+            completion = getattr(usage, "output_tokens", None)
+        if prompt is None and completion is None:
+            return None
+        prompt, completion = prompt or 0, completion or 0
+    return {"prompt_tokens": int(prompt), "completion_tokens": int(completion), "total_tokens": int(prompt + completion)}
+
+
+@contextmanager
+def metrics_context(endpoint: Optional[str] = None, user_id: Optional[int] = None):
+    """Tag LLM calls made outside a request (background jobs) with an endpoint and user."""
+    token = _context.set({"endpoint": endpoint, "user_id": user_id})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class Spend:
+    """Tokens used by the LLM calls inside a ``spend_tracker`` block (any thread)."""
+
+    def __init__(self):
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens += tokens
+
+
+@contextmanager
+def spend_tracker():
+    """Count the tokens of every provider call made in this block.
+
+    Worker threads started with ``contextvars.copy_context()`` add to the same total.
+    """
+    spend = Spend()
+    token = _spend.set(spend)
+    try:
+        yield spend
+    finally:
+        _spend.reset(token)
+
+
+def current_tags() -> Tuple[str, Optional[int]]:
+    ctx = _context.get()
+    if ctx is not None:
+        return ctx.get("endpoint") or "unknown", ctx.get("user_id")
+    try:
+        from flask import g, has_request_context, request
+        if has_request_context():
+            return request.endpoint or request.path, g.get("current_user_id")
+    except Exception:
+        pass
+    return "unknown", None
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.count:
+            return None
+        target, running = self.count * pct / 100, 0
+        for i, n in enumerate(self.counts):
+            running += n
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Thread-safe labelled counters and histograms for one process."""
+
+    HELP = {
+        "llm_requests_total": ("counter", "LLM calls by outcome and cache status"),
+        "llm_tokens_total": ("counter", "Prompt / completion tokens"),
+        "llm_cost_usd_total": ("counter", "Estimated spend in USD"),
+        "llm_cache_lookups_total": ("counter", "Response / report cache lookups"),
+        "llm_route_events_total": ("counter", "Hedges, failovers and circuit-breaker skips"),
+        "llm_rate_limited_total": ("counter", "Calls delayed or refused by the outbound rate limiter"),
+        "llm_rate_wait_ms": ("histogram", "Time spent waiting for outbound rate-limit capacity"),
+        "llm_user_budget_total": ("counter", "Per-user LLM budget charges and degraded requests"),
+        "http_conditional_get_total": ("counter", "ETag-tagged GETs answered in full or with 304"),
+        "llm_latency_ms": ("histogram", "Total call latency"),
+        "llm_ttft_ms": ("histogram", "Time to first token (streaming calls)"),
+        "llm_prompt_tokens": ("histogram", "Prompt size per call"),
+    }
+
+    def __init__(self, max_users: int = 1000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters: Dict[Tuple[str, Tuple], float] = {}
+            self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+            self._users: "OrderedDict[int, Dict[str, float]]" = OrderedDict()
+
+    def inc(self, name: str, labels: Dict[str, Any], value: float = 1.0) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Dict[str, Any], value: float, buckets) -> None:
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def record_call(self, record: Dict[str, Any]) -> None:
+        labels = {"provider": record["provider"], "model": record["model"], "endpoint": record["endpoint"]}
+        self.inc("llm_requests_total", {**labels, "status": record["status"], "cache": "hit" if record["cache_hit"] else "miss"})
+        if record["cache_hit"]:
+            self.inc("llm_cache_lookups_total", {"cache": "llm", "result": "hit"})
+        else:
+            self.inc("llm_cache_lookups_total", {"cache": "llm", "result": "miss"})
+            self.inc("llm_tokens_total", {**labels, "kind": "prompt"}, record["prompt_tokens"])
+            self.inc("llm_tokens_total", {**labels, "kind": "completion"}, record["completion_tokens"])
+            self.observe("llm_latency_ms", labels, record["latency_ms"], LATENCY_BUCKETS_MS)
+            self.observe("llm_prompt_tokens", labels, record["prompt_tokens"], TOKEN_BUCKETS)
+            if record.get("ttft_ms") is not None:
+                self.observe("llm_ttft_ms", labels, record["ttft_ms"], LATENCY_BUCKETS_MS)
+            if record.get("cost_usd"):
+                self.inc("llm_cost_usd_total", labels, record["cost_usd"])
+
+        user_id = record.get("user_id")
+        if user_id is not None:
+            with self._lock:
+                totals = self._users.pop(user_id, None) or {"calls": 0, "cache_hits": 0, "tokens": 0, "cost_usd": 0.0}
+                totals["calls"] += 1
+                totals["cache_hits"] += 1 if record["cache_hit"] else 0
+                totals["tokens"] += record["prompt_tokens"] + record["completion_tokens"]
+                totals["cost_usd"] += record.get("cost_usd") or 0.0
+                self._users[user_id] = totals
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+
+    def snapshot(self, include_users: bool = False, top_users: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.percentile(50),
+                    "p95": h.percentile(95),
+                    "p99": h.percentile(99),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+            users = sorted(self._users.items(), key=lambda item: item[1]["cost_usd"], reverse=True)[:top_users]
+        data = {"counters": counters, "histograms": histograms}
+        if include_users:
+            data["top_users"] = [{"user_id": uid, **totals} for uid, totals in users]
+        return data
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+        lines, seen = [], set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = self.HELP.get(name, ("counter", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines.append(f"{name}{fmt(labels)} {value:g}")
+        for (name, labels), h in histograms:
+            if name not in seen:
+                seen.add(name)
+                kind, help_text = self.HELP.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            running = 0
+            for bound, count in zip(list(h.buckets) + ["+Inf"], h.counts):
+                running += count
+                lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {running}")
+            lines.append(f"{name}_sum{fmt(labels)} {h.sum:g}")
+            lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+
+def record_cache_lookup(cache: str, result: str) -> None:
+    """Count a hit / stale / miss on a cache in front of LLM calls (e.g. the insights report)."""
+    metrics.inc("llm_cache_lookups_total", {"cache": cache, "result": result})
+
+
+class LLMCall:
+    """Mutable record for one provider call, filled in inside ``track_llm_call``."""
+
+    def __init__(self, provider: str, model: str, prompt: str, system: Optional[str]):
+        self.provider = provider
+        self.model = model
+        self.prompt = prompt
+        self.system = system
+        self.started = time.monotonic()
+        self.ttft_ms: Optional[int] = None
+        self.usage: Optional[Dict[str, int]] = None
+        self.response_text = ""
+
+    def first_token(self) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = int((time.monotonic() - self.started) * 1000)
+
+    def set_usage(self, usage: Any) -> None:
+        self.usage = usage_from(usage) or self.usage
+
+    def set_response(self, text: Optional[str]) -> None:
+        self.response_text = text or ""
+
+
+def _audit_logger():
+    from src.utils.llm_audit_logger import LLMAuditLogger
+    return LLMAuditLogger()
+
+
+@contextmanager
+def track_llm_call(
+    provider: str,
+    model: str,
+    prompt: str,
+    system: Optional[str] = None,
+    options: Optional[Dict[str, Any]] = None,
+    audit_logger=None,
+    max_tokens: Optional[int] = None,
+):
+    """Audit-log and measure one provider call; see module docstring."""
+    from src.utils.llm_rate_limiter import rate_limiter
+
+    endpoint, user_id = current_tags()
+    # Waiting for capacity is not part of the call's latency
+    completion_cap = int(max_tokens or (options or {}).get("max_tokens") or os.getenv("LLM_MAX_TOKENS", "1200"))
+    # A typical completion, not the cap: settle() charges any excess once usage is known
+    reserved = estimate_tokens((system or "") + prompt) + min(
+        completion_cap, int(os.getenv("LLM_RATE_COMPLETION_ESTIMATE", "512"))
+    )
+    grant = rate_limiter.acquire(provider, model, reserved)
+    audit_logger = audit_logger or _audit_logger()
+    request_id = audit_logger.log_request(
+        provider=provider,
+        model=model,
+        prompt=prompt,
+        system_message=system,
+        user_id=user_id,
+        options={**(options or {}), "endpoint": endpoint},
+    )
+    call = LLMCall(provider, model, prompt, system)
+    error = None
+    try:
+        yield call
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        latency_ms = int((time.monotonic() - call.started) * 1000)
+        usage = call.usage
+        estimated = usage is None
+        if estimated:
+            prompt_tokens = estimate_tokens((system or "") + prompt)
+            completion_tokens = estimate_tokens(call.response_text)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        rate_limiter.settle(grant, usage["total_tokens"])
+        spend = _spend.get()
+        if spend is not None:
+            spend.add(usage["total_tokens"])
+        cost = estimate_cost(model, usage["prompt_tokens"], usage["completion_tokens"])
+        audit_logger.log_response(
+            request_id=request_id,
+            response_text=call.response_text,
+            tokens_used=usage["total_tokens"],
+            latency_ms=latency_ms,
+            error=error,
+            usage={**usage, "estimated": estimated},
+            ttft_ms=call.ttft_ms,
+            cost_usd=cost,
+        )
+        metrics.record_call({
+            "provider": provider,
+            "model": model,
+            "endpoint": endpoint,
+            "user_id": user_id,
+            "status": "error" if error else "ok",
+            "cache_hit": False,
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "latency_ms": latency_ms,
+            "ttft_ms": call.ttft_ms,
+            "cost_usd": cost,
+        })
+
+
+def record_cached_call(provider: str, model: str) -> None:
+    """A call answered from the LLM response cache (no tokens, no cost)."""
+    endpoint, user_id = current_tags()
+    metrics.record_call({
+        "provider": provider,
+        "model": model,
+        "endpoint": endpoint,
+        "user_id": user_id,
+        "status": "ok",
+        "cache_hit": True,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": 0,
+        "cost_usd": 0.0,
+    })
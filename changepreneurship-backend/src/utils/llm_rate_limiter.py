@@ -0,0 +1,288 @@
+"""
+Cluster-wide token-bucket limiter for outbound LLM calls.
+
+Every provider call acquires from a bucket per provider (or provider:model)
+before it is sent - ``track_llm_call`` does this, so no call site can skip
+it. A bucket limits both requests and tokens per minute; with REDIS_URL set
+the bucket lives in ``llm:rate:<provider>:<model>`` and is shared by every
+gunicorn worker (refill and take happen atomically in one Lua script on
+Redis time), otherwise it is per process.
+
+A call reserves its prompt tokens plus a typical completion
+(LLM_RATE_COMPLETION_ESTIMATE, capped at ``max_tokens``) rather than the
+whole ``max_tokens``, which would let a 12k TPM bucket admit only a couple of
+large calls at a time; ``settle()`` charges or returns the difference once
+the real usage is known.
+
+Priority and deadlines:
+  - ``interactive`` (request threads, default) may drain the bucket;
+    ``background`` work (job handlers) leaves LLM_RATE_BACKGROUND_RESERVE of
+    it for interactive calls, cluster-wide.
+  - Within a process waiters queue per bucket by priority, then arrival.
+  - A call that cannot get capacity before its deadline
+    (LLM_RATE_WAIT_<PRIORITY>_SECONDS) raises RateLimitTimeout straight away
+    instead of sleeping into a provider timeout. A batch of calls can share
+    one longer deadline instead (``llm_wait_deadline``).
+
+    with llm_priority(BACKGROUND):
+        ...  # every LLM call in here queues behind interactive ones
+
+    with llm_wait_deadline(120):
+        ...  # fan-out: every call may wait until 120s from now
+
+Limits: LLM_RATE_LIMITS='{"groq": {"rpm": 30, "tpm": 12000}, "openai:gpt-4o": {...}}',
+keyed by "<provider>:<model>" or "<provider>"; unlisted providers are not
+limited, and nothing is limited until limits are configured. Waits are exported as ``llm_rate_wait_ms`` / ``llm_rate_limited_total``.
+"""
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from src.utils.llm_metrics import LATENCY_BUCKETS_MS, metrics
+from src.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+_RANK = {INTERACTIVE: 0, BACKGROUND: 1}
+
+# Opt-in: limits depend on the account tier, so none are assumed
+DEFAULT_LIMITS: Dict[str, dict] = {}
+
+_priority: ContextVar[Optional[str]] = ContextVar("llm_rate_priority", default=None)
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_rate_deadline", default=None)
+
+# KEYS[1] bucket; ARGV rpm, tpm, tokens, reserve fraction. Returns seconds to wait ("0" = taken).
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost, reserve = tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(state[1]) or rpm
+local tok = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+local wait = 0
+if rpm > 0 then
+  req = math.min(rpm, req + elapsed * rpm / 60)
+  local need = math.min(rpm, 1 + reserve * rpm)
+  if req < need then wait = math.max(wait, (need - req) * 60 / rpm) end
+end
+if tpm > 0 then
+  tok = math.min(tpm, tok + elapsed * tpm / 60)
+  local need = math.min(tpm, cost + reserve * tpm)
+  if tok < need then wait = math.max(wait, (need - tok) * 60 / tpm) end
+end
+if wait == 0 then
+  req = req - 1
+  tok = tok - cost
+end
+redis.call('HSET', KEYS[1], 'req', req, 'tok', tok, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return tostring(wait)
+"""
+
+# KEYS[1] bucket; ARGV tokens to give back (negative: charge more), tpm
+_SETTLE_SCRIPT = """
+local tok = tonumber(redis.call('HGET', KEYS[1], 'tok'))
+if tok then
+  redis.call('HSET', KEYS[1], 'tok', math.min(tonumber(ARGV[2]), tok + tonumber(ARGV[1])))
+end
+return 1
+"""
+
+
+class RateLimitTimeout(RuntimeError):
+    """No capacity for an LLM call within its deadline."""
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the LLM calls in this block at *priority* (INTERACTIVE or BACKGROUND)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get() or INTERACTIVE
+
+
+@contextmanager
+def llm_wait_deadline(seconds: float):
+    """Let every LLM call in this block wait for capacity until *seconds* from now."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@dataclass
+class Grant:
+    key: str
+    tokens: int
+    tpm: int
+
+
+class _LocalBucket:
+    def __init__(self, rpm: int, tpm: int):
+        self.req, self.tok = float(rpm), float(tpm)
+        self.ts = time.monotonic()
+
+    def take(self, rpm: int, tpm: int, cost: int, reserve: float) -> float:
+        now = time.monotonic()
+        elapsed, self.ts = now - self.ts, now
+        wait = 0.0
+        if rpm > 0:
+            self.req = min(rpm, self.req + elapsed * rpm / 60)
+            need = min(rpm, 1 + reserve * rpm)
+            if self.req < need:
+                wait = max(wait, (need - self.req) * 60 / rpm)
+        if tpm > 0:
+            self.tok = min(tpm, self.tok + elapsed * tpm / 60)
+            need = min(tpm, cost + reserve * tpm)
+            if self.tok < need:
+                wait = max(wait, (need - self.tok) * 60 / tpm)
+        if wait == 0:
+            self.req -= 1
+            self.tok -= cost
+        return wait
+
+
+class LLMRateLimiter:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiters: Dict[str, list] = {}
+        self._seq = itertools.count()
+        self._local: Dict[str, _LocalBucket] = {}
+        self._take = self._settle = None
+
+    def reset(self) -> None:
+        """Drop per-process buckets (tests)."""
+        with self._cond:
+            self._local.clear()
+
+    @staticmethod
+    def limits(provider: str, model: str) -> Optional[Tuple[str, int, int]]:
+        """(bucket key, rpm, tpm) for a provider/model, or None when unlimited."""
+        if os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() != "true":
+            return None
+        configured = dict(DEFAULT_LIMITS)
+        try:
+            configured.update(json.loads(os.getenv("LLM_RATE_LIMITS", "{}")))
+        except (ValueError, TypeError):
+            logger.warning("[LLMRateLimiter] LLM_RATE_LIMITS is not valid JSON; using defaults")
+        for key in (f"{provider}:{model}", provider):
+            limit = configured.get(key)
+            if limit:
+                rpm, tpm = int(limit.get("rpm") or 0), int(limit.get("tpm") or 0)
+                if rpm > 0 or tpm > 0:
+                    return key, rpm, tpm
+        return None
+
+    def acquire(self, provider: str, model: str, tokens: int, priority: Optional[str] = None) -> Optional[Grant]:
+        """Block until the call may go out; None when the provider is not limited."""
+        limit = self.limits(provider, model)
+        if limit is None:
+            return None
+        key, rpm, tpm = limit
+        priority = priority or current_priority()
+        tokens = min(int(tokens), tpm) if tpm > 0 else int(tokens)
+        reserve = float(os.getenv("LLM_RATE_BACKGROUND_RESERVE", "0.2")) if priority == BACKGROUND else 0.0
+        started = time.monotonic()
+        deadline = _deadline.get()
+        if deadline is None:
+            deadline = started + float(os.getenv(f"LLM_RATE_WAIT_{priority.upper()}_SECONDS",
+                                                 "120" if priority == BACKGROUND else "20"))
+        ticket = (_RANK.get(priority, 0), next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiters.setdefault(key, []), ticket)
+        try:
+            while True:
+                with self._cond:
+                    # Only the head of this bucket's queue polls the bucket
+                    while self._waiters[key][0] != ticket:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._throttled(key, provider, model, priority, started)
+                        self._cond.wait(remaining)
+                wait = self._take_tokens(key, rpm, tpm, tokens, reserve)
+                if wait <= 0:
+                    break
+                if time.monotonic() + wait > deadline:
+                    self._throttled(key, provider, model, priority, started)
+                # Re-check at least every second: settles elsewhere may free capacity
+                time.sleep(min(wait, 1.0))
+        finally:
+            with self._cond:
+                queue = self._waiters[key]
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                self._cond.notify_all()
+
+        waited_ms = int((time.monotonic() - started) * 1000)
+        labels = {"provider": provider, "model": model, "priority": priority}
+        metrics.observe("llm_rate_wait_ms", labels, waited_ms, LATENCY_BUCKETS_MS)
+        if waited_ms >= 1:
+            metrics.inc("llm_rate_limited_total", {**labels, "result": "waited"})
+        return Grant(key, tokens, tpm)
+
+    def settle(self, grant: Optional[Grant], used_tokens: int) -> None:
+        """Correct the reservation with the call's real token usage."""
+        if grant is None or grant.tpm <= 0:
+            return
+        delta = grant.tokens - int(used_tokens)
+        if delta == 0:
+            return
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._settle is None:
+                    self._settle = client.register_script(_SETTLE_SCRIPT)
+                self._settle(keys=[f"llm:rate:{grant.key}"], args=[delta, grant.tpm])
+                return
+            except Exception as e:
+                logger.warning(f"[LLMRateLimiter] Redis settle failed: {e}")
+        with self._cond:
+            bucket = self._local.get(grant.key)
+            if bucket is not None:
+                bucket.tok = min(grant.tpm, bucket.tok + delta)
+
+    def _take_tokens(self, key: str, rpm: int, tpm: int, tokens: int, reserve: float) -> float:
+        client = get_redis_client()
+        if client is not None:
+            try:
+                if self._take is None:
+                    self._take = client.register_script(_TAKE_SCRIPT)
+                return float(self._take(keys=[f"llm:rate:{key}"], args=[rpm, tpm, tokens, reserve]))
+            except Exception as e:
+                # Limit per process rather than not at all
+                logger.warning(f"[LLMRateLimiter] Redis unavailable, using local bucket: {e}")
+        with self._cond:
+            bucket = self._local.get(key)
+            if bucket is None:
+                bucket = self._local[key] = _LocalBucket(rpm, tpm)
+            return bucket.take(rpm, tpm, tokens, reserve)
+
+    @staticmethod
+    def _throttled(key: str, provider: str, model: str, priority: str, started: float):
+        labels = {"provider": provider, "model": model, "priority": priority}
+        metrics.inc("llm_rate_limited_total", {**labels, "result": "timeout"})
+        metrics.observe("llm_rate_wait_ms", labels, int((time.monotonic() - started) * 1000), LATENCY_BUCKETS_MS)
+        raise RateLimitTimeout(f"LLM rate limit for {key}: no capacity for a {priority} call in time")
+
+
+rate_limiter = LLMRateLimiter()
@@ -0,0 +1,289 @@
+"""
+Prompt Packer
+-------------
+Fits assessment responses into a token budget instead of fixed
+"first N answers, M characters each" caps.
+
+  1. Responses are normalised (dicts from collect_assessment_data or
+     AssessmentResponse rows) and rendered as ``[section] Q: ... → A: ...``.
+  2. Repeated question text within a group is deduplicated: the most recent
+     answer wins, identical answers collapse into one line.
+  3. Each line is scored by information value: answer length (log-scaled so
+     one essay does not outrank everything), section weight and recency.
+  4. Lines are taken best-first until the budget is spent. Every group gets
+     its best ``min_per_group`` answers first so no phase is silenced; a line
+     that does not fit is truncated when enough budget is left for it to be
+     useful. Chosen lines keep their original order in the output.
+
+Token counts are the local ~4 characters/token estimate from llm_metrics —
+no tokenizer round trip. Budgets come from ``token_budget(purpose, model)``:
+a per-purpose default, overridable through PROMPT_TOKEN_BUDGETS (JSON keyed
+by ``"<purpose>"`` or ``"<purpose>:<model>"``) and never above what the
+model accepts.
+
+Used by:
+  - insights_report_service.py  (insights report prompt)
+  - phase_summary_service.py    (phase completion summary prompt)
+  - ai_consensus.py             (multi-LLM business summary)
+"""
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from .llm_metrics import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGETS = {
+    "insights_report": 6000,
+    "insights_shard": 2500,
+    "phase_summary": 1500,
+    "ai_consensus": 1200,
+}
+
+# Prompt tokens each model accepts once room for the completion is left
+MODEL_INPUT_LIMITS = {
+    "llama-3.3-70b-versatile": 120000,
+    "llama-3.1-70b-versatile": 120000,
+    "llama-3.1-8b-instant": 120000,
+    "llama3-8b-8192": 7000,
+    "llama3-70b-8192": 7000,
+    "mixtral-8x7b-32768": 30000,
+    "gpt-4o": 120000,
+    "gpt-4o-mini": 120000,
+}
+
+DEFAULT_SECTION_WEIGHTS = {
+    "problem_definition": 1.3,
+    "unique_value": 1.3,
+    "target_market": 1.2,
+    "validation_evidence": 1.2,
+    "customer_research": 1.2,
+    "financial_planning": 1.2,
+    "entrepreneurial_motivation": 1.1,
+    "general": 0.7,
+}
+
+MAX_QUESTION_CHARS = 120
+
+
+def _load_json_env(name: str) -> Dict[str, Any]:
+    raw = os.getenv(name)
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        logger.warning(f"[PromptPacker] Ignoring invalid {name}")
+        return {}
+
+
+def token_budget(purpose: str, model: Optional[str] = None) -> int:
+    """Prompt token budget for *purpose* on *model*."""
+    overrides = _load_json_env("PROMPT_TOKEN_BUDGETS")
+    budget = overrides.get(f"{purpose}:{model}") or overrides.get(purpose) or DEFAULT_BUDGETS.get(purpose, 2000)
+    limit = MODEL_INPUT_LIMITS.get(model or "")
+    return int(min(budget, limit) if limit else budget)
+
+
+def section_weights() -> Dict[str, float]:
+    weights = dict(DEFAULT_SECTION_WEIGHTS)
+    weights.update(_load_json_env("PROMPT_SECTION_WEIGHTS"))
+    return weights
+
+
+@dataclass
+class PackedItem:
+    group: str
+    position: int
+    section: str
+    question: str
+    answer: str
+    recency: Any
+    score: float = 0.0
+    duplicates: int = 0
+
+    def render(self, answer: Optional[str] = None) -> str:
+        return f"[{self.section}] Q: {self.question} → A: {self.answer if answer is None else answer}"
+
+
+@dataclass
+class PackResult:
+    budget: int
+    tokens_used: int = 0
+    lines: Dict[str, List[str]] = field(default_factory=dict)
+    totals: Dict[str, int] = field(default_factory=dict)
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+    def shown(self, group: str) -> int:
+        return len(self.lines.get(group, []))
+
+    def stats(self) -> dict:
+        return {
+            "budget": self.budget,
+            "tokens_used": self.tokens_used,
+            "shown": sum(len(v) for v in self.lines.values()),
+            "total": sum(self.totals.values()),
+            "duplicates": self.duplicates,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+def _field(resp: Any, name: str, default: Any = None) -> Any:
+    if isinstance(resp, dict):
+        return resp.get(name, default)
+    return getattr(resp, name, default)
+
+
+def _answer_text(resp: Any) -> Optional[str]:
+    if isinstance(resp, dict):
+        value = resp.get("response_value")
+    else:
+        try:
+            value = resp.get_response_value()
+        except Exception:
+            value = getattr(resp, "response_value", None)
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = str(value)
+    text = " ".join(text.split())
+    return text or None
+
+
+def _normalise_question(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+class PromptPacker:
+    """Choose which responses go into a prompt, within *budget* tokens."""
+
+    def __init__(
+        self,
+        budget: int,
+        weights: Optional[Dict[str, float]] = None,
+        min_per_group: int = 2,
+        max_answer_tokens: int = 200,
+        min_truncated_tokens: int = 24,
+    ):
+        self.budget = budget
+        self.weights = section_weights() if weights is None else weights
+        self.min_per_group = min_per_group
+        self.max_answer_tokens = max_answer_tokens
+        self.min_truncated_tokens = min_truncated_tokens
+
+    def pack(self, groups: Dict[str, Iterable[Any]], reserved: str = "", prefix: str = "") -> PackResult:
+        """
+        Pack *groups* (group key -> responses) into what is left of the budget
+        after *reserved* text (headers, instructions) is accounted for.
+        Every returned line starts with *prefix* (indent, bullet).
+        """
+        result = PackResult(budget=self.budget)
+        remaining = self.budget - estimate_tokens(reserved)
+        per_group: Dict[str, List[PackedItem]] = {}
+        for group, responses in groups.items():
+            responses = list(responses)
+            result.totals[group] = len(responses)
+            items, duplicates = self._dedupe(group, responses)
+            result.duplicates += duplicates
+            self._score(items)
+            per_group[group] = sorted(items, key=lambda i: -i.score)
+
+        # Each group's best answers first, then everything else best-first
+        floor = [i for items in per_group.values() for i in items[:self.min_per_group]]
+        rest = sorted(
+            (i for items in per_group.values() for i in items[self.min_per_group:]),
+            key=lambda i: -i.score,
+        )
+        chosen: Dict[str, List[tuple]] = {group: [] for group in groups}
+        for item in floor + rest:
+            line = prefix + item.render()
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                line = self._truncate(item, remaining, prefix)
+                if line is None:
+                    result.dropped += 1
+                    continue
+                cost = estimate_tokens(line) + 1
+                result.truncated += 1
+            remaining -= cost
+            chosen[item.group].append((item.position, line))
+
+        for group, picked in chosen.items():
+            result.lines[group] = [line for _, line in sorted(picked)]
+        result.tokens_used = self.budget - remaining
+        return result
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _dedupe(self, group: str, responses: List[Any]) -> tuple:
+        items: Dict[str, PackedItem] = {}
+        duplicates = 0
+        for position, resp in enumerate(responses):
+            answer = _answer_text(resp)
+            if answer is None:
+                continue
+            question = str(_field(resp, "question_text") or _field(resp, "question_id") or "?")
+            question = " ".join(question.split())[:MAX_QUESTION_CHARS]
+            item = PackedItem(
+                group=group,
+                position=position,
+                section=_field(resp, "section_id") or "",
+                question=question,
+                answer=self._cap_answer(answer),
+                recency=_field(resp, "updated_at") or position,
+            )
+            key = _normalise_question(question) or f"#{position}"
+            previous = items.get(key)
+            if previous is None:
+                items[key] = item
+                continue
+            duplicates += 1
+            keep, other = (item, previous) if self._newer(item, previous) else (previous, item)
+            keep.duplicates = previous.duplicates + 1
+            # Keep the earlier slot so the prompt order stays stable
+            keep.position = min(keep.position, other.position)
+            items[key] = keep
+        return list(items.values()), duplicates
+
+    @staticmethod
+    def _newer(a: PackedItem, b: PackedItem) -> bool:
+        try:
+            return a.recency >= b.recency
+        except TypeError:
+            return a.position >= b.position
+
+    def _score(self, items: List[PackedItem]) -> None:
+        if not items:
+            return
+        try:
+            order = sorted(items, key=lambda i: i.recency)
+        except TypeError:
+            order = sorted(items, key=lambda i: i.position)
+        span = max(len(order) - 1, 1)
+        for rank, item in enumerate(order):
+            recency = 0.75 + 0.25 * rank / span  # oldest 0.75 .. newest 1.0
+            length = math.log1p(estimate_tokens(item.answer))
+            item.score = length * self.weights.get(item.section, 1.0) * recency
+
+    def _cap_answer(self, answer: str) -> str:
+        max_chars = self.max_answer_tokens * 4
+        return answer if len(answer) <= max_chars else answer[:max_chars].rstrip() + "…"
+
+    def _truncate(self, item: PackedItem, remaining: int, prefix: str) -> Optional[str]:
+        overhead = estimate_tokens(prefix + item.render(answer="")) + 2
+        answer_tokens = remaining - overhead
+        if answer_tokens < self.min_truncated_tokens:
+            return None
+        return prefix + item.render(answer=item.answer[:answer_tokens * 4].rstrip() + "…")
@@ -32,12 +32,19 @@ def get_redis_client():
             _redis_client = None
     return _redis_client
 
-def cache_session(token: str, user_id: int, ttl_seconds: int = 60 * 60 * 24 * 30):
+def cache_session(token: str, user_id: int, ttl_seconds: int = 60 * 60 * 24 * 30,
+                  session_id: int = None, expires_at=None):
+    """Cache ``session:<token>`` as JSON (user_id, session_id, expires_at)."""
     client = get_redis()
     if not client:
         return False
     try:
-        client.set(f"session:{token}", user_id, ex=ttl_seconds)
+        payload = json.dumps({
+            "user_id": user_id,
+            "session_id": session_id,
+            "expires_at": expires_at.isoformat() if expires_at else None,
+        })
+        client.set(f"session:{token}", payload, ex=ttl_seconds)
         return True
     except Exception as e:
         logger.warning(f"[Redis] cache_session failed: {e}")
@@ -51,7 +58,9 @@ def get_session_user(token: str):
         val = client.get(f"session:{token}")
         if val is None:
             return None
-        return int(val)
+        data = json.loads(val)
+        # Older entries hold the bare user id
+        return int(data["user_id"] if isinstance(data, dict) else data)
     except Exception as e:
         logger.warning(f"[Redis] get_session_user failed: {e}")
         return None
@@ -0,0 +1,163 @@
+"""
+Assessment Response Upsert
+--------------------------
+Saves one or many answers for an assessment in a single
+``INSERT ... ON CONFLICT (assessment_id, question_id) DO UPDATE ... RETURNING``
+statement on Postgres and SQLite, replacing the SELECT-then-INSERT/UPDATE
+loop (plus a follow-up COUNT) the routes used to run per question.
+
+Rows whose response_type changes are deliberately left out of the upsert
+(``DO UPDATE ... WHERE`` the type is unchanged) and updated through the ORM,
+so callers still learn the previous type for the stats histogram.  Other
+dialects fall back to one SELECT for the whole batch.
+
+Inserted and updated rows are told apart by ``RETURNING (xmax = 0)`` on
+Postgres (only a freshly inserted tuple has no deleting transaction), which
+holds however many writers share a timestamp.  SQLite has no xmax; there the
+returned created_at is compared with the statement's own timestamp, which is
+sound because SQLite runs one write transaction at a time.
+
+``known_count`` must be read under a lock (save_assessment_responses takes
+it from the user's stats row, read ``FOR UPDATE``), or two concurrent saves
+would both report the same count.
+
+Used by:
+  - routes/assessment.py  (save_response, submit_phase_assessment)
+  - complete_user_generator.py
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+
+from ..models.assessment import db, AssessmentResponse
+
+_UPSERT_DIALECTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+@dataclass
+class UpsertResult:
+    inserted: List[Tuple[str, str]] = field(default_factory=list)         # (question_id, response_type)
+    updated: List[Tuple[str, str, str]] = field(default_factory=list)     # (question_id, previous_type, response_type)
+    response_count: Optional[int] = None                                  # responses now stored for the assessment
+
+    @property
+    def saved(self) -> int:
+        return len(self.inserted) + len(self.updated)
+
+
+def _normalise(items: Iterable[Dict[str, Any]], assessment_id: int, now: datetime) -> Dict[str, dict]:
+    """Encode values and collapse duplicate question_ids (last one wins)."""
+    rows: Dict[str, dict] = {}
+    for item in items:
+        question_id = str(item['question_id'])
+        rows[question_id] = {
+            'assessment_id': assessment_id,
+            'section_id': item.get('section_id') or 'general',
+            'question_id': question_id,
+            'question_text': item.get('question_text') or question_id,
+            'response_type': item.get('response_type') or 'text',
+            'response_value': AssessmentResponse.encode_response_value(item.get('response_value')),
+            'created_at': now,
+            'updated_at': now,
+        }
+    return rows
+
+
+def _update_rows(session, rows: Dict[str, dict], result: UpsertResult, now: datetime) -> None:
+    """ORM path: one SELECT for the batch, then update or insert each row."""
+    if not rows:
+        return
+    assessment_id = next(iter(rows.values()))['assessment_id']
+    existing = {
+        r.question_id: r
+        for r in session.query(AssessmentResponse).filter(
+            AssessmentResponse.assessment_id == assessment_id,
+            AssessmentResponse.question_id.in_(list(rows)),
+        )
+    }
+    for question_id, row in rows.items():
+        response = existing.get(question_id)
+        if response is None:
+            session.add(AssessmentResponse(**row))
+            result.inserted.append((question_id, row['response_type']))
+            continue
+        previous_type = response.response_type
+        response.response_value = row['response_value']
+        response.response_type = row['response_type']
+        response.question_text = row['question_text']
+        response.updated_at = now
+        result.updated.append((question_id, previous_type, row['response_type']))
+    session.flush()
+
+
+def _inserted_flag(dialect_name: str, table):
+    """RETURNING column telling an inserted row from an updated one (see module docstring)."""
+    if dialect_name == 'postgresql':
+        return literal_column('(xmax = 0)').label('inserted')
+    # created_at equals this statement's timestamp only on rows it inserted
+    return table.c.created_at
+
+
+def upsert_responses(
+    assessment_id: int,
+    items: Iterable[Dict[str, Any]],
+    session=None,
+    known_count: Optional[int] = None,
+) -> UpsertResult:
+    """
+    Insert or update answers for *assessment_id*.
+
+    Args:
+        items: dicts with question_id, section_id, question_text,
+               response_type and a raw (un-encoded) response_value.
+        known_count: responses stored before this call, if the caller
+               already knows it; avoids a COUNT(*) round trip.
+    """
+    session = session or db.session
+    now = datetime.utcnow()
+    rows = _normalise(items, assessment_id, now)
+    result = UpsertResult()
+    if not rows:
+        result.response_count = known_count
+        return result
+
+    dialect_name = session.get_bind().dialect.name
+    insert = _UPSERT_DIALECTS.get(dialect_name)
+    if insert is None:
+        _update_rows(session, rows, result, now)
+    else:
+        table = AssessmentResponse.__table__
+        stmt = insert(table).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.assessment_id, table.c.question_id],
+            set_={
+                'response_value': stmt.excluded.response_value,
+                'question_text': stmt.excluded.question_text,
+                'updated_at': stmt.excluded.updated_at,
+            },
+            where=table.c.response_type == stmt.excluded.response_type,
+        ).returning(table.c.question_id, _inserted_flag(dialect_name, table))
+
+        for question_id, flag in session.execute(stmt):
+            row = rows.pop(question_id)
+            if (flag if dialect_name == 'postgresql' else flag == now):
+                result.inserted.append((question_id, row['response_type']))
+            else:
+                result.updated.append((question_id, row['response_type'], row['response_type']))
+
+        # Whatever was not returned hit the conflict with a different response_type
+        _update_rows(session, rows, result, now)
+
+    if known_count is not None:
+        result.response_count = known_count + len(result.inserted)
+    else:
+        result.response_count = session.query(func.count(AssessmentResponse.id)).filter(
+            AssessmentResponse.assessment_id == assessment_id
+        ).scalar()
+    return result
@@ -0,0 +1,253 @@
+"""
+Tiered session resolver used by ``verify_session_token``.
+
+Lookup order for a bearer token:
+  1. per-worker TTL-bounded LRU (no I/O)
+  2. Redis ``session:<token>`` (populated by AuthService.create_session)
+  3. ``user_session`` table (index-only on Postgres, see ix_user_session_token_active)
+
+Logout publishes the token on ``session:invalidate`` so every gunicorn worker
+drops its local entry; without Redis the short local TTL bounds staleness.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from time import monotonic
+from typing import Optional
+
+from src.models.assessment import db, UserSession
+from src.utils.redis_client import cache_session, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'session:invalidate'
+
+
+@dataclass(frozen=True)
+class ResolvedSession:
+    session_token: str
+    user_id: int
+    session_id: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    source: str = 'db'
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and datetime.utcnow() > self.expires_at
+
+    def to_dict(self):
+        return {
+            'id': self.session_id,
+            'user_id': self.user_id,
+            'session_token': self.session_token,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'is_active': True,
+            'is_expired': self.is_expired(),
+            'source': self.source,
+        }
+
+
+def decode_session(token: str, raw) -> Optional[ResolvedSession]:
+    """Parse a ``session:<token>`` value (JSON, or a bare user id from older writers)."""
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    if isinstance(data, int):
+        return ResolvedSession(token, data, source='redis')
+    if not isinstance(data, dict) or 'user_id' not in data:
+        return None
+    expires_at = data.get('expires_at')
+    return ResolvedSession(
+        token,
+        int(data['user_id']),
+        session_id=data.get('session_id'),
+        expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+        source='redis',
+    )
+
+
+class SessionResolver:
+    """Resolve session tokens through local LRU -> Redis -> DB."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            'local_hits': 0,
+            'redis_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+            'invalidations': 0,
+        }
+        self._listener_pid = None
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def resolve(self, token: str) -> Optional[ResolvedSession]:
+        self._ensure_listener()
+
+        resolved = self._get_local(token)
+        if resolved is not None:
+            self._count('local_hits')
+            return resolved
+
+        resolved = self._get_redis(token)
+        if resolved is not None:
+            self._count('redis_hits')
+        else:
+            resolved = self._get_db(token)
+            if resolved is None:
+                self._count('misses')
+                return None
+            self._count('db_hits')
+            self._set_redis(resolved)
+
+        self._set_local(resolved)
+        return resolved
+
+    def invalidate(self, token: str) -> None:
+        """Drop a token everywhere and tell the other workers to do the same."""
+        self._drop_local(token)
+        self._count('invalidations')
+        client = get_redis_client()
+        if not client:
+            return
+        try:
+            client.delete(f'session:{token}')
+            client.publish(INVALIDATION_CHANNEL, token)
+        except Exception as e:
+            logger.warning(f"[SessionResolver] Redis invalidation failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['size'] = len(self._entries)
+        lookups = sum(counters[k] for k in ('local_hits', 'redis_hits', 'db_hits', 'misses'))
+        counters['local_hit_rate'] = round(counters['local_hits'] / lookups, 4) if lookups else 0.0
+        return counters
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _get_local(self, token: str) -> Optional[ResolvedSession]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            resolved, expires = entry
+            if monotonic() >= expires:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+        return ResolvedSession(
+            resolved.session_token, resolved.user_id, resolved.session_id, resolved.expires_at, source='local'
+        )
+
+    def _set_local(self, resolved: ResolvedSession) -> None:
+        ttl = self.ttl_seconds
+        if resolved.expires_at is not None:
+            ttl = min(ttl, (resolved.expires_at - datetime.utcnow()).total_seconds())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[resolved.session_token] = (resolved, monotonic() + ttl)
+            self._entries.move_to_end(resolved.session_token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop_local(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def _get_redis(self, token: str) -> Optional[ResolvedSession]:
+        client = get_redis_client()
+        if not client:
+            return None
+        try:
+            resolved = decode_session(token, client.get(f'session:{token}'))
+        except Exception as e:
+            logger.warning(f"[SessionResolver] Redis lookup failed: {e}")
+            return None
+        if resolved is None or resolved.is_expired():
+            return None
+        return resolved
+
+    def _set_redis(self, resolved: ResolvedSession) -> None:
+        if resolved.expires_at is None:
+            return
+        ttl = int((resolved.expires_at - datetime.utcnow()).total_seconds())
+        if ttl > 0:
+            cache_session(
+                resolved.session_token, resolved.user_id, ttl_seconds=ttl,
+                session_id=resolved.session_id, expires_at=resolved.expires_at,
+            )
+
+    def _get_db(self, token: str) -> Optional[ResolvedSession]:
+        row = (
+            db.session.query(UserSession.id, UserSession.user_id, UserSession.expires_at)
+            .filter_by(session_token=token, is_active=True)
+            .first()
+        )
+        if row is None:
+            return None
+        resolved = ResolvedSession(token, row.user_id, session_id=row.id, expires_at=row.expires_at, source='db')
+        return None if resolved.is_expired() else resolved
+
+    # ------------------------------------------------------------------
+    # Cross-worker invalidation
+    # ------------------------------------------------------------------
+
+    def _ensure_listener(self) -> None:
+        """Start the pub/sub listener once per process (gunicorn forks after preload)."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            # Entries inherited from the master process were never subscribed
+            self._entries.clear()
+
+        client = get_redis_client()
+        if not client:
+            return
+        thread = threading.Thread(target=self._listen, args=(client,), name='session-invalidation', daemon=True)
+        thread.start()
+
+    def _listen(self, client) -> None:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                token = message.get('data')
+                if isinstance(token, bytes):
+                    token = token.decode()
+                if token:
+                    self._drop_local(token)
+        except Exception as e:
+            # Fall back to TTL-bounded staleness; the next fork / restart resubscribes
+            logger.warning(f"[SessionResolver] Invalidation listener stopped: {e}")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+session_resolver = SessionResolver(
+    max_entries=int(os.getenv('SESSION_CACHE_MAX_ENTRIES', '10000')),
+    ttl_seconds=float(os.getenv('SESSION_CACHE_TTL_SECONDS', '30')),
+)
@@ -0,0 +1,186 @@
+"""
+Single-flight coalescing for expensive, deterministic work (LLM generations).
+
+Concurrent callers asking for the same key share one execution:
+
+  1. In-process: the first thread registers a Future under the key; other
+     threads in the same worker wait on it.
+  2. Cross-process: the leader also takes ``sf:lock:<key>`` in Redis
+     (SET NX PX). Leaders in other gunicorn workers that lose the race poll
+     ``sf:result:<key>``, which the winner writes when it finishes.
+
+Waits are bounded. A caller that times out uses ``fallback()`` when one is
+given and otherwise runs the work itself; a caller that sees the remote
+leader vanish without a result (crash, error) takes the lock over.
+
+    value = single_flight.do(key, lambda: expensive(), fallback=lambda: cheap())
+
+Results crossing processes must be JSON-serialisable.
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        lock_seconds: float = 120.0,
+        wait_seconds: float = 90.0,
+        result_ttl_seconds: int = 60,
+        poll_interval: float = 0.1,
+    ):
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            'leader': 0,
+            'local_waits': 0,
+            'remote_waits': 0,
+            'timeouts': 0,
+            'fallbacks': 0,
+        }
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        fallback: Optional[Callable[[], Any]] = None,
+        wait_seconds: Optional[float] = None,
+    ) -> Any:
+        """Run *fn* once per *key* across concurrent callers and return its result."""
+        wait_seconds = self.wait_seconds if wait_seconds is None else wait_seconds
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._count('local_waits')
+            try:
+                # Callers may mutate what they get back; the leader keeps the original
+                return copy.deepcopy(future.result(timeout=wait_seconds))
+            except FutureTimeout:
+                return self._on_timeout(key, fn, fallback)
+
+        try:
+            value = self._lead(key, fn, fallback, wait_seconds)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters['inflight'] = len(self._inflight)
+        return counters
+
+    # ------------------------------------------------------------------
+    # Cross-process
+    # ------------------------------------------------------------------
+
+    def _lead(self, key: str, fn: Callable[[], Any], fallback, wait_seconds: float) -> Any:
+        client = get_redis_client()
+        if not client:
+            self._count('leader')
+            return fn()
+
+        lock_key, result_key = f"sf:lock:{key}", f"sf:result:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wait_seconds
+        waited = False
+
+        while True:
+            try:
+                acquired = client.set(lock_key, token, nx=True, px=int(self.lock_seconds * 1000))
+            except Exception as e:
+                logger.warning(f"[SingleFlight] Redis lock failed, running locally: {e}")
+                self._count('leader')
+                return fn()
+
+            if acquired:
+                self._count('leader')
+                try:
+                    # A result left over from an earlier flight must not reach our waiters
+                    client.delete(result_key)
+                    value = fn()
+                    try:
+                        client.set(result_key, json.dumps(value, default=str), ex=self.result_ttl_seconds)
+                    except Exception as e:
+                        logger.warning(f"[SingleFlight] Could not publish result for {key}: {e}")
+                    return value
+                finally:
+                    try:
+                        client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                    except Exception:
+                        pass
+
+            if not waited:
+                self._count('remote_waits')
+                waited = True
+
+            # Another worker is generating: wait for its result or its lock to go
+            while time.monotonic() < deadline:
+                try:
+                    raw = client.get(result_key)
+                    if raw is not None:
+                        return json.loads(raw)
+                    if not client.exists(lock_key):
+                        break
+                except Exception as e:
+                    logger.warning(f"[SingleFlight] Redis wait failed, running locally: {e}")
+                    return fn()
+                time.sleep(self.poll_interval)
+            else:
+                return self._on_timeout(key, fn, fallback)
+            # Lock released without a result: try to take over
+
+    def _on_timeout(self, key: str, fn: Callable[[], Any], fallback) -> Any:
+        self._count('timeouts')
+        if fallback is not None:
+            self._count('fallbacks')
+            logger.warning(f"[SingleFlight] Wait for {key} timed out — using fallback")
+            return fallback()
+        logger.warning(f"[SingleFlight] Wait for {key} timed out — running it here")
+        return fn()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+single_flight = SingleFlight(
+    lock_seconds=float(os.getenv('SINGLE_FLIGHT_LOCK_SECONDS', '120')),
+    wait_seconds=float(os.getenv('SINGLE_FLIGHT_WAIT_SECONDS', '90')),
+    result_ttl_seconds=int(os.getenv('SINGLE_FLIGHT_RESULT_TTL_SECONDS', '60')),
+)
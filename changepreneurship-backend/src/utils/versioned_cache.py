@@ -0,0 +1,180 @@
+"""
+Versioned read-through cache for per-user derived views.
+
+Entries are keyed by the user's assessment state version
+(``UserAssessmentStats.state_version``, moved on by every write hook in
+AssessmentStatsService inside the write's own transaction):
+
+    <namespace>:<user_id>:v<version>[:<variant>]
+
+Answering a question makes every older entry unreachable at once - nothing
+is scanned or deleted, old versions simply run out their TTL - and a reader
+can never store a view built from uncommitted answers under a newer version.
+
+Rebuilds of a hot key are spread out two ways:
+  - early probabilistic expiration ("XFetch"): each hit recomputes early with
+    a probability that grows as expiry nears, scaled by how long the last
+    build took (``beta`` tunes it), so one request refreshes the entry while
+    everyone else is still served it instead of all of them missing at once;
+  - a rebuild lock: the early refresh is claimed with ``SET NX``, and plain
+    misses go through ``single_flight`` so concurrent callers - in any worker,
+    with Redis - wait for one build.
+
+    value, from_cache = analytics_cache.fetch(user.id, version, lambda: build(user.id))
+
+With REDIS_URL entries live in Redis, otherwise per process. Values must be
+JSON-serialisable.
+
+Used by:
+  - routes/dashboard.py  (executive summary)
+  - routes/analytics.py  (dashboard/* views)
+  - services/dashboard_service.py  (DashboardComputation nodes)
+"""
+import json
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.llm_metrics import record_cache_lookup
+from src.utils.redis_client import get_redis_client
+from src.utils.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+
+class VersionedCache:
+    def __init__(self, namespace: str, ttl_seconds: int, beta: float = 1.0, lock_seconds: int = 30):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.beta = beta
+        self.lock_seconds = lock_seconds
+        self._local: Dict[str, tuple] = {}  # key -> (raw envelope, expires_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def key(self, user_id: int, version: int, variant: Optional[str] = None) -> str:
+        key = f"{self.namespace}:{user_id}:v{version}"
+        return f"{key}:{variant}" if variant is not None else key
+
+    def reset(self) -> None:
+        """Drop per-process entries (tests)."""
+        with self._lock:
+            self._local.clear()
+            self._refreshing.clear()
+
+    def fetch(
+        self,
+        user_id: int,
+        version: int,
+        build: Callable[[], Any],
+        variant: Optional[str] = None,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        (value, from_cache) for the user's view at *version*, calling *build*
+        on a miss; a result *cache_if* rejects is returned but not stored.
+        """
+        key = self.key(user_id, version, variant)
+        envelope = self._get(key)
+        if envelope is not None:
+            if not self._expires_early(envelope) or not self._claim_refresh(key):
+                record_cache_lookup(self.namespace, "hit")
+                return envelope["value"], True
+            record_cache_lookup(self.namespace, "early_refresh")
+            try:
+                return self._build(key, build, cache_if), False
+            finally:
+                self._release_refresh(key)
+
+        record_cache_lookup(self.namespace, "miss")
+        return single_flight.do(key, lambda: self._build(key, build, cache_if)), False
+
+    def get(self, user_id: int, version: int, variant: Optional[str] = None) -> Optional[Any]:
+        """The stored value for the user's view at *version*, or None (never builds)."""
+        envelope = self._get(self.key(user_id, version, variant))
+        record_cache_lookup(self.namespace, "hit" if envelope is not None else "miss")
+        return envelope["value"] if envelope is not None else None
+
+    def put(self, user_id: int, version: int, value: Any, variant: Optional[str] = None) -> None:
+        """Store an already built *value* (e.g. after an explicit refresh)."""
+        self._put(self.key(user_id, version, variant), value, 0.0)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _build(self, key: str, build: Callable[[], Any], cache_if) -> Any:
+        started = time.monotonic()
+        value = build()
+        if cache_if is None or cache_if(value):
+            self._put(key, value, time.monotonic() - started)
+        return value
+
+    def _expires_early(self, envelope: dict) -> bool:
+        # XFetch: -log(U) is exponentially distributed, so early refreshes stay rare until expiry is close
+        gap = -envelope.get("delta", 0.0) * self.beta * math.log(random.random() or 1e-12)
+        return time.time() + gap >= envelope["expires_at"]
+
+    def _get(self, key: str) -> Optional[dict]:
+        client = get_redis_client()
+        if client is not None:
+            try:
+                raw = client.get(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"[VersionedCache] Redis read failed for {key}: {e}")
+                return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            raw, expires_at = entry
+            if time.time() >= expires_at:
+                del self._local[key]
+                return None
+        return json.loads(raw)
+
+    def _put(self, key: str, value: Any, delta: float) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        raw = json.dumps({"value": value, "delta": delta, "expires_at": expires_at}, default=str)
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.set(key, raw, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"[VersionedCache] Redis write failed for {key}: {e}")
+            return
+        with self._lock:
+            now = time.time()
+            # Superseded versions are never read again; drop the expired ones as we go
+            for stale in [k for k, (_, exp) in self._local.items() if exp <= now]:
+                del self._local[stale]
+            self._local[key] = (raw, expires_at)
+
+    def _claim_refresh(self, key: str) -> bool:
+        client = get_redis_client()
+        if client is not None:
+            try:
+                return bool(client.set(f"{key}:refresh", "1", nx=True, ex=self.lock_seconds))
+            except Exception as e:
+                logger.warning(f"[VersionedCache] Redis refresh lock failed for {key}: {e}")
+                return False
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, key: str) -> None:
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.delete(f"{key}:refresh")
+            except Exception:
+                pass
+            return
+        with self._lock:
+            self._refreshing.discard(key)
@@ -1,8 +1,12 @@
+import copy
 import os
 import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 
 import pytest
 from flask import Flask
+from sqlalchemy import event
 
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -11,14 +15,49 @@ if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
 
-from src.models.assessment import db
+from src.models.assessment import (
+    Assessment,
+    AssessmentResponse,
+    User,
+    UserAssessmentStats,
+    UserSession,
+    db,
+)
 from src.routes.auth import auth_bp
 from src.routes.assessment import assessment_bp
-from src.routes.dashboard import dashboard_bp
-from src.routes.analytics import analytics_bp
+from src.routes.dashboard import dashboard_bp, dashboard_cache
+from src.routes.analytics import analytics_bp, analytics_cache
 from src.routes.ai_recommendations import ai_recommendations_bp
 from src.routes.user import user_bp
 from src.routes.mind_mapping import mind_mapping_bp
+from src.utils.session_resolver import session_resolver
+from src.services.dashboard_service import computation_cache
+from src.services.insights_report_service import report_cache
+from src.services.insights_shards import shard_cache
+from src.services.report_cache import MemoryReportBackend
+from src.services.llm_router import reset_router
+from src.utils.llm_rate_limiter import rate_limiter
+from src.utils.llm_budget import llm_budget
+
+
+@pytest.fixture(scope="session")
+def _audit_log_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("llm-audit")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_audit_log(monkeypatch, _audit_log_dir):
+    # The default directory is the checkout's tracked logs/llm
+    monkeypatch.setenv("LLM_AUDIT_LOG_DIR", str(_audit_log_dir))
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_rate_buckets():
+    # Per-process buckets would otherwise carry spend from test to test
+    rate_limiter.reset()
+    llm_budget.reset()
+    yield
 
 
 @pytest.fixture
@@ -32,6 +71,14 @@ def app():
     )
 
     db.init_app(app)
+    # Tokens are reused across tests against fresh databases
+    session_resolver.clear()
+    report_cache.reset_backend(MemoryReportBackend())
+    shard_cache.reset_backend(MemoryReportBackend())
+    reset_router()
+    dashboard_cache.reset()
+    computation_cache.reset()
+    analytics_cache.reset()
     
     # Register all blueprints
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
@@ -52,3 +99,120 @@ def app():
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture
+def count_statements(app):
+    """``with count_statements() as statements:`` collects the SQL run inside the block."""
+    @contextmanager
+    def counting():
+        statements = []
+
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", _before_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _before_execute)
+
+    return counting
+
+
+def _add_session(user_id, session_token):
+    db.session.add(UserSession(
+        user_id=user_id,
+        session_token=session_token,
+        expires_at=datetime.utcnow() + timedelta(days=1),
+        is_active=True,
+    ))
+
+
+@pytest.fixture
+def seed_user_with_responses(app):
+    """``seed_user_with_responses(session_token=...)`` -> user id, with two phases of three answers."""
+    def seed(session_token="snapshot-token"):
+        with app.app_context():
+            user = User(username="snapshot", email="snapshot@example.com", password_hash="hashed")
+            db.session.add(user)
+            db.session.flush()
+            _add_session(user.id, session_token)
+
+            for phase_id, phase_name in [("self_discovery", "Self Discovery"), ("idea_discovery", "Idea Discovery")]:
+                assessment = Assessment(user_id=user.id, phase_id=phase_id, phase_name=phase_name)
+                db.session.add(assessment)
+                db.session.flush()
+                for i in range(3):
+                    response = AssessmentResponse(
+                        assessment_id=assessment.id,
+                        section_id="general",
+                        question_id=f"{phase_id}_q{i}",
+                        question_text=f"Question {i}",
+                        response_type="json",
+                    )
+                    response.set_response_value({"answer": i})
+                    db.session.add(response)
+            db.session.commit()
+            return user.id
+
+    return seed
+
+
+@pytest.fixture
+def create_user_with_stats(app):
+    """``create_user_with_stats(session_token=...)`` -> (user id, empty self_discovery assessment id)."""
+    def create(session_token="stats-token"):
+        with app.app_context():
+            user = User(username="stats", email="stats@example.com", password_hash="hashed")
+            db.session.add(user)
+            db.session.flush()
+            _add_session(user.id, session_token)
+            db.session.add(UserAssessmentStats(user_id=user.id))
+            assessment = Assessment(user_id=user.id, phase_id="self_discovery", phase_name="Self Discovery")
+            db.session.add(assessment)
+            db.session.commit()
+            return user.id, assessment.id
+
+    return create
+
+
+@pytest.fixture
+def save(client):
+    """``save(assessment_id, question_id, ...)``: one answer through the single-item endpoint."""
+    def save_response(assessment_id, question_id, response_type="text", token="stats-token"):
+        return client.post(
+            f"/api/assessment/{assessment_id}/response",
+            json={
+                "section_id": "general",
+                "question_id": question_id,
+                "question_text": question_id,
+                "response_type": response_type,
+                "response_value": "answer",
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    return save_response
+
+
+_HEATMAP = {row: [50, 60, 70, 80, 90, 100] for row in ("Strategic", "Behavioral", "Predictive")}
+_REPORT = {
+    "entrepreneur": {
+        "score": 72, "archetype": "Builder", "tagline": "t", "summary": "s", "radar": {"Vision": 70},
+        "dimensions": [], "phases": [], "strengths": [], "growth_areas": [], "recent_activity": [],
+    },
+    "venture": {
+        "score": 65, "idea_name": "Idea", "tagline": "t", "summary": "s \"quoted\" {braces} \\ ]", "radar": {},
+        "dimensions": [], "phases": [], "validation_pct": 40, "heatmap": _HEATMAP,
+    },
+    "alignment": {"score": 60, "combined_score": 66, "sweet_spots": [], "risk_zones": [], "untapped_potential": []},
+    # "yes" is deliberately not a bool: the readiness section fails validation
+    "readiness": {"unlocked": "yes", "unlock_message": "m"},
+}
+
+
+@pytest.fixture
+def sample_report():
+    """A full insights report as the LLM would return it (a fresh copy per test)."""
+    return copy.deepcopy(_REPORT)
@@ -0,0 +1,51 @@
+import dataclasses
+
+import pytest
+
+from src.models.assessment import db
+from src.utils.assessment_snapshot import load_assessment_snapshot
+
+
+def test_snapshot_loads_everything_in_one_query(app, seed_user_with_responses, count_statements):
+    user_id = seed_user_with_responses()
+
+    with app.app_context():
+        db.session.expunge_all()
+        with count_statements() as statements:
+            snapshot = load_assessment_snapshot(user_id)
+
+        assert len(statements) == 1
+        assert snapshot.user_id == user_id
+        assert [a.phase_id for a in snapshot.assessments] == ["self_discovery", "idea_discovery"]
+        assert snapshot.total_responses == 6
+        first = snapshot.phase("self_discovery").responses[0]
+        assert first.value == {"answer": 0}
+        assert first.raw_value == '{"answer": 0}'
+
+
+def test_snapshot_is_immutable(app, seed_user_with_responses):
+    user_id = seed_user_with_responses()
+
+    with app.app_context():
+        snapshot = load_assessment_snapshot(user_id)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.username = "changed"
+        assert isinstance(snapshot.assessments, tuple)
+
+
+def test_snapshot_missing_user_returns_none(app):
+    with app.app_context():
+        assert load_assessment_snapshot(9999) is None
+
+
+def test_sync_all_uses_snapshot(client, seed_user_with_responses):
+    seed_user_with_responses(session_token="sync-token")
+
+    response = client.get("/api/assessment/sync-all", headers={"Authorization": "Bearer sync-token"})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["totalAssessments"] == 2
+    phase = data["assessmentData"]["self_discovery"]
+    assert phase["responseCount"] == 3
+    assert phase["responses"]["general"][0]["response_value"] == '{"answer": 0}'
@@ -0,0 +1,48 @@
+from src.models.assessment import UserAssessmentStats, db
+from src.services.assessment_stats_service import AssessmentStatsService
+
+
+def test_save_response_updates_stats_incrementally(app, create_user_with_stats, save):
+    user_id, assessment_id = create_user_with_stats()
+
+    assert save(assessment_id, "q1").status_code == 200
+    assert save(assessment_id, "q2", response_type="scale").status_code == 200
+    # Re-answering q1 with a different type moves it between histogram buckets
+    assert save(assessment_id, "q1", response_type="scale").status_code == 200
+
+    with app.app_context():
+        stats = db.session.get(UserAssessmentStats, user_id)
+        assert stats.total_responses == 2
+        assert stats.get_json_field("response_type_counts") == {"scale": 2}
+        phase = stats.get_json_field("phase_stats")["self_discovery"]
+        assert phase["responses"] == 2
+        assert phase["last_updated"] is not None
+        assert stats.average_progress == round(2 / 7 * 100, 2)
+
+        incremental = stats.to_dict()
+        rebuilt = AssessmentStatsService.rebuild(user_id).to_dict()
+        for key in ("total_assessments", "completed_assessments", "total_responses",
+                    "average_progress", "response_type_counts"):
+            assert incremental[key] == rebuilt[key]
+
+
+def test_assessment_stats_endpoint_rebuilds_missing_row(app, client, create_user_with_stats, save):
+    user_id, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+
+    with app.app_context():
+        db.session.delete(db.session.get(UserAssessmentStats, user_id))
+        db.session.commit()
+
+    response = client.get(
+        "/api/analytics/dashboard/assessment-stats",
+        headers={"Authorization": "Bearer stats-token"},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["total_responses"] == 1
+    assert data["response_types"] == {"text": 1}
+
+    with app.app_context():
+        assert db.session.get(UserAssessmentStats, user_id) is not None
@@ -0,0 +1,80 @@
+from src.models.assessment import AssessmentResponse, Assessment, UserAssessmentStats, db
+
+HEADERS = {"Authorization": "Bearer stats-token"}
+
+
+def answer(question_id, response_type="text", value="answer"):
+    return {
+        "section_id": "general",
+        "question_id": question_id,
+        "question_text": question_id,
+        "response_type": response_type,
+        "response_value": value,
+    }
+
+
+def batch(client, assessment_id, items):
+    return client.post(f"/api/assessment/{assessment_id}/responses:batch", json=items, headers=HEADERS)
+
+
+def test_batch_save_reports_per_item_results(app, client, create_user_with_stats):
+    user_id, assessment_id = create_user_with_stats()
+
+    response = batch(client, assessment_id, [
+        answer("q1"),
+        {"question_id": "q2", "response_value": "no type"},
+        answer("q3", response_type="scale", value=4),
+        "not an object",
+    ])
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["saved"] == 2
+    assert data["failed"] == 2
+    assert [r["success"] for r in data["results"]] == [True, False, True, False]
+    assert data["results"][1]["error"] == "Missing required fields"
+    assert data["assessment"]["progress_percentage"] == round(2 / 7 * 100, 2)
+
+    with app.app_context():
+        stored = {r.question_id: r.response_value for r in AssessmentResponse.query.filter_by(assessment_id=assessment_id)}
+        assert stored == {"q1": "answer", "q3": "4"}
+        assert db.session.get(UserAssessmentStats, user_id).get_json_field("response_type_counts") == {"text": 1, "scale": 1}
+        assert db.session.get(Assessment, assessment_id).get_assessment_data()["response_count"] == 2
+
+
+def test_batch_save_rejects_bad_requests(client, create_user_with_stats):
+    _, assessment_id = create_user_with_stats()
+
+    assert batch(client, assessment_id, []).status_code == 400
+    assert batch(client, assessment_id, {"responses": "nope"}).status_code == 400
+    assert batch(client, assessment_id, [answer(f"q{i}") for i in range(201)]).status_code == 400
+    assert batch(client, 9999, [answer("q1")]).status_code == 404
+    assert client.post(f"/api/assessment/{assessment_id}/responses:batch", json=[answer("q1")]).status_code == 401
+
+
+def test_batch_save_completes_assessment(client, create_user_with_stats):
+    _, assessment_id = create_user_with_stats()
+
+    response = batch(client, assessment_id, {"responses": [answer(f"q{i}") for i in range(7)]})
+
+    assert response.status_code == 200
+    assert response.get_json()["assessment"]["is_completed"] is True
+
+
+def test_batch_save_issues_fewer_statements_than_single_item_calls(client, create_user_with_stats, save,
+                                                                  count_statements):
+    """50 answers via one batch call vs 50 single-item calls, counted in SQL statements"""
+    _, assessment_id = create_user_with_stats()
+    count = 50
+
+    with count_statements() as statements:
+        for i in range(count):
+            assert save(assessment_id, f"single_{i}").status_code == 200
+        single_statements = len(statements)
+
+        del statements[:]
+        assert batch(client, assessment_id, [answer(f"batch_{i}") for i in range(count)]).status_code == 200
+        batch_statements = len(statements)
+
+    # The batch's round trips do not grow with its size: 50 answers cost less than two single saves
+    assert batch_statements < 2 * single_statements / count
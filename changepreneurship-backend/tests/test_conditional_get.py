@@ -0,0 +1,62 @@
+import pytest
+
+HEADERS = {"Authorization": "Bearer stats-token"}
+
+
+def test_unchanged_state_is_answered_with_304_before_the_view(client, monkeypatch, create_user_with_stats, save):
+    _, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+
+    first = client.get("/api/assessment/sync-all", headers=HEADERS)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    monkeypatch.setattr("src.routes.assessment.load_assessment_snapshot",
+                        lambda *a, **k: pytest.fail("a 304 must not load the snapshot"))
+    second = client.get("/api/assessment/sync-all", headers={**HEADERS, "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.data == b""
+
+
+def test_a_write_changes_the_etag(client, create_user_with_stats, save):
+    _, assessment_id = create_user_with_stats()
+    etag = client.get("/api/assessment/phases", headers=HEADERS).headers["ETag"]
+
+    save(assessment_id, "q1")
+
+    response = client.get("/api/assessment/phases", headers={**HEADERS, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    phase = next(p for p in response.get_json()["phases"] if p["id"] == "self_discovery")
+    assert phase["progress_percentage"] > 0
+
+
+def test_etag_covers_the_query_string_and_skips_errors(client, create_user_with_stats):
+    create_user_with_stats()
+    url = "/api/analytics/dashboard/progress-history"
+
+    week = client.get(f"{url}?days=7", headers=HEADERS).headers["ETag"]
+    month = client.get(f"{url}?days=30", headers=HEADERS)
+    assert month.status_code == 200 and month.headers["ETag"] != week
+
+    unauthenticated = client.get(url, headers={"If-None-Match": week})
+    assert unauthenticated.status_code == 401
+    assert "ETag" not in unauthenticated.headers
+
+
+def test_time_relative_views_roll_over_at_midnight(client, monkeypatch, create_user_with_stats):
+    create_user_with_stats()
+    url = "/api/analytics/dashboard/overview"
+    etag = client.get(url, headers=HEADERS).headers["ETag"]
+    assert client.get(url, headers={**HEADERS, "If-None-Match": etag}).status_code == 304
+
+    built = []
+    monkeypatch.setattr("src.utils.conditional_get.utc_day", lambda: "2099-01-01")
+    monkeypatch.setattr("src.routes.analytics.utc_day", lambda: "2099-01-01")
+    monkeypatch.setattr("src.routes.analytics._build_overview", lambda user_id: built.append(user_id) or {})
+
+    tomorrow = client.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert tomorrow.status_code == 200 and tomorrow.headers["ETag"] != etag
+    # Rebuilt for the new day rather than served from the version-keyed cache
+    assert len(built) == 1
@@ -0,0 +1,89 @@
+import pytest
+from flask import g
+
+from src.models.assessment import AssessmentResponse, db
+from src.services.dashboard_service import DashboardDataGenerator
+
+
+@pytest.fixture
+def generator(app, monkeypatch):
+    monkeypatch.setenv("USE_LLM", "false")
+    built = []
+    original = DashboardDataGenerator._generate_sub_element_data
+
+    def counting(self, element, user_data, overall_score):
+        built.append(element['key'])
+        return original(self, element, user_data, overall_score)
+
+    monkeypatch.setattr(DashboardDataGenerator, "_generate_sub_element_data", counting)
+    return DashboardDataGenerator(), built
+
+
+def test_sub_element_builds_only_that_element(generator, monkeypatch, seed_user_with_responses):
+    service, built = generator
+    user_id = seed_user_with_responses()
+    monkeypatch.setattr(DashboardDataGenerator, "_generate_ai_insights",
+                        lambda *a: pytest.fail("insights are not needed for one element"))
+
+    element = service.get_sub_element_details(user_id, "market_opportunity")
+
+    assert element["title"] == "Market Opportunity"
+    assert built == ["market_opportunity"]
+    assert service.get_sub_element_details(user_id, "no_such_element") is None
+
+
+def test_metrics_build_no_elements(generator, seed_user_with_responses):
+    service, built = generator
+    user_id = seed_user_with_responses()
+
+    metrics = service.get_dashboard_metrics(user_id)
+
+    assert metrics["assessment_count"] == 2
+    assert built == []
+    assert metrics["user_score"] == service.generate_executive_summary(user_id)["overall_score"]
+
+
+def test_nodes_are_reused_until_the_answers_change(generator, seed_user_with_responses, save):
+    service, built = generator
+    user_id = seed_user_with_responses()
+
+    first = service.generate_executive_summary(user_id)
+    service.get_sub_element_details(user_id, "company_vision")
+    assert len(built) == 9
+
+    first["sub_elements"][0]["score"] = -1  # callers get copies
+    assert service.get_sub_element_details(user_id, "company_vision")["score"] != -1
+
+    response = AssessmentResponse.query.first()
+    save(response.assessment_id, response.question_id, token="snapshot-token")
+
+    service.get_sub_element_details(user_id, "company_vision")
+    assert len(built) == 10
+
+
+def test_cached_nodes_skip_the_snapshot(generator, monkeypatch, seed_user_with_responses):
+    service, built = generator
+    user_id = seed_user_with_responses()
+    first = service.generate_executive_summary(user_id)
+
+    # A later request (or another worker) finds every node under the same state version
+    g.pop("dashboard_computations")
+    monkeypatch.setattr("src.services.dashboard_service.load_assessment_snapshot",
+                        lambda *a, **k: pytest.fail("cached nodes must not load the snapshot"))
+    again = service.generate_executive_summary(user_id)
+
+    assert len(built) == 9
+    assert {k: v for k, v in again.items() if k != "last_updated"} == \
+        {k: v for k, v in first.items() if k != "last_updated"}
+
+
+def test_summary_reads_the_stats_row_once(generator, count_statements, create_user_with_stats):
+    service, _ = generator
+    user_id, _ = create_user_with_stats()
+    db.session.remove()
+
+    with count_statements() as statements:
+        summary = service.generate_executive_summary(user_id)
+
+    assert summary["assessment_count"] == 1
+    assert len([s for s in statements if "FROM user_assessment_stats" in s]) == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from src.models.assessment import AssessmentResponse, AssessmentResponseTombstone, db
+
+HEADERS = {"Authorization": "Bearer stats-token"}
+
+
+@pytest.fixture(autouse=True)
+def settle_immediately(monkeypatch):
+    monkeypatch.setattr("src.services.assessment_sync.SYNC_SETTLE_SECONDS", 0)
+
+
+def sync(client, cursor=None):
+    url = "/api/assessment/sync-all" + (f"?since={cursor}" if cursor else "")
+    response = client.get(url, headers=HEADERS)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_delta_returns_only_what_changed(client, create_user_with_stats, save):
+    _, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+
+    full = sync(client)
+    assert full["full"] is True
+    assert [r["question_id"] for r in full["assessmentData"]["self_discovery"]["responses"]["general"]] == ["q1"]
+
+    assert sync(client, full["cursor"])["assessmentData"] == {}
+
+    save(assessment_id, "q2")
+    delta = sync(client, full["cursor"])
+    assert delta["full"] is False
+    phase = delta["assessmentData"]["self_discovery"]
+    assert [r["question_id"] for r in phase["responses"]["general"]] == ["q2"]
+    assert phase["responseCount"] == 2 and phase["progress"] > 0
+    assert delta["deleted"] == []
+
+    assert sync(client, delta["cursor"])["assessmentData"] == {}
+
+
+def test_deleted_response_is_reported_as_a_tombstone(app, client, create_user_with_stats, save):
+    user_id, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+    cursor = sync(client)["cursor"]
+
+    with app.app_context():
+        db.session.delete(AssessmentResponse.query.filter_by(question_id="q1").one())
+        db.session.commit()
+        assert AssessmentResponseTombstone.query.filter_by(user_id=user_id).count() == 1
+
+    delta = sync(client, cursor)
+    assert delta["deleted"] == [{"phaseId": "self_discovery", "sectionId": "general", "questionId": "q1"}]
+
+
+def test_unreadable_cursor_falls_back_to_a_full_sync(client, create_user_with_stats, save):
+    _, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+
+    response = sync(client, "not-a-cursor")
+    assert response["full"] is True
+    assert "self_discovery" in response["assessmentData"]
+
+
+def test_empty_delta_keeps_the_cursor_and_revalidates(client, create_user_with_stats, save):
+    _, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+    cursor = sync(client)["cursor"]
+
+    url = f"/api/assessment/sync-all?since={cursor}"
+    first = client.get(url, headers=HEADERS)
+    assert first.get_json()["cursor"] == cursor
+
+    again = client.get(url, headers={**HEADERS, "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
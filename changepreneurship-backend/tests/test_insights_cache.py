@@ -0,0 +1,156 @@
+import copy
+import time
+
+import pytest
+from flask import url_for
+
+from src.models.assessment import db, AssessmentResponse
+from src.routes.ai_routes import ai_bp
+from src.services import job_queue as job_module
+from src.services.insights_report_service import InsightsReportService, report_cache
+from src.services.job_queue import JobQueue, MemoryJobBackend
+from src.services.report_cache import MemoryReportBackend, ReportCache
+
+HEADERS = {"Authorization": "Bearer cache-token"}
+
+
+@pytest.fixture
+def cache_app(app, monkeypatch, seed_user_with_responses, sample_report):
+    app.register_blueprint(ai_bp)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("JOB_INPROCESS_WORKERS", "0")
+    monkeypatch.setattr(InsightsReportService, "ENABLE_CACHE", True)
+    monkeypatch.setattr(InsightsReportService, "SHARDED", False)
+    jq = JobQueue(MemoryJobBackend())
+    monkeypatch.setattr(job_module, "_job_queue", jq)
+
+    calls = []
+
+    def fake_call(self, user_prompt):
+        calls.append(user_prompt)
+        return copy.deepcopy(sample_report)
+
+    monkeypatch.setattr(InsightsReportService, "_call_groq", fake_call)
+    app.llm_calls = calls
+    app.job_queue = jq
+    app.user_id = seed_user_with_responses(session_token="cache-token")
+    return app
+
+
+def drain(jq):
+    while jq.run_one(timeout=0.01):
+        pass
+
+
+def report_urls(app):
+    with app.test_request_context():
+        return [
+            "/api/ai/insights-report",
+            url_for("ai_recommendations.get_recommendations", user_id=app.user_id),
+            url_for("ai_recommendations.get_user_strengths", user_id=app.user_id),
+            url_for("ai_recommendations.get_action_plan", user_id=app.user_id),
+        ]
+
+
+def test_report_endpoints_share_one_llm_call(cache_app):
+    client = cache_app.test_client()
+    for url in report_urls(cache_app):
+        assert client.get(url, headers=HEADERS).status_code == 200
+
+    assert len(cache_app.llm_calls) == 1
+    assert client.get("/api/ai/insights-report", headers=HEADERS).get_json()["report"]["_from_cache"]
+
+
+def test_expired_entry_is_served_stale_and_refreshed(cache_app, monkeypatch):
+    client = cache_app.test_client()
+    client.get("/api/ai/insights-report", headers=HEADERS)
+    monkeypatch.setattr(report_cache, "fresh_seconds", 0)
+
+    report = client.get("/api/ai/insights-report", headers=HEADERS).get_json()["report"]
+    assert report["_stale"] and report["_refresh_job"] and report["_stale_reason"] == "expired"
+    assert len(cache_app.llm_calls) == 1
+
+    # Repeated stale hits share the one refresh job
+    again = client.get("/api/ai/insights-report", headers=HEADERS).get_json()["report"]
+    assert again["_refresh_job"] == report["_refresh_job"]
+
+    drain(cache_app.job_queue)
+    assert len(cache_app.llm_calls) == 2
+    assert cache_app.job_queue.get(report["_refresh_job"])["status"] == "succeeded"
+
+
+def change_an_answer():
+    response = AssessmentResponse.query.first()
+    response.set_response_value({"answer": "changed"})
+    db.session.commit()
+
+
+def test_changed_answers_regenerate_unless_the_previous_report_is_asked_for(cache_app):
+    client = cache_app.test_client()
+    client.get("/api/ai/insights-report", headers=HEADERS)
+    change_an_answer()
+
+    report = client.get("/api/ai/insights-report", headers=HEADERS).get_json()["report"]
+    assert "_stale" not in report and "_from_cache" not in report
+    assert len(cache_app.llm_calls) == 2
+
+
+def test_changed_answers_serve_previous_version_while_regenerating(cache_app):
+    client = cache_app.test_client()
+    client.get("/api/ai/insights-report", headers=HEADERS)
+    change_an_answer()
+
+    report = client.get("/api/ai/insights-report?previous=1", headers=HEADERS).get_json()["report"]
+    assert report["_stale"] and report["_stale_reason"] == "answers_changed"
+    assert len(cache_app.llm_calls) == 1
+
+    drain(cache_app.job_queue)
+    assert len(cache_app.llm_calls) == 2
+    fresh = client.get("/api/ai/insights-report", headers=HEADERS).get_json()["report"]
+    assert fresh["_from_cache"] and "_stale" not in fresh
+
+
+def test_refresh_param_evicts_and_regenerates(cache_app):
+    client = cache_app.test_client()
+    client.get("/api/ai/insights-report", headers=HEADERS)
+    report = client.get("/api/ai/insights-report?refresh=1", headers=HEADERS).get_json()["report"]
+
+    assert "_from_cache" not in report
+    assert len(cache_app.llm_calls) == 2
+
+
+def test_fallback_reports_are_not_cached(app, monkeypatch):
+    monkeypatch.setattr(InsightsReportService, "ENABLE_CACHE", True)
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    data = {"phases": [], "responses": {}}
+
+    assert InsightsReportService().generate_report(1, data)["_fallback"]
+    assert report_cache.latest(1) is None
+
+
+def test_cache_keeps_only_newest_versions_per_user():
+    cache = ReportCache("test", fresh_seconds=60, retention_seconds=3600, max_versions=2, backend=MemoryReportBackend())
+    for digest in ("a", "b", "c"):
+        cache.put(7, digest, {"digest": digest})
+    cache.put(8, "a", {"digest": "other-user"})
+
+    assert cache.get(7, "a") is None
+    assert cache.latest(7).report == {"digest": "c"}
+    assert cache.get(7, "b").is_fresh
+    assert cache.get(8, "a").report == {"digest": "other-user"}
+
+    cache.evict_user(7)
+    assert cache.latest(7) is None and cache.get(8, "a") is not None
+
+
+def test_memory_backend_drops_expired_entries_on_put(monkeypatch):
+    backend = MemoryReportBackend()
+    cache = ReportCache("test", fresh_seconds=60, retention_seconds=3600, max_versions=2, backend=backend)
+    cache.put(7, "a", {"digest": "a"})
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 7200)
+    cache.put(8, "b", {"digest": "b"})
+
+    assert list(backend._entries) == [cache.key(8, "b")]
+    assert backend.versions(cache._index(7)) == []
@@ -0,0 +1,182 @@
+import copy
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.insights_report_service import (
+    InsightsReportService,
+    REPORT_SECTIONS,
+    report_cache,
+    validate_report_section,
+)
+from src.services.insights_shards import ShardedReportBuilder
+from src.utils.llm_rate_limiter import rate_limiter
+
+@pytest.fixture
+def merged_report(sample_report):
+    """What the merge call returns: the report without the per-phase parts shards supply."""
+    merged = {name: {k: v for k, v in section.items() if k not in ("phases", "radar")}
+              for name, section in sample_report.items()}
+    merged["readiness"]["unlocked"] = True
+    return merged
+
+
+def shard_for(phase_id, score):
+    return {
+        "entrepreneur_phase": {"id": phase_id, "title": phase_id, "icon": "✓", "score": score,
+                               "completed": True, "cards": [{"name": "Card", "score": score, "subs": []}]},
+        "venture_phase": None,
+        "entrepreneur_radar": {"Vision": score},
+        "venture_radar": {"Market Demand": score} if phase_id == "market_research" else {},
+        "strengths": [{"name": f"{phase_id} strength", "score": score}],
+        "growth_areas": [],
+        "facts": {"idea_name": None, "runway_months": 9 if phase_id == "market_research" else None},
+        "digest": f"{phase_id} digest",
+    }
+
+
+@pytest.fixture
+def sharded(app, monkeypatch, merged_report):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setattr(InsightsReportService, "ENABLE_CACHE", True)
+    monkeypatch.setattr(InsightsReportService, "SHARDED", True)
+    calls = []
+    failures = set()
+    scores = {"self_discovery": 80, "market_research": 60}
+
+    def fake_complete(self, system, prompt, max_tokens, options):
+        target = options["shard"]
+        calls.append(target)
+        if target in failures:
+            raise RuntimeError("provider down")
+        if target == "merge":
+            assert "digest" in prompt and "Card" not in prompt
+            return copy.deepcopy(merged_report)
+        return shard_for(target, scores[target])
+
+    monkeypatch.setattr(ShardedReportBuilder, "_complete_json", fake_complete)
+    return calls, failures
+
+
+def assessment(market_answer="Interviewed 12 shops"):
+    return {
+        "phases": [
+            {"id": "self_discovery", "name": "Self Discovery", "progress": 100, "completed": True},
+            {"id": "market_research", "name": "Market Research", "progress": 50, "completed": False},
+            {"id": "business_pillars", "name": "Business Pillars", "progress": 0, "completed": False},
+        ],
+        "responses": {
+            "self_discovery": [{"question_id": "why", "question_text": "Why?", "section_id": "motivation",
+                                "response_value": "Independence", "response_type": "text"}],
+            "market_research": [{"question_id": "interviews", "question_text": "Interviews?",
+                                 "section_id": "validation", "response_value": market_answer,
+                                 "response_type": "text"}],
+        },
+    }
+
+
+def test_report_is_assembled_from_shards_and_matches_schema(sharded, sample_report):
+    calls, _ = sharded
+    report = InsightsReportService().generate_report(1, assessment())
+
+    assert sorted(calls) == ["market_research", "merge", "self_discovery"]
+    for name in REPORT_SECTIONS:
+        assert validate_report_section((name,), report[name]) == []
+    assert validate_report_section(("venture", "heatmap"), report["venture"]["heatmap"]) == []
+    assert [p["id"] for p in report["entrepreneur"]["phases"]] == ["self_discovery", "market_research", "business_pillars"]
+    assert report["entrepreneur"]["phases"][2]["score"] is None
+    assert report["entrepreneur"]["radar"]["Vision"] == 70
+    assert report["venture"]["radar"]["Market Demand"] == 60
+    assert report["venture"]["runway_months"] == 9
+    assert report["venture"]["heatmap"] == sample_report["venture"]["heatmap"]
+    assert "_fallback_sections" not in report
+
+
+def test_only_changed_phases_are_regenerated(sharded):
+    calls, _ = sharded
+    service = InsightsReportService()
+    service.generate_report(1, assessment())
+    calls.clear()
+
+    service.generate_report(1, assessment(market_answer="Interviewed 20 shops"), allow_stale=False)
+    assert sorted(calls) == ["market_research", "merge"]
+
+
+def test_failed_shard_is_retried_without_caching_the_partial_report(sharded):
+    calls, failures = sharded
+    failures.add("market_research")
+    service = InsightsReportService()
+
+    report = service.generate_report(1, assessment())
+    assert report["_failed_shards"] == ["market_research"]
+    assert report_cache.latest(1) is None
+
+    failures.clear()
+    calls.clear()
+    report = service.generate_report(1, assessment(), allow_stale=False)
+    assert sorted(calls) == ["market_research", "merge"]
+    assert "_failed_shards" not in report
+
+
+def test_merge_failure_falls_back_to_shard_data(sharded):
+    _, failures = sharded
+    failures.add("merge")
+
+    report = InsightsReportService().generate_report(1, assessment())
+
+    assert report["_fallback_sections"] == list(REPORT_SECTIONS)
+    assert report["entrepreneur"]["score"] == 70
+    assert report["entrepreneur"]["strengths"][0]["name"] == "self_discovery strength"
+    assert not report.get("_fallback")
+
+
+def test_refresh_evicts_shards(sharded):
+    calls, _ = sharded
+    service = InsightsReportService()
+    service.generate_report(1, assessment())
+    service.invalidate_cache(1)
+    calls.clear()
+
+    service.generate_report(1, assessment())
+    assert sorted(calls) == ["market_research", "merge", "self_discovery"]
+
+
+class FakeGroq:
+    """Answers shard and merge prompts like Groq would, with realistic usage."""
+
+    def __init__(self, merged_report):
+        self.merged_report = merged_report
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, max_tokens, **kwargs):
+        self.calls += 1
+        prompt = messages[1]["content"]
+        phase = re.search(r"=== PHASE '(\w+)'", prompt)
+        body = shard_for(phase.group(1), 70) if phase else copy.deepcopy(self.merged_report)
+        usage = SimpleNamespace(prompt_tokens=3000, completion_tokens=900, total_tokens=3900)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))],
+                               usage=usage)
+
+
+def test_full_report_is_not_throttled_under_default_limits(app, monkeypatch, merged_report):
+    monkeypatch.delenv("LLM_RATE_LIMITS", raising=False)
+    monkeypatch.setenv("LLM_RATE_WAIT_INTERACTIVE_SECONDS", "0.1")
+    rate_limiter.reset()
+    groq = FakeGroq(merged_report)
+    monkeypatch.setattr("src.services.insights_shards.get_provider_client", lambda *a, **k: groq)
+
+    phase_ids = ["self_discovery", "idea_discovery", "market_research", "business_pillars",
+                 "product_concept_testing", "business_development", "business_prototype_testing"]
+    data = {
+        "phases": [{"id": pid, "name": pid, "progress": 100, "completed": True} for pid in phase_ids],
+        "responses": {pid: [{"question_id": "q", "question_text": "Q?", "section_id": "s",
+                             "response_value": "x " * 400, "response_type": "text"}] for pid in phase_ids},
+    }
+
+    report = ShardedReportBuilder("test-key", "llama-3.3-70b-versatile", use_cache=False).build(1, data)
+
+    assert "_failed_shards" not in report
+    assert groq.calls == 8
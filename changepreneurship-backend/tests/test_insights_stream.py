@@ -0,0 +1,103 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.routes.ai_routes import ai_bp
+from src.services import insights_report_service as report_module
+from src.services.insights_report_service import InsightsReportService, validate_report_section
+from src.utils.incremental_json import IncrementalJSONParser
+
+
+def chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_parser_emits_sections_as_they_close(sample_report):
+    text = json.dumps(sample_report)
+    parser = IncrementalJSONParser(max_depth=2)
+    seen = []
+    for chunk in chunks(text):
+        seen.extend(path for path, _ in parser.feed(chunk))
+
+    top_level = [p for p in seen if len(p) == 1]
+    assert top_level == [("entrepreneur",), ("venture",), ("alignment",), ("readiness",)]
+    assert seen.index(("venture", "heatmap")) < seen.index(("venture",))
+    assert parser.done and parser.result() == sample_report
+
+
+def test_parser_yields_first_section_before_document_ends(sample_report):
+    text = json.dumps(sample_report)
+    parser = IncrementalJSONParser()
+    cut = text.index('"venture"')
+    assert [p for p, _ in parser.feed(text[:cut])] == [("entrepreneur",)]
+    assert not parser.done
+
+
+def test_section_validation_follows_schema(sample_report):
+    assert validate_report_section(("entrepreneur",), sample_report["entrepreneur"]) == []
+    assert validate_report_section(("venture", "heatmap"), sample_report["venture"]["heatmap"]) == []
+    assert validate_report_section(("venture", "heatmap"), {"Strategic": [1, 2]}) != []
+    assert validate_report_section(("readiness",), sample_report["readiness"]) == ["readiness.unlocked must be bool"]
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.text = text
+
+    def create(self, **kwargs):
+        assert kwargs["stream"] is True
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+            for part in chunks(self.text, 64)
+        )
+
+
+@pytest.fixture
+def ai_app(app, monkeypatch, sample_report):
+    app.register_blueprint(ai_bp)
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=FakeStream(json.dumps(sample_report))))
+    monkeypatch.setattr(report_module, "get_provider_client", lambda *a, **k: fake)
+    return app
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_sends_sections_then_report(ai_app, seed_user_with_responses, sample_report):
+    seed_user_with_responses(session_token="stream-token")
+    client = ai_app.test_client()
+
+    response = client.get("/api/ai/insights-report/stream", headers={"Authorization": "Bearer stream-token"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = parse_sse(response.get_data(as_text=True))
+    assert events[0] == ("progress", {"stage": "started"})
+    sections = [(d["path"], d["valid"]) for e, d in events if e == "section"]
+    assert sections == [
+        ("entrepreneur", True), ("venture.heatmap", True), ("venture", True),
+        ("alignment", True), ("readiness", False),
+    ]
+
+    event, report = events[-1]
+    assert event == "report"
+    assert report["venture"]["heatmap"] == sample_report["venture"]["heatmap"]
+    # Invalid section replaced by the fallback
+    assert report["readiness"]["unlocked"] is False
+    assert report["_fallback_sections"] == ["readiness"]
+    assert report["consensus"]["responses_analyzed"] == 6
+
+
+def test_stream_without_key_returns_fallback(app, monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    events = list(InsightsReportService().stream_report(1, {"phases": [], "responses": {}}))
+
+    assert events[0][0] == "progress"
+    assert events[-1][0] == "report" and events[-1][1]["_fallback"] is True
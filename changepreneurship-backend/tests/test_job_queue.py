@@ -0,0 +1,266 @@
+import threading
+import time
+
+import pytest
+
+from src.routes.ai_routes import ai_bp
+from src.routes.jobs import jobs_bp
+from src.services import job_queue as job_module
+from src.services.insights_report_service import InsightsReportService
+from src.services.job_queue import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    MemoryJobBackend,
+    PermanentJobError,
+    RedisJobBackend,
+)
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(job_module, "JOB_RETRY_BASE_SECONDS", 0)
+    # Jobs are drained explicitly with run_one in the test thread
+    monkeypatch.setenv("JOB_INPROCESS_WORKERS", "0")
+    jq = JobQueue(MemoryJobBackend())
+    monkeypatch.setattr(job_module, "_job_queue", jq)
+    return jq
+
+
+def register(monkeypatch, job_type, fn):
+    monkeypatch.setitem(job_module._handlers, job_type, fn)
+
+
+def drain(jq):
+    while jq.run_one(timeout=0.01):
+        pass
+
+
+def test_idempotency_key_returns_existing_job(queue, monkeypatch):
+    register(monkeypatch, "echo", lambda payload: payload)
+
+    first = queue.enqueue("echo", {"n": 1}, idempotency_key="k1")
+    second = queue.enqueue("echo", {"n": 2}, idempotency_key="k1")
+    other = queue.enqueue("echo", {"n": 3}, idempotency_key="k2")
+
+    assert second["id"] == first["id"] and second["deduplicated"]
+    assert other["id"] != first["id"]
+
+    drain(queue)
+    assert queue.get(first["id"])["result"] == {"n": 1}
+    # Finished jobs keep answering for the same key
+    assert queue.enqueue("echo", {}, idempotency_key="k1")["id"] == first["id"]
+
+
+def test_failed_attempts_are_retried_with_backoff(queue, monkeypatch):
+    calls = []
+
+    def flaky(payload):
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("provider timeout")
+        return "ok"
+
+    register(monkeypatch, "flaky", flaky)
+    job = queue.enqueue("flaky", {}, max_attempts=3)
+
+    queue.run_one(timeout=0.01)
+    state = queue.get(job["id"])
+    assert state["status"] == QUEUED and state["attempts"] == 1
+    assert state["error"] == "provider timeout" and state["next_run_at"]
+
+    drain(queue)
+    state = queue.get(job["id"])
+    assert state["status"] == SUCCEEDED and state["attempts"] == 3
+    assert state["result"] == "ok" and state["error"] is None
+
+
+def test_exhausted_job_fails_and_releases_key(queue, monkeypatch):
+    def broken(payload):
+        raise RuntimeError("boom")
+
+    register(monkeypatch, "broken", broken)
+    job = queue.enqueue("broken", {}, idempotency_key="same", max_attempts=2)
+    drain(queue)
+
+    state = queue.get(job["id"])
+    assert state["status"] == FAILED and state["attempts"] == 2
+    retry = queue.enqueue("broken", {}, idempotency_key="same")
+    assert retry["id"] != job["id"]
+
+
+def test_permanent_error_is_not_retried(queue, monkeypatch):
+    def missing(payload):
+        raise PermanentJobError("No assessment found")
+
+    register(monkeypatch, "missing", missing)
+    job = queue.enqueue("missing", {}, max_attempts=5)
+    drain(queue)
+
+    state = queue.get(job["id"])
+    assert state["status"] == FAILED and state["attempts"] == 1
+
+
+class ListRedis:
+    """Just the string and list commands RedisJobBackend.requeue_stale uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None, nx=False):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def lpush(self, key, value):
+        self.data.setdefault(key, []).insert(0, value)
+
+    def lrange(self, key, start, end):
+        return list(self.data.get(key, []))
+
+    def lrem(self, key, count, value):
+        items = self.data.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+
+def test_only_running_jobs_with_expired_leases_are_requeued():
+    backend = RedisJobBackend(ListRedis())
+    jobs = {
+        "crashed": {"status": RUNNING, "lease_until": time.time() - 1},
+        "alive": {"status": RUNNING, "lease_until": time.time() + 60},
+        "just_moved": {"status": QUEUED},
+        "done": {"status": SUCCEEDED},
+    }
+    for job_id, job in jobs.items():
+        backend.save({"id": job_id, **job})
+        backend.r.lpush(RedisJobBackend.PROCESSING, job_id)
+
+    assert backend.requeue_stale() == 1
+    assert backend.r.get(RedisJobBackend.QUEUE) == ["crashed"]
+    assert sorted(backend.r.lrange(RedisJobBackend.PROCESSING, 0, -1)) == ["alive", "just_moved"]
+    assert backend.load("crashed")["status"] == QUEUED
+
+
+def test_running_job_lease_is_renewed_until_it_finishes(queue, monkeypatch):
+    monkeypatch.setattr(job_module, "JOB_LEASE_SECONDS", 1)
+    monkeypatch.setattr(job_module, "JOB_HEARTBEAT_SECONDS", 0.05)
+    leases = []
+
+    def slow(payload):
+        leases.append(queue.get(job["id"])["lease_until"])
+        time.sleep(0.3)
+        leases.append(queue.get(job["id"])["lease_until"])
+        return "done"
+
+    register(monkeypatch, "slow", slow)
+    job = queue.enqueue("slow", {})
+    drain(queue)
+
+    assert leases[1] > leases[0]
+    state = queue.get(job["id"])
+    assert state["status"] == SUCCEEDED and "lease_until" not in state
+    assert not [t for t in threading.enumerate() if t.name == f"job-heartbeat-{job['id'][:8]}"]
+
+
+def test_worker_loop_sweeps_periodically(app, queue, monkeypatch):
+    sweeps, runs = [], []
+    stop = threading.Event()
+    monkeypatch.setattr(queue.backend, "requeue_stale", lambda: sweeps.append(1) or 0)
+    monkeypatch.setattr(queue, "run_one", lambda timeout: runs.append(1) or (len(runs) == 3 and stop.set()))
+
+    job_module.work_forever(queue, app, stop)
+    assert (len(runs), len(sweeps)) == (3, 1)
+
+    queue._next_sweep = 0.0
+    queue.sweep_stale()
+    assert len(sweeps) == 2
+
+
+def test_unknown_job_type_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue("nope", {})
+
+
+@pytest.fixture
+def jobs_app(app, queue, monkeypatch):
+    app.register_blueprint(ai_bp)
+    app.register_blueprint(jobs_bp)
+    monkeypatch.setattr(InsightsReportService, "generate_report", lambda self, user_id, data, **kwargs: {
+        "phases": len(data["phases"]),
+    })
+    return app
+
+
+def test_job_endpoints_enqueue_poll_and_return_result(jobs_app, queue, seed_user_with_responses):
+    seed_user_with_responses(session_token="jobs-token")
+    client = jobs_app.test_client()
+    headers = {"Authorization": "Bearer jobs-token"}
+
+    response = client.post("/api/jobs", json={"type": "insights_report"}, headers=headers)
+    assert response.status_code == 202
+    body = response.get_json()
+    job_id = body["job"]["id"]
+    assert body["status_url"] == f"/api/jobs/{job_id}"
+    assert "payload" not in body["job"]
+
+    # Same answers -> same job
+    again = client.post("/api/jobs", json={"type": "insights_report"}, headers=headers).get_json()
+    assert again["job"]["id"] == job_id and again["job"]["deduplicated"]
+
+    assert client.get(f"/api/jobs/{job_id}/result", headers=headers).status_code == 202
+
+    drain(queue)
+    status = client.get(f"/api/jobs/{job_id}", headers=headers).get_json()
+    assert status["job"]["status"] == SUCCEEDED
+    result = client.get(f"/api/jobs/{job_id}/result", headers=headers)
+    assert result.status_code == 200
+    assert result.get_json()["result"] == {"phases": 2}
+
+
+def test_insights_report_async_mode_shares_job(jobs_app, queue, seed_user_with_responses):
+    seed_user_with_responses(session_token="jobs-token")
+    client = jobs_app.test_client()
+    headers = {"Authorization": "Bearer jobs-token"}
+
+    response = client.get("/api/ai/insights-report?async=1", headers=headers)
+    assert response.status_code == 202
+    job_id = response.get_json()["job"]["id"]
+
+    posted = client.post("/api/jobs", json={"type": "insights_report"}, headers=headers).get_json()
+    assert posted["job"]["id"] == job_id
+
+
+def test_forced_async_refresh_regenerates(jobs_app, queue, seed_user_with_responses):
+    seed_user_with_responses(session_token="jobs-token")
+    client = jobs_app.test_client()
+    headers = {"Authorization": "Bearer jobs-token"}
+
+    first = client.get("/api/ai/insights-report?async=1", headers=headers).get_json()["job"]["id"]
+    drain(queue)
+    assert queue.get(first)["status"] == SUCCEEDED
+
+    refreshed = client.get("/api/ai/insights-report?async=1&refresh=1", headers=headers).get_json()["job"]
+    assert refreshed["id"] != first
+    drain(queue)
+    assert queue.get(refreshed["id"])["status"] == SUCCEEDED
+
+
+def test_job_endpoints_validate_and_scope_to_owner(jobs_app, queue, monkeypatch, seed_user_with_responses):
+    register(monkeypatch, "echo", lambda payload: payload)
+    seed_user_with_responses(session_token="jobs-token")
+    client = jobs_app.test_client()
+    headers = {"Authorization": "Bearer jobs-token"}
+
+    assert client.post("/api/jobs", json={"type": "nope"}, headers=headers).status_code == 400
+    missing_phase = client.post("/api/jobs", json={"type": "phase_summary"}, headers=headers)
+    assert missing_phase.status_code == 400
+
+    foreign = queue.enqueue("echo", {}, user_id=9999)
+    assert client.get(f"/api/jobs/{foreign['id']}", headers=headers).status_code == 404
+    assert client.get("/api/jobs/does-not-exist", headers=headers).status_code == 404
@@ -0,0 +1,147 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+from src.utils.audit_log_writer import AuditLogWriter, DailyRollup
+from src.utils.llm_audit_logger import LLMAuditLogger
+
+
+def log_calls(logger, provider, latencies, error_every=0):
+    for i, latency in enumerate(latencies):
+        request_id = logger.log_request(provider=provider, model="m", prompt="p", request_id=f"{provider}-{i}")
+        error = "boom" if error_every and i % error_every == 0 else None
+        logger.log_response(request_id, response_text="ok", tokens_used=10, latency_ms=latency, error=error)
+
+
+def test_entries_are_written_in_background_and_rolled_up(tmp_path):
+    logger = LLMAuditLogger(log_dir=str(tmp_path))
+    log_calls(logger, "groq", [100] * 90 + [2000] * 10, error_every=10)
+    log_calls(logger, "openai", [50, 60])
+    assert logger.writer.flush()
+
+    date_str = os.listdir(tmp_path)[0][10:20]
+    with open(tmp_path / f"llm-audit-{date_str}.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 204
+
+    stats = logger.get_daily_stats(date_str)
+    assert stats["requests"] == 102 and stats["responses"] == 102
+    assert stats["errors"] == 10 and stats["total_tokens"] == 1020
+    assert stats["providers"] == {"groq": 100, "openai": 2}
+    assert stats["provider_stats"]["groq"]["error_rate"] == 0.1
+    assert stats["provider_stats"]["openai"]["errors"] == 0
+    # Histogram buckets are 25% wide
+    assert 100 <= stats["latency_ms"]["p50"] < 125
+    assert 2000 <= stats["latency_ms"]["p99"] < 2500
+
+
+def test_stats_merge_rollup_snapshots_from_other_processes(tmp_path):
+    other = DailyRollup("2026-01-02")
+    other.add({"event": "request"}, "groq")
+    other.add({"event": "response", "latency_ms": 300, "error": "x"}, "groq")
+    with open(tmp_path / "llm-audit-2026-01-02.rollup.99999.json", "w", encoding="utf-8") as f:
+        json.dump(other.to_dict(), f)
+
+    logger = LLMAuditLogger(log_dir=str(tmp_path))
+    stats = logger.get_daily_stats("2026-01-02")
+
+    assert stats["requests"] == 1 and stats["errors"] == 1 and stats["error_rate"] == 1.0
+    assert stats["providers"] == {"groq": 1}
+
+
+def test_days_without_rollups_fall_back_to_scanning_logs(tmp_path):
+    entries = [
+        {"event": "request", "provider": "groq"},
+        {"event": "response", "latency_ms": 100, "tokens_used": 5},
+    ]
+    with gzip.open(tmp_path / "llm-audit-2026-01-01.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in entries))
+
+    stats = LLMAuditLogger(log_dir=str(tmp_path)).get_daily_stats("2026-01-01")
+    assert stats["requests"] == 1 and stats["total_tokens"] == 5 and stats["avg_latency_ms"] == 100
+
+
+def test_old_logs_are_compressed_and_expired(tmp_path):
+    for name in ("llm-audit-2026-03-09.jsonl", "llm-audit-2026-01-01.jsonl", "llm-audit-2026-01-01.rollup.1.json"):
+        (tmp_path / name).write_text('{"event": "request"}\n', encoding="utf-8")
+    (tmp_path / "llm-audit-2026-03-10.jsonl").write_text("", encoding="utf-8")
+
+    writer = AuditLogWriter(str(tmp_path), retention_days=30)
+    writer.compress_and_expire("2026-03-10")
+
+    logs = sorted(name for name in os.listdir(tmp_path) if name != "llm-audit.lock")
+    assert logs == ["llm-audit-2026-03-09.jsonl.gz", "llm-audit-2026-03-10.jsonl"]
+    with gzip.open(tmp_path / "llm-audit-2026-03-09.jsonl.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == '{"event": "request"}\n'
+
+
+def test_old_logs_are_kept_without_a_retention(tmp_path):
+    (tmp_path / "llm-audit-2020-01-01.jsonl").write_text('{"event": "request"}\n', encoding="utf-8")
+    (tmp_path / "llm-audit-2020-01-01.rollup.1.json").write_text("{}", encoding="utf-8")
+
+    AuditLogWriter(str(tmp_path)).compress_and_expire("2026-03-10")
+
+    logs = sorted(name for name in os.listdir(tmp_path) if name != "llm-audit.lock")
+    assert logs == ["llm-audit-2020-01-01.jsonl.gz", "llm-audit-2020-01-01.rollup.1.json"]
+
+
+def test_full_file_is_rotated(tmp_path):
+    now = datetime.utcnow().isoformat()
+    writer = AuditLogWriter(str(tmp_path), max_file_bytes=200)
+    for i in range(10):
+        writer.enqueue({"timestamp": now, "event": "request", "request_id": str(i), "pad": "x" * 50})
+    assert writer.flush()
+
+    names = sorted(os.listdir(tmp_path))
+    assert f"llm-audit-{now[:10]}.1.jsonl" in names
+    total = 0
+    for name in names:
+        if name.endswith(".jsonl"):
+            with open(tmp_path / name, encoding="utf-8") as f:
+                total += len(f.readlines())
+    assert total == 10
+
+
+def count_lines(directory):
+    total = 0
+    for name in os.listdir(directory):
+        if name.endswith(".jsonl"):
+            with open(directory / name, encoding="utf-8") as f:
+                total += len(f.readlines())
+    return total
+
+
+def test_writers_sharing_a_directory_lose_nothing_across_rotations(tmp_path):
+    now = datetime.utcnow().isoformat()
+    # Stand-ins for two gunicorn processes appending to the same daily file
+    writers = [AuditLogWriter(str(tmp_path), batch_size=5, max_file_bytes=2000) for _ in range(2)]
+
+    def produce(writer, prefix):
+        for i in range(200):
+            writer.enqueue({"timestamp": now, "event": "request", "request_id": f"{prefix}{i}", "pad": "x" * 50})
+
+    threads = [threading.Thread(target=produce, args=(w, n)) for n, w in enumerate(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(w.flush() for w in writers)
+
+    assert len([n for n in os.listdir(tmp_path) if n.endswith(".jsonl")]) > 2
+    assert count_lines(tmp_path) == 400
+
+
+def test_writer_reopens_a_file_moved_by_another_process(tmp_path):
+    now = datetime.utcnow().isoformat()
+    writer = AuditLogWriter(str(tmp_path))
+    writer.enqueue({"timestamp": now, "event": "request", "request_id": "1"})
+    assert writer.flush()
+
+    path = tmp_path / f"llm-audit-{now[:10]}.jsonl"
+    os.replace(path, tmp_path / f"llm-audit-{now[:10]}.1.jsonl")
+    writer.enqueue({"timestamp": now, "event": "request", "request_id": "2"})
+    assert writer.flush()
+
+    assert json.loads(path.read_text(encoding="utf-8"))["request_id"] == "2"
@@ -0,0 +1,93 @@
+import pytest
+
+from src.routes.ai_routes import ai_bp
+from src.services.insights_report_service import InsightsReportService, report_cache
+from src.utils.assessment_collector import collect_assessment_data
+from src.utils.llm_budget import ESTIMATED_TOKENS, llm_budget
+from src.utils.llm_metrics import track_llm_call
+
+HEADERS = {"Authorization": "Bearer budget-token"}
+
+
+@pytest.fixture
+def budget_env(monkeypatch):
+    monkeypatch.setenv("LLM_AUDIT_LOGGING", "false")
+    monkeypatch.setenv("LLM_USER_TOKEN_BUDGET", "10000")
+    monkeypatch.setenv("LLM_USER_BUDGET_WINDOW_SECONDS", "3600")
+    return monkeypatch
+
+
+def test_expensive_requests_exhaust_the_window_first(budget_env):
+    assert llm_budget.reserve(1, "insights_report").allowed
+    assert llm_budget.reserve(1, "phase_summary").allowed is False  # 9000 + 2500 > 10000
+
+    refused = llm_budget.reserve(1, "insights_report")
+    assert not refused.allowed
+    assert 3590 <= refused.retry_after <= 3600
+    assert llm_budget.reserve(2, "insights_report").allowed  # budgets are per user
+
+
+def test_charge_is_settled_to_the_tokens_actually_spent(budget_env):
+    with llm_budget.spend(1, "insights_report") as charge:
+        assert charge.allowed and charge.tokens == ESTIMATED_TOKENS["insights_report"]
+        with track_llm_call("mock", "m", "prompt") as call:
+            call.set_usage({"prompt_tokens": 700, "completion_tokens": 300})
+
+    # 1000 tokens used, so two more phase summaries fit
+    assert llm_budget.reserve(1, "phase_summary").allowed
+    assert llm_budget.reserve(1, "phase_summary").allowed
+
+
+def test_cache_hits_cost_nothing(budget_env):
+    for _ in range(5):
+        with llm_budget.spend(1, "insights_report") as charge:
+            assert charge.allowed
+
+
+def test_exhausted_user_gets_rule_based_consensus(app, budget_env, seed_user_with_responses):
+    app.register_blueprint(ai_bp)
+    user_id = seed_user_with_responses(session_token="budget-token")
+    budget_env.setenv("LLM_USER_TOKEN_BUDGET", "5000")
+    llm_budget.reserve(user_id, "ai_consensus")
+
+    response = app.test_client().get("/api/ai/consensus", headers=HEADERS)
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["degraded"] is True and body["degraded_reason"] == "llm_budget"
+    assert int(response.headers["Retry-After"]) == body["retry_after"] > 0
+    assert body["consensus"]["confidence"] == "rule_based"
+    assert body["consensus"]["key_insights"]
+
+
+def test_exhausted_user_is_served_the_stored_report(app, budget_env, seed_user_with_responses):
+    app.register_blueprint(ai_bp)
+    user_id = seed_user_with_responses(session_token="budget-token")
+    report_cache.put(user_id, "older-answers", {"entrepreneur": {"score": 77}})
+    llm_budget.reserve(user_id, "insights_report")
+    budget_env.setattr(InsightsReportService, "generate_report",
+                       lambda *a, **k: pytest.fail("must not call the LLM"))
+
+    body = app.test_client().get("/api/ai/insights-report", headers=HEADERS).get_json()
+
+    assert body["degraded"] is True
+    assert body["report"]["entrepreneur"]["score"] == 77
+
+
+def test_exhausted_user_gets_recommendations_from_the_cached_report(app, budget_env, seed_user_with_responses):
+    user_id = seed_user_with_responses(session_token="budget-token")
+    digest = InsightsReportService._state_digest(collect_assessment_data(user_id))
+    report_cache.put(user_id, digest, {"entrepreneur": {"score": 77, "archetype": "Builder", "strengths": []}})
+    llm_budget.reserve(user_id, "insights_report")
+    budget_env.setattr(InsightsReportService, "generate_report",
+                       lambda *a, **k: pytest.fail("must not call the LLM"))
+    # The test app mounts ai_recommendations_bp under /api; main.py mounts it at the root
+    url = f"/api/api/ai/recommendations/strengths/{user_id}"
+
+    cached = app.test_client().get(url, headers=HEADERS)
+    assert cached.status_code == 200 and "Retry-After" not in cached.headers
+    assert cached.get_json()["data"]["founder_profile"]["score"] == 77
+
+    report_cache.evict_user(user_id)
+    degraded = app.test_client().get(url, headers=HEADERS).get_json()
+    assert degraded["degraded"] is True
@@ -0,0 +1,111 @@
+import time
+
+from src.utils import llm_cache as llm_cache_module
+from src.utils.llm_cache import BoundedTTLCache, LLMCache
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = BoundedTTLCache(max_entries=2, max_bytes=10_000)
+    cache.set("a", {"response": "1"})
+    cache.set("b", {"response": "2"})
+    cache.get("a")
+    cache.set("c", {"response": "3"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"response": "1"}
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 2
+
+
+def test_byte_bound_evicts_until_under_budget():
+    big = {"response": "x" * 400}
+    cache = BoundedTTLCache(max_entries=100, max_bytes=1000)
+    for key in "abc":
+        cache.set(key, big)
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 1000
+    assert cache.get("a") is None
+
+    # Larger than the whole budget: never stored
+    cache.set("huge", {"response": "x" * 2000})
+    assert cache.get("huge") is None
+
+
+def test_entries_expire_after_ttl():
+    cache = BoundedTTLCache(default_ttl=0.05)
+    cache.set("a", {"response": "1"})
+    assert cache.get("a") is not None
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 0 and stats["bytes"] == 0
+
+
+def test_llm_cache_instances_share_process_l1(monkeypatch):
+    shared = BoundedTTLCache(max_entries=10)
+    monkeypatch.setattr(llm_cache_module, "l1_cache", shared)
+    monkeypatch.setenv("LLM_CACHE_TTL_SECONDS", "60")
+
+    LLMCache().set("groq", "m", "prompt", None, "answer")
+    other = LLMCache()
+
+    assert other.get("groq", "m", "prompt") == "answer"
+    assert other.get("groq", "m", "different") is None
+    stats = other.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["backend"] == "memory"
+
+    other.invalidate("groq", "m", "prompt")
+    assert other.get("groq", "m", "prompt") is None
+
+
+class PubSubRedis:
+    """Just the commands LLMCache.invalidate / clear_all and the L1 listener use."""
+
+    def __init__(self, messages=()):
+        self.published = []
+        self.messages = list(messages)
+
+    def delete(self, *keys):
+        pass
+
+    def scan(self, cursor, match=None, count=None):
+        return 0, []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self
+
+    def subscribe(self, channel):
+        self.channel = channel
+
+    def listen(self):
+        return iter(self.messages)
+
+
+def test_invalidations_reach_every_worker_l1(monkeypatch):
+    shared = BoundedTTLCache(max_entries=10)
+    monkeypatch.setattr(llm_cache_module, "l1_cache", shared)
+    redis = PubSubRedis()
+    cache = LLMCache()
+    cache.redis_client = redis
+    key = cache._generate_key("groq", "m", "prompt", None)
+
+    cache.invalidate("groq", "m", "prompt")
+    cache.clear_all()
+    assert redis.published == [
+        (llm_cache_module.INVALIDATION_CHANNEL, key),
+        (llm_cache_module.INVALIDATION_CHANNEL, llm_cache_module.CLEAR_ALL),
+    ]
+
+    # Another worker's listener applies them to its own L1
+    shared.set(key, {"response": "stale"})
+    shared.set("other", {"response": "kept"})
+    llm_cache_module._listen(PubSubRedis([{"data": key.encode()}]))
+    assert shared.get(key) is None and shared.get("other") is not None
+
+    llm_cache_module._listen(PubSubRedis([{"data": b"*"}]))
+    assert shared.stats()["entries"] == 0
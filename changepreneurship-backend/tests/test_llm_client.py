@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import llm_client as llm_client_module
+from src.services.llm_client import LLMClient
+from src.services.llm_pool import get_provider_client, reset_pool
+from src.services.llm_router import reset_router
+
+
+@pytest.fixture
+def llm_env(monkeypatch):
+    monkeypatch.setenv("LLM_AUDIT_LOGGING", "false")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_TIMEOUT_SECONDS", "7")
+    reset_pool()
+    reset_router()
+    yield monkeypatch
+    reset_pool()
+    reset_router()
+
+
+def test_provider_client_is_shared_per_process(llm_env):
+    first = get_provider_client("groq", api_key="test-key")
+
+    assert get_provider_client("groq", api_key="test-key") is first
+    assert get_provider_client("groq", api_key="other-key") is not first
+
+    llm_env.setenv("LLM_PROVIDER", "groq")
+    llm_env.setenv("GROQ_API_KEY", "test-key")
+    assert LLMClient()._provider_client() is LLMClient()._provider_client() is first
+
+
+def test_missing_groq_key_is_reported(llm_env):
+    with pytest.raises(RuntimeError, match="GROQ_API_KEY"):
+        get_provider_client("groq", api_key="")
+
+
+class RecordingCompletions:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            return iter(
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+                for part in ["Hel", "lo", None]
+            )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Hello "))])
+
+
+def test_requests_carry_timeout_and_stream_yields_deltas(llm_env):
+    completions = RecordingCompletions()
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    llm_env.setattr(llm_client_module, "get_provider_client", lambda *a, **k: fake)
+    llm_env.setenv("LLM_PROVIDER", "openai")
+    client = LLMClient()
+
+    assert client.generate("hi") == "Hello"
+    assert list(client.stream("hi")) == ["Hel", "lo"]
+    assert [c["timeout"] for c in completions.calls] == [7, 7]
+    assert [c["stream"] for c in completions.calls] == [False, True]
+
+
+def test_mock_provider_stream_and_agenerate_match_generate(llm_env):
+    llm_env.setenv("LLM_PROVIDER", "mock")
+    client = LLMClient()
+
+    chunks = list(LLMClient().stream("Give me an executive summary"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == client.generate("Give me an executive summary")
+    assert asyncio.run(LLMClient().agenerate("Give me an executive summary")) == "".join(chunks)
@@ -0,0 +1,112 @@
+import time
+
+from src.services.llm_consensus import LLMConsensus
+from src.utils.llm_metrics import metrics, metrics_context, spend_tracker
+
+
+class SlowClient:
+    def __init__(self, answer, delay=0.0, review="CONFIRM niche insight", review_delay=None):
+        self.answer = answer
+        self.delay = delay
+        self.review = review
+        self.review_delay = delay if review_delay is None else review_delay
+
+    def generate(self, prompt, system=None, options=None):
+        if prompt.startswith("Minority claim"):
+            time.sleep(self.review_delay)
+            return self.review
+        time.sleep(self.delay)
+        return self.answer
+
+
+def consensus_with(clients, **kwargs):
+    consensus = LLMConsensus(configs=[{"provider": "mock", "model": f"m{i}"} for i in range(len(clients))], **kwargs)
+    for entry, client in zip(consensus.clients, clients):
+        entry["client"] = client
+    return consensus
+
+
+def test_initial_and_review_calls_run_in_parallel():
+    clients = [
+        SlowClient("- shared\n- only a", delay=0.2),
+        SlowClient("- shared\n- only b", delay=0.2),
+        SlowClient("- shared", delay=0.2, review="REJECT as hallucination"),
+    ]
+
+    start = time.monotonic()
+    result = consensus_with(clients).run("prompt")
+    elapsed = time.monotonic() - start
+
+    # 3 generations + 4 reviews sequentially would take ~1.4s
+    assert elapsed < 0.8
+    assert result["majority"] == ["shared"]
+    assert [r["claim"] for r in result["minority_reviews"]] == ["only a", "only b"]
+    assert len(result["calls"]) == 7
+    assert all(c["status"] == "ok" and c["duration_ms"] >= 150 for c in result["calls"])
+    assert result["partial"] is False
+
+
+def test_slow_call_times_out_and_result_is_partial():
+    clients = [
+        SlowClient("- shared"),
+        SlowClient("- shared"),
+        SlowClient("- shared", delay=2.0),
+    ]
+
+    start = time.monotonic()
+    result = consensus_with(clients, call_timeout=0.3).run("prompt")
+
+    assert time.monotonic() - start < 1.0
+    assert result["partial"] is True
+    assert result["majority"] == ["shared"]
+    statuses = sorted(c["status"] for c in result["calls"])
+    assert statuses == ["ok", "ok", "timeout"]
+
+
+def test_global_deadline_stops_peer_reviews():
+    clients = [
+        SlowClient("- a", review="CONFIRM", review_delay=1.0),
+        SlowClient("- b", review="CONFIRM", review_delay=1.0),
+    ]
+
+    start = time.monotonic()
+    result = consensus_with(clients, deadline=0.3).run("prompt")
+
+    assert time.monotonic() - start < 0.8
+    assert result["partial"] is True
+    assert [c["status"] for c in result["calls"] if c["kind"] == "generate"] == ["ok", "ok"]
+    assert {c["status"] for c in result["calls"] if c["kind"] == "review"} == {"timeout"}
+    assert all(r["details"] == [] for r in result["minority_reviews"])
+
+
+def test_failed_call_is_reported():
+    class Broken:
+        def generate(self, prompt, system=None, options=None):
+            raise RuntimeError("provider down")
+
+    result = consensus_with([SlowClient("- x"), Broken()]).run("prompt")
+
+    broken = [c for c in result["calls"] if c["status"] == "error"]
+    assert len(broken) == 1 and broken[0]["error"] == "provider down"
+    assert [r["model"] for r in result["raw"]] == ["m0"]
+
+
+def test_consensus_calls_are_charged_and_tagged_to_the_caller(monkeypatch):
+    monkeypatch.setenv("LLM_AUDIT_LOGGING", "false")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    # LLMConsensus points LLM_PROVIDER / LLM_MODEL at each client it builds
+    monkeypatch.setenv("LLM_PROVIDER", "mock")
+    monkeypatch.setenv("LLM_MODEL", "m0")
+    metrics.reset()
+    consensus = LLMConsensus(configs=[{"provider": "mock", "model": "m0"}, {"provider": "mock", "model": "m1"}])
+
+    with metrics_context(endpoint="executive_summary", user_id=7), spend_tracker() as spent:
+        consensus.run("prompt")
+
+    counters = metrics.snapshot()["counters"]
+    requests = [c for c in counters if c["name"] == "llm_requests_total"]
+    tokens = [c for c in counters if c["name"] == "llm_tokens_total"]
+    assert sum(c["value"] for c in requests) == 2
+    assert {c["labels"]["endpoint"] for c in requests + tokens} == {"executive_summary"}
+    assert spent.tokens == sum(c["value"] for c in tokens) > 0
+    assert [u["user_id"] for u in metrics.snapshot(include_users=True)["top_users"]] == [7]
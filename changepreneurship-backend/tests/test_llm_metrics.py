@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.routes.metrics import metrics_bp
+from src.services import llm_client as llm_client_module
+from src.services.llm_client import LLMClient
+from src.utils.llm_cache import l1_cache
+from src.utils.llm_metrics import estimate_cost, metrics, metrics_context, usage_from
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    l1_cache.clear()
+    yield
+    metrics.reset()
+    l1_cache.clear()
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if kwargs.get("stream"):
+            return iter([
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Hel"))], x_groq=None),
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="lo"))], x_groq=None),
+                SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=SimpleNamespace(prompt_tokens=7, completion_tokens=2))),
+            ])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Hello"))],
+            usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=500, total_tokens=1500),
+        )
+
+
+@pytest.fixture
+def groq_client(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "groq")
+    monkeypatch.setenv("LLM_MODEL", "llama-3.3-70b-versatile")
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(llm_client_module, "get_provider_client", lambda *a, **k: fake)
+    client = LLMClient()
+    client.audit_logger.writer = None  # keep audit entries out of the repo logs
+    client.audit_logger.enabled = False
+    return client
+
+
+def counter(name, **labels):
+    return sum(
+        c["value"] for c in metrics.snapshot()["counters"]
+        if c["name"] == name and all(c["labels"].get(k) == str(v) for k, v in labels.items())
+    )
+
+
+def test_usage_is_normalised_across_providers():
+    openai_like = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=3, completion_tokens=4))
+    anthropic_like = SimpleNamespace(usage=SimpleNamespace(input_tokens=5, output_tokens=6))
+    groq_stream_end = SimpleNamespace(x_groq=SimpleNamespace(usage=SimpleNamespace(prompt_tokens=1, completion_tokens=2)))
+
+    assert usage_from(openai_like)["total_tokens"] == 7
+    assert usage_from(anthropic_like) == {"prompt_tokens": 5, "completion_tokens": 6, "total_tokens": 11}
+    assert usage_from({"prompt_eval_count": 8, "eval_count": 9})["total_tokens"] == 17
+    assert usage_from(groq_stream_end)["completion_tokens"] == 2
+    assert usage_from(SimpleNamespace(choices=[])) is None
+
+
+def test_cost_estimate_uses_model_pricing():
+    assert estimate_cost("llama-3.3-70b-versatile", 1_000_000, 1_000_000) == pytest.approx(1.38)
+    assert estimate_cost("unknown-model", 10, 10) is None
+
+
+def test_generate_records_tokens_cost_and_tags(groq_client):
+    with metrics_context(endpoint="ai.get_consensus", user_id=42):
+        assert groq_client.generate("prompt") == "Hello"
+        assert groq_client.generate("prompt") == "Hello"  # L1 cache hit
+
+    assert counter("llm_requests_total", endpoint="ai.get_consensus", cache="miss", status="ok") == 1
+    assert counter("llm_requests_total", cache="hit") == 1
+    assert counter("llm_tokens_total", kind="prompt") == 1000
+    assert counter("llm_tokens_total", kind="completion") == 500
+    assert counter("llm_cost_usd_total") == pytest.approx((1000 * 0.59 + 500 * 0.79) / 1e6)
+
+    users = metrics.snapshot(include_users=True)["top_users"]
+    assert users == [{"user_id": 42, "calls": 2, "cache_hits": 1, "tokens": 1500, "cost_usd": pytest.approx(0.000985)}]
+
+
+def test_stream_records_time_to_first_token_and_stream_usage(groq_client):
+    assert "".join(groq_client.stream("stream prompt")) == "Hello"
+
+    histograms = {h["name"]: h for h in metrics.snapshot()["histograms"]}
+    assert histograms["llm_ttft_ms"]["count"] == 1
+    assert histograms["llm_latency_ms"]["count"] == 1
+    assert counter("llm_tokens_total", kind="prompt") == 7
+
+
+def test_provider_errors_are_counted(groq_client, monkeypatch):
+    def boom(**kwargs):
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setattr(groq_client._provider_client().chat.completions, "create", boom)
+    with pytest.raises(RuntimeError):
+        groq_client.generate("failing prompt")
+
+    assert counter("llm_requests_total", status="error") == 1
+
+
+def test_metrics_endpoint_serves_prometheus_and_json(app, groq_client, monkeypatch):
+    app.register_blueprint(metrics_bp)
+    client = app.test_client()
+    groq_client.generate("prompt")
+
+    text = client.get("/api/metrics").get_data(as_text=True)
+    assert "# TYPE llm_latency_ms histogram" in text
+    assert 'llm_tokens_total{endpoint="unknown",kind="prompt",model="llama-3.3-70b-versatile",provider="groq"} 1000' in text
+    assert 'le="+Inf"' in text and "llm_cache_l1_entries 1" in text
+
+    data = client.get("/api/metrics?format=json").get_json()
+    assert "top_users" not in data and data["llm_cache"]["entries"] == 1
+
+    # Without a token only loopback callers are served
+    assert client.get("/api/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"}).status_code == 401
+
+    monkeypatch.setenv("METRICS_TOKEN", "secret")
+    assert client.get("/api/metrics").status_code == 401
+    authed = client.get("/api/metrics?format=json", headers={"Authorization": "Bearer secret"})
+    assert authed.status_code == 200 and "top_users" in authed.get_json()
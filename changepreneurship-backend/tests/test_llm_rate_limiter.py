@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.llm_metrics import metrics
+from src.utils.llm_rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    LLMRateLimiter,
+    RateLimitTimeout,
+    llm_wait_deadline,
+)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    # 600 tokens per minute = 10 tokens per second
+    monkeypatch.setenv("LLM_RATE_LIMITS", '{"test": {"rpm": 600, "tpm": 600}}')
+    monkeypatch.setenv("LLM_RATE_BACKGROUND_RESERVE", "0")
+    metrics.reset()
+    return LLMRateLimiter()
+
+
+def wait_histogram(priority):
+    return [h for h in metrics.snapshot()["histograms"]
+            if h["name"] == "llm_rate_wait_ms" and h["labels"]["priority"] == priority]
+
+
+def test_unlisted_provider_is_not_limited(limiter):
+    assert limiter.acquire("mock", "m", 10 ** 6) is None
+
+
+def test_call_waits_for_refill_and_records_the_wait(limiter):
+    limiter.acquire("test", "m", 600)
+
+    started = time.monotonic()
+    limiter.acquire("test", "m", 5)
+    assert 0.4 <= time.monotonic() - started < 1.0
+    assert wait_histogram(INTERACTIVE)[-1]["count"] == 2
+
+
+def test_deadline_fails_fast_instead_of_sleeping(limiter, monkeypatch):
+    monkeypatch.setenv("LLM_RATE_WAIT_INTERACTIVE_SECONDS", "0.2")
+    limiter.acquire("test", "m", 600)
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("test", "m", 300)  # needs ~30s of refill
+    assert time.monotonic() - started < 0.1
+
+
+def test_batch_deadline_replaces_the_per_call_wait(limiter, monkeypatch):
+    monkeypatch.setenv("LLM_RATE_WAIT_INTERACTIVE_SECONDS", "0.1")
+    limiter.acquire("test", "m", 600)
+
+    with llm_wait_deadline(2):
+        started = time.monotonic()
+        limiter.acquire("test", "m", 5)  # ~0.5s of refill, past the per-call wait
+    assert time.monotonic() - started >= 0.4
+
+
+def test_background_calls_leave_headroom_for_interactive(limiter, monkeypatch):
+    monkeypatch.setenv("LLM_RATE_BACKGROUND_RESERVE", "0.2")
+    monkeypatch.setenv("LLM_RATE_WAIT_BACKGROUND_SECONDS", "0.2")
+    limiter.acquire("test", "m", 450)
+
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("test", "m", 100, priority=BACKGROUND)
+    assert limiter.acquire("test", "m", 100, priority=INTERACTIVE) is not None
+
+
+def test_settle_returns_unused_reservation(limiter):
+    grant = limiter.acquire("test", "m", 600)
+    limiter.settle(grant, used_tokens=100)
+
+    started = time.monotonic()
+    limiter.acquire("test", "m", 450)
+    assert time.monotonic() - started < 0.1
+
+
+def test_interactive_waiter_goes_ahead_of_background(limiter):
+    limiter.acquire("test", "m", 600)
+    order = []
+
+    def take(priority):
+        limiter.acquire("test", "m", 5, priority=priority)
+        order.append(priority)
+
+    background = threading.Thread(target=take, args=(BACKGROUND,))
+    background.start()
+    time.sleep(0.1)
+    take(INTERACTIVE)
+    background.join()
+
+    assert order == [INTERACTIVE, BACKGROUND]
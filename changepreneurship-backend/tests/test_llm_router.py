@@ -0,0 +1,182 @@
+import time
+
+import pytest
+
+from src.services.llm_client import LLMClient
+from src.utils.llm_rate_limiter import RateLimitTimeout
+from src.services.llm_router import (
+    ProviderRouter,
+    ProvidersUnavailable,
+    Route,
+    breaker_for,
+    latency_for,
+    parse_routes,
+    reset_router,
+)
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    monkeypatch.setenv("LLM_AUDIT_LOGGING", "false")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_PROVIDERS", "mock:primary,mock:secondary")
+    monkeypatch.setenv("LLM_HEDGE_DEFAULT_MS", "50")
+    monkeypatch.setenv("LLM_HEDGE_MIN_MS", "10")
+    monkeypatch.setenv("LLM_BREAKER_FAILURES", "2")
+    reset_router()
+    calls = []
+    behaviour = {}
+
+    def fake_mock(self, prompt, system, options):
+        calls.append(self.model)
+        action = behaviour.get(self.model)
+        if action == "fail":
+            raise RuntimeError(f"{self.model} down")
+        if action == "slow":
+            time.sleep(0.5)
+        return f"answer from {self.model}"
+
+    monkeypatch.setattr(LLMClient, "_generate_mock", fake_mock)
+    yield calls, behaviour
+    reset_router()
+
+
+def test_routes_parse_in_order_and_default_the_model():
+    default = Route("groq", "llama-3.3-70b-versatile")
+    assert parse_routes("", default) == [default]
+    assert parse_routes("openai:gpt-4o-mini, groq, ollama:llama3:8b", default) == [
+        Route("openai", "gpt-4o-mini"), default, Route("ollama", "llama3:8b"),
+    ]
+
+
+def test_route_for_another_provider_must_name_its_model():
+    with pytest.raises(ValueError, match="openai"):
+        parse_routes("groq, openai", Route("groq", "llama-3.3-70b-versatile"))
+
+
+def test_each_route_uses_its_own_providers_key(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "openai")
+    monkeypatch.setenv("LLM_API_KEY", "sk-openai")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant")
+    monkeypatch.setenv("LLM_PROVIDERS", "openai:gpt-4o-mini,anthropic:claude-3-5-haiku-latest")
+
+    client = LLMClient()
+    assert client.api_key == "sk-openai"
+    fallback = client._for_route(Route("anthropic", "claude-3-5-haiku-latest"))
+    assert (fallback.provider, fallback.model, fallback.api_key) == ("anthropic", "claude-3-5-haiku-latest", "sk-ant")
+
+
+def test_single_route_is_held_to_the_timeout():
+    router = ProviderRouter([Route("mock", "only")], timeout=0.1)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        router.call(lambda route: time.sleep(1))
+    assert time.monotonic() - started < 0.5
+
+
+def test_slow_primary_is_hedged_and_first_answer_wins(routed):
+    calls, behaviour = routed
+    behaviour["primary"] = "slow"
+
+    started = time.monotonic()
+    assert LLMClient().generate("hi") == "answer from secondary"
+    assert time.monotonic() - started < 0.4
+    assert calls == ["primary", "secondary"]
+
+
+def test_fast_primary_is_not_hedged(routed):
+    calls, _ = routed
+    assert LLMClient().generate("hi") == "answer from primary"
+    time.sleep(0.1)
+    assert calls == ["primary"]
+
+
+def test_failed_provider_fails_over_and_opens_its_breaker(routed):
+    calls, behaviour = routed
+    behaviour["primary"] = "fail"
+    client = LLMClient()
+
+    assert client.generate("one") == "answer from secondary"
+    assert client.generate("two") == "answer from secondary"
+    assert breaker_for(Route("mock", "primary")).state == "open"
+
+    calls.clear()
+    assert client.generate("three") == "answer from secondary"
+    assert calls == ["secondary"]  # skipped, not waited on
+
+
+def test_breaker_probes_again_after_reset(routed, monkeypatch):
+    calls, behaviour = routed
+    monkeypatch.setenv("LLM_BREAKER_RESET_SECONDS", "0.05")
+    behaviour["primary"] = "fail"
+    client = LLMClient()
+    client.generate("one")
+    client.generate("two")
+
+    behaviour.clear()
+    time.sleep(0.06)
+    calls.clear()
+    assert client.generate("three") == "answer from primary"
+    assert breaker_for(Route("mock", "primary")).state == "closed"
+
+
+def test_all_routes_open_fails_fast(routed, monkeypatch):
+    _, behaviour = routed
+    monkeypatch.setenv("LLM_PROVIDERS", "mock:primary")
+    behaviour["primary"] = "fail"
+    client = LLMClient()
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="primary down"):
+            client.generate("hi")
+
+    with pytest.raises(ProvidersUnavailable):
+        client.generate("hi")
+
+
+def test_hedge_delay_follows_observed_p95(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_MIN_SAMPLES", "20")
+    reset_router()
+    route = Route("mock", "p95")
+    router = ProviderRouter([route], timeout=10)
+    assert router.hedge_delay(route) == 5.0  # default until enough samples
+
+    for i in range(100):
+        latency_for(route).observe(1.0 + i / 100)
+    assert router.hedge_delay(route) == pytest.approx(1.95)
+
+    monkeypatch.setenv("LLM_HEDGE_MAX_MS", "1500")
+    assert ProviderRouter([route], timeout=10).hedge_delay(route) == 1.5
+    reset_router()
+
+
+def test_stream_fails_over_before_the_first_chunk(routed):
+    calls, behaviour = routed
+    behaviour["primary"] = "fail"
+
+    assert "".join(LLMClient().stream("hi")) == "answer from secondary"
+    assert calls == ["primary", "secondary"]
+
+
+@pytest.mark.parametrize("abandon", ["disconnect", "rate_limited"])
+def test_stream_never_keeps_the_half_open_probe(routed, monkeypatch, abandon):
+    _, behaviour = routed
+    monkeypatch.setenv("LLM_PROVIDERS", "mock:primary")
+    monkeypatch.setenv("LLM_BREAKER_RESET_SECONDS", "0")
+    breaker = breaker_for(Route("mock", "primary"))
+    breaker.record_failure()
+    breaker.record_failure()
+    if abandon == "rate_limited":
+        def limited(self, prompt, system, options, call=None):
+            raise RateLimitTimeout("no capacity")
+            yield
+        monkeypatch.setattr(LLMClient, "_stream_provider", limited)
+
+    stream = LLMClient().stream("hi")
+    if abandon == "disconnect":
+        assert next(stream)
+        stream.close()  # GeneratorExit at the yield, as when an SSE client goes away
+    else:
+        with pytest.raises(RateLimitTimeout):
+            list(stream)
+
+    assert breaker.allow()
@@ -0,0 +1,124 @@
+import pytest
+
+from src.models.assessment import PhaseSummary, db
+from src.routes.ai_routes import ai_bp
+from src.services import job_queue as job_module
+from src.services.job_queue import JobQueue, MemoryJobBackend
+from src.services.phase_summary_service import PhaseSummaryService
+from src.services.phase_summary_store import PhaseSummaryStore
+
+HEADERS = {"Authorization": "Bearer summary-token"}
+
+
+@pytest.fixture
+def summary_app(app, monkeypatch, seed_user_with_responses):
+    app.register_blueprint(ai_bp)
+    monkeypatch.setenv("JOB_INPROCESS_WORKERS", "0")
+    jq = JobQueue(MemoryJobBackend())
+    monkeypatch.setattr(job_module, "_job_queue", jq)
+
+    calls = []
+
+    def fake_generate(self, phase_id, phase_name, responses):
+        calls.append(sorted(r.get_response_value() for r in responses if r.question_id == "goal"))
+        return {"phase_id": phase_id, "score": 80, "headline": f"summary {len(calls)}"}
+
+    monkeypatch.setattr(PhaseSummaryService, "generate_summary", fake_generate)
+    app.summary_calls = calls
+    app.job_queue = jq
+    app.user_id = seed_user_with_responses(session_token="summary-token")
+    return app
+
+
+def drain(jq):
+    while jq.run_one(timeout=0.01):
+        pass
+
+
+def submit(client, goal="Grow"):
+    response = client.post("/api/assessment/self_discovery/submit", headers=HEADERS,
+                           json={"responses": {"goal": goal}})
+    assert response.status_code == 201
+
+
+def fetch_summary(client):
+    return client.post("/api/ai/phase-summary", headers=HEADERS, json={"phase_id": "self_discovery"})
+
+
+def test_completion_precomputes_summary(summary_app):
+    client = summary_app.test_client()
+    submit(client)
+
+    pending = fetch_summary(client)
+    assert pending.status_code == 202
+    assert pending.get_json()["status"] == "pending"
+    assert summary_app.summary_calls == []
+
+    drain(summary_app.job_queue)
+    ready = fetch_summary(client)
+    assert ready.status_code == 200
+    assert ready.get_json()["summary"]["headline"] == "summary 1"
+    assert len(summary_app.summary_calls) == 1
+
+
+def test_changed_answers_invalidate_and_identical_resaves_reuse(summary_app):
+    client = summary_app.test_client()
+    submit(client)
+    drain(summary_app.job_queue)
+
+    submit(client, goal="Grow")  # same answers
+    drain(summary_app.job_queue)
+    assert len(summary_app.summary_calls) == 1
+    assert fetch_summary(client).get_json()["summary"]["headline"] == "summary 1"
+
+    submit(client, goal="Scale")
+    assert fetch_summary(client).status_code == 202
+    drain(summary_app.job_queue)
+    assert summary_app.summary_calls[-1] == ["Scale"]
+    assert fetch_summary(client).get_json()["summary"]["headline"] == "summary 2"
+
+
+def test_result_for_superseded_answers_is_dropped(summary_app):
+    client = summary_app.test_client()
+    submit(client, goal="First")
+    submit(client, goal="Second")  # before the first job ran
+
+    drain(summary_app.job_queue)
+
+    assert summary_app.summary_calls == [["Second"]]
+    row = PhaseSummaryStore.get(summary_app.user_id, "self_discovery")
+    assert row.status == PhaseSummary.READY and row.revision == 2
+
+
+def test_fallback_summary_is_served_and_retried(summary_app, monkeypatch):
+    client = summary_app.test_client()
+    monkeypatch.setattr(PhaseSummaryService, "generate_summary",
+                        lambda self, phase_id, phase_name, responses: {"_fallback": True, "headline": "fallback"})
+    submit(client)
+    drain(summary_app.job_queue)
+
+    failed = fetch_summary(client).get_json()
+    assert failed["status"] == "failed" and failed["summary"]["headline"] == "fallback"
+
+    monkeypatch.setattr(PhaseSummaryService, "generate_summary",
+                        lambda self, phase_id, phase_name, responses: {"headline": "real"})
+    assert fetch_summary(client).status_code == 202
+    drain(summary_app.job_queue)
+    assert fetch_summary(client).get_json()["summary"]["headline"] == "real"
+
+
+def test_row_created_by_a_concurrent_save_is_reused(summary_app, monkeypatch):
+    real_get = PhaseSummaryStore.get
+
+    def get_after_racing_save(user_id, phase_id):
+        # Another save completes the phase between our lookup and our insert
+        monkeypatch.setattr(PhaseSummaryStore, "get", real_get)
+        db.session.add(PhaseSummary(user_id=user_id, phase_id=phase_id, revision=1))
+        db.session.flush()
+        return None
+
+    monkeypatch.setattr(PhaseSummaryStore, "get", get_after_racing_save)
+    submit(summary_app.test_client())
+
+    rows = PhaseSummary.query.filter_by(user_id=summary_app.user_id, phase_id="self_discovery").all()
+    assert [(row.status, row.revision) for row in rows] == [(PhaseSummary.PENDING, 2)]
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src.services.ai_consensus import AIConsensusService
+from src.services.insights_report_service import InsightsReportService
+from src.utils.llm_metrics import estimate_tokens
+from src.utils.prompt_packer import PromptPacker, token_budget
+
+
+def response(question, value, section="general", **extra):
+    return {"question_id": question, "question_text": question, "section_id": section,
+            "response_value": value, **extra}
+
+
+def test_repeated_question_keeps_latest_answer():
+    packed = PromptPacker(1000, weights={}).pack({"p": [
+        response("What problem do you solve?", "An early draft answer"),
+        response("What  problem do you solve", "The revised answer"),
+        response("Who is the customer?", "Freelancers"),
+    ]})
+
+    assert packed.duplicates == 1
+    assert packed.lines["p"] == [
+        "[general] Q: What problem do you solve → A: The revised answer",
+        "[general] Q: Who is the customer? → A: Freelancers",
+    ]
+
+
+def test_pack_stays_within_budget_and_prefers_informative_answers():
+    responses = [response(f"Short {i}", "yes") for i in range(50)]
+    responses.append(response("Describe your idea", "A marketplace that " + "connects makers " * 20))
+    responses.append(response("Core problem", "Small shops " * 20, section="problem_definition"))
+
+    packed = PromptPacker(150, weights={"problem_definition": 2.0}).pack({"p": responses})
+
+    assert packed.tokens_used <= 150
+    assert packed.dropped > 0
+    text = "\n".join(packed.lines["p"])
+    assert "Core problem" in text and "Describe your idea" in text
+    # Output keeps the original answer order
+    assert text.index("Describe your idea") < text.index("Core problem")
+
+
+def test_every_group_gets_its_best_answers_first():
+    groups = {
+        "verbose": [response(f"Q{i}", "long answer text " * 30) for i in range(30)],
+        "terse": [response("Only question", "ok")],
+    }
+    packed = PromptPacker(400).pack(groups, reserved="header " * 40)
+
+    assert packed.shown("terse") == 1
+    assert 0 < packed.shown("verbose") < 30
+    assert packed.totals == {"verbose": 30, "terse": 1}
+
+
+def test_orm_rows_use_updated_at_for_recency():
+    now = datetime(2026, 1, 1)
+
+    def row(question, value, age_days):
+        return SimpleNamespace(question_text=question, question_id=question, section_id="s",
+                               response_value=value, updated_at=now - timedelta(days=age_days),
+                               get_response_value=lambda: value)
+
+    # Listed newest first: the older duplicate must not win
+    packed = PromptPacker(1000).pack({"p": [row("Goal", "new goal", 0), row("Goal", "old goal", 10)]})
+    assert packed.lines["p"] == ["[s] Q: Goal → A: new goal"]
+
+
+def test_token_budget_is_configurable_and_capped_by_model(monkeypatch):
+    assert token_budget("phase_summary") == 1500
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGETS", '{"phase_summary": 900, "insights_report:llama3-8b-8192": 50000}')
+    assert token_budget("phase_summary", "llama-3.3-70b-versatile") == 900
+    assert token_budget("insights_report", "llama3-8b-8192") == 7000
+
+
+def test_services_build_prompts_within_budget(monkeypatch):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGETS", '{"insights_report": 800, "ai_consensus": 300}')
+    data = {
+        "phases": [{"id": "self_discovery", "name": "Self Discovery", "progress": 100, "completed": True}],
+        "responses": {"self_discovery": [response(f"Question {i}", "detail " * 60) for i in range(40)]},
+    }
+
+    prompt = InsightsReportService()._build_user_prompt(data)
+    assert estimate_tokens(prompt) <= 800
+    assert "40 answers," in prompt and "most informative shown" in prompt
+
+    summary = AIConsensusService()._prepare_business_summary(data["responses"], {})
+    assert summary.startswith("\n## Self Discovery")
+    assert estimate_tokens(summary) <= 300
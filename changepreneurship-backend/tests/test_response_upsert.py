@@ -0,0 +1,137 @@
+import json
+
+from sqlalchemy.dialects import postgresql
+
+from src.models.assessment import Assessment, AssessmentResponse, UserAssessmentStats, db
+from src.routes.assessment import save_assessment_responses
+from src.services.assessment_stats_service import AssessmentStatsService
+from src.utils.response_upsert import _inserted_flag, upsert_responses
+
+
+def item(question_id, value="a", response_type="text"):
+    return {
+        "section_id": "general",
+        "question_id": question_id,
+        "question_text": question_id,
+        "response_type": response_type,
+        "response_value": value,
+    }
+
+
+def test_upsert_inserts_and_updates_in_one_statement(app, create_user_with_stats, count_statements):
+    _, assessment_id = create_user_with_stats()
+
+    with app.app_context():
+        result = upsert_responses(assessment_id, [item("q1"), item("q2")], known_count=0)
+        assert sorted(q for q, _ in result.inserted) == ["q1", "q2"]
+        assert result.response_count == 2
+
+        with count_statements() as statements:
+            result = upsert_responses(
+                assessment_id,
+                [item("q1", value={"x": 1}), item("q3"), item("q3", value="last")],
+                known_count=2,
+            )
+
+        assert len(statements) == 1
+        assert statements[0].lstrip().upper().startswith("INSERT")
+        assert result.inserted == [("q3", "text")]
+        assert result.updated == [("q1", "text", "text")]
+        assert result.response_count == 3
+
+        values = {
+            r.question_id: r.response_value
+            for r in AssessmentResponse.query.filter_by(assessment_id=assessment_id)
+        }
+        assert values == {"q1": '{"x": 1}', "q2": "a", "q3": "last"}
+
+
+def test_upsert_reports_previous_type_on_type_change(app, create_user_with_stats):
+    _, assessment_id = create_user_with_stats()
+
+    with app.app_context():
+        upsert_responses(assessment_id, [item("q1")])
+        result = upsert_responses(assessment_id, [item("q1", response_type="scale")])
+
+        assert result.inserted == []
+        assert result.updated == [("q1", "text", "scale")]
+        assert result.response_count == 1
+        assert AssessmentResponse.query.filter_by(assessment_id=assessment_id).one().response_type == "scale"
+
+
+def test_submit_phase_assessment_resubmit_updates_in_place(app, client, create_user_with_stats):
+    user_id, _ = create_user_with_stats()
+    headers = {"Authorization": "Bearer stats-token"}
+
+    first = client.post("/api/assessment/self_discovery/submit",
+                        json={"responses": {"q1": "a", "q2": "b"}}, headers=headers)
+    assert first.status_code == 201
+    second = client.post("/api/assessment/self_discovery/submit",
+                         json={"responses": {"q2": "c", "q3": "d"}}, headers=headers)
+    assert second.status_code == 201
+
+    with app.app_context():
+        rows = AssessmentResponse.query.filter_by(assessment_id=first.get_json()["assessment_id"]).all()
+        assert sorted((r.question_id, r.response_value) for r in rows) == [("q1", "a"), ("q2", "c"), ("q3", "d")]
+
+        stats = db.session.get(UserAssessmentStats, user_id).to_dict()
+        rebuilt = AssessmentStatsService.rebuild(user_id).to_dict()
+        assert stats["total_responses"] == rebuilt["total_responses"] == 3
+        assert stats["completed_assessments"] == 1
+
+
+def test_save_response_uses_cached_count(app, create_user_with_stats, save, count_statements):
+    _, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+
+    with app.app_context():
+        with count_statements() as statements:
+            assert save(assessment_id, "q2").status_code == 200
+
+    assert not any("count(" in s.lower() for s in statements)
+    assert save(assessment_id, "q2").get_json()["assessment"]["progress_percentage"] == round(2 / 7 * 100, 2)
+
+
+def test_save_reads_the_count_under_the_stats_row_lock(app, create_user_with_stats):
+    user_id, assessment_id = create_user_with_stats()
+
+    with app.app_context():
+        save_assessment_responses(db.session.get(Assessment, assessment_id), [item("q1")])
+        db.session.commit()
+        assessment = db.session.get(Assessment, assessment_id)
+        stats = db.session.get(UserAssessmentStats, user_id)
+        phases = stats.get_json_field("phase_stats")
+
+        # Another worker saves q2 after this one loaded the stats row
+        phases["self_discovery"]["responses"] = 2
+        db.session.execute(db.text("UPDATE user_assessment_stats SET phase_stats = :phases WHERE user_id = :id"),
+                           {"phases": json.dumps(phases), "id": user_id})
+        db.session.add(AssessmentResponse(assessment_id=assessment_id, section_id="general",
+                                          question_id="q2", question_text="q2", response_type="text"))
+        db.session.flush()
+
+        assert save_assessment_responses(assessment, [item("q3")]).response_count == 3
+
+
+def test_single_save_reads_and_writes_each_row_once(create_user_with_stats, save, count_statements):
+    user_id, assessment_id = create_user_with_stats()
+    save(assessment_id, "q1")
+    version = db.session.get(UserAssessmentStats, user_id).state_version
+
+    with count_statements() as statements:
+        assert save(assessment_id, "q2").status_code == 200
+
+    def count(prefix):
+        return sum(1 for s in statements if " ".join(s.split()).upper().startswith(prefix))
+
+    assert count("SELECT USER_ASSESSMENT_STATS") == count("UPDATE USER_ASSESSMENT_STATS") == 1
+    assert count("UPDATE ASSESSMENT ") == 1
+    # The route's own lookup, and to_dict() after the commit
+    assert count("SELECT ASSESSMENT.") == 2
+    db.session.expire_all()
+    assert db.session.get(UserAssessmentStats, user_id).state_version == version + 1
+
+
+def test_postgres_tells_inserts_from_updates_by_xmax():
+    flag = _inserted_flag("postgresql", AssessmentResponse.__table__)
+    assert str(flag.compile(dialect=postgresql.dialect())) == "(xmax = 0)"
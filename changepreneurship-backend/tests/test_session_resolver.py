@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+from src.models.assessment import User, UserSession, db
+from src.services.auth_service import AuthService
+from src.utils.session_resolver import SessionResolver, decode_session, session_resolver
+
+
+def create_session(app, token="resolver-token", expires_in=timedelta(days=1)):
+    with app.app_context():
+        user = User(username="resolver", email="resolver@example.com", password_hash="hashed")
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserSession(
+            user_id=user.id,
+            session_token=token,
+            expires_at=datetime.utcnow() + expires_in,
+            is_active=True,
+        ))
+        db.session.commit()
+        return user.id
+
+
+def test_second_lookup_is_served_from_local_cache(app, count_statements):
+    user_id = create_session(app)
+    resolver = SessionResolver(ttl_seconds=60)
+
+    with app.app_context():
+        first = resolver.resolve("resolver-token")
+        with count_statements() as statements:
+            second = resolver.resolve("resolver-token")
+
+    assert first.source == "db" and first.user_id == user_id
+    assert second.source == "local" and second.user_id == user_id
+    assert statements == []
+    stats = resolver.stats()
+    assert (stats["db_hits"], stats["local_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_unknown_and_expired_tokens_miss(app):
+    create_session(app, expires_in=timedelta(seconds=-1))
+    resolver = SessionResolver()
+
+    with app.app_context():
+        assert resolver.resolve("resolver-token") is None
+        assert resolver.resolve("nope") is None
+
+    assert resolver.stats()["misses"] == 2
+    assert resolver.stats()["size"] == 0
+
+
+def test_local_cache_is_bounded():
+    resolver = SessionResolver(max_entries=2)
+    for token in ("a", "b", "c"):
+        resolver._set_local(decode_session(token, '{"user_id": 1}'))
+
+    assert list(resolver._entries) == ["b", "c"]
+
+
+def test_decode_session_accepts_legacy_user_id():
+    assert decode_session("t", "42").user_id == 42
+    assert decode_session("t", None) is None
+    resolved = decode_session("t", '{"user_id": 7, "session_id": 3, "expires_at": "2030-01-01T00:00:00"}')
+    assert (resolved.user_id, resolved.session_id, resolved.expires_at.year) == (7, 3, 2030)
+
+
+def test_logout_invalidates_cached_session(app, client):
+    create_session(app)
+    headers = {"Authorization": "Bearer resolver-token"}
+
+    assert client.get("/api/auth/verify", headers=headers).status_code == 200
+    verified = client.get("/api/auth/verify", headers=headers).get_json()
+    assert verified["session"]["source"] == "local"
+
+    assert client.post("/api/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/auth/verify", headers=headers).status_code == 401
+
+    with app.app_context():
+        assert UserSession.query.filter_by(session_token="resolver-token").one().is_active is False
+    assert session_resolver.stats()["invalidations"] >= 1
+
+
+def test_routes_read_the_user_row_only_when_they_need_it(app, client, count_statements):
+    create_session(app)
+    headers = {"Authorization": "Bearer resolver-token"}
+    assert client.get("/api/auth/verify", headers=headers).status_code == 200
+
+    with app.app_context():
+        with count_statements() as scoped:
+            assert client.get("/api/assessment/phases", headers=headers).status_code == 200
+        with count_statements() as full:
+            verified = client.get("/api/auth/verify", headers=headers).get_json()
+
+    assert not [s for s in scoped if "FROM user " in s]
+    assert len([s for s in full if "FROM user " in s]) == 1
+    assert verified["user"]["username"] == "resolver"
+
+
+def test_deleting_a_user_invalidates_their_sessions(app, client):
+    user_id = create_session(app)
+    headers = {"Authorization": "Bearer resolver-token"}
+    assert client.get("/api/auth/verify", headers=headers).status_code == 200
+
+    with app.app_context():
+        AuthService.invalidate_user_sessions(user_id)
+        db.session.commit()
+
+    assert client.get("/api/assessment/phases", headers=headers).status_code == 401
+    with app.app_context():
+        assert UserSession.query.filter_by(user_id=user_id).one().is_active is False
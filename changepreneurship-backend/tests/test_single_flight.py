@@ -0,0 +1,143 @@
+import threading
+import time
+
+from src.services import llm_client as llm_client_module
+from src.services.llm_client import LLMClient
+from src.services.phase_summary_service import PhaseSummaryService
+from src.utils.single_flight import SingleFlight
+
+
+def run_concurrently(n, target):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight(wait_seconds=5)
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    results = run_concurrently(5, lambda: flight.do("k", work))
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 5
+    # Followers get their own copy
+    assert len({id(r) for r in results}) == 5
+    stats = flight.stats()
+    assert stats["leader"] == 1 and stats["local_waits"] == 4 and stats["inflight"] == 0
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["leader"] == 2
+
+
+def test_follower_times_out_to_fallback():
+    flight = SingleFlight(wait_seconds=0.05)
+    release = threading.Event()
+
+    leader = threading.Thread(target=lambda: flight.do("slow", lambda: release.wait(2) and "done"))
+    leader.start()
+    while not flight.stats()["inflight"]:
+        time.sleep(0.005)
+
+    assert flight.do("slow", lambda: "unused", fallback=lambda: "fallback") == "fallback"
+    release.set()
+    leader.join()
+    assert flight.stats()["fallbacks"] == 1
+
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight(wait_seconds=5)
+
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    def call():
+        try:
+            return flight.do("err", fail)
+        except RuntimeError as e:
+            return str(e)
+
+    assert run_concurrently(3, call) == ["provider down"] * 3
+
+
+def test_llm_client_generate_is_coalesced(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "mock")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setattr(llm_client_module, "single_flight", SingleFlight(wait_seconds=5))
+    calls = []
+
+    def slow_mock(self, prompt, system, options):
+        calls.append(prompt)
+        time.sleep(0.2)
+        return "answer"
+
+    monkeypatch.setattr(LLMClient, "_generate_mock", slow_mock)
+    client = LLMClient()
+
+    assert run_concurrently(4, lambda: client.generate("same prompt")) == ["answer"] * 4
+    assert len(calls) == 1
+
+
+def test_phase_summary_is_coalesced(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    calls = []
+
+    def slow_groq(self, phase_id, phase_name, prompt, count):
+        calls.append(phase_id)
+        time.sleep(0.2)
+        return {"phase_id": phase_id, "score": 80}
+
+    monkeypatch.setattr(PhaseSummaryService, "_call_groq", slow_groq)
+
+    class Response:
+        question_text = "Why?"
+        section_id = "general"
+
+        def get_response_value(self):
+            return "Because"
+
+    service = PhaseSummaryService()
+    results = run_concurrently(3, lambda: service.generate_summary("self_discovery", "Self Discovery", [Response()]))
+
+    assert len(calls) == 1
+    assert all(r["score"] == 80 for r in results)
+
+
+def test_insights_report_is_generated_once_for_parallel_requests(app, monkeypatch):
+    from src.services.insights_report_service import InsightsReportService
+
+    monkeypatch.setattr(InsightsReportService, "ENABLE_CACHE", True)
+    calls = []
+
+    def slow_generate(self, assessment_data, user_id=None):
+        calls.append(1)
+        time.sleep(0.2)
+        return {"entrepreneur": {"score": 70}}
+
+    monkeypatch.setattr(InsightsReportService, "_generate", slow_generate)
+    data = {"phases": [{"id": "self_discovery", "progress": 100, "completed": True}], "responses": {}}
+
+    results = run_concurrently(3, lambda: InsightsReportService().generate_report(5, data))
+
+    assert len(calls) == 1
+    assert all(r["entrepreneur"]["score"] == 70 for r in results)
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+
+from src.models.assessment import UserAssessmentStats, db
+from src.routes.dashboard import dashboard_service
+from src.utils.versioned_cache import VersionedCache
+
+HEADERS = {"Authorization": "Bearer stats-token"}
+
+
+def test_response_write_moves_the_state_version(app, client, create_user_with_stats, save):
+    user_id, assessment_id = create_user_with_stats()
+
+    first = client.get("/api/analytics/dashboard/assessment-stats", headers=HEADERS).get_json()["data"]
+    with app.app_context():
+        version = db.session.get(UserAssessmentStats, user_id).state_version
+
+    save(assessment_id, "q1")
+
+    with app.app_context():
+        assert db.session.get(UserAssessmentStats, user_id).state_version > version
+    second = client.get("/api/analytics/dashboard/assessment-stats", headers=HEADERS).get_json()["data"]
+    assert (first["total_responses"], second["total_responses"]) == (0, 1)
+
+
+def test_executive_summary_is_cached_until_the_next_answer(client, monkeypatch, create_user_with_stats, save):
+    monkeypatch.setenv("USE_LLM", "false")
+    _, assessment_id = create_user_with_stats()
+    builds = []
+    original = dashboard_service.generate_executive_summary
+    monkeypatch.setattr(dashboard_service, "generate_executive_summary",
+                        lambda user_id, **kw: builds.append(user_id) or original(user_id, **kw))
+
+    url = "/api/dashboard/executive-summary"
+    assert "from_cache" not in client.get(url, headers=HEADERS).get_json()
+    assert client.get(url, headers=HEADERS).get_json()["from_cache"] is True
+    assert len(builds) == 1
+
+    save(assessment_id, "q1")
+    assert "from_cache" not in client.get(url, headers=HEADERS).get_json()
+    assert len(builds) == 2
+
+
+def test_entry_is_refreshed_early_by_one_caller(monkeypatch):
+    cache = VersionedCache("test:xfetch", ttl_seconds=60)
+    cache.fetch(1, 1, lambda: "old")
+
+    # A build that took longer than the remaining lifetime makes the early refresh certain
+    monkeypatch.setattr("src.utils.versioned_cache.random.random", lambda: 1e-9)
+    envelope = cache._get(cache.key(1, 1))
+    envelope["delta"] = 5.0
+    cache._local[cache.key(1, 1)] = (json.dumps(envelope), envelope["expires_at"])
+
+    cache._claim_refresh(cache.key(1, 1))  # another request is already refreshing
+    assert cache.fetch(1, 1, lambda: "new") == ("old", True)
+    cache._release_refresh(cache.key(1, 1))
+
+    assert cache.fetch(1, 1, lambda: "new") == ("new", False)
+    monkeypatch.setattr("src.utils.versioned_cache.random.random", lambda: 0.5)
+    assert cache.fetch(1, 1, lambda: "newer") == ("new", True)
+
+
+def test_concurrent_misses_build_once():
+    cache = VersionedCache("test:stampede", ttl_seconds=60)
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.1)
+        return {"score": 70}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.fetch(1, 3, build)[0])) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1
+    assert results == [{"score": 70}] * 5
+
+
+def test_rejected_results_are_not_stored():
+    cache = VersionedCache("test:degraded", ttl_seconds=60)
+    cache.fetch(1, 1, lambda: {"degraded": True}, cache_if=lambda v: not v.get("degraded"))
+    assert cache.fetch(1, 1, lambda: {"data": 1})[0] == {"data": 1}
+
+
+def test_refresh_moves_the_version_and_caches_under_it(client, monkeypatch, create_user_with_stats):
+    monkeypatch.setenv("USE_LLM", "false")
+    create_user_with_stats()
+    url = "/api/dashboard/executive-summary"
+    etag = client.get(url, headers=HEADERS).headers["ETag"]
+
+    # The test app mounts dashboard_bp under /api/dashboard; main.py mounts it at the root
+    refreshed = client.post(f"/api/dashboard{url}/refresh", headers=HEADERS).get_json()["data"]
+
+    after = client.get(url, headers={**HEADERS, "If-None-Match": etag})
+    assert after.status_code == 200 and after.headers["ETag"] != etag
+    assert after.get_json()["from_cache"] is True
+    assert after.get_json()["data"] == refreshed
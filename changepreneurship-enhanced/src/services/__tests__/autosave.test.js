@@ -0,0 +1,37 @@
+import assert from 'node:assert';
+import { test } from 'node:test';
+import api from '../api.js';
+
+function stubFetch(body) {
+  const calls = [];
+  globalThis.fetch = async (url, options) => {
+    calls.push({ url, body: JSON.parse(options.body) });
+    return { ok: true, status: 200, json: async () => body };
+  };
+  return calls;
+}
+
+test('answers are coalesced into one batch request per assessment', async () => {
+  const calls = stubFetch({
+    saved: 1,
+    failed: 1,
+    results: [
+      { index: 0, question_id: 'q1', success: true },
+      { index: 1, question_id: 'q2', success: false, error: 'response_type is required' },
+    ],
+    assessment: { id: 7, progress_percentage: 10 },
+  });
+
+  const first = api.saveAssessmentResponse(7, { question_id: 'q1', response_value: 'a' });
+  const replaced = api.saveAssessmentResponse(7, { question_id: 'q1', response_value: 'b' });
+  const invalid = api.saveAssessmentResponse(7, { question_id: 'q2', response_value: 'c' });
+  await api.flushAssessmentResponses(7);
+
+  assert.equal(calls.length, 1);
+  assert.match(calls[0].url, /\/assessment\/7\/responses:batch$/);
+  assert.deepEqual(calls[0].body.responses.map((r) => r.response_value), ['b', 'c']);
+
+  assert.deepEqual(await first, { success: true, data: { assessment: { id: 7, progress_percentage: 10 } } });
+  assert.deepEqual(await replaced, await first);
+  assert.deepEqual(await invalid, { success: false, error: 'response_type is required' });
+});
@@ -24,6 +24,11 @@ const USER_DATA_KEY =
 // across origins). userData is kept in memory only — never written to storage.
 const _storage = typeof window !== 'undefined' ? window.sessionStorage : null;
 
+// Autosave: answers given in quick succession are sent as one responses:batch
+// request per assessment (one transaction on the backend instead of one per answer)
+const AUTOSAVE_DELAY_MS = 300;
+const AUTOSAVE_MAX_BATCH = 200; // MAX_BATCH_RESPONSES in routes/assessment.py
+
 class ApiService {
   constructor() {
     // Prefer sessionStorage; fall back to in-memory only if unavailable.
@@ -38,6 +43,10 @@ class ApiService {
       this.sessionToken = null;
     }
     this.userData = null; // kept in memory only
+    this.pendingResponses = new Map(); // assessmentId -> { items: Map(questionId -> entry), timer }
+    if (typeof window !== 'undefined') {
+      window.addEventListener('pagehide', () => this.flushAllAssessmentResponses());
+    }
   }
 
   getHeaders() {
@@ -196,13 +205,55 @@ class ApiService {
     return this.request(`/assessment/start/${phaseId}`, { method: 'POST' });
   }
 
-  async saveAssessmentResponse(assessmentId, responseData) {
-    return this.request(`/assessment/${assessmentId}/response`, {
-      method: 'POST',
-      body: JSON.stringify(responseData),
+  /**
+   * Queue one answer for autosave. Resolves like the single-response route
+   * ({success, data: {assessment}}) once its batch has been saved.
+   */
+  saveAssessmentResponse(assessmentId, responseData) {
+    return new Promise((resolve) => {
+      let pending = this.pendingResponses.get(assessmentId);
+      if (!pending) {
+        pending = { items: new Map(), timer: null };
+        this.pendingResponses.set(assessmentId, pending);
+      }
+      // A newer answer to the same question replaces the queued one
+      const queued = pending.items.get(responseData.question_id);
+      pending.items.set(responseData.question_id, {
+        data: responseData,
+        waiters: [...(queued ? queued.waiters : []), resolve],
+      });
+      clearTimeout(pending.timer);
+      pending.timer = setTimeout(() => this.flushAssessmentResponses(assessmentId), AUTOSAVE_DELAY_MS);
     });
   }
 
+  async flushAssessmentResponses(assessmentId) {
+    const pending = this.pendingResponses.get(assessmentId);
+    if (!pending) return;
+    this.pendingResponses.delete(assessmentId);
+    clearTimeout(pending.timer);
+
+    const entries = [...pending.items.values()];
+    for (let start = 0; start < entries.length; start += AUTOSAVE_MAX_BATCH) {
+      const chunk = entries.slice(start, start + AUTOSAVE_MAX_BATCH);
+      const result = await this.request(`/assessment/${assessmentId}/responses:batch`, {
+        method: 'POST',
+        body: JSON.stringify({ responses: chunk.map((entry) => entry.data) }),
+      });
+      chunk.forEach((entry, index) => {
+        const item = result.success ? result.data?.results?.[index] : null;
+        const outcome = item?.success
+          ? { success: true, data: { assessment: result.data.assessment } }
+          : { success: false, error: item?.error || result.error };
+        entry.waiters.forEach((resolve) => resolve(outcome));
+      });
+    }
+  }
+
+  async flushAllAssessmentResponses() {
+    await Promise.all([...this.pendingResponses.keys()].map((id) => this.flushAssessmentResponses(id)));
+  }
+
   async updateAssessmentProgress(assessmentId, progressPercentage, isCompleted = false, assessmentData = null) {
     const body = { progress_percentage: progressPercentage };
     if (isCompleted) body.is_completed = true;
@@ -403,18 +454,29 @@ class ApiService {
 
   /**
    * Get a brief AI-powered summary for a single completed assessment phase.
-   * Called immediately after phase completion.
+   * Called immediately after phase completion. The backend precomputes it
+   * when the phase is completed and answers 202 `status: 'pending'` while
+   * that job runs, so this polls until the summary is ready.
    *
    * @param {string} phaseId - e.g. 'self_discovery'
-   * @returns {Promise<{success: boolean, summary: Object}>}
+   * @param {{pollMs?: number, timeoutMs?: number}} options
+   * @returns {Promise<{success: boolean, status: string, summary: Object}>}
    */
-  async getPhaseAISummary(phaseId) {
-    const res = await fetch(`${API_BASE_URL}/ai/phase-summary`, {
-      method: 'POST',
-      headers: this.getHeaders(),
-      body: JSON.stringify({ phase_id: phaseId }),
-    });
-    return this.handleResponse(res);
+  async getPhaseAISummary(phaseId, { pollMs = 1500, timeoutMs = 60000 } = {}) {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+      const res = await fetch(`${API_BASE_URL}/ai/phase-summary`, {
+        method: 'POST',
+        headers: this.getHeaders(),
+        body: JSON.stringify({ phase_id: phaseId }),
+      });
+      const result = await this.handleResponse(res);
+      if (!result.success) return result;
+      if (result.data?.status !== 'pending' || Date.now() + pollMs > deadline) {
+        return { ...result.data, success: true };
+      }
+      await new Promise((resolve) => setTimeout(resolve, pollMs));
+    }
   }
 
   /**